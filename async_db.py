@@ -13,12 +13,17 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2024/4/6 14:21
 # @Desc    : 异步Aiomysql的增删改查封装
-from typing import Any, Dict, List, Union
+from typing import Any, AsyncIterator, Dict, List, Tuple, Union
 
 import aiomysql
 
+from sql_builder import MYSQL
+
 
 class AsyncMysqlDB:
+    # IN 查询每批的参数个数
+    IN_QUERY_BATCH_SIZE = 500
+
     def __init__(self, pool: aiomysql.Pool) -> None:
         self.__pool = pool
 
@@ -35,6 +40,25 @@ class AsyncMysqlDB:
                 data = await cur.fetchall()
                 return data or []
 
+    async def iter_query(self, sql: str, *args: Union[str, int], chunk_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        逐条返回查询结果，使用服务端游标（SSDictCursor）按 chunk_size 分批读取，结果集很大时内存占用也保持不变
+        遍历结束前会一直占用一个连接
+        :param sql: 查询的sql
+        :param args: sql中传递动态参数列表
+        :param chunk_size: 每批从服务端读取的行数
+        :return:
+        """
+        async with self.__pool.acquire() as conn:
+            async with conn.cursor(aiomysql.SSDictCursor) as cur:
+                await cur.execute(sql, args)
+                while True:
+                    rows = await cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield row
+
     async def get_first(self, sql: str, *args: Union[str, int]) -> Union[Dict[str, Any], None]:
         """
         从给定的 SQL 中查询记录，返回的是符合条件的第一个结果
@@ -55,15 +79,10 @@ class AsyncMysqlDB:
         :param item: 一条记录的字典信息
         :return:
         """
-        fields = list(item.keys())
-        values = list(item.values())
-        fields = [f'`{field}`' for field in fields]
-        fieldstr = ','.join(fields)
-        valstr = ','.join(['%s'] * len(item))
-        sql = "INSERT INTO %s (%s) VALUES(%s)" % (table_name, fieldstr, valstr)
+        sql = MYSQL.insert(table_name, tuple(item.keys()))
         async with self.__pool.acquire() as conn:
             async with conn.cursor(aiomysql.DictCursor) as cur:
-                await cur.execute(sql, values)
+                await cur.execute(sql, list(item.values()))
                 lastrowid = cur.lastrowid
                 return lastrowid
 
@@ -77,23 +96,86 @@ class AsyncMysqlDB:
         :param value_where: update 语句 where 条件中的字段值
         :return:
         """
-        upsets = []
-        values = []
-        for k, v in updates.items():
-            s = '`%s`=%%s' % k
-            upsets.append(s)
-            values.append(v)
-        upsets = ','.join(upsets)
-        sql = 'UPDATE %s SET %s WHERE %s="%s"' % (
-            table_name,
-            upsets,
-            field_where, value_where,
-        )
+        sql = MYSQL.update(table_name, tuple(updates.keys()), field_where)
         async with self.__pool.acquire() as conn:
             async with conn.cursor() as cur:
-                rows = await cur.execute(sql, values)
+                rows = await cur.execute(sql, [*updates.values(), value_where])
                 return rows
 
+    async def query_by_fields(self, table_name: str, where: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        按字段取值查询记录，多个字段之间是 AND 关系，取值通过参数绑定
+        :param table_name: 表名
+        :param where: 字段名 -> 取值
+        :return:
+        """
+        return await self.query(MYSQL.select_where(table_name, tuple(where.keys())), *where.values())
+
+    async def query_field_values(self, table_name: str, field: str, values: List[Union[str, int]]) -> List[Any]:
+        """
+        查询指定字段取值在 values 中的记录，返回已存在的字段值，按批拼成 IN 查询
+        :param table_name: 表名
+        :param field: 字段名
+        :param values: 待查询的字段值
+        :return:
+        """
+        found = []
+        async with self.__pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                for i in range(0, len(values), self.IN_QUERY_BATCH_SIZE):
+                    chunk = values[i:i + self.IN_QUERY_BATCH_SIZE]
+                    await cur.execute(MYSQL.select_in(table_name, field, len(chunk)), chunk)
+                    found.extend(row[0] for row in await cur.fetchall())
+        return found
+
+    async def query_rows_in(self, table_name: str, field: str, values: List[Union[str, int]],
+                            fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        """
+        查询指定字段取值在 values 中的记录，只取出 fields 里的字段，按批拼成 IN 查询
+        :param table_name: 表名
+        :param field: 字段名
+        :param values: 待查询的字段值
+        :param fields: 返回的字段
+        :return:
+        """
+        found = []
+        async with self.__pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                for i in range(0, len(values), self.IN_QUERY_BATCH_SIZE):
+                    chunk = values[i:i + self.IN_QUERY_BATCH_SIZE]
+                    await cur.execute(MYSQL.select_fields_in(table_name, fields, field, len(chunk)), chunk)
+                    found.extend(await cur.fetchall())
+        return found
+
+    async def items_to_table(self, table_name: str, items: List[Dict[str, Any]]) -> int:
+        """
+        表中批量插入数据，所有记录的字段相同；INSERT 语句匹配 aiomysql 的 RE_INSERT_VALUES，executemany 会合并成一条多值 INSERT
+        :param table_name: 表名
+        :param items: 记录列表
+        :return: 插入的条数
+        """
+        if not items:
+            return 0
+        sql = MYSQL.insert(table_name, tuple(items[0].keys()))
+        async with self.__pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                return await cur.executemany(sql, [list(item.values()) for item in items])
+
+    async def update_items(self, table_name: str, items: List[Dict[str, Any]], field_where: str) -> int:
+        """
+        按 field_where 批量更新记录，所有记录的字段相同，共用同一个连接
+        :param table_name: 表名
+        :param items: 记录列表
+        :param field_where: update 语句 where 条件中的字段名，取值来自每条记录
+        :return: 更新的条数
+        """
+        if not items:
+            return 0
+        sql = MYSQL.update(table_name, tuple(items[0].keys()), field_where)
+        async with self.__pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                return await cur.executemany(sql, [list(item.values()) + [item[field_where]] for item in items])
+
     async def execute(self, sql: str, *args: Union[str, int]) -> int:
         """
         需要更新、写入等操作的 excute 执行语句
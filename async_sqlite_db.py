@@ -13,12 +13,17 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2024/4/6 14:21
 # @Desc    : 异步SQLite的增删改查封装
-from typing import Any, Dict, List, Union
+from typing import Any, AsyncIterator, Dict, List, Tuple, Union
 
 import aiosqlite
 
+from sql_builder import SQLITE
+
 
 class AsyncSqliteDB:
+    # IN 查询每批的参数个数，低于 SQLite 默认的 999 个参数上限
+    IN_QUERY_BATCH_SIZE = 500
+
     def __init__(self, db_path: str) -> None:
         self.__db_path = db_path
 
@@ -35,6 +40,24 @@ class AsyncSqliteDB:
                 rows = await cursor.fetchall()
                 return [dict(row) for row in rows] if rows else []
 
+    async def iter_query(self, sql: str, *args: Union[str, int], chunk_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        逐条返回查询结果，按 chunk_size 分批 fetchmany，结果集很大时内存占用也保持不变
+        :param sql: 查询的sql
+        :param args: sql中传递动态参数列表
+        :param chunk_size: 每批读取的行数
+        :return:
+        """
+        async with aiosqlite.connect(self.__db_path) as conn:
+            conn.row_factory = aiosqlite.Row
+            async with conn.execute(sql, args) as cursor:
+                while True:
+                    rows = await cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield dict(row)
+
     async def get_first(self, sql: str, *args: Union[str, int]) -> Union[Dict[str, Any], None]:
         """
         从给定的 SQL 中查询记录，返回的是符合条件的第一个结果
@@ -55,13 +78,9 @@ class AsyncSqliteDB:
         :param item: 一条记录的字典信息
         :return:
         """
-        fields = list(item.keys())
-        values = list(item.values())
-        fieldstr = ','.join(fields)
-        valstr = ','.join(['?'] * len(item))
-        sql = f"INSERT INTO {table_name} ({fieldstr}) VALUES({valstr})"
+        sql = SQLITE.insert(table_name, tuple(item.keys()))
         async with aiosqlite.connect(self.__db_path) as conn:
-            async with conn.execute(sql, values) as cursor:
+            async with conn.execute(sql, list(item.values())) as cursor:
                 await conn.commit()
                 return cursor.lastrowid
 
@@ -75,19 +94,87 @@ class AsyncSqliteDB:
         :param value_where: update 语句 where 条件中的字段值
         :return:
         """
-        upsets = []
-        values = []
-        for k, v in updates.items():
-            upsets.append(f'{k}=?')
-            values.append(v)
-        upsets_str = ','.join(upsets)
-        values.append(value_where)
-        sql = f'UPDATE {table_name} SET {upsets_str} WHERE {field_where}=?'
+        sql = SQLITE.update(table_name, tuple(updates.keys()), field_where)
         async with aiosqlite.connect(self.__db_path) as conn:
-            async with conn.execute(sql, values) as cursor:
+            async with conn.execute(sql, [*updates.values(), value_where]) as cursor:
                 await conn.commit()
                 return cursor.rowcount
 
+    async def query_by_fields(self, table_name: str, where: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        按字段取值查询记录，多个字段之间是 AND 关系，取值通过参数绑定
+        :param table_name: 表名
+        :param where: 字段名 -> 取值
+        :return:
+        """
+        return await self.query(SQLITE.select_where(table_name, tuple(where.keys())), *where.values())
+
+    async def query_field_values(self, table_name: str, field: str, values: List[Union[str, int]]) -> List[Any]:
+        """
+        查询指定字段取值在 values 中的记录，返回已存在的字段值，按批拼成 IN 查询
+        :param table_name: 表名
+        :param field: 字段名
+        :param values: 待查询的字段值
+        :return:
+        """
+        found = []
+        async with aiosqlite.connect(self.__db_path) as conn:
+            for i in range(0, len(values), self.IN_QUERY_BATCH_SIZE):
+                chunk = values[i:i + self.IN_QUERY_BATCH_SIZE]
+                async with conn.execute(SQLITE.select_in(table_name, field, len(chunk)), chunk) as cursor:
+                    found.extend(row[0] for row in await cursor.fetchall())
+        return found
+
+    async def query_rows_in(self, table_name: str, field: str, values: List[Union[str, int]],
+                            fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        """
+        查询指定字段取值在 values 中的记录，只取出 fields 里的字段，按批拼成 IN 查询
+        :param table_name: 表名
+        :param field: 字段名
+        :param values: 待查询的字段值
+        :param fields: 返回的字段
+        :return:
+        """
+        found = []
+        async with aiosqlite.connect(self.__db_path) as conn:
+            conn.row_factory = aiosqlite.Row
+            for i in range(0, len(values), self.IN_QUERY_BATCH_SIZE):
+                chunk = values[i:i + self.IN_QUERY_BATCH_SIZE]
+                async with conn.execute(SQLITE.select_fields_in(table_name, fields, field, len(chunk)), chunk) as cursor:
+                    found.extend(dict(row) for row in await cursor.fetchall())
+        return found
+
+    async def items_to_table(self, table_name: str, items: List[Dict[str, Any]]) -> int:
+        """
+        表中批量插入数据，所有记录的字段相同，在同一个事务里写入
+        :param table_name: 表名
+        :param items: 记录列表
+        :return: 插入的条数
+        """
+        if not items:
+            return 0
+        sql = SQLITE.insert(table_name, tuple(items[0].keys()))
+        async with aiosqlite.connect(self.__db_path) as conn:
+            await conn.executemany(sql, [list(item.values()) for item in items])
+            await conn.commit()
+        return len(items)
+
+    async def update_items(self, table_name: str, items: List[Dict[str, Any]], field_where: str) -> int:
+        """
+        按 field_where 批量更新记录，所有记录的字段相同，在同一个事务里写入
+        :param table_name: 表名
+        :param items: 记录列表
+        :param field_where: update 语句 where 条件中的字段名，取值来自每条记录
+        :return: 更新的条数
+        """
+        if not items:
+            return 0
+        sql = SQLITE.update(table_name, tuple(items[0].keys()), field_where)
+        async with aiosqlite.connect(self.__db_path) as conn:
+            await conn.executemany(sql, [list(item.values()) + [item[field_where]] for item in items])
+            await conn.commit()
+        return len(items)
+
     async def execute(self, sql: str, *args: Union[str, int]) -> int:
         """
         需要更新、写入等操作的 excute 执行语句
@@ -9,7 +9,7 @@
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
 
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from playwright.async_api import BrowserContext, BrowserType, Playwright
 
@@ -23,6 +23,21 @@ class AbstractCrawler(ABC):
         """
         pass
 
+    @abstractmethod
+    async def prepare(self, playwright: Playwright):
+        """
+        launch browser and login, called once per crawler instance in daemon mode
+        :param playwright: playwright instance
+        """
+        pass
+
+    @abstractmethod
+    async def run(self):
+        """
+        crawl once according to config.CRAWLER_TYPE
+        """
+        pass
+
     @abstractmethod
     async def search(self):
         """
@@ -90,6 +105,19 @@ class AbstractStore(ABC):
     async def store_creator(self, creator: Dict):
         pass
 
+    # 批量写入接口：默认逐条调用上面的单条接口，各存储实现按自己的方式合并成一次 I/O
+    async def store_contents(self, content_items: List[Dict]):
+        for content_item in content_items:
+            await self.store_content(content_item)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        for comment_item in comment_items:
+            await self.store_comment(comment_item)
+
+    async def store_creators(self, creators: List[Dict]):
+        for creator in creators:
+            await self.store_creator(creator)
+
 
 class AbstractStoreImage(ABC):
     # TODO: support all platform
@@ -0,0 +1,214 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 评论树：所有评论表统一记录 root_comment_id（所属一级评论，一级评论为自身ID）和 parent_comment_id（回复的评论），
+#            按 (内容ID, root_comment_id) 建联合索引，一次索引范围查询取出一个楼层或一条内容下的全部评论，再在内存里拼成树，
+#            不需要按 parent_comment_id 反复自关联查询
+#
+# 命令行（在项目根目录执行）：
+#   python comment_tree.py --table xhs_note_comment --content-id 6645c1b1000000001e01b5f7
+#   python comment_tree.py --table bilibili_video_comment --content-id 1234567 --root-comment-id 7654321
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Sequence
+
+import config
+from async_sqlite_db import AsyncSqliteDB
+from sql_builder import MYSQL, SQLITE, SqlBuilder
+
+# 评论表 -> 所属内容的ID字段
+COMMENT_TABLES = {
+    "xhs_note_comment": "note_id",
+    "douyin_aweme_comment": "aweme_id",
+    "kuaishou_video_comment": "video_id",
+    "bilibili_video_comment": "video_id",
+    "weibo_note_comment": "note_id",
+    "tieba_comment": "note_id",
+    "zhihu_comment": "content_id",
+}
+
+# 评论树字段，旧版本建的表缺少时启动时补上，MySQL 字段长度和 schema/tables.sql 保持一致
+TREE_COLUMNS = ("parent_comment_id", "root_comment_id")
+MYSQL_ID_TYPES = {"tieba_comment": "varchar(255)"}
+
+# parent_comment_id 取这些值时表示一级评论
+EMPTY_PARENT_IDS = ("", "0")
+
+
+def thread_index_name(table_name: str) -> str:
+    return f"idx_{table_name}_thread"
+
+
+def _builder(async_db) -> SqlBuilder:
+    return SQLITE if isinstance(async_db, AsyncSqliteDB) else MYSQL
+
+
+def _content_column(table_name: str) -> str:
+    if table_name not in COMMENT_TABLES:
+        raise ValueError(f"{table_name} is not a comment table, supported: {', '.join(COMMENT_TABLES)}")
+    return COMMENT_TABLES[table_name]
+
+
+async def _table_columns(async_db, table_name: str) -> List[str]:
+    if isinstance(async_db, AsyncSqliteDB):
+        rows = await async_db.query(f"PRAGMA table_info({SQLITE.ident(table_name)})")
+        return [row["name"] for row in rows]
+    rows = await async_db.query(
+        "SELECT COLUMN_NAME AS name FROM information_schema.columns WHERE table_schema = DATABASE() AND table_name = %s",
+        table_name)
+    return [row["name"] for row in rows]
+
+
+async def _create_thread_index(async_db, table_name: str) -> None:
+    builder = _builder(async_db)
+    index = builder.ident(thread_index_name(table_name))
+    columns = f"{builder.ident(COMMENT_TABLES[table_name])}, {builder.ident('root_comment_id')}"
+    if isinstance(async_db, AsyncSqliteDB):
+        await async_db.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {builder.ident(table_name)}({columns})")
+        return
+    # MySQL 的 CREATE INDEX 不支持 IF NOT EXISTS
+    exists = await async_db.query(
+        "SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+        table_name, thread_index_name(table_name))
+    if not exists:
+        await async_db.execute(f"ALTER TABLE {builder.ident(table_name)} ADD INDEX {index} ({columns})")
+
+
+async def init_comment_tree(async_db) -> None:
+    """
+    给旧版本建的评论表补上 parent_comment_id / root_comment_id 字段和联合索引，可以重复执行；
+    新增 root_comment_id 时按 parent_comment_id 回填已有数据：没有父评论的是一级评论，其余按父评论归到对应楼层，
+    回复二级评论的旧数据没法区分，会被当成父评论所在的楼层
+    Args:
+        async_db: MySQL 或 SQLite 数据库对象
+
+    Returns:
+
+    """
+    builder = _builder(async_db)
+    for table_name in COMMENT_TABLES:
+        columns = await _table_columns(async_db, table_name)
+        if not columns:
+            continue
+        table = builder.ident(table_name)
+        for column in TREE_COLUMNS:
+            if column in columns:
+                continue
+            column_type = "TEXT" if builder is SQLITE else MYSQL_ID_TYPES.get(table_name, "varchar(64)")
+            await async_db.execute(f"ALTER TABLE {table} ADD COLUMN {builder.ident(column)} {column_type} DEFAULT NULL")
+            if column == "root_comment_id":
+                parent, comment = builder.ident("parent_comment_id"), builder.ident("comment_id")
+                await async_db.execute(
+                    f"UPDATE {table} SET {builder.ident(column)} = CASE WHEN {parent} IS NULL "
+                    f"OR {parent} IN ({builder.placeholders(len(EMPTY_PARENT_IDS))}) THEN {comment} ELSE {parent} END",
+                    *EMPTY_PARENT_IDS)
+        await _create_thread_index(async_db, table_name)
+
+
+def build_threads(rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    把评论记录拼成树，每条评论多一个 replies 字段；父评论不在结果里的回复挂到所在楼层的一级评论下，
+    一级评论也没有爬到时作为楼层的第一层返回
+    Args:
+        rows: 评论记录，按楼层、写入顺序排列
+
+    Returns: 一级评论列表
+
+    """
+    nodes: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        node = dict(row)
+        node["replies"] = []
+        nodes[str(node["comment_id"])] = node
+    threads: List[Dict[str, Any]] = []
+    for comment_id, node in nodes.items():
+        root_id = str(node.get("root_comment_id") or comment_id)
+        parent_id = str(node.get("parent_comment_id") or "")
+        parent = nodes.get(parent_id) if parent_id != comment_id else None
+        if parent is None and root_id != comment_id:
+            parent = nodes.get(root_id)
+        if parent is None:
+            threads.append(node)
+        else:
+            parent["replies"].append(node)
+    return threads
+
+
+async def load_thread(async_db, table_name: str, content_id: str, root_comment_id: str) -> List[Dict[str, Any]]:
+    """
+    读取一个楼层：一级评论和它下面的全部回复，走 (内容ID, root_comment_id) 联合索引的一次等值查询
+    Args:
+        async_db: MySQL 或 SQLite 数据库对象
+        table_name: 评论表名，需要在 COMMENT_TABLES 里
+        content_id: 帖子、视频等内容的ID
+        root_comment_id: 一级评论ID
+
+    Returns: 拼好的评论树
+
+    """
+    builder = _builder(async_db)
+    content_column = _content_column(table_name)
+    sql = builder.select_where(table_name, (content_column, "root_comment_id")) + f" ORDER BY {builder.ident('id')}"
+    return build_threads(await async_db.query(sql, content_id, root_comment_id))
+
+
+async def load_threads(async_db, table_name: str, content_id: str) -> List[Dict[str, Any]]:
+    """
+    读取一条内容下的所有楼层，按楼层顺序走联合索引的一次范围查询
+    Args:
+        async_db: MySQL 或 SQLite 数据库对象
+        table_name: 评论表名，需要在 COMMENT_TABLES 里
+        content_id: 帖子、视频等内容的ID
+
+    Returns: 拼好的评论树，每个元素是一个楼层
+
+    """
+    builder = _builder(async_db)
+    content_column = _content_column(table_name)
+    sql = builder.select_where(table_name, (content_column,)) + \
+        f" ORDER BY {builder.ident('root_comment_id')}, {builder.ident('id')}"
+    return build_threads(await async_db.query(sql, content_id))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load comment threads of a note / video from the database")
+    parser.add_argument("--db", choices=["sqlite", "db"], default="db" if config.SAVE_DATA_OPTION == "db" else "sqlite",
+                        help="sqlite=SQLite数据库 | db=MySQL数据库")
+    parser.add_argument("--table", required=True, choices=list(COMMENT_TABLES), help="comment table, e.g. xhs_note_comment")
+    parser.add_argument("--content-id", required=True, help="note / video / content id the comments belong to")
+    parser.add_argument("--root-comment-id", default="", help="only load the thread under this root comment")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    # db 初始化时会调用本模块，放到函数里导入避免循环导入
+    import db
+    from var import media_crawler_db_var
+
+    args = parse_args()
+    config.SAVE_DATA_OPTION = args.db
+    await db.init_db()
+    try:
+        async_db = media_crawler_db_var.get()
+        if args.root_comment_id:
+            threads = await load_thread(async_db, args.table, args.content_id, args.root_comment_id)
+        else:
+            threads = await load_threads(async_db, args.table, args.content_id)
+        print(json.dumps(threads, ensure_ascii=False, indent=2))
+    finally:
+        await db.close()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
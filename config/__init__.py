@@ -9,5 +9,10 @@
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
 
 
+import sys
+
 from .base_config import *
-from .db_config import *
\ No newline at end of file
+from .db_config import *
+from .overlay import install as _install_overlay, settings_overlay
+
+_install_overlay(sys.modules[__name__])
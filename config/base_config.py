@@ -16,6 +16,9 @@ COOKIES = ""
 CRAWLER_TYPE = (
     "search"  # 爬取类型，search(关键词搜索) | detail(帖子详情)| creator(创作者主页数据)
 )
+# 多平台运行配置文件（JSON），设置后在同一个进程里并发运行文件中列出的所有平台，忽略上面的 PLATFORM 等配置
+# 文件格式见 tools/run_spec.py
+RUN_SPEC_FILE = ""
 # 是否开启 IP 代理
 ENABLE_IP_PROXY = False
 
@@ -57,12 +60,82 @@ CDP_HEADLESS = False
 # 浏览器启动超时时间（秒）
 BROWSER_LAUNCH_TIMEOUT = 30
 
+# 签名、读取 localStorage 使用的浏览器页面数量，大于 1 时会额外打开页面，并发请求的签名不再排队等同一个页面（知乎的签名在本地计算，不使用页面池）
+BROWSER_PAGE_POOL_SIZE = 1
+
+# 是否拦截浏览器里的图片、音视频、字体和统计脚本请求，加快打开首页、登录、刷新 cookie 的速度
+# 各平台始终放行的地址（登录二维码、验证码图片等）在平台配置的 *_RESOURCE_ALLOW_LIST 里设置
+ENABLE_RESOURCE_FILTER = False
+
+# 拦截的资源类型，取值见 playwright 的 Request.resource_type
+RESOURCE_FILTER_BLOCKED_TYPES = ["image", "media", "font"]
+
+# 拦截的统计、监控域名（包含子域名）
+RESOURCE_FILTER_BLOCKED_HOSTS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "hm.baidu.com",
+    "cnzz.com",
+    "sentry.io",
+]
+
 # 是否在程序结束时自动关闭浏览器
 # 设置为False可以保持浏览器运行，便于调试
 AUTO_CLOSE_BROWSER = True
 
-# 数据保存类型选项配置,支持四种类型：csv、db、json、sqlite, 最好保存到DB，有排重的功能。
-SAVE_DATA_OPTION = "json"  # csv or db or json or sqlite
+# 数据保存类型选项配置,支持五种类型：csv、db、json、sqlite、parquet, 最好保存到DB，有排重的功能。
+# parquet 用于导入分析引擎（duckdb、spark 等），需要 pip install pyarrow
+SAVE_DATA_OPTION = "json"  # csv or db or json or sqlite or parquet
+
+# CSV 存储：每个文件常驻一个写入器，缓冲到这么多行后写入磁盘
+CSV_BUFFER_ROWS = 1000
+
+# CSV 缓冲区定时写入磁盘的间隔（秒），进程异常退出时最多丢失这段时间内的数据
+CSV_FLUSH_INTERVAL_SEC = 5
+
+# 单个 CSV 文件超过这个字节数或行数后切换到新文件（xxx_2.csv、xxx_3.csv ...），0 表示不限制
+CSV_ROTATE_MAX_BYTES = 512 * 1024 * 1024
+CSV_ROTATE_MAX_ROWS = 0
+
+# 文件类存储（csv、json）的压缩算法："" 不压缩、gzip、zstd（需要 pip install zstandard），压缩后文件名追加 .gz / .zst
+STORE_COMPRESSION = ""
+
+# 压缩级别，0 表示使用算法默认级别（gzip 6、zstd 3）
+STORE_COMPRESSION_LEVEL = 0
+
+# parquet 存储每个 row group 的行数，行数越多压缩率越高、占用内存越多
+PARQUET_ROW_GROUP_ROWS = 10000
+
+# parquet 文件的压缩算法：snappy、zstd、gzip、none
+PARQUET_COMPRESSION = "snappy"
+
+# DB/SQLite 存储先追加写入本地磁盘的 spool，由后台任务按批写入数据库，数据库变慢或暂时不可用时不拖慢爬取，
+# 进程退出时没写入数据库的数据保留在磁盘上，下次启动继续写入
+ENABLE_DB_SPOOL = False
+
+# spool 日志段所在目录和单个日志段的大小上限
+SPOOL_DIR = "data/spool"
+SPOOL_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+# 后台任务每次写入数据库的最大调用数
+SPOOL_BATCH_SIZE = 500
+
+# 每次写入 spool 后 fsync，机器断电也不丢数据，写入会变慢
+SPOOL_FSYNC = False
+
+# 运行结束时等待 spool 写入数据库的最长时间（秒）
+SPOOL_DRAIN_TIMEOUT_SEC = 30
+
+# 同一批数据写入数据库连续失败多少次后改为逐条写入，仍然失败的记录移到 spool 目录下的 dead_letter.jsonl，
+# 不再阻塞后面的数据；重试间隔翻倍到 60 秒封顶，默认大约能扛过 5 分钟的数据库不可用
+SPOOL_REPLAY_MAX_ATTEMPTS = 10
+
+# SQLite 存储给帖子、评论的文本字段建 FTS5 全文索引（写入时由触发器同步），可以用 python sqlite_fts.py 检索
+ENABLE_SQLITE_FTS = False
+
+# DB/SQLite 重复爬到已存在的记录时，只更新和数据库里取值不同的字段（如点赞数、评论数），没有变化的记录不写库；
+# last_modify_ts 只在有字段变化时更新。关闭后和以前一样每次整行覆盖
+SKIP_UNCHANGED_UPDATES = True
 
 # 用户浏览器缓存的浏览器文件配置
 USER_DATA_DIR = "%s_user_data_dir"  # %s will be replaced by platform name
@@ -76,6 +149,18 @@ CRAWLER_MAX_NOTES_COUNT = 200
 # 并发爬虫数量控制
 MAX_CONCURRENCY_NUM = 1
 
+# 同时搜索的关键词数量，每个关键词在独立的任务里抓取，1 表示按顺序逐个搜索
+KEYWORD_CONCURRENCY_NUM = 1
+
+# 创作者模式下同时抓取的创作者数量，1 表示按顺序逐个抓取
+CREATOR_CONCURRENCY_NUM = 1
+
+# 单个平台同时在途的请求数上限，所有关键词共享这个预算
+GLOBAL_MAX_INFLIGHT_REQUESTS = 8
+
+# 单个平台每秒最多发起的请求数，所有关键词共享，0 表示不限制
+GLOBAL_MAX_REQUESTS_PER_SEC = 0
+
 # 是否开启爬媒体模式（包含图片或视频资源），默认不开启爬媒体
 ENABLE_GET_MEIDAS = False
 
@@ -89,6 +174,10 @@ CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES = 10
 # 老版本项目使用了 db, 则需参考 schema/tables.sql line 287 增加表字段
 ENABLE_GET_SUB_COMMENTS = False
 
+# 同一个帖子下同时翻页抓取二级评论的一级评论数量（所有页的一级评论共用），一级评论翻页也会同时进行
+# 大于 1 时会提高对平台的请求频率，实际请求并发仍受 GLOBAL_MAX_INFLIGHT_REQUESTS 限制
+SUB_COMMENT_CONCURRENCY_NUM = 1
+
 # 词云相关
 # 是否开启生成评论词云图
 ENABLE_GET_WORDCLOUD = False
@@ -108,6 +197,56 @@ FONT_PATH = "./docs/STZHONGS.TTF"
 # 爬取间隔时间
 CRAWLER_MAX_SLEEP_SEC = 2
 
+# ==================== 日志配置 ====================
+# 全局日志级别 DEBUG | INFO | WARNING | ERROR
+LOG_LEVEL = "INFO"
+
+# 按模块单独设置日志级别，key 为模块路径前缀，匹配最长的前缀
+# 例如 {"store": "WARNING", "media_platform.xhs": "DEBUG"}
+LOG_MODULE_LEVELS = {}
+
+# 是否通过后台线程队列输出日志，开启后日志 I/O 不会阻塞事件循环
+ENABLE_ASYNC_LOG = True
+
+# 接口响应、存储记录等大报文日志的最大输出字符数，超出部分会被截断
+LOG_PAYLOAD_MAX_CHARS = 1024
+
+# 同一处大报文日志每 N 次只输出 1 次，1 表示全部输出
+LOG_PAYLOAD_SAMPLE_EVERY = 1
+
+# ==================== 运行指标配置 ====================
+# 是否开启 Prometheus 指标接口（请求数、耗时、状态码、存储吞吐、代理池）
+ENABLE_METRICS_SERVER = False
+
+# 指标接口监听地址和端口，访问 http://host:port/metrics
+METRICS_SERVER_HOST = "127.0.0.1"
+METRICS_SERVER_PORT = 9091
+
+# 是否开启分阶段耗时统计（签名、网络、解析、存储、休眠），程序退出时输出汇总
+ENABLE_TRACING = False
+
+# 分阶段耗时明细导出路径（Chrome trace 格式，可在 ui.perfetto.dev 打开），为空则不导出
+# 例如 "data/trace.json"
+TRACE_EXPORT_PATH = ""
+
+# ==================== 风控冷却配置 ====================
+# 疑似被封后暂停该平台请求的冷却时长（秒），冷却期间不阻塞其他任务
+CIRCUIT_BREAKER_COOLDOWN_SEC = 20
+
+# 冷却结束后探测仍失败时冷却时长翻倍，最长不超过该值（秒）
+CIRCUIT_BREAKER_MAX_COOLDOWN_SEC = 300
+
+# 连续多少次疑似被封的失败后进入冷却
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 1
+
+# ==================== 服务模式配置 ====================
+# 服务模式（python daemon.py）的监听地址和端口，浏览器、登录态、数据库连接池常驻，通过 HTTP 接口提交爬取任务
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8090
+
+# 服务模式最多保留多少个已结束任务的状态，超出后丢弃最早结束的任务
+DAEMON_MAX_FINISHED_JOBS = 200
+
 from .bilibili_config import *
 from .xhs_config import *
 from .dy_config import *
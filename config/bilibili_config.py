@@ -34,6 +34,10 @@ END_DAY = "2024-01-01"
 # 搜索模式
 BILI_SEARCH_MODE = "normal"
 
+# 按时间范围搜索时同时抓取的时间片数量（时间片按天切分，结果被截断时自动拆分到小时）
+# 大于 1 时会提高对平台的请求频率，实际请求并发仍受 GLOBAL_MAX_INFLIGHT_REQUESTS 限制
+BILI_TIME_SLICE_CONCURRENCY_NUM = 1
+
 # 是否爬取用户信息
 CREATOR_MODE = True
 
@@ -45,3 +49,9 @@ CRAWLER_MAX_CONTACTS_COUNT_SINGLENOTES = 100
 
 # 单个视频/帖子最大爬取动态数
 CRAWLER_MAX_DYNAMICS_COUNT_SINGLENOTES = 50
+
+# 开启 ENABLE_RESOURCE_FILTER 时始终放行的请求地址片段（登录二维码、验证码图片等）
+BILI_RESOURCE_ALLOW_LIST = [
+    "captcha",
+    "geetest",
+]
@@ -23,3 +23,10 @@ DY_CREATOR_ID_LIST = [
     "MS4wLjABAAAATJPY7LAlaa5X-c8uNdWkvz0jUGgpw4eeXIwu_8BhvqE",
     # ........................
 ]
+
+# 开启 ENABLE_RESOURCE_FILTER 时始终放行的请求地址片段（登录二维码、验证码图片等）
+DY_RESOURCE_ALLOW_LIST = [
+    "captcha",
+    "catpcha",
+    "verify",
+]
@@ -18,3 +18,8 @@ KS_CREATOR_ID_LIST = [
     "3x4sm73aye7jq7i",
     # ........................
 ]
+
+# 开启 ENABLE_RESOURCE_FILTER 时始终放行的请求地址片段（登录二维码、验证码图片等）
+KS_RESOURCE_ALLOW_LIST = [
+    "captcha",
+]
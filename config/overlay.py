@@ -0,0 +1,63 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 按任务覆盖配置：同一个进程里并发运行多个平台时，每个平台的配置互不影响
+import contextlib
+import types
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+# 当前任务的配置覆盖项，asyncio 创建任务时会复制上下文，同一次运行里派生的任务共用同一份覆盖项
+_overlay_var: ContextVar[Optional[Dict[str, Any]]] = ContextVar("config_overlay", default=None)
+
+
+class _OverlayModule(types.ModuleType):
+    """
+    config 模块的类型：读取配置时先查当前任务的覆盖项；覆盖生效期间修改配置（如爬虫运行中调整 CRAWLER_MAX_NOTES_COUNT）
+    只写入覆盖项，不影响其他平台
+    """
+
+    def __getattribute__(self, name: str) -> Any:
+        overlay = _overlay_var.get()
+        if overlay is not None and name in overlay:
+            return overlay[name]
+        return super().__getattribute__(name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        overlay = _overlay_var.get()
+        if overlay is not None:
+            overlay[name] = value
+        else:
+            super().__setattr__(name, value)
+
+
+def install(module: types.ModuleType) -> None:
+    module.__class__ = _OverlayModule
+
+
+@contextlib.contextmanager
+def settings_overlay(overrides: Dict[str, Any]) -> Iterator[None]:
+    """
+    在当前上下文里覆盖配置，退出 with 后恢复，可以嵌套：
+        with config.settings_overlay({"PLATFORM": "xhs", "KEYWORDS": "编程副业"}):
+            await crawler.start()
+    Args:
+        overrides: 配置名 -> 值
+
+    Returns:
+
+    """
+    token = _overlay_var.set({**(_overlay_var.get() or {}), **overrides})
+    try:
+        yield
+    finally:
+        _overlay_var.reset(token)
@@ -25,3 +25,9 @@ WEIBO_CREATOR_ID_LIST = [
     "5533390220",
     # ........................
 ]
+
+# 开启 ENABLE_RESOURCE_FILTER 时始终放行的请求地址片段（登录二维码、验证码图片等）
+WEIBO_RESOURCE_ALLOW_LIST = [
+    "qr.weibo.cn",
+    "captcha",
+]
@@ -26,3 +26,8 @@ XHS_CREATOR_ID_LIST = [
     "63e36c9a000000002703502b",
     # ........................
 ]
+
+# 开启 ENABLE_RESOURCE_FILTER 时始终放行的请求地址片段（登录二维码、验证码图片等）
+XHS_RESOURCE_ALLOW_LIST = [
+    "captcha",
+]
@@ -23,3 +23,9 @@ ZHIHU_SPECIFIED_ID_LIST = [
     "https://zhuanlan.zhihu.com/p/673461588",  # 文章
     "https://www.zhihu.com/zvideo/1539542068422144000",  # 视频
 ]
+
+# 开启 ENABLE_RESOURCE_FILTER 时始终放行的请求地址片段（登录二维码、验证码图片等）
+ZHIHU_RESOURCE_ALLOW_LIST = [
+    "qrcode",
+    "captcha",
+]
@@ -0,0 +1,299 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 服务模式：常驻进程里保持浏览器、登录态、数据库连接池和代理池，通过 HTTP 接口提交、查询、取消爬取任务
+#
+# 用法（在项目根目录执行）：
+#   python daemon.py
+#   curl -X POST http://127.0.0.1:8090/jobs -H "Content-Type: application/json" \
+#        -d '{"platform": "xhs", "crawler_type": "search", "keywords": "编程副业", "max_notes": 20}'
+import asyncio
+import contextlib
+import itertools
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from playwright.async_api import Playwright, async_playwright
+
+import config
+import db
+import store
+from base.base_crawler import AbstractCrawler
+from main import CrawlerFactory
+from store import csv_writer, parquet_writer, spool
+from tools import metrics, tracing, utils
+from tools.run_spec import CrawlSpec
+
+
+class CrawlJob:
+    def __init__(self, job_id: str, request: CrawlSpec):
+        self.job_id = job_id
+        self.request = request
+        # queued -> running -> finished / failed / cancelled
+        self.status = "queued"
+        self.error = ""
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.stored_contents = 0
+        self.stored_comments = 0
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("finished", "failed", "cancelled")
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "error": self.error,
+            "request": self.request.model_dump(exclude_none=True),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "stored_contents": self.stored_contents,
+            "stored_comments": self.stored_comments,
+        }
+
+
+class JobManager:
+    """
+    任务队列：按提交顺序逐个执行任务，每个平台的爬虫实例（浏览器、登录态、API 客户端、代理池）在第一次执行该平台任务时创建并一直保留
+    任务参数通过 config.settings_overlay 只在任务内生效；同一个平台的爬虫实例不能同时运行多个任务，任务按提交顺序逐个执行
+    """
+
+    def __init__(self):
+        self.jobs: "OrderedDict[str, CrawlJob]" = OrderedDict()
+        self.crawlers: Dict[str, AbstractCrawler] = {}
+        self._ids = itertools.count(1)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._playwright: Optional[Playwright] = None
+        self._owns_playwright = False
+
+    async def start(self, playwright: Optional[Playwright] = None) -> None:
+        """
+        初始化数据库连接池、启动 playwright 和任务队列
+        Args:
+            playwright: 已启动的 playwright 实例，为空时自行启动
+
+        Returns:
+
+        """
+        if config.SAVE_DATA_OPTION in ["db", "sqlite"]:
+            await db.init_db()
+        if spool.spool_enabled():
+            spool.get_spool()
+        self._owns_playwright = playwright is None
+        self._playwright = playwright or await async_playwright().start()
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._work())
+        utils.logger.info("[JobManager.start] job manager started")
+
+    async def stop(self) -> None:
+        """
+        取消所有未结束的任务，关闭浏览器、playwright 和数据库连接池
+        """
+        if self._worker:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+        running = [job.task for job in self.jobs.values() if job.task and not job.task.done()]
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        for job in self.jobs.values():
+            if job.status == "queued":
+                job.status = "cancelled"
+        for platform in list(self.crawlers):
+            await self._drop_crawler(platform)
+        if self._owns_playwright and self._playwright:
+            await self._playwright.stop()
+        await spool.close_spool()
+        if config.SAVE_DATA_OPTION in ["db", "sqlite"]:
+            await db.close()
+        await csv_writer.close_csv_writers()
+        await parquet_writer.close_parquet_writers()
+        store.clear_store_cache()
+        tracing.report()
+        utils.logger.info("[JobManager.stop] job manager stopped")
+
+    def submit(self, request: CrawlSpec) -> CrawlJob:
+        """
+        提交任务，排在队列末尾
+        Args:
+            request: 任务参数
+
+        Returns:
+
+        """
+        request.validate_spec()
+        job = CrawlJob(str(next(self._ids)), request)
+        self.jobs[job.job_id] = job
+        self._queue.put_nowait(job.job_id)
+        utils.logger.info(f"[JobManager.submit] job {job.job_id} queued, request: {job.request.model_dump(exclude_none=True)}")
+        return job
+
+    def cancel(self, job_id: str) -> CrawlJob:
+        """
+        取消任务：排队中的任务不再执行，运行中的任务会被取消
+        Args:
+            job_id: 任务ID
+
+        Returns:
+
+        """
+        job = self.jobs[job_id]
+        if job.status == "queued":
+            job.status = "cancelled"
+            job.finished_at = time.time()
+        elif job.status == "running" and job.task:
+            job.task.cancel()
+        return job
+
+    async def _get_crawler(self, platform: str) -> AbstractCrawler:
+        crawler = self.crawlers.get(platform)
+        if crawler is None:
+            utils.logger.info(f"[JobManager._get_crawler] prepare {platform} crawler, launch browser and login")
+            crawler = CrawlerFactory.create_crawler(platform)
+            try:
+                await crawler.prepare(self._playwright)
+            except BaseException:
+                await self._close_crawler(platform, crawler)
+                raise
+            self.crawlers[platform] = crawler
+        return crawler
+
+    @staticmethod
+    async def _close_crawler(platform: str, crawler: AbstractCrawler) -> None:
+        try:
+            await crawler.close()
+        except Exception as e:
+            utils.logger.warning(f"[JobManager._close_crawler] close {platform} crawler failed, err: {e}")
+
+    async def _drop_crawler(self, platform: str) -> None:
+        crawler = self.crawlers.pop(platform, None)
+        if crawler:
+            await self._close_crawler(platform, crawler)
+
+    async def _run_job(self, job: CrawlJob) -> None:
+        platform = job.request.platform
+        contents_before = metrics.STORE_ITEMS_TOTAL.total(platform=platform, item_type="content", outcome="ok")
+        comments_before = metrics.STORE_ITEMS_TOTAL.total(platform=platform, item_type="comment", outcome="ok")
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            with config.settings_overlay(job.request.config_overrides()):
+                crawler = await self._get_crawler(platform)
+                await crawler.run()
+            job.status = "finished"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+            utils.logger.error(f"[JobManager._run_job] job {job.job_id} failed, err: {job.error}")
+            # 失败可能是登录态失效或浏览器异常，下一个任务重新启动浏览器并登录
+            await self._drop_crawler(platform)
+        finally:
+            # 任务结束时缓冲中的数据写入磁盘，任务状态为结束时输出文件已经完整；parquet 文件写入文件尾后才能读取，每个任务单独一个文件
+            await csv_writer.flush_csv_writers()
+            await parquet_writer.close_parquet_writers()
+            job.finished_at = time.time()
+            job.stored_contents = int(metrics.STORE_ITEMS_TOTAL.total(platform=platform, item_type="content", outcome="ok") - contents_before)
+            job.stored_comments = int(metrics.STORE_ITEMS_TOTAL.total(platform=platform, item_type="comment", outcome="ok") - comments_before)
+            utils.logger.info(f"[JobManager._run_job] job {job.job_id} {job.status}, contents: {job.stored_contents}, "
+                              f"comments: {job.stored_comments}, elapsed: {job.finished_at - job.started_at:.1f}s")
+
+    def _trim_finished_jobs(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(len(finished) - config.DAEMON_MAX_FINISHED_JOBS, 0)]:
+            del self.jobs[job_id]
+
+    async def _work(self) -> None:
+        while True:
+            job = self.jobs.get(await self._queue.get())
+            if job is None or job.status != "queued":
+                continue
+            job.task = asyncio.create_task(self._run_job(job))
+            # asyncio.wait 不会把取消传给任务，任务被取消时 worker 继续处理下一个
+            await asyncio.wait([job.task])
+            self._trim_finished_jobs()
+
+
+job_manager = JobManager()
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_: FastAPI):
+    if config.ENABLE_METRICS_SERVER:
+        import metrics_server
+        metrics_server.start_metrics_server(config.METRICS_SERVER_HOST, config.METRICS_SERVER_PORT)
+    await job_manager.start()
+    yield
+    await job_manager.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.post("/jobs")
+async def submit_job(request: CrawlSpec):
+    """
+    提交爬取任务
+    Args:
+        request:
+            {
+                "platform": "xhs",
+                "crawler_type": "search",
+                "keywords": "编程副业,编程兼职",
+                "max_notes": 20,
+                "get_comment": true
+            }
+
+    Returns:
+
+    """
+    try:
+        return job_manager.submit(request).to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/jobs")
+async def list_jobs():
+    return {
+        "jobs": [job.to_dict() for job in job_manager.jobs.values()],
+        "warm_platforms": list(job_manager.crawlers),
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    if job_id not in job_manager.jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_manager.cancel(job_id).to_dict()
+
+
+if __name__ == '__main__':
+    uvicorn.run(app, port=config.DAEMON_PORT, host=config.DAEMON_HOST)
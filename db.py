@@ -20,7 +20,9 @@ from urllib.parse import urlparse
 import aiofiles
 import aiomysql
 
+import comment_tree
 import config
+import sqlite_fts
 from async_db import AsyncMysqlDB
 from async_sqlite_db import AsyncSqliteDB
 from tools import utils
@@ -42,6 +44,7 @@ async def init_mediacrawler_db():
         autocommit=True,
     )
     async_db_obj = AsyncMysqlDB(pool)
+    await comment_tree.init_comment_tree(async_db_obj)
 
     # 将连接池对象和封装的CRUD sql接口对象放到上下文变量中
     db_conn_pool_var.set(pool)
@@ -55,6 +58,9 @@ async def init_sqlite_db():
 
     """
     async_db_obj = AsyncSqliteDB(config.SQLITE_DB_PATH)
+    await comment_tree.init_comment_tree(async_db_obj)
+    if config.ENABLE_SQLITE_FTS:
+        await sqlite_fts.init_fts(async_db_obj)
     
     # 将SQLite数据库对象放到上下文变量中
     media_crawler_db_var.set(async_db_obj)
@@ -131,6 +137,8 @@ async def init_table_schema(db_type: str = None):
         async with aiofiles.open("schema/sqlite_tables.sql", mode="r", encoding="utf-8") as f:
             schema_sql = await f.read()
             await async_db_obj.executescript(schema_sql)
+            if config.ENABLE_SQLITE_FTS:
+                await sqlite_fts.init_fts(async_db_obj)
             utils.logger.info("[init_table_schema] sqlite table schema init successful")
     elif db_type == "mysql":
         utils.logger.info("[init_table_schema] begin init mysql table schema ...")
@@ -0,0 +1,225 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 数据导出：从 SQLite / MySQL 流式读取一张表（可以按时间范围过滤），导出为 JSONL、CSV 或 Parquet，内存占用与表的大小无关
+#
+# 用法（在项目根目录执行）：
+#   python export.py --table xhs_note_comment --output data/export/xhs_note_comment.jsonl
+#   python export.py --db db --table douyin_aweme --output data/export/douyin_aweme.csv.gz --start 2024-01-01 --end 2024-02-01
+#   python export.py --table bilibili_video --output data/export/bilibili_video.parquet --time-field last_modify_ts --start 1704038400000
+# 输出文件以 .gz / .zst 结尾时，JSONL、CSV 按批压缩成独立的帧写入
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import config
+import db
+from store import compression, parquet_writer
+from store.parquet_writer import table_columns
+from sql_builder import MYSQL, SQLITE, SqlBuilder
+from tools import utils
+from var import media_crawler_db_var
+
+FORMATS = ["jsonl", "csv", "parquet"]
+
+
+def parse_time(value: str) -> int:
+    """
+    把时间参数转换成 13 位时间戳，支持 13 位时间戳、2024-01-01、2024-01-01 12:00:00
+    Args:
+        value: 时间参数
+
+    Returns:
+
+    """
+    if value.isdigit():
+        return int(value)
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return int(datetime.strptime(value, fmt).timestamp() * 1000)
+        except ValueError:
+            continue
+    raise ValueError(f"invalid time: {value}, use a 13 digit timestamp, YYYY-MM-DD or 'YYYY-MM-DD HH:MM:SS'")
+
+
+def guess_format(output: str) -> str:
+    """
+    按输出文件的扩展名判断导出格式，如 xxx.csv.gz -> csv
+    """
+    algorithm = compression.algorithm_of(output)
+    name = output[:-len(compression.SUFFIXES[algorithm])] if algorithm else output
+    fmt = os.path.splitext(name)[1].lstrip(".")
+    if fmt not in FORMATS:
+        raise ValueError(f"can not guess export format from {output}, please specify --format {' or '.join(FORMATS)}")
+    return fmt
+
+
+def build_query(table: str, time_field: str, start: Optional[int], end: Optional[int],
+                builder: SqlBuilder) -> Tuple[str, List[int]]:
+    """
+    拼接导出的查询语句，表名和字段名只接受建表语句里存在的名字，时间范围通过参数传入
+    Args:
+        table: 表名
+        time_field: 按时间范围过滤的字段
+        start: 开始时间（包含），13 位时间戳
+        end: 结束时间（不包含），13 位时间戳
+        builder: 数据库方言对应的 SQL 生成器
+
+    Returns:
+
+    """
+    columns = [name for name, _ in table_columns(table)]
+    if time_field not in columns:
+        raise ValueError(f"table {table} has no column {time_field}")
+    conditions, args = [], []
+    if start is not None:
+        conditions.append(f"{builder.ident(time_field)} >= {builder.placeholder}")
+        args.append(start)
+    if end is not None:
+        conditions.append(f"{builder.ident(time_field)} < {builder.placeholder}")
+        args.append(end)
+    sql = f"SELECT * FROM {builder.ident(table)}"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return sql + " ORDER BY id", args
+
+
+class TextExporter:
+    """
+    JSONL / CSV 导出：每批数据序列化后写入文件，输出文件以 .gz / .zst 结尾时每批压缩成一个独立的帧
+    """
+
+    def __init__(self, output: str, fmt: str):
+        self.output = output
+        self.fmt = fmt
+        algorithm = compression.algorithm_of(output)
+        self.compressor = compression.FrameCompressor(algorithm) if algorithm else None
+        self._file = open(output, "wb")
+        self._header: Optional[List[str]] = None
+
+    async def write(self, rows: List[Dict]) -> None:
+        # 编码、压缩在线程里进行，不阻塞读取下一批数据
+        await asyncio.to_thread(self._write, rows)
+
+    def _write(self, rows: List[Dict]) -> None:
+        if self.fmt == "jsonl":
+            data = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+        else:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if self._header is None:
+                self._header = list(rows[0].keys())
+                writer.writerow(self._header)
+            writer.writerows([row.get(name) for name in self._header] for row in rows)
+            data = buffer.getvalue().encode("utf-8")
+            if self._file.tell() == 0:
+                # 与 CSV 存储一致，带 BOM 方便 Excel 识别 utf-8
+                data = "\ufeff".encode("utf-8") + data
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+        self._file.write(data)
+
+    async def close(self) -> None:
+        self._file.close()
+
+
+class ParquetExporter:
+    """
+    Parquet 导出：复用 parquet 存储的写入器，列和类型与建表语句一致，每批数据写成一个 row group
+    """
+
+    def __init__(self, output: str, table: str, chunk_size: int):
+        self._writer = parquet_writer.ParquetTableWriter(output, table, row_group_rows=chunk_size,
+                                                         compression=config.PARQUET_COMPRESSION)
+
+    async def write(self, rows: List[Dict]) -> None:
+        await self._writer.write_rows(rows)
+
+    async def close(self) -> None:
+        await self._writer.close()
+
+
+async def export_table(table: str, output: str, fmt: str = "", time_field: str = "add_ts", start: Optional[int] = None,
+                       end: Optional[int] = None, chunk_size: int = 1000) -> int:
+    """
+    流式导出一张表，需要先调用 db.init_db()
+    Args:
+        table: 表名，如 xhs_note_comment
+        output: 输出文件，已存在时覆盖
+        fmt: jsonl、csv、parquet，为空时按输出文件的扩展名判断
+        time_field: 按时间范围过滤的字段，默认为写入时间 add_ts
+        start: 开始时间（包含），13 位时间戳
+        end: 结束时间（不包含），13 位时间戳
+        chunk_size: 每批读取、写入的行数
+
+    Returns: 导出的行数
+
+    """
+    fmt = fmt or guess_format(output)
+    async_db = media_crawler_db_var.get()
+    sql, args = build_query(table, time_field, start, end, SQLITE if config.SAVE_DATA_OPTION == "sqlite" else MYSQL)
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    if os.path.exists(output):
+        os.remove(output)
+    exporter = ParquetExporter(output, table, chunk_size) if fmt == "parquet" else TextExporter(output, fmt)
+    begin = time.perf_counter()
+    total = 0
+    rows: List[Dict] = []
+    try:
+        async for row in async_db.iter_query(sql, *args, chunk_size=chunk_size):
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                await exporter.write(rows)
+                total += len(rows)
+                rows = []
+        if rows:
+            await exporter.write(rows)
+            total += len(rows)
+    finally:
+        await exporter.close()
+    utils.logger.info(f"[export_table] exported {total} rows of {table} to {output}, elapsed: {time.perf_counter() - begin:.1f}s")
+    return total
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export a MediaCrawler table to JSONL / CSV / Parquet in constant memory")
+    parser.add_argument("--db", choices=["sqlite", "db"], default="db" if config.SAVE_DATA_OPTION == "db" else "sqlite",
+                        help="sqlite=SQLite数据库 | db=MySQL数据库")
+    parser.add_argument("--table", required=True, help="table name, e.g. xhs_note_comment")
+    parser.add_argument("--output", required=True, help="output file, .gz / .zst suffix compresses jsonl and csv output")
+    parser.add_argument("--format", default="", choices=[""] + FORMATS, help="export format, guessed from --output by default")
+    parser.add_argument("--time-field", default="add_ts", help="column used by --start / --end, default add_ts")
+    parser.add_argument("--start", type=parse_time, default=None, help="inclusive start, 13 digit timestamp or YYYY-MM-DD")
+    parser.add_argument("--end", type=parse_time, default=None, help="exclusive end, 13 digit timestamp or YYYY-MM-DD")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows fetched and written per batch")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    config.SAVE_DATA_OPTION = args.db
+    await db.init_db()
+    try:
+        await export_table(args.table, args.output, args.format, args.time_field, args.start, args.end, args.chunk_size)
+    finally:
+        await db.close()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
@@ -10,46 +10,78 @@
 
 
 import asyncio
+import importlib
 import sys
-from typing import Optional
+from typing import List, Optional
+
+from playwright.async_api import Playwright, async_playwright
 
 import cmd_arg
 import config
 import db
+import store
 from base.base_crawler import AbstractCrawler
-from media_platform.bilibili import BilibiliCrawler
-from media_platform.douyin import DouYinCrawler
-from media_platform.kuaishou import KuaishouCrawler
-from media_platform.tieba import TieBaCrawler
-from media_platform.weibo import WeiboCrawler
-from media_platform.xhs import XiaoHongShuCrawler
-from media_platform.zhihu import ZhihuCrawler
+from store import csv_writer, parquet_writer, spool
+from tools import scheduler, tracing
+from tools.run_spec import CrawlSpec, load_run_spec
 
 
 class CrawlerFactory:
+    # 平台 -> (模块, 爬虫类名)，创建爬虫时才导入对应平台，只跑一个平台时不用加载其他平台的依赖
     CRAWLERS = {
-        "xhs": XiaoHongShuCrawler,
-        "dy": DouYinCrawler,
-        "ks": KuaishouCrawler,
-        "bili": BilibiliCrawler,
-        "wb": WeiboCrawler,
-        "tieba": TieBaCrawler,
-        "zhihu": ZhihuCrawler,
+        "xhs": ("media_platform.xhs", "XiaoHongShuCrawler"),
+        "dy": ("media_platform.douyin", "DouYinCrawler"),
+        "ks": ("media_platform.kuaishou", "KuaishouCrawler"),
+        "bili": ("media_platform.bilibili", "BilibiliCrawler"),
+        "wb": ("media_platform.weibo", "WeiboCrawler"),
+        "tieba": ("media_platform.tieba", "TieBaCrawler"),
+        "zhihu": ("media_platform.zhihu", "ZhihuCrawler"),
     }
 
     @staticmethod
     def create_crawler(platform: str) -> AbstractCrawler:
-        crawler_class = CrawlerFactory.CRAWLERS.get(platform)
-        if not crawler_class:
+        crawler_path = CrawlerFactory.CRAWLERS.get(platform)
+        if not crawler_path:
             raise ValueError(
                 "Invalid Media Platform Currently only supported xhs or dy or ks or bili ..."
             )
+        module_name, class_name = crawler_path
+        crawler_class = getattr(importlib.import_module(module_name), class_name)
         return crawler_class()
 
 
 crawler: Optional[AbstractCrawler] = None
 
 
+async def run_spec(spec: CrawlSpec, playwright: Playwright) -> None:
+    """
+    运行 run spec 里的一个平台，该平台的参数只在自己的任务里生效
+    Args:
+        spec: 平台的爬取参数
+        playwright: 各平台共用的 playwright 实例
+
+    Returns:
+
+    """
+    with config.settings_overlay(spec.config_overrides()):
+        spec_crawler = CrawlerFactory.create_crawler(spec.platform)
+        await spec_crawler.prepare(playwright)
+        await spec_crawler.run()
+
+
+async def run_specs(specs: List[CrawlSpec]) -> None:
+    """
+    在同一个事件循环里并发运行多个平台，共用 playwright、数据库连接池、代理池和指标；单个平台失败不影响其他平台
+    Args:
+        specs: 各平台的爬取参数
+
+    Returns:
+
+    """
+    async with async_playwright() as playwright:
+        await scheduler.run_concurrently(specs, lambda spec: run_spec(spec, playwright), len(specs), "run_specs")
+
+
 async def main():
     # Init crawler
     global crawler
@@ -57,15 +89,36 @@ async def main():
     # parse cmd
     await cmd_arg.parse_cmd()
 
+    # start metrics server
+    if config.ENABLE_METRICS_SERVER:
+        import metrics_server
+        metrics_server.start_metrics_server(config.METRICS_SERVER_HOST, config.METRICS_SERVER_PORT)
+
+    specs = load_run_spec(config.RUN_SPEC_FILE) if config.RUN_SPEC_FILE else []
+
     # init db
     if config.SAVE_DATA_OPTION in ["db", "sqlite"]:
         await db.init_db()
+    if spool.spool_enabled():
+        # 上次运行没写入数据库的 spool 数据在爬取的同时继续写入
+        spool.get_spool()
 
-    crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
-    await crawler.start()
+    try:
+        if specs:
+            await run_specs(specs)
+            return
+
+        crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
+        await crawler.start()
+    finally:
+        await csv_writer.close_csv_writers()
+        await parquet_writer.close_parquet_writers()
+        await spool.close_spool()
 
 
 def cleanup():
+    tracing.report()
+    store.clear_store_cache()
     if crawler:
         # asyncio.run(crawler.close())
         pass
@@ -19,11 +19,12 @@ from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlencode
 
 import httpx
-from playwright.async_api import BrowserContext, Page
+from playwright.async_api import BrowserContext
 
 import config
 from base.base_crawler import AbstractApiClient
-from tools import utils
+from tools import metrics, scheduler, tracing, utils
+from tools.page_pool import BrowserPagePool
 
 from .exception import DataFetchError
 from .field import CommentOrderType, SearchOrderType
@@ -38,21 +39,26 @@ class BilibiliClient(AbstractApiClient):
         proxy=None,
         *,
         headers: Dict[str, str],
-        playwright_page: Page,
+        page_pool: BrowserPagePool,
         cookie_dict: Dict[str, str],
     ):
         self.proxy = proxy
         self.timeout = timeout
         self.headers = headers
         self._host = "https://api.bilibili.com"
-        self.playwright_page = playwright_page
+        self.page_pool = page_pool
         self.cookie_dict = cookie_dict
 
+    @scheduler.limit_requests("bili")
+    @metrics.instrument_request("bili")
     async def request(self, method, url, **kwargs) -> Any:
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        with tracing.span("network", url):
+            async with httpx.AsyncClient(proxy=self.proxy) as client:
+                response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        metrics.observe_response("bili", response.status_code)
         try:
-            data: Dict = response.json()
+            with tracing.span("parse"):
+                data: Dict = response.json()
         except json.JSONDecodeError:
             utils.logger.error(f"[BilibiliClient.request] Failed to decode JSON from response. status_code: {response.status_code}, response_text: {response.text}")
             raise DataFetchError(f"Failed to decode JSON, content: {response.text}")
@@ -61,6 +67,7 @@ class BilibiliClient(AbstractApiClient):
         else:
             return data.get("data", {})
 
+    @tracing.traced("sign")
     async def pre_request_data(self, req_data: Dict) -> Dict:
         """
         发送请求进行请求参数签名
@@ -79,7 +86,7 @@ class BilibiliClient(AbstractApiClient):
         获取最新的 img_key 和 sub_key
         :return:
         """
-        local_storage = await self.playwright_page.evaluate("() => window.localStorage")
+        local_storage = await self.page_pool.evaluate("() => window.localStorage")
         wbi_img_urls = local_storage.get("wbi_img_urls", "")
         if not wbi_img_urls:
             img_url_from_storage = local_storage.get("wbi_img_url")
@@ -252,57 +259,80 @@ class BilibiliClient(AbstractApiClient):
         is_end = False
         next_page = 0
         max_retries = 3
-        while not is_end and len(result) < max_count:
-            comments_res = None
-            for attempt in range(max_retries):
-                try:
-                    comments_res = await self.get_video_comments(video_id, CommentOrderType.DEFAULT, next_page)
-                    break  # Success
-                except DataFetchError as e:
-                    if attempt < max_retries - 1:
-                        delay = 5 * (2**attempt) + random.uniform(0, 1)
-                        utils.logger.warning(f"[BilibiliClient.get_video_all_comments] Retrying video_id {video_id} in {delay:.2f}s... (Attempt {attempt + 1}/{max_retries})")
-                        await asyncio.sleep(delay)
-                    else:
-                        utils.logger.error(f"[BilibiliClient.get_video_all_comments] Max retries reached for video_id: {video_id}. Skipping comments. Error: {e}")
-                        is_end = True
-                        break
-            if not comments_res:
-                break
-
-            cursor_info: Dict = comments_res.get("cursor")
-            if not cursor_info:
-                utils.logger.warning(f"[BilibiliClient.get_video_all_comments] Could not find 'cursor' in response for video_id: {video_id}. Skipping.")
-                break
-
-            comment_list: List[Dict] = comments_res.get("replies", [])
-
-            # 检查 is_end 和 next 是否存在
-            if "is_end" not in cursor_info or "next" not in cursor_info:
-                utils.logger.warning(f"[BilibiliClient.get_video_all_comments] 'is_end' or 'next' not in cursor for video_id: {video_id}. Assuming end of comments.")
-                is_end = True
-            else:
-                is_end = cursor_info.get("is_end")
-                next_page = cursor_info.get("next")
-
-            if not isinstance(is_end, bool):
-                utils.logger.warning(f"[BilibiliClient.get_video_all_comments] 'is_end' is not a boolean for video_id: {video_id}. Assuming end of comments.")
-                is_end = True
-            if is_fetch_sub_comments:
-                for comment in comment_list:
-                    comment_id = comment['rpid']
-                    if (comment.get("rcount", 0) > 0):
-                        {await self.get_video_all_level_two_comments(video_id, comment_id, CommentOrderType.DEFAULT, 10, crawl_interval, callback)}
-            if len(result) + len(comment_list) > max_count:
-                comment_list = comment_list[:max_count - len(result)]
-            if callback:  # 如果有回调函数，就执行回调函数
-                await callback(video_id, comment_list)
-            await asyncio.sleep(crawl_interval)
-            if not is_fetch_sub_comments:
+        # 二级评论在后台抓取，一级评论继续翻页，不用等每一页的回复都抓完；同一个帖子下所有页共用一个并发上限
+        sub_comment_semaphore = scheduler.sub_comment_semaphore()
+        async with scheduler.BackgroundTasks() as pending:
+            while not is_end and len(result) < max_count:
+                comments_res = None
+                for attempt in range(max_retries):
+                    try:
+                        comments_res = await self.get_video_comments(video_id, CommentOrderType.DEFAULT, next_page)
+                        break  # Success
+                    except DataFetchError as e:
+                        if attempt < max_retries - 1:
+                            delay = 5 * (2**attempt) + random.uniform(0, 1)
+                            utils.logger.warning(f"[BilibiliClient.get_video_all_comments] Retrying video_id {video_id} in {delay:.2f}s... (Attempt {attempt + 1}/{max_retries})")
+                            await tracing.sleep(delay)
+                        else:
+                            utils.logger.error(f"[BilibiliClient.get_video_all_comments] Max retries reached for video_id: {video_id}. Skipping comments. Error: {e}")
+                            is_end = True
+                            break
+                if not comments_res:
+                    break
+
+                cursor_info: Dict = comments_res.get("cursor")
+                if not cursor_info:
+                    utils.logger.warning(f"[BilibiliClient.get_video_all_comments] Could not find 'cursor' in response for video_id: {video_id}. Skipping.")
+                    break
+
+                comment_list: List[Dict] = comments_res.get("replies", [])
+
+                # 检查 is_end 和 next 是否存在
+                if "is_end" not in cursor_info or "next" not in cursor_info:
+                    utils.logger.warning(f"[BilibiliClient.get_video_all_comments] 'is_end' or 'next' not in cursor for video_id: {video_id}. Assuming end of comments.")
+                    is_end = True
+                else:
+                    is_end = cursor_info.get("is_end")
+                    next_page = cursor_info.get("next")
+
+                if not isinstance(is_end, bool):
+                    utils.logger.warning(f"[BilibiliClient.get_video_all_comments] 'is_end' is not a boolean for video_id: {video_id}. Assuming end of comments.")
+                    is_end = True
+                if len(result) + len(comment_list) > max_count:
+                    comment_list = comment_list[:max_count - len(result)]
+                if callback:  # 如果有回调函数，就执行回调函数
+                    await callback(video_id, comment_list)
                 result.extend(comment_list)
-                continue
+                if is_fetch_sub_comments:
+                    pending.start(self.get_comments_all_level_two_comments(video_id, comment_list, crawl_interval, callback,
+                                                                           sub_comment_semaphore))
+                await tracing.sleep(crawl_interval)
+            await pending.join()
         return result
 
+    async def get_comments_all_level_two_comments(
+        self,
+        video_id: str,
+        comment_list: List[Dict],
+        crawl_interval: float = 1.0,
+        callback: Optional[Callable] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> None:
+        """
+        get all level two comments for a page of level one comments, at most SUB_COMMENT_CONCURRENCY_NUM level one comments are paged concurrently
+        :param video_id: 视频 ID
+        :param comment_list: 一级评论列表
+        :param crawl_interval:
+        :param callback:
+        :param semaphore: 同一个视频下多页一级评论共用的并发上限，为空时只限制本页
+        :return:
+        """
+        task_list = [
+            self.get_video_all_level_two_comments(video_id, comment["rpid"], CommentOrderType.DEFAULT, 10, crawl_interval, callback)
+            for comment in comment_list if comment.get("rcount", 0) > 0
+        ]
+        await scheduler.gather_limited(task_list, config.SUB_COMMENT_CONCURRENCY_NUM, semaphore)
+
     async def get_video_all_level_two_comments(
         self,
         video_id: str,
@@ -329,7 +359,7 @@ class BilibiliClient(AbstractApiClient):
             comment_list: List[Dict] = result.get("replies", [])
             if callback:  # 如果有回调函数，就执行回调函数
                 await callback(video_id, comment_list)
-            await asyncio.sleep(crawl_interval)
+            await tracing.sleep(crawl_interval)
             if (int(result["page"]["count"]) <= pn * ps):
                 break
 
@@ -479,7 +509,7 @@ class BilibiliClient(AbstractApiClient):
                 fans_list = fans_list[:max_count - len(result)]
             if callback:  # 如果有回调函数，就执行回调函数
                 await callback(creator_info, fans_list)
-            await asyncio.sleep(crawl_interval)
+            await tracing.sleep(crawl_interval)
             if not fans_list:
                 break
             result.extend(fans_list)
@@ -513,7 +543,7 @@ class BilibiliClient(AbstractApiClient):
                 followings_list = followings_list[:max_count - len(result)]
             if callback:  # 如果有回调函数，就执行回调函数
                 await callback(creator_info, followings_list)
-            await asyncio.sleep(crawl_interval)
+            await tracing.sleep(crawl_interval)
             if not followings_list:
                 break
             result.extend(followings_list)
@@ -548,6 +578,6 @@ class BilibiliClient(AbstractApiClient):
                 dynamics_list = dynamics_list[:max_count - len(result)]
             if callback:
                 await callback(creator_info, dynamics_list)
-            await asyncio.sleep(crawl_interval)
+            await tracing.sleep(crawl_interval)
             result.extend(dynamics_list)
         return result
@@ -14,12 +14,12 @@
 # @Desc    : B站爬虫
 
 import asyncio
+import itertools
 import os
 import random
 from asyncio import Task
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 from datetime import datetime, timedelta
-import pandas as pd
 
 from playwright.async_api import (
     BrowserContext,
@@ -32,17 +32,32 @@ from playwright._impl._errors import TargetClosedError
 
 import config
 from base.base_crawler import AbstractCrawler
-from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_ip_pool import IpInfoModel, get_shared_ip_pool
 from store import bilibili as bilibili_store
-from tools import utils
+from tools import route_filter, scheduler, tracing, utils
 from tools.cdp_browser import CDPBrowserManager
-from var import crawler_type_var, source_keyword_var
+from tools.page_pool import BrowserPagePool
+from var import crawler_type_var
 
 from .client import BilibiliClient
 from .exception import DataFetchError
 from .field import SearchOrderType
 from .login import BilibiliLogin
 
+# B站搜索接口一个查询最多返回 50 页共 1000 条结果，时间片命中上限时说明结果被截断，需要继续拆分
+BILI_SEARCH_MAX_RESULTS = 1000
+# 时间片最小拆分到 1 小时
+MIN_TIME_SLICE_SECONDS = 3600
+
+
+class TimeSlice(NamedTuple):
+    """
+    按发布时间搜索的时间片，day 为所属日期，按天限量时用它计数
+    """
+    day: str
+    begin_s: int
+    end_s: int
+
 
 class BilibiliCrawler(AbstractCrawler):
     context_page: Page
@@ -55,61 +70,77 @@ class BilibiliCrawler(AbstractCrawler):
         self.user_agent = utils.get_user_agent()
         self.cdp_manager = None
 
-    async def start(self):
+    async def start(self) -> None:
+        async with async_playwright() as playwright:
+            await self.prepare(playwright)
+            await self.run()
+
+    async def prepare(self, playwright: Playwright) -> None:
+        """
+        创建代理、启动浏览器并登录，服务模式下同一个爬虫实例只调用一次，之后的任务直接调用 run
+        Args:
+            playwright: playwright 实例
+
+        Returns:
+
+        """
         playwright_proxy_format, httpx_proxy_format = None, None
         if config.ENABLE_IP_PROXY:
-            ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
+            ip_proxy_pool = await get_shared_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
             playwright_proxy_format, httpx_proxy_format = utils.format_proxy_info(ip_proxy_info)
 
-        async with async_playwright() as playwright:
-            # 根据配置选择启动模式
-            if config.ENABLE_CDP_MODE:
-                utils.logger.info("[BilibiliCrawler] 使用CDP模式启动浏览器")
-                self.browser_context = await self.launch_browser_with_cdp(
-                    playwright,
-                    playwright_proxy_format,
-                    self.user_agent,
-                    headless=config.CDP_HEADLESS,
-                )
-            else:
-                utils.logger.info("[BilibiliCrawler] 使用标准模式启动浏览器")
-                # Launch a browser context.
-                chromium = playwright.chromium
-                self.browser_context = await self.launch_browser(chromium, None, self.user_agent, headless=config.HEADLESS)
-            # stealth.min.js is a js script to prevent the website from detecting the crawler.
-            await self.browser_context.add_init_script(path="libs/stealth.min.js")
-            self.context_page = await self.browser_context.new_page()
-            await self.context_page.goto(self.index_url)
-
-            # Create a client to interact with the xiaohongshu website.
-            self.bili_client = await self.create_bilibili_client(httpx_proxy_format)
-            if not await self.bili_client.pong():
-                login_obj = BilibiliLogin(
-                    login_type=config.LOGIN_TYPE,
-                    login_phone="",  # your phone number
-                    browser_context=self.browser_context,
-                    context_page=self.context_page,
-                    cookie_str=config.COOKIES,
-                )
-                await login_obj.begin()
-                await self.bili_client.update_cookies(browser_context=self.browser_context)
-
-            crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
-                await self.search()
-            elif config.CRAWLER_TYPE == "detail":
-                # Get the information and comments of the specified post
-                await self.get_specified_videos(config.BILI_SPECIFIED_ID_LIST)
-            elif config.CRAWLER_TYPE == "creator":
-                if config.CREATOR_MODE:
-                    for creator_id in config.BILI_CREATOR_ID_LIST:
-                        await self.get_creator_videos(int(creator_id))
-                else:
-                    await self.get_all_creator_details(config.BILI_CREATOR_ID_LIST)
+        # 根据配置选择启动模式
+        if config.ENABLE_CDP_MODE:
+            utils.logger.info("[BilibiliCrawler] 使用CDP模式启动浏览器")
+            self.browser_context = await self.launch_browser_with_cdp(
+                playwright,
+                playwright_proxy_format,
+                self.user_agent,
+                headless=config.CDP_HEADLESS,
+            )
+        else:
+            utils.logger.info("[BilibiliCrawler] 使用标准模式启动浏览器")
+            # Launch a browser context.
+            chromium = playwright.chromium
+            self.browser_context = await self.launch_browser(chromium, None, self.user_agent, headless=config.HEADLESS)
+        # stealth.min.js is a js script to prevent the website from detecting the crawler.
+        await self.browser_context.add_init_script(path="libs/stealth.min.js")
+        await route_filter.install_resource_filter(self.browser_context, "bili", config.BILI_RESOURCE_ALLOW_LIST)
+        self.context_page = await self.browser_context.new_page()
+        await self.context_page.goto(self.index_url)
+
+        # Create a client to interact with the xiaohongshu website.
+        self.bili_client = await self.create_bilibili_client(httpx_proxy_format)
+        if not await self.bili_client.pong():
+            login_obj = BilibiliLogin(
+                login_type=config.LOGIN_TYPE,
+                login_phone="",  # your phone number
+                browser_context=self.browser_context,
+                context_page=self.context_page,
+                cookie_str=config.COOKIES,
+            )
+            await login_obj.begin()
+            await self.bili_client.update_cookies(browser_context=self.browser_context)
+
+    async def run(self) -> None:
+        """
+        按 CRAWLER_TYPE 执行一次爬取
+        """
+        crawler_type_var.set(config.CRAWLER_TYPE)
+        if config.CRAWLER_TYPE == "search":
+            await self.search()
+        elif config.CRAWLER_TYPE == "detail":
+            # Get the information and comments of the specified post
+            await self.get_specified_videos(config.BILI_SPECIFIED_ID_LIST)
+        elif config.CRAWLER_TYPE == "creator":
+            if config.CREATOR_MODE:
+                await scheduler.run_creators(lambda creator_id: self.get_creator_videos(int(creator_id)), config.BILI_CREATOR_ID_LIST)
             else:
-                pass
-            utils.logger.info("[BilibiliCrawler.start] Bilibili Crawler finished ...")
+                await self.get_all_creator_details(config.BILI_CREATOR_ID_LIST)
+        else:
+            pass
+        utils.logger.info("[BilibiliCrawler.run] Bilibili Crawler finished ...")
 
     async def search(self):
         """
@@ -168,8 +199,8 @@ class BilibiliCrawler(AbstractCrawler):
         if config.CRAWLER_MAX_NOTES_COUNT < bili_limit_count:
             config.CRAWLER_MAX_NOTES_COUNT = bili_limit_count
         start_page = config.START_PAGE  # start page number
-        for keyword in config.KEYWORDS.split(","):
-            source_keyword_var.set(keyword)
+
+        async def search_keyword(keyword: str) -> None:
             utils.logger.info(f"[BilibiliCrawler.search_by_keywords] Current search keyword: {keyword}")
             page = 1
             while (page - start_page + 1) * bili_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
@@ -210,85 +241,133 @@ class BilibiliCrawler(AbstractCrawler):
                 page += 1
                 await self.batch_get_video_comments(video_id_list)
 
+        await scheduler.run_keywords(search_keyword)
+
+    @staticmethod
+    def split_time_range_by_day(begin_s: int, end_s: int) -> List[TimeSlice]:
+        """
+        把 [begin_s, end_s] 的发布时间范围按天切成时间片
+        :param begin_s: 起始时间戳
+        :param end_s: 结束时间戳
+        :return:
+        """
+        time_slices: List[TimeSlice] = []
+        day_begin = begin_s
+        while day_begin <= end_s:
+            day = datetime.fromtimestamp(day_begin).strftime("%Y-%m-%d")
+            day_end = int((datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).timestamp()) - 1
+            time_slices.append(TimeSlice(day, day_begin, min(day_end, end_s)))
+            day_begin = day_end + 1
+        return time_slices
+
     async def search_by_keywords_in_time_range(self, daily_limit: bool):
         """
         Search bilibili video with keywords in a given time range.
         :param daily_limit: if True, strictly limit the number of notes per day and total.
         """
         utils.logger.info(f"[BilibiliCrawler.search_by_keywords_in_time_range] Begin search with daily_limit={daily_limit}")
-        bili_limit_count = 20
-        start_page = config.START_PAGE
+        pubtime_begin_s, pubtime_end_s = await self.get_pubtime_datetime(start=config.START_DAY, end=config.END_DAY)
+        day_slices = self.split_time_range_by_day(int(pubtime_begin_s), int(pubtime_end_s))
 
-        for keyword in config.KEYWORDS.split(","):
-            source_keyword_var.set(keyword)
+        async def search_keyword(keyword: str) -> None:
             utils.logger.info(f"[BilibiliCrawler.search_by_keywords_in_time_range] Current search keyword: {keyword}")
-            total_notes_crawled_for_keyword = 0
+            await self.search_keyword_in_time_slices(keyword, day_slices)
 
-            for day in pd.date_range(start=config.START_DAY, end=config.END_DAY, freq="D"):
-                if (daily_limit and total_notes_crawled_for_keyword >= config.CRAWLER_MAX_NOTES_COUNT):
-                    utils.logger.info(f"[BilibiliCrawler.search] Reached CRAWLER_MAX_NOTES_COUNT limit for keyword '{keyword}', skipping remaining days.")
-                    break
-
-                if (not daily_limit and total_notes_crawled_for_keyword >= config.CRAWLER_MAX_NOTES_COUNT):
-                    utils.logger.info(f"[BilibiliCrawler.search] Reached CRAWLER_MAX_NOTES_COUNT limit for keyword '{keyword}', skipping remaining days.")
-                    break
+        await scheduler.run_keywords(search_keyword)
 
-                pubtime_begin_s, pubtime_end_s = await self.get_pubtime_datetime(start=day.strftime("%Y-%m-%d"), end=day.strftime("%Y-%m-%d"))
-                page = 1
-                notes_count_this_day = 0
-
-                while True:
-                    if notes_count_this_day >= config.MAX_NOTES_PER_DAY:
-                        utils.logger.info(f"[BilibiliCrawler.search] Reached MAX_NOTES_PER_DAY limit for {day.ctime()}.")
-                        break
-                    if (daily_limit and total_notes_crawled_for_keyword >= config.CRAWLER_MAX_NOTES_COUNT):
-                        utils.logger.info(f"[BilibiliCrawler.search] Reached CRAWLER_MAX_NOTES_COUNT limit for keyword '{keyword}'.")
-                        break
-                    if (not daily_limit and total_notes_crawled_for_keyword >= config.CRAWLER_MAX_NOTES_COUNT):
+    async def search_keyword_in_time_slices(self, keyword: str, time_slices: List[TimeSlice]):
+        """
+        并发搜索一个关键词在各个时间片内的视频，同时最多 BILI_TIME_SLICE_CONCURRENCY_NUM 个时间片
+        每次只抓一个时间片的一页，抓完把下一页放回优先队列，已抓数量最少的日期优先，CRAWLER_MAX_NOTES_COUNT 均匀分到各天
+        第一页结果数达到搜索接口上限时说明结果被截断，把时间片对半拆开重新搜索
+        :param keyword: 搜索关键词
+        :param time_slices: 按天切分的时间片
+        :return:
+        """
+        bili_limit_count = 20
+        total_notes_crawled_for_keyword = 0
+        notes_count_per_day: Dict[str, int] = {time_slice.day: 0 for time_slice in time_slices}
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        sequence = itertools.count()
+
+        def schedule(time_slice: TimeSlice, page: int) -> None:
+            queue.put_nowait((notes_count_per_day[time_slice.day], next(sequence), time_slice, page))
+
+        def is_full(day: str) -> bool:
+            if total_notes_crawled_for_keyword >= config.CRAWLER_MAX_NOTES_COUNT:
+                return True
+            return notes_count_per_day[day] >= config.MAX_NOTES_PER_DAY
+
+        async def search_page(time_slice: TimeSlice, page: int) -> None:
+            nonlocal total_notes_crawled_for_keyword
+            if is_full(time_slice.day):
+                return
+            utils.logger.info(f"[BilibiliCrawler.search] search bilibili keyword: {keyword}, date: {time_slice.day}, "
+                              f"range: {time_slice.begin_s}-{time_slice.end_s}, page: {page}")
+            videos_res = await self.bili_client.search_video_by_keyword(
+                keyword=keyword,
+                page=page,
+                page_size=bili_limit_count,
+                order=SearchOrderType.DEFAULT,
+                pubtime_begin_s=time_slice.begin_s,
+                pubtime_end_s=time_slice.end_s,
+            )
+            video_list: List[Dict] = videos_res.get("result")
+            if not video_list:
+                utils.logger.info(f"[BilibiliCrawler.search] No more videos for '{keyword}' on {time_slice.day}, range: {time_slice.begin_s}-{time_slice.end_s}.")
+                return
+
+            if (page == 1 and videos_res.get("numResults", 0) >= BILI_SEARCH_MAX_RESULTS
+                    and time_slice.end_s - time_slice.begin_s + 1 >= 2 * MIN_TIME_SLICE_SECONDS):
+                middle_s = (time_slice.begin_s + time_slice.end_s) // 2
+                utils.logger.info(f"[BilibiliCrawler.search] Search results of '{keyword}' on {time_slice.day} are truncated, split the range at {middle_s}")
+                schedule(TimeSlice(time_slice.day, time_slice.begin_s, middle_s), 1)
+                schedule(TimeSlice(time_slice.day, middle_s + 1, time_slice.end_s), 1)
+                return
+
+            # 只请求剩余限额内的视频详情，详情获取失败少掉的部分由下一页补上
+            remaining = min(config.CRAWLER_MAX_NOTES_COUNT - total_notes_crawled_for_keyword,
+                            config.MAX_NOTES_PER_DAY - notes_count_per_day[time_slice.day])
+            semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+            task_list = [self.get_video_info_task(aid=video_item.get("aid"), bvid="", semaphore=semaphore) for video_item in video_list[:remaining]]
+            video_items = await asyncio.gather(*task_list)
+
+            video_id_list: List[str] = []
+            for video_item in video_items:
+                if video_item:
+                    # 检查和计数之间没有 await，并发的时间片不会超出限额
+                    if is_full(time_slice.day):
                         break
+                    notes_count_per_day[time_slice.day] += 1
+                    total_notes_crawled_for_keyword += 1
+                    video_id_list.append(video_item.get("View").get("aid"))
+                    await bilibili_store.update_bilibili_video(video_item)
+                    await bilibili_store.update_up_info(video_item)
+                    await self.get_bilibili_video(video_item, semaphore)
+
+            await self.batch_get_video_comments(video_id_list)
+            num_pages = videos_res.get("numPages")
+            if num_pages is None or page < num_pages:
+                schedule(time_slice, page + 1)
+
+        async def worker() -> None:
+            while True:
+                _, _, time_slice, page = await queue.get()
+                try:
+                    await search_page(time_slice, page)
+                except Exception as e:
+                    utils.logger.error(f"[BilibiliCrawler.search] Error searching on {time_slice.day}: {e}")
+                finally:
+                    queue.task_done()
 
-                    try:
-                        utils.logger.info(f"[BilibiliCrawler.search] search bilibili keyword: {keyword}, date: {day.ctime()}, page: {page}")
-                        video_id_list: List[str] = []
-                        videos_res = await self.bili_client.search_video_by_keyword(
-                            keyword=keyword,
-                            page=page,
-                            page_size=bili_limit_count,
-                            order=SearchOrderType.DEFAULT,
-                            pubtime_begin_s=pubtime_begin_s,
-                            pubtime_end_s=pubtime_end_s,
-                        )
-                        video_list: List[Dict] = videos_res.get("result")
-
-                        if not video_list:
-                            utils.logger.info(f"[BilibiliCrawler.search] No more videos for '{keyword}' on {day.ctime()}, moving to next day.")
-                            break
-
-                        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
-                        task_list = [self.get_video_info_task(aid=video_item.get("aid"), bvid="", semaphore=semaphore) for video_item in video_list]
-                        video_items = await asyncio.gather(*task_list)
-
-                        for video_item in video_items:
-                            if video_item:
-                                if (daily_limit and total_notes_crawled_for_keyword >= config.CRAWLER_MAX_NOTES_COUNT):
-                                    break
-                                if (not daily_limit and total_notes_crawled_for_keyword >= config.CRAWLER_MAX_NOTES_COUNT):
-                                    break
-                                if notes_count_this_day >= config.MAX_NOTES_PER_DAY:
-                                    break
-                                notes_count_this_day += 1
-                                total_notes_crawled_for_keyword += 1
-                                video_id_list.append(video_item.get("View").get("aid"))
-                                await bilibili_store.update_bilibili_video(video_item)
-                                await bilibili_store.update_up_info(video_item)
-                                await self.get_bilibili_video(video_item, semaphore)
-
-                        page += 1
-                        await self.batch_get_video_comments(video_id_list)
-
-                    except Exception as e:
-                        utils.logger.error(f"[BilibiliCrawler.search] Error searching on {day.ctime()}: {e}")
-                        break
+        for time_slice in time_slices:
+            schedule(time_slice, 1)
+        workers = [asyncio.create_task(worker()) for _ in range(max(config.BILI_TIME_SLICE_CONCURRENCY_NUM, 1))]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
 
     async def batch_get_video_comments(self, video_id_list: List[str]):
         """
@@ -318,7 +397,7 @@ class BilibiliCrawler(AbstractCrawler):
         async with semaphore:
             try:
                 utils.logger.info(f"[BilibiliCrawler.get_comments] begin get video_id: {video_id} comments ...")
-                await asyncio.sleep(random.uniform(0.5, 1.5))
+                await tracing.sleep(random.uniform(0.5, 1.5))
                 await self.bili_client.get_video_all_comments(
                     video_id=video_id,
                     crawl_interval=random.random(),
@@ -347,7 +426,7 @@ class BilibiliCrawler(AbstractCrawler):
             await self.get_specified_videos(video_bvids_list)
             if int(result["page"]["count"]) <= pn * ps:
                 break
-            await asyncio.sleep(random.random())
+            await tracing.sleep(random.random())
             pn += 1
 
     async def get_specified_videos(self, bvids_list: List[str]):
@@ -416,6 +495,7 @@ class BilibiliCrawler(AbstractCrawler):
         """
         utils.logger.info("[BilibiliCrawler.create_bilibili_client] Begin create bilibili API client ...")
         cookie_str, cookie_dict = utils.convert_cookies(await self.browser_context.cookies())
+        page_pool = await BrowserPagePool.create(self.browser_context, self.context_page, config.BROWSER_PAGE_POOL_SIZE, self.index_url)
         bilibili_client_obj = BilibiliClient(
             proxy=httpx_proxy,
             headers={
@@ -425,7 +505,7 @@ class BilibiliCrawler(AbstractCrawler):
                 "Referer": "https://www.bilibili.com",
                 "Content-Type": "application/json;charset=UTF-8",
             },
-            playwright_page=self.context_page,
+            page_pool=page_pool,
             cookie_dict=cookie_dict,
         )
         return bilibili_client_obj
@@ -544,7 +624,7 @@ class BilibiliCrawler(AbstractCrawler):
             return
 
         content = await self.bili_client.get_video_media(video_url)
-        await asyncio.sleep(random.random())
+        await tracing.sleep(random.random())
         if content is None:
             return
         extension_file_name = f"video.mp4"
@@ -12,13 +12,15 @@ import asyncio
 import copy
 import json
 import urllib.parse
-from typing import Any, Callable, Dict, Union, Optional
+from typing import Any, Callable, Dict, List, Union, Optional
 
 import httpx
 from playwright.async_api import BrowserContext
 
+import config
 from base.base_crawler import AbstractApiClient
-from tools import utils
+from tools import metrics, scheduler, tracing, utils
+from tools.page_pool import BrowserPagePool
 from var import request_keyword_var
 
 from .exception import *
@@ -34,16 +36,17 @@ class DouYinClient(AbstractApiClient):
         proxy=None,
         *,
         headers: Dict,
-        playwright_page: Optional[Page],
+        page_pool: BrowserPagePool,
         cookie_dict: Dict,
     ):
         self.proxy = proxy
         self.timeout = timeout
         self.headers = headers
         self._host = "https://www.douyin.com"
-        self.playwright_page = playwright_page
+        self.page_pool = page_pool
         self.cookie_dict = cookie_dict
 
+    @tracing.traced("sign")
     async def __process_req_params(
         self,
         uri: str,
@@ -55,7 +58,7 @@ class DouYinClient(AbstractApiClient):
         if not params:
             return
         headers = headers or self.headers
-        local_storage: Dict = await self.playwright_page.evaluate("() => window.localStorage")  # type: ignore
+        local_storage: Dict = await self.page_pool.evaluate("() => window.localStorage")  # type: ignore
         common_params = {
             "device_platform": "webapp",
             "aid": "6383",
@@ -91,17 +94,22 @@ class DouYinClient(AbstractApiClient):
         post_data = {}
         if request_method == "POST":
             post_data = params
-        a_bogus = await get_a_bogus(uri, query_string, post_data, headers["User-Agent"], self.playwright_page)
+        a_bogus = await get_a_bogus(uri, query_string, post_data, headers["User-Agent"], self.page_pool.primary)
         params["a_bogus"] = a_bogus
 
+    @scheduler.limit_requests("dy")
+    @metrics.instrument_request("dy")
     async def request(self, method, url, **kwargs):
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        with tracing.span("network", url):
+            async with httpx.AsyncClient(proxy=self.proxy) as client:
+                response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        metrics.observe_response("dy", response.status_code)
         try:
             if response.text == "" or response.text == "blocked":
                 utils.logger.error(f"request params incrr, response.text: {response.text}")
                 raise Exception("account blocked")
-            return response.json()
+            with tracing.span("parse"):
+                return response.json()
         except Exception as e:
             raise DataFetchError(f"{e}, {response.text}")
 
@@ -119,7 +127,7 @@ class DouYinClient(AbstractApiClient):
         return await self.request(method="POST", url=f"{self._host}{uri}", data=data, headers=headers)
 
     async def pong(self, browser_context: BrowserContext) -> bool:
-        local_storage = await self.playwright_page.evaluate("() => window.localStorage")
+        local_storage = await self.page_pool.evaluate("() => window.localStorage")
         if local_storage.get("HasUserLogin", "") == "1":
             return True
 
@@ -235,43 +243,87 @@ class DouYinClient(AbstractApiClient):
         result = []
         comments_has_more = 1
         comments_cursor = 0
-        while comments_has_more and len(result) < max_count:
-            comments_res = await self.get_aweme_comments(aweme_id, comments_cursor)
-            comments_has_more = comments_res.get("has_more", 0)
-            comments_cursor = comments_res.get("cursor", 0)
-            comments = comments_res.get("comments", [])
-            if not comments:
-                continue
-            if len(result) + len(comments) > max_count:
-                comments = comments[:max_count - len(result)]
-            result.extend(comments)
-            if callback:  # 如果有回调函数，就执行回调函数
-                await callback(aweme_id, comments)
+        # 二级评论在后台抓取，一级评论继续翻页，不用等每一页的回复都抓完；同一个帖子下所有页共用一个并发上限
+        sub_comment_semaphore = scheduler.sub_comment_semaphore()
+        async with scheduler.BackgroundTasks() as pending:
+            while comments_has_more and len(result) < max_count:
+                comments_res = await self.get_aweme_comments(aweme_id, comments_cursor)
+                comments_has_more = comments_res.get("has_more", 0)
+                comments_cursor = comments_res.get("cursor", 0)
+                comments = comments_res.get("comments", [])
+                if not comments:
+                    continue
+                if len(result) + len(comments) > max_count:
+                    comments = comments[:max_count - len(result)]
+                result.extend(comments)
+                if callback:  # 如果有回调函数，就执行回调函数
+                    await callback(aweme_id, comments)
 
-            await asyncio.sleep(crawl_interval)
-            if not is_fetch_sub_comments:
-                continue
-            # 获取二级评论
-            for comment in comments:
-                reply_comment_total = comment.get("reply_comment_total")
+                await tracing.sleep(crawl_interval)
+                if not is_fetch_sub_comments:
+                    continue
+                # 获取二级评论
+                pending.start(self.get_comments_all_sub_comments(aweme_id, comments, crawl_interval, callback, sub_comment_semaphore))
+            for sub_comments in await pending.join():
+                result.extend(sub_comments)
+        return result
 
-                if reply_comment_total > 0:
-                    comment_id = comment.get("cid")
-                    sub_comments_has_more = 1
-                    sub_comments_cursor = 0
+    async def get_comments_all_sub_comments(
+        self,
+        aweme_id: str,
+        comments: List[Dict],
+        crawl_interval: float = 1.0,
+        callback: Optional[Callable] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> List[Dict]:
+        """
+        获取一页一级评论下的所有二级评论，多个一级评论的回复并发翻页，同时最多 SUB_COMMENT_CONCURRENCY_NUM 个
+        :param aweme_id: 帖子ID
+        :param comments: 一级评论列表
+        :param crawl_interval: 抓取间隔
+        :param callback: 回调函数，用于处理抓取到的评论
+        :param semaphore: 同一个帖子下多页一级评论共用的并发上限，为空时只限制本页
+        :return: 二级评论列表
+        """
+        task_list = [
+            self.get_root_comment_all_sub_comments(aweme_id, comment.get("cid"), crawl_interval, callback)
+            for comment in comments if comment.get("reply_comment_total", 0) > 0
+        ]
+        result = []
+        for sub_comments in await scheduler.gather_limited(task_list, config.SUB_COMMENT_CONCURRENCY_NUM, semaphore):
+            result.extend(sub_comments)
+        return result
 
-                    while sub_comments_has_more:
-                        sub_comments_res = await self.get_sub_comments(aweme_id, comment_id, sub_comments_cursor)
-                        sub_comments_has_more = sub_comments_res.get("has_more", 0)
-                        sub_comments_cursor = sub_comments_res.get("cursor", 0)
-                        sub_comments = sub_comments_res.get("comments", [])
+    async def get_root_comment_all_sub_comments(
+        self,
+        aweme_id: str,
+        comment_id: str,
+        crawl_interval: float = 1.0,
+        callback: Optional[Callable] = None,
+    ) -> List[Dict]:
+        """
+        翻页获取单个一级评论下的所有二级评论
+        :param aweme_id: 帖子ID
+        :param comment_id: 一级评论ID
+        :param crawl_interval: 抓取间隔
+        :param callback: 回调函数，用于处理抓取到的评论
+        :return: 二级评论列表
+        """
+        result = []
+        sub_comments_has_more = 1
+        sub_comments_cursor = 0
+        while sub_comments_has_more:
+            sub_comments_res = await self.get_sub_comments(aweme_id, comment_id, sub_comments_cursor)
+            sub_comments_has_more = sub_comments_res.get("has_more", 0)
+            sub_comments_cursor = sub_comments_res.get("cursor", 0)
+            sub_comments = sub_comments_res.get("comments", [])
 
-                        if not sub_comments:
-                            continue
-                        result.extend(sub_comments)
-                        if callback:  # 如果有回调函数，就执行回调函数
-                            await callback(aweme_id, sub_comments)
-                        await asyncio.sleep(crawl_interval)
+            if not sub_comments:
+                continue
+            result.extend(sub_comments)
+            if callback:  # 如果有回调函数，就执行回调函数
+                await callback(aweme_id, sub_comments)
+            await tracing.sleep(crawl_interval)
         return result
 
     async def get_user_info(self, sec_user_id: str):
@@ -24,11 +24,12 @@ from playwright.async_api import (
 
 import config
 from base.base_crawler import AbstractCrawler
-from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_ip_pool import IpInfoModel, get_shared_ip_pool
 from store import douyin as douyin_store
-from tools import utils
+from tools import route_filter, scheduler, tracing, utils
 from tools.cdp_browser import CDPBrowserManager
-from var import crawler_type_var, source_keyword_var
+from tools.page_pool import BrowserPagePool
+from var import crawler_type_var
 
 from .client import DouYinClient
 from .exception import DataFetchError
@@ -47,60 +48,78 @@ class DouYinCrawler(AbstractCrawler):
         self.cdp_manager = None
 
     async def start(self) -> None:
+        async with async_playwright() as playwright:
+            await self.prepare(playwright)
+            await self.run()
+
+    async def prepare(self, playwright: Playwright) -> None:
+        """
+        创建代理、启动浏览器并登录，服务模式下同一个爬虫实例只调用一次，之后的任务直接调用 run
+        Args:
+            playwright: playwright 实例
+
+        Returns:
+
+        """
         playwright_proxy_format, httpx_proxy_format = None, None
         if config.ENABLE_IP_PROXY:
-            ip_proxy_pool = await create_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
+            ip_proxy_pool = await get_shared_ip_pool(config.IP_PROXY_POOL_COUNT, enable_validate_ip=True)
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
             playwright_proxy_format, httpx_proxy_format = utils.format_proxy_info(ip_proxy_info)
 
-        async with async_playwright() as playwright:
-            # 根据配置选择启动模式
-            if config.ENABLE_CDP_MODE:
-                utils.logger.info("[DouYinCrawler] 使用CDP模式启动浏览器")
-                self.browser_context = await self.launch_browser_with_cdp(
-                    playwright,
-                    playwright_proxy_format,
-                    None,
-                    headless=config.CDP_HEADLESS,
-                )
-            else:
-                utils.logger.info("[DouYinCrawler] 使用标准模式启动浏览器")
-                # Launch a browser context.
-                chromium = playwright.chromium
-                self.browser_context = await self.launch_browser(
-                    chromium,
-                    playwright_proxy_format,
-                    user_agent=None,
-                    headless=config.HEADLESS,
-                )
-            # stealth.min.js is a js script to prevent the website from detecting the crawler.
-            await self.browser_context.add_init_script(path="libs/stealth.min.js")
-            self.context_page = await self.browser_context.new_page()
-            await self.context_page.goto(self.index_url)
-
-            self.dy_client = await self.create_douyin_client(httpx_proxy_format)
-            if not await self.dy_client.pong(browser_context=self.browser_context):
-                login_obj = DouYinLogin(
-                    login_type=config.LOGIN_TYPE,
-                    login_phone="",  # you phone number
-                    browser_context=self.browser_context,
-                    context_page=self.context_page,
-                    cookie_str=config.COOKIES,
-                )
-                await login_obj.begin()
-                await self.dy_client.update_cookies(browser_context=self.browser_context)
-            crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
-                # Search for notes and retrieve their comment information.
-                await self.search()
-            elif config.CRAWLER_TYPE == "detail":
-                # Get the information and comments of the specified post
-                await self.get_specified_awemes()
-            elif config.CRAWLER_TYPE == "creator":
-                # Get the information and comments of the specified creator
-                await self.get_creators_and_videos()
-
-            utils.logger.info("[DouYinCrawler.start] Douyin Crawler finished ...")
+        # 根据配置选择启动模式
+        if config.ENABLE_CDP_MODE:
+            utils.logger.info("[DouYinCrawler] 使用CDP模式启动浏览器")
+            self.browser_context = await self.launch_browser_with_cdp(
+                playwright,
+                playwright_proxy_format,
+                None,
+                headless=config.CDP_HEADLESS,
+            )
+        else:
+            utils.logger.info("[DouYinCrawler] 使用标准模式启动浏览器")
+            # Launch a browser context.
+            chromium = playwright.chromium
+            self.browser_context = await self.launch_browser(
+                chromium,
+                playwright_proxy_format,
+                user_agent=None,
+                headless=config.HEADLESS,
+            )
+        # stealth.min.js is a js script to prevent the website from detecting the crawler.
+        await self.browser_context.add_init_script(path="libs/stealth.min.js")
+        await route_filter.install_resource_filter(self.browser_context, "dy", config.DY_RESOURCE_ALLOW_LIST)
+        self.context_page = await self.browser_context.new_page()
+        await self.context_page.goto(self.index_url)
+
+        self.dy_client = await self.create_douyin_client(httpx_proxy_format)
+        if not await self.dy_client.pong(browser_context=self.browser_context):
+            login_obj = DouYinLogin(
+                login_type=config.LOGIN_TYPE,
+                login_phone="",  # you phone number
+                browser_context=self.browser_context,
+                context_page=self.context_page,
+                cookie_str=config.COOKIES,
+            )
+            await login_obj.begin()
+            await self.dy_client.update_cookies(browser_context=self.browser_context)
+
+    async def run(self) -> None:
+        """
+        按 CRAWLER_TYPE 执行一次爬取
+        """
+        crawler_type_var.set(config.CRAWLER_TYPE)
+        if config.CRAWLER_TYPE == "search":
+            # Search for notes and retrieve their comment information.
+            await self.search()
+        elif config.CRAWLER_TYPE == "detail":
+            # Get the information and comments of the specified post
+            await self.get_specified_awemes()
+        elif config.CRAWLER_TYPE == "creator":
+            # Get the information and comments of the specified creator
+            await self.get_creators_and_videos()
+
+        utils.logger.info("[DouYinCrawler.run] Douyin Crawler finished ...")
 
     async def search(self) -> None:
         utils.logger.info("[DouYinCrawler.search] Begin search douyin keywords")
@@ -108,8 +127,8 @@ class DouYinCrawler(AbstractCrawler):
         if config.CRAWLER_MAX_NOTES_COUNT < dy_limit_count:
             config.CRAWLER_MAX_NOTES_COUNT = dy_limit_count
         start_page = config.START_PAGE  # start page number
-        for keyword in config.KEYWORDS.split(","):
-            source_keyword_var.set(keyword)
+
+        async def search_keyword(keyword: str) -> None:
             utils.logger.info(f"[DouYinCrawler.search] Current keyword: {keyword}")
             aweme_list: List[str] = []
             page = 0
@@ -150,6 +169,8 @@ class DouYinCrawler(AbstractCrawler):
             utils.logger.info(f"[DouYinCrawler.search] keyword:{keyword}, aweme_list:{aweme_list}")
             await self.batch_get_note_comments(aweme_list)
 
+        await scheduler.run_keywords(search_keyword)
+
     async def get_specified_awemes(self):
         """Get the information and comments of the specified post"""
         semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
@@ -209,7 +230,8 @@ class DouYinCrawler(AbstractCrawler):
         Get the information and videos of the specified creator
         """
         utils.logger.info("[DouYinCrawler.get_creators_and_videos] Begin get douyin creators")
-        for user_id in config.DY_CREATOR_ID_LIST:
+
+        async def crawl_creator(user_id: str) -> None:
             creator_info: Dict = await self.dy_client.get_user_info(user_id)
             if creator_info:
                 await douyin_store.save_creator(user_id, creator=creator_info)
@@ -220,6 +242,8 @@ class DouYinCrawler(AbstractCrawler):
             video_ids = [video_item.get("aweme_id") for video_item in all_video_list]
             await self.batch_get_note_comments(video_ids)
 
+        await scheduler.run_creators(crawl_creator, config.DY_CREATOR_ID_LIST)
+
     async def fetch_creator_video_detail(self, video_list: List[Dict]):
         """
         Concurrently obtain the specified post list and save the data
@@ -236,6 +260,7 @@ class DouYinCrawler(AbstractCrawler):
     async def create_douyin_client(self, httpx_proxy: Optional[str]) -> DouYinClient:
         """Create douyin client"""
         cookie_str, cookie_dict = utils.convert_cookies(await self.browser_context.cookies())  # type: ignore
+        page_pool = await BrowserPagePool.create(self.browser_context, self.context_page, config.BROWSER_PAGE_POOL_SIZE, self.index_url)
         douyin_client = DouYinClient(
             proxy=httpx_proxy,
             headers={
@@ -246,7 +271,7 @@ class DouYinCrawler(AbstractCrawler):
                 "Referer": "https://www.douyin.com/",
                 "Content-Type": "application/json;charset=UTF-8",
             },
-            playwright_page=self.context_page,
+            page_pool=page_pool,
             cookie_dict=cookie_dict,
         )
         return douyin_client
@@ -362,7 +387,7 @@ class DouYinCrawler(AbstractCrawler):
             if not url:
                 continue
             content = await self.dy_client.get_aweme_media(url)
-            await asyncio.sleep(random.random())
+            await tracing.sleep(random.random())
             if content is None:
                 continue
             extension_file_name = f"{picNum:>03d}.jpeg"
@@ -386,7 +411,7 @@ class DouYinCrawler(AbstractCrawler):
         if not video_download_url:
             return
         content = await self.dy_client.get_aweme_media(video_download_url)
-        await asyncio.sleep(random.random())
+        await tracing.sleep(random.random())
         if content is None:
             return
         extension_file_name = f"video.mp4"
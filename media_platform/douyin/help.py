@@ -20,7 +20,7 @@ import random
 import execjs
 from playwright.async_api import Page
 
-douyin_sign_obj = execjs.compile(open('libs/douyin.js', encoding='utf-8-sig').read())
+douyin_sign_obj = None
 
 def get_web_id():
     """
@@ -61,9 +61,14 @@ def get_a_bogus_from_js(url: str, params: str, user_agent: str):
     Returns:
 
     """
+    global douyin_sign_obj
     sign_js_name = "sign_datail"
     if "/reply" in url:
         sign_js_name = "sign_reply"
+    # libs/douyin.js 编译较慢，第一次签名时才编译
+    if not douyin_sign_obj:
+        with open('libs/douyin.js', encoding='utf-8-sig') as f:
+            douyin_sign_obj = execjs.compile(f.read())
     return douyin_sign_obj.call(sign_js_name, params, user_agent)
 
 
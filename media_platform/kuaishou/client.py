@@ -16,11 +16,12 @@ from typing import Any, Callable, Dict, List, Optional
 from urllib.parse import urlencode
 
 import httpx
-from playwright.async_api import BrowserContext, Page
+from playwright.async_api import BrowserContext
 
 import config
 from base.base_crawler import AbstractApiClient
-from tools import utils
+from tools import cooldown, metrics, scheduler, tracing, utils
+from tools.page_pool import BrowserPagePool
 
 from .exception import DataFetchError
 from .graphql import KuaiShouGraphQL
@@ -33,21 +34,27 @@ class KuaiShouClient(AbstractApiClient):
         proxy=None,
         *,
         headers: Dict[str, str],
-        playwright_page: Page,
+        page_pool: BrowserPagePool,
         cookie_dict: Dict[str, str],
     ):
         self.proxy = proxy
         self.timeout = timeout
         self.headers = headers
         self._host = "https://www.kuaishou.com/graphql"
-        self.playwright_page = playwright_page
+        self.page_pool = page_pool
         self.cookie_dict = cookie_dict
         self.graphql = KuaiShouGraphQL()
+        self.breaker = cooldown.get_breaker("ks")
 
+    @scheduler.limit_requests("ks")
+    @metrics.instrument_request("ks")
     async def request(self, method, url, **kwargs) -> Any:
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
-        data: Dict = response.json()
+        with tracing.span("network", url):
+            async with httpx.AsyncClient(proxy=self.proxy) as client:
+                response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        metrics.observe_response("ks", response.status_code)
+        with tracing.span("parse"):
+            data: Dict = response.json()
         if data.get("errors"):
             raise DataFetchError(data.get("errors", "unkonw error"))
         else:
@@ -57,12 +64,14 @@ class KuaiShouClient(AbstractApiClient):
         final_uri = uri
         if isinstance(params, dict):
             final_uri = f"{uri}?" f"{urlencode(params)}"
+        await self.breaker.wait_until_available()
         return await self.request(
             method="GET", url=f"{self._host}{final_uri}", headers=self.headers
         )
 
     async def post(self, uri: str, data: dict) -> Dict:
         json_str = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        await self.breaker.wait_until_available()
         return await self.request(
             method="POST", url=f"{self._host}{uri}", data=json_str, headers=self.headers
         )
@@ -196,21 +205,25 @@ class KuaiShouClient(AbstractApiClient):
         result = []
         pcursor = ""
 
-        while pcursor != "no_more" and len(result) < max_count:
-            comments_res = await self.get_video_comments(photo_id, pcursor)
-            vision_commen_list = comments_res.get("visionCommentList", {})
-            pcursor = vision_commen_list.get("pcursor", "")
-            comments = vision_commen_list.get("rootComments", [])
-            if len(result) + len(comments) > max_count:
-                comments = comments[: max_count - len(result)]
-            if callback:  # 如果有回调函数，就执行回调函数
-                await callback(photo_id, comments)
-            result.extend(comments)
-            await asyncio.sleep(crawl_interval)
-            sub_comments = await self.get_comments_all_sub_comments(
-                comments, photo_id, crawl_interval, callback
-            )
-            result.extend(sub_comments)
+        # 二级评论在后台抓取，一级评论继续翻页，不用等每一页的回复都抓完；同一个帖子下所有页共用一个并发上限
+        sub_comment_semaphore = scheduler.sub_comment_semaphore()
+        async with scheduler.BackgroundTasks() as pending:
+            while pcursor != "no_more" and len(result) < max_count:
+                comments_res = await self.get_video_comments(photo_id, pcursor)
+                vision_commen_list = comments_res.get("visionCommentList", {})
+                pcursor = vision_commen_list.get("pcursor", "")
+                comments = vision_commen_list.get("rootComments", [])
+                if len(result) + len(comments) > max_count:
+                    comments = comments[: max_count - len(result)]
+                if callback:  # 如果有回调函数，就执行回调函数
+                    await callback(photo_id, comments)
+                result.extend(comments)
+                await tracing.sleep(crawl_interval)
+                pending.start(self.get_comments_all_sub_comments(
+                    comments, photo_id, crawl_interval, callback, sub_comment_semaphore
+                ))
+            for sub_comments in await pending.join():
+                result.extend(sub_comments)
         return result
 
     async def get_comments_all_sub_comments(
@@ -219,14 +232,16 @@ class KuaiShouClient(AbstractApiClient):
         photo_id,
         crawl_interval: float = 1.0,
         callback: Optional[Callable] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
     ) -> List[Dict]:
         """
-        获取指定一级评论下的所有二级评论, 该方法会一直查找一级评论下的所有二级评论信息
+        获取指定一级评论下的所有二级评论, 多个一级评论的回复并发翻页，同时最多 SUB_COMMENT_CONCURRENCY_NUM 个
         Args:
             comments: 评论列表
             photo_id: 视频id
             crawl_interval: 爬取一次评论的延迟单位（秒）
             callback: 一次评论爬取结束后
+            semaphore: 同一个视频下多页一级评论共用的并发上限，为空时只限制本页
         Returns:
 
         """
@@ -236,31 +251,66 @@ class KuaiShouClient(AbstractApiClient):
             )
             return []
 
-        result = []
+        task_list = []
         for comment in comments:
             sub_comments = comment.get("subComments")
+            if sub_comments:
+                self._mark_root_comment(sub_comments, comment.get("commentId"))
             if sub_comments and callback:
                 await callback(photo_id, sub_comments)
 
             sub_comment_pcursor = comment.get("subCommentsPcursor")
             if sub_comment_pcursor == "no_more":
                 continue
+            task_list.append(self.get_root_comment_all_sub_comments(
+                photo_id, comment.get("commentId"), crawl_interval, callback
+            ))
 
-            root_comment_id = comment.get("commentId")
-            sub_comment_pcursor = ""
+        result = []
+        for sub_comments in await scheduler.gather_limited(task_list, config.SUB_COMMENT_CONCURRENCY_NUM, semaphore):
+            result.extend(sub_comments)
+        return result
 
-            while sub_comment_pcursor != "no_more":
-                comments_res = await self.get_video_sub_comments(
-                    photo_id, root_comment_id, sub_comment_pcursor
-                )
-                vision_sub_comment_list = comments_res.get("visionSubCommentList", {})
-                sub_comment_pcursor = vision_sub_comment_list.get("pcursor", "no_more")
+    @staticmethod
+    def _mark_root_comment(sub_comments: List[Dict], root_comment_id: str) -> None:
+        """
+        二级评论的接口数据里没有根评论ID，按所属的一级评论补上，存储时写入 root_comment_id
+        """
+        for sub_comment in sub_comments:
+            sub_comment["root_comment_id"] = root_comment_id
 
-                comments = vision_sub_comment_list.get("subComments", {})
-                if callback:
-                    await callback(photo_id, comments)
-                await asyncio.sleep(crawl_interval)
-                result.extend(comments)
+    async def get_root_comment_all_sub_comments(
+        self,
+        photo_id: str,
+        root_comment_id: str,
+        crawl_interval: float = 1.0,
+        callback: Optional[Callable] = None,
+    ) -> List[Dict]:
+        """
+        翻页获取单个一级评论下的所有二级评论
+        Args:
+            photo_id: 视频id
+            root_comment_id: 一级评论id
+            crawl_interval: 爬取一次评论的延迟单位（秒）
+            callback: 一次评论爬取结束后
+        Returns:
+
+        """
+        result = []
+        sub_comment_pcursor = ""
+        while sub_comment_pcursor != "no_more":
+            comments_res = await self.get_video_sub_comments(
+                photo_id, root_comment_id, sub_comment_pcursor
+            )
+            vision_sub_comment_list = comments_res.get("visionSubCommentList", {})
+            sub_comment_pcursor = vision_sub_comment_list.get("pcursor", "no_more")
+
+            comments = vision_sub_comment_list.get("subComments", {})
+            self._mark_root_comment(comments, root_comment_id)
+            if callback:
+                await callback(photo_id, comments)
+            await tracing.sleep(crawl_interval)
+            result.extend(comments)
         return result
 
     async def get_creator_info(self, user_id: str) -> Dict:
@@ -308,6 +358,6 @@ class KuaiShouClient(AbstractApiClient):
 
             if callback:
                 await callback(videos)
-            await asyncio.sleep(crawl_interval)
+            await tracing.sleep(crawl_interval)
             result.extend(videos)
         return result
@@ -12,7 +12,6 @@
 import asyncio
 import os
 import random
-import time
 from asyncio import Task
 from typing import Dict, List, Optional, Tuple
 
@@ -26,11 +25,12 @@ from playwright.async_api import (
 
 import config
 from base.base_crawler import AbstractCrawler
-from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_ip_pool import IpInfoModel, get_shared_ip_pool
 from store import kuaishou as kuaishou_store
-from tools import utils
+from tools import route_filter, scheduler, utils
 from tools.cdp_browser import CDPBrowserManager
-from var import comment_tasks_var, crawler_type_var, source_keyword_var
+from tools.page_pool import BrowserPagePool
+from var import comment_tasks_var, crawler_type_var
 
 from .client import KuaiShouClient
 from .exception import DataFetchError
@@ -48,10 +48,23 @@ class KuaishouCrawler(AbstractCrawler):
         self.user_agent = utils.get_user_agent()
         self.cdp_manager = None
 
-    async def start(self):
+    async def start(self) -> None:
+        async with async_playwright() as playwright:
+            await self.prepare(playwright)
+            await self.run()
+
+    async def prepare(self, playwright: Playwright) -> None:
+        """
+        创建代理、启动浏览器并登录，服务模式下同一个爬虫实例只调用一次，之后的任务直接调用 run
+        Args:
+            playwright: playwright 实例
+
+        Returns:
+
+        """
         playwright_proxy_format, httpx_proxy_format = None, None
         if config.ENABLE_IP_PROXY:
-            ip_proxy_pool = await create_ip_pool(
+            ip_proxy_pool = await get_shared_ip_pool(
                 config.IP_PROXY_POOL_COUNT, enable_validate_ip=True
             )
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
@@ -59,57 +72,62 @@ class KuaishouCrawler(AbstractCrawler):
                 ip_proxy_info
             )
 
-        async with async_playwright() as playwright:
-            # 根据配置选择启动模式
-            if config.ENABLE_CDP_MODE:
-                utils.logger.info("[KuaishouCrawler] 使用CDP模式启动浏览器")
-                self.browser_context = await self.launch_browser_with_cdp(
-                    playwright,
-                    playwright_proxy_format,
-                    self.user_agent,
-                    headless=config.CDP_HEADLESS,
-                )
-            else:
-                utils.logger.info("[KuaishouCrawler] 使用标准模式启动浏览器")
-                # Launch a browser context.
-                chromium = playwright.chromium
-                self.browser_context = await self.launch_browser(
-                    chromium, None, self.user_agent, headless=config.HEADLESS
-                )
-            # stealth.min.js is a js script to prevent the website from detecting the crawler.
-            await self.browser_context.add_init_script(path="libs/stealth.min.js")
-            self.context_page = await self.browser_context.new_page()
-            await self.context_page.goto(f"{self.index_url}?isHome=1")
-
-            # Create a client to interact with the kuaishou website.
-            self.ks_client = await self.create_ks_client(httpx_proxy_format)
-            if not await self.ks_client.pong():
-                login_obj = KuaishouLogin(
-                    login_type=config.LOGIN_TYPE,
-                    login_phone=httpx_proxy_format,
-                    browser_context=self.browser_context,
-                    context_page=self.context_page,
-                    cookie_str=config.COOKIES,
-                )
-                await login_obj.begin()
-                await self.ks_client.update_cookies(
-                    browser_context=self.browser_context
-                )
+        # 根据配置选择启动模式
+        if config.ENABLE_CDP_MODE:
+            utils.logger.info("[KuaishouCrawler] 使用CDP模式启动浏览器")
+            self.browser_context = await self.launch_browser_with_cdp(
+                playwright,
+                playwright_proxy_format,
+                self.user_agent,
+                headless=config.CDP_HEADLESS,
+            )
+        else:
+            utils.logger.info("[KuaishouCrawler] 使用标准模式启动浏览器")
+            # Launch a browser context.
+            chromium = playwright.chromium
+            self.browser_context = await self.launch_browser(
+                chromium, None, self.user_agent, headless=config.HEADLESS
+            )
+        # stealth.min.js is a js script to prevent the website from detecting the crawler.
+        await self.browser_context.add_init_script(path="libs/stealth.min.js")
+        await route_filter.install_resource_filter(self.browser_context, "ks", config.KS_RESOURCE_ALLOW_LIST)
+        self.context_page = await self.browser_context.new_page()
+        await self.context_page.goto(f"{self.index_url}?isHome=1")
+
+        # Create a client to interact with the kuaishou website.
+        self.ks_client = await self.create_ks_client(httpx_proxy_format)
+        self.ks_client.breaker.set_recovery(probe=self.ks_client.pong, refresh=self.refresh_login_state)
+        if not await self.ks_client.pong():
+            login_obj = KuaishouLogin(
+                login_type=config.LOGIN_TYPE,
+                login_phone=httpx_proxy_format,
+                browser_context=self.browser_context,
+                context_page=self.context_page,
+                cookie_str=config.COOKIES,
+            )
+            await login_obj.begin()
+            await self.ks_client.update_cookies(
+                browser_context=self.browser_context
+            )
 
-            crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
-                # Search for videos and retrieve their comment information.
-                await self.search()
-            elif config.CRAWLER_TYPE == "detail":
-                # Get the information and comments of the specified post
-                await self.get_specified_videos()
-            elif config.CRAWLER_TYPE == "creator":
-                # Get creator's information and their videos and comments
-                await self.get_creators_and_videos()
-            else:
-                pass
+    async def run(self) -> None:
+        """
+        按 CRAWLER_TYPE 执行一次爬取
+        """
+        crawler_type_var.set(config.CRAWLER_TYPE)
+        if config.CRAWLER_TYPE == "search":
+            # Search for videos and retrieve their comment information.
+            await self.search()
+        elif config.CRAWLER_TYPE == "detail":
+            # Get the information and comments of the specified post
+            await self.get_specified_videos()
+        elif config.CRAWLER_TYPE == "creator":
+            # Get creator's information and their videos and comments
+            await self.get_creators_and_videos()
+        else:
+            pass
 
-            utils.logger.info("[KuaishouCrawler.start] Kuaishou Crawler finished ...")
+        utils.logger.info("[KuaishouCrawler.run] Kuaishou Crawler finished ...")
 
     async def search(self):
         utils.logger.info("[KuaishouCrawler.search] Begin search kuaishou keywords")
@@ -117,9 +135,9 @@ class KuaishouCrawler(AbstractCrawler):
         if config.CRAWLER_MAX_NOTES_COUNT < ks_limit_count:
             config.CRAWLER_MAX_NOTES_COUNT = ks_limit_count
         start_page = config.START_PAGE
-        for keyword in config.KEYWORDS.split(","):
+
+        async def search_keyword(keyword: str) -> None:
             search_session_id = ""
-            source_keyword_var.set(keyword)
             utils.logger.info(
                 f"[KuaishouCrawler.search] Current search keyword: {keyword}"
             )
@@ -161,6 +179,8 @@ class KuaishouCrawler(AbstractCrawler):
                 page += 1
                 await self.batch_get_video_comments(video_id_list)
 
+        await scheduler.run_keywords(search_keyword)
+
     async def get_specified_videos(self):
         """Get the information and comments of the specified post"""
         semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
@@ -248,16 +268,18 @@ class KuaishouCrawler(AbstractCrawler):
                 utils.logger.error(
                     f"[KuaishouCrawler.get_comments] may be been blocked, err:{e}"
                 )
-                # use time.sleeep block main coroutine instead of asyncio.sleep and cacel running comment task
-                # maybe kuaishou block our request, we will take a nap and update the cookie again
-                current_running_tasks = comment_tasks_var.get()
-                for task in current_running_tasks:
-                    task.cancel()
-                time.sleep(20)
-                await self.context_page.goto(f"{self.index_url}?isHome=1")
-                await self.ks_client.update_cookies(
-                    browser_context=self.browser_context
-                )
+                # maybe kuaishou block our request, the breaker pauses all kuaishou requests without blocking the event loop,
+                # then reloads the home page to update the cookie and probes with pong before resuming
+                self.ks_client.breaker.record_failure(e)
+            else:
+                self.ks_client.breaker.record_success()
+
+    async def refresh_login_state(self):
+        """
+        reload the home page and update the client cookie, called by the breaker before the half-open probe
+        """
+        await self.context_page.goto(f"{self.index_url}?isHome=1")
+        await self.ks_client.update_cookies(browser_context=self.browser_context)
 
     async def create_ks_client(self, httpx_proxy: Optional[str]) -> KuaiShouClient:
         """Create ks client"""
@@ -267,6 +289,7 @@ class KuaishouCrawler(AbstractCrawler):
         cookie_str, cookie_dict = utils.convert_cookies(
             await self.browser_context.cookies()
         )
+        page_pool = await BrowserPagePool.create(self.browser_context, self.context_page, config.BROWSER_PAGE_POOL_SIZE, f"{self.index_url}?isHome=1")
         ks_client_obj = KuaiShouClient(
             proxy=httpx_proxy,
             headers={
@@ -276,7 +299,7 @@ class KuaishouCrawler(AbstractCrawler):
                 "Referer": self.index_url,
                 "Content-Type": "application/json;charset=UTF-8",
             },
-            playwright_page=self.context_page,
+            page_pool=page_pool,
             cookie_dict=cookie_dict,
         )
         return ks_client_obj
@@ -352,7 +375,8 @@ class KuaishouCrawler(AbstractCrawler):
         utils.logger.info(
             "[KuaiShouCrawler.get_creators_and_videos] Begin get kuaishou creators"
         )
-        for user_id in config.KS_CREATOR_ID_LIST:
+
+        async def crawl_creator(user_id: str) -> None:
             # get creator detail info from web html content
             createor_info: Dict = await self.ks_client.get_creator_info(user_id=user_id)
             if createor_info:
@@ -370,6 +394,8 @@ class KuaishouCrawler(AbstractCrawler):
             ]
             await self.batch_get_video_comments(video_ids)
 
+        await scheduler.run_creators(crawl_creator, config.KS_CREATOR_ID_LIST)
+
     async def fetch_creator_video_detail(self, video_list: List[Dict]):
         """
         Concurrently obtain the specified post list and save the data
@@ -21,7 +21,7 @@ import config
 from base.base_crawler import AbstractApiClient
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
 from proxy.proxy_ip_pool import ProxyIpPool
-from tools import utils
+from tools import metrics, scheduler, tracing, utils
 
 from .field import SearchNoteType, SearchSortType
 from .help import TieBaExtractor
@@ -46,6 +46,8 @@ class BaiduTieBaClient(AbstractApiClient):
         self.default_ip_proxy = default_ip_proxy
 
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
+    @scheduler.limit_requests("tieba")
+    @metrics.instrument_request("tieba")
     async def request(self, method, url, return_ori_content=False, proxy=None, **kwargs) -> Union[str, Any]:
         """
         封装httpx的公共请求方法，对请求响应做一些处理
@@ -60,8 +62,10 @@ class BaiduTieBaClient(AbstractApiClient):
 
         """
         actual_proxy = proxy if proxy else self.default_ip_proxy
-        async with httpx.AsyncClient(proxy=actual_proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, headers=self.headers, **kwargs)
+        with tracing.span("network", url):
+            async with httpx.AsyncClient(proxy=actual_proxy) as client:
+                response = await client.request(method, url, timeout=self.timeout, headers=self.headers, **kwargs)
+        metrics.observe_response("tieba", response.status_code)
 
         if response.status_code != 200:
             utils.logger.error(f"Request failed, method: {method}, url: {url}, status code: {response.status_code}")
@@ -75,7 +79,8 @@ class BaiduTieBaClient(AbstractApiClient):
         if return_ori_content:
             return response.text
 
-        return response.json()
+        with tracing.span("parse"):
+            return response.json()
 
     async def get(self, uri: str, params=None, return_ori_content=False, **kwargs) -> Any:
         """
@@ -129,7 +134,7 @@ class BaiduTieBaClient(AbstractApiClient):
         try:
             uri = "/mo/q/sync"
             res: Dict = await self.get(uri)
-            utils.logger.info(f"[BaiduTieBaClient.pong] res: {res}")
+            utils.logger.debug("[BaiduTieBaClient.pong] res: %s", utils.lazy_payload(res))
             if res and res.get("no") == 0:
                 ping_flag = True
             else:
@@ -230,7 +235,7 @@ class BaiduTieBaClient(AbstractApiClient):
             result.extend(comments)
             # 获取所有子评论
             await self.get_comments_all_sub_comments(comments, crawl_interval=crawl_interval, callback=callback)
-            await asyncio.sleep(crawl_interval)
+            await tracing.sleep(crawl_interval)
             current_page += 1
         return result
 
@@ -280,7 +285,7 @@ class BaiduTieBaClient(AbstractApiClient):
                 if callback:
                     await callback(parment_comment.note_id, sub_comments)
                 all_sub_comments.extend(sub_comments)
-                await asyncio.sleep(crawl_interval)
+                await tracing.sleep(crawl_interval)
                 current_page += 1
         return all_sub_comments
 
@@ -378,7 +383,7 @@ class BaiduTieBaClient(AbstractApiClient):
             notes = await asyncio.gather(*note_detail_task)
             if callback:
                 await callback(notes)
-            await asyncio.sleep(crawl_interval)
+            await tracing.sleep(crawl_interval)
             result.extend(notes)
             page_number += 1
             total_get_count += page_per_count
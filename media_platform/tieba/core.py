@@ -26,11 +26,11 @@ from playwright.async_api import (
 import config
 from base.base_crawler import AbstractCrawler
 from model.m_baidu_tieba import TiebaCreator, TiebaNote
-from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
+from proxy.proxy_ip_pool import IpInfoModel, get_shared_ip_pool
 from store import tieba as tieba_store
-from tools import utils
+from tools import scheduler, utils
 from tools.cdp_browser import CDPBrowserManager
-from var import crawler_type_var, source_keyword_var
+from var import crawler_type_var
 
 from .client import BaiduTieBaClient
 from .field import SearchNoteType, SearchSortType
@@ -55,19 +55,31 @@ class TieBaCrawler(AbstractCrawler):
         Start the crawler
         Returns:
 
+        """
+        await self.prepare()
+        await self.run()
+
+    async def prepare(self, playwright: Optional[Playwright] = None) -> None:
+        """
+        创建代理和 API 客户端，贴吧不需要浏览器，playwright 参数只为和其他平台保持一致
+        Args:
+            playwright: playwright 实例
+
+        Returns:
+
         """
         ip_proxy_pool, httpx_proxy_format = None, None
         if config.ENABLE_IP_PROXY:
             utils.logger.info(
-                "[BaiduTieBaCrawler.start] Begin create ip proxy pool ..."
+                "[BaiduTieBaCrawler.prepare] Begin create ip proxy pool ..."
             )
-            ip_proxy_pool = await create_ip_pool(
+            ip_proxy_pool = await get_shared_ip_pool(
                 config.IP_PROXY_POOL_COUNT, enable_validate_ip=True
             )
             ip_proxy_info: IpInfoModel = await ip_proxy_pool.get_proxy()
             _, httpx_proxy_format = utils.format_proxy_info(ip_proxy_info)
             utils.logger.info(
-                f"[BaiduTieBaCrawler.start] Init default ip proxy, value: {httpx_proxy_format}"
+                f"[BaiduTieBaCrawler.prepare] Init default ip proxy, value: {httpx_proxy_format}"
             )
 
         # Create a client to interact with the baidutieba website.
@@ -75,6 +87,11 @@ class TieBaCrawler(AbstractCrawler):
             ip_pool=ip_proxy_pool,
             default_ip_proxy=httpx_proxy_format,
         )
+
+    async def run(self) -> None:
+        """
+        按 CRAWLER_TYPE 执行一次爬取
+        """
         crawler_type_var.set(config.CRAWLER_TYPE)
         if config.CRAWLER_TYPE == "search":
             # Search for notes and retrieve their comment information.
@@ -89,7 +106,7 @@ class TieBaCrawler(AbstractCrawler):
         else:
             pass
 
-        utils.logger.info("[BaiduTieBaCrawler.start] Tieba Crawler finished ...")
+        utils.logger.info("[BaiduTieBaCrawler.run] Tieba Crawler finished ...")
 
     async def search(self) -> None:
         """
@@ -104,8 +121,8 @@ class TieBaCrawler(AbstractCrawler):
         if config.CRAWLER_MAX_NOTES_COUNT < tieba_limit_count:
             config.CRAWLER_MAX_NOTES_COUNT = tieba_limit_count
         start_page = config.START_PAGE
-        for keyword in config.KEYWORDS.split(","):
-            source_keyword_var.set(keyword)
+
+        async def search_keyword(keyword: str) -> None:
             utils.logger.info(
                 f"[BaiduTieBaCrawler.search] Current search keyword: {keyword}"
             )
@@ -148,6 +165,8 @@ class TieBaCrawler(AbstractCrawler):
                     )
                     break
 
+        await scheduler.run_keywords(search_keyword)
+
     async def get_specified_tieba_notes(self):
         """
         Get the information and comments of the specified post by tieba name
@@ -293,7 +312,8 @@ class TieBaCrawler(AbstractCrawler):
         utils.logger.info(
             "[WeiboCrawler.get_creators_and_notes] Begin get weibo creators"
         )
-        for creator_url in config.TIEBA_CREATOR_URL_LIST:
+
+        async def crawl_creator(creator_url: str) -> None:
             creator_page_html_content = await self.tieba_client.get_creator_info_by_url(
                 creator_url=creator_url
             )
@@ -327,6 +347,8 @@ class TieBaCrawler(AbstractCrawler):
                     f"[WeiboCrawler.get_creators_and_notes] get creator info error, creator_url:{creator_url}"
                 )
 
+        await scheduler.run_creators(crawl_creator, config.TIEBA_CREATOR_URL_LIST)
+
     async def launch_browser(
         self,
         chromium: BrowserType,
@@ -413,6 +435,6 @@ class TieBaCrawler(AbstractCrawler):
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
             self.cdp_manager = None
-        else:
+        elif hasattr(self, "browser_context"):
             await self.browser_context.close()
         utils.logger.info("[BaiduTieBaCrawler.close] Browser context closed ...")
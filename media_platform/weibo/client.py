@@ -13,7 +13,6 @@
 # @Time    : 2023/12/23 15:40
 # @Desc    : 微博爬虫 API 请求 client
 
-import asyncio
 import copy
 import json
 import re
@@ -22,10 +21,11 @@ from urllib.parse import parse_qs, unquote, urlencode
 
 import httpx
 from httpx import Response
-from playwright.async_api import BrowserContext, Page
+from playwright.async_api import BrowserContext
 
 import config
-from tools import utils
+from tools import metrics, scheduler, tracing, utils
+from tools.page_pool import BrowserPagePool
 
 from .exception import DataFetchError
 from .field import SearchType
@@ -39,26 +39,31 @@ class WeiboClient:
         proxy=None,
         *,
         headers: Dict[str, str],
-        playwright_page: Page,
+        page_pool: BrowserPagePool,
         cookie_dict: Dict[str, str],
     ):
         self.proxy = proxy
         self.timeout = timeout
         self.headers = headers
         self._host = "https://m.weibo.cn"
-        self.playwright_page = playwright_page
+        self.page_pool = page_pool
         self.cookie_dict = cookie_dict
         self._image_agent_host = "https://i1.wp.com/"
 
+    @scheduler.limit_requests("wb")
+    @metrics.instrument_request("wb")
     async def request(self, method, url, **kwargs) -> Union[Response, Dict]:
         enable_return_response = kwargs.pop("return_response", False)
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        with tracing.span("network", url):
+            async with httpx.AsyncClient(proxy=self.proxy) as client:
+                response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        metrics.observe_response("wb", response.status_code)
 
         if enable_return_response:
             return response
 
-        data: Dict = response.json()
+        with tracing.span("parse"):
+            data: Dict = response.json()
         ok_code = data.get("ok")
         if ok_code == 0:  # response error
             utils.logger.error(f"[WeiboClient.request] request {method}:{url} err, res:{data}")
@@ -176,7 +181,7 @@ class WeiboClient:
                 comment_list = comment_list[:max_count - len(result)]
             if callback:  # 如果有回调函数，就执行回调函数
                 await callback(note_id, comment_list)
-            await asyncio.sleep(crawl_interval)
+            await tracing.sleep(crawl_interval)
             result.extend(comment_list)
             sub_comment_result = await self.get_comments_all_sub_comments(note_id, comment_list, callback)
             result.extend(sub_comment_result)
@@ -366,7 +371,7 @@ class WeiboClient:
                 break
             since_id = notes_res.get("cardlistInfo", {}).get("since_id", "0")
             if "cards" not in notes_res:
-                utils.logger.info(f"[WeiboClient.get_all_notes_by_creator] No 'notes' key found in response: {notes_res}")
+                utils.logger.info("[WeiboClient.get_all_notes_by_creator] No 'notes' key found in response: %s", utils.lazy_payload(notes_res))
                 break
 
             notes = notes_res["cards"]
@@ -374,7 +379,7 @@ class WeiboClient:
             notes = [note for note in notes if note.get("card_type") == 9]
             if callback:
                 await callback(notes)
-            await asyncio.sleep(crawl_interval)
+            await tracing.sleep(crawl_interval)
             result.extend(notes)
             crawler_total_count += 10
             notes_has_more = notes_res.get("cardlistInfo", {}).get("total", 0) > crawler_total_count
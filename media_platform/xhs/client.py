@@ -15,12 +15,13 @@ from typing import Any, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode
 
 import httpx
-from playwright.async_api import BrowserContext, Page
+from playwright.async_api import BrowserContext
 from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_result
 
 import config
 from base.base_crawler import AbstractApiClient
-from tools import utils
+from tools import metrics, scheduler, tracing, utils
+from tools.page_pool import BrowserPagePool
 from html import unescape
 
 from .exception import DataFetchError, IPBlockError
@@ -36,7 +37,7 @@ class XiaoHongShuClient(AbstractApiClient):
         proxy=None,
         *,
         headers: Dict[str, str],
-        playwright_page: Page,
+        page_pool: BrowserPagePool,
         cookie_dict: Dict[str, str],
     ):
         self.proxy = proxy
@@ -48,9 +49,10 @@ class XiaoHongShuClient(AbstractApiClient):
         self.IP_ERROR_CODE = 300012
         self.NOTE_ABNORMAL_STR = "笔记状态异常，请稍后查看"
         self.NOTE_ABNORMAL_CODE = -510001
-        self.playwright_page = playwright_page
+        self.page_pool = page_pool
         self.cookie_dict = cookie_dict
 
+    @tracing.traced("sign")
     async def _pre_headers(self, url: str, data=None) -> Dict:
         """
         请求头参数签名
@@ -61,8 +63,10 @@ class XiaoHongShuClient(AbstractApiClient):
         Returns:
 
         """
-        encrypt_params = await self.playwright_page.evaluate("([url, data]) => window._webmsxyw(url,data)", [url, data])
-        local_storage = await self.playwright_page.evaluate("() => window.localStorage")
+        # 签名和 b1 从同一个页面读取
+        async with self.page_pool.acquire() as page:
+            encrypt_params = await page.evaluate("([url, data]) => window._webmsxyw(url,data)", [url, data])
+            local_storage = await page.evaluate("() => window.localStorage")
         signs = sign(
             a1=self.cookie_dict.get("a1", ""),
             b1=local_storage.get("b1", ""),
@@ -70,16 +74,18 @@ class XiaoHongShuClient(AbstractApiClient):
             x_t=str(encrypt_params.get("X-t", "")),
         )
 
-        headers = {
+        # 返回新的请求头，不修改共享的 self.headers，避免并发请求互相覆盖签名
+        return {
+            **self.headers,
             "X-S": signs["x-s"],
             "X-T": signs["x-t"],
             "x-S-Common": signs["x-s-common"],
             "X-B3-Traceid": signs["x-b3-traceid"],
         }
-        self.headers.update(headers)
-        return self.headers
 
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
+    @scheduler.limit_requests("xhs")
+    @metrics.instrument_request("xhs")
     async def request(self, method, url, **kwargs) -> Union[str, Any]:
         """
         封装httpx的公共请求方法，对请求响应做一些处理
@@ -93,8 +99,10 @@ class XiaoHongShuClient(AbstractApiClient):
         """
         # return response.text
         return_response = kwargs.pop("return_response", False)
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        with tracing.span("network", url):
+            async with httpx.AsyncClient(proxy=self.proxy) as client:
+                response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        metrics.observe_response("xhs", response.status_code)
 
         if response.status_code == 471 or response.status_code == 461:
             # someday someone maybe will bypass captcha
@@ -106,7 +114,8 @@ class XiaoHongShuClient(AbstractApiClient):
 
         if return_response:
             return response.text
-        data: Dict = response.json()
+        with tracing.span("parse"):
+            data: Dict = response.json()
         if data["success"]:
             return data.get("data", data.get("success", {}))
         elif data["code"] == self.IP_ERROR_CODE:
@@ -344,27 +353,32 @@ class XiaoHongShuClient(AbstractApiClient):
         result = []
         comments_has_more = True
         comments_cursor = ""
-        while comments_has_more and len(result) < max_count:
-            comments_res = await self.get_note_comments(note_id=note_id, xsec_token=xsec_token, cursor=comments_cursor)
-            comments_has_more = comments_res.get("has_more", False)
-            comments_cursor = comments_res.get("cursor", "")
-            if "comments" not in comments_res:
-                utils.logger.info(f"[XiaoHongShuClient.get_note_all_comments] No 'comments' key found in response: {comments_res}")
-                break
-            comments = comments_res["comments"]
-            if len(result) + len(comments) > max_count:
-                comments = comments[:max_count - len(result)]
-            if callback:
-                await callback(note_id, comments)
-            await asyncio.sleep(crawl_interval)
-            result.extend(comments)
-            sub_comments = await self.get_comments_all_sub_comments(
-                comments=comments,
-                xsec_token=xsec_token,
-                crawl_interval=crawl_interval,
-                callback=callback,
-            )
-            result.extend(sub_comments)
+        # 二级评论在后台抓取，一级评论继续翻页，不用等每一页的回复都抓完；同一个帖子下所有页共用一个并发上限
+        sub_comment_semaphore = scheduler.sub_comment_semaphore()
+        async with scheduler.BackgroundTasks() as pending:
+            while comments_has_more and len(result) < max_count:
+                comments_res = await self.get_note_comments(note_id=note_id, xsec_token=xsec_token, cursor=comments_cursor)
+                comments_has_more = comments_res.get("has_more", False)
+                comments_cursor = comments_res.get("cursor", "")
+                if "comments" not in comments_res:
+                    utils.logger.info("[XiaoHongShuClient.get_note_all_comments] No 'comments' key found in response: %s", utils.lazy_payload(comments_res))
+                    break
+                comments = comments_res["comments"]
+                if len(result) + len(comments) > max_count:
+                    comments = comments[:max_count - len(result)]
+                if callback:
+                    await callback(note_id, comments)
+                await tracing.sleep(crawl_interval)
+                result.extend(comments)
+                pending.start(self.get_comments_all_sub_comments(
+                    comments=comments,
+                    xsec_token=xsec_token,
+                    crawl_interval=crawl_interval,
+                    callback=callback,
+                    semaphore=sub_comment_semaphore,
+                ))
+            for sub_comments in await pending.join():
+                result.extend(sub_comments)
         return result
 
     async def get_comments_all_sub_comments(
@@ -373,14 +387,16 @@ class XiaoHongShuClient(AbstractApiClient):
         xsec_token: str,
         crawl_interval: float = 1.0,
         callback: Optional[Callable] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
     ) -> List[Dict]:
         """
-        获取指定一级评论下的所有二级评论, 该方法会一直查找一级评论下的所有二级评论信息
+        获取指定一级评论下的所有二级评论, 多个一级评论的回复并发翻页，同时最多 SUB_COMMENT_CONCURRENCY_NUM 个
         Args:
             comments: 评论列表
             xsec_token: 验证token
             crawl_interval: 爬取一次评论的延迟单位（秒）
             callback: 一次评论爬取结束后
+            semaphore: 同一个帖子下多页一级评论共用的并发上限，为空时只限制本页
 
         Returns:
 
@@ -390,41 +406,77 @@ class XiaoHongShuClient(AbstractApiClient):
             return []
 
         result = []
+        task_list = []
         for comment in comments:
             note_id = comment.get("note_id")
             sub_comments = comment.get("sub_comments")
+            if sub_comments:
+                self._mark_root_comment(sub_comments, comment.get("id"))
             if sub_comments and callback:
                 await callback(note_id, sub_comments)
 
-            sub_comment_has_more = comment.get("sub_comment_has_more")
-            if not sub_comment_has_more:
+            if not comment.get("sub_comment_has_more"):
                 continue
+            task_list.append(self.get_root_comment_all_sub_comments(comment, xsec_token, crawl_interval, callback))
 
-            root_comment_id = comment.get("id")
-            sub_comment_cursor = comment.get("sub_comment_cursor")
+        for sub_comments in await scheduler.gather_limited(task_list, config.SUB_COMMENT_CONCURRENCY_NUM, semaphore):
+            result.extend(sub_comments)
+        return result
 
-            while sub_comment_has_more:
-                comments_res = await self.get_note_sub_comments(
-                    note_id=note_id,
-                    root_comment_id=root_comment_id,
-                    xsec_token=xsec_token,
-                    num=10,
-                    cursor=sub_comment_cursor,
-                )
-
-                if comments_res is None:
-                    utils.logger.info(f"[XiaoHongShuClient.get_comments_all_sub_comments] No response found for note_id: {note_id}")
-                    continue
-                sub_comment_has_more = comments_res.get("has_more", False)
-                sub_comment_cursor = comments_res.get("cursor", "")
-                if "comments" not in comments_res:
-                    utils.logger.info(f"[XiaoHongShuClient.get_comments_all_sub_comments] No 'comments' key found in response: {comments_res}")
-                    break
-                comments = comments_res["comments"]
-                if callback:
-                    await callback(note_id, comments)
-                await asyncio.sleep(crawl_interval)
-                result.extend(comments)
+    @staticmethod
+    def _mark_root_comment(sub_comments: List[Dict], root_comment_id: str) -> None:
+        """
+        二级评论的接口数据里没有根评论ID，按所属的一级评论补上，存储时写入 root_comment_id
+        """
+        for sub_comment in sub_comments:
+            sub_comment["root_comment_id"] = root_comment_id
+
+    async def get_root_comment_all_sub_comments(
+        self,
+        comment: Dict,
+        xsec_token: str,
+        crawl_interval: float = 1.0,
+        callback: Optional[Callable] = None,
+    ) -> List[Dict]:
+        """
+        翻页获取单个一级评论下剩余的二级评论
+        Args:
+            comment: 一级评论，从 sub_comment_cursor 开始翻页
+            xsec_token: 验证token
+            crawl_interval: 爬取一次评论的延迟单位（秒）
+            callback: 一次评论爬取结束后
+
+        Returns:
+
+        """
+        result = []
+        note_id = comment.get("note_id")
+        root_comment_id = comment.get("id")
+        sub_comment_cursor = comment.get("sub_comment_cursor")
+        sub_comment_has_more = True
+        while sub_comment_has_more:
+            comments_res = await self.get_note_sub_comments(
+                note_id=note_id,
+                root_comment_id=root_comment_id,
+                xsec_token=xsec_token,
+                num=10,
+                cursor=sub_comment_cursor,
+            )
+
+            if comments_res is None:
+                utils.logger.info(f"[XiaoHongShuClient.get_root_comment_all_sub_comments] No response found for note_id: {note_id}")
+                break
+            sub_comment_has_more = comments_res.get("has_more", False)
+            sub_comment_cursor = comments_res.get("cursor", "")
+            if "comments" not in comments_res:
+                utils.logger.info("[XiaoHongShuClient.get_root_comment_all_sub_comments] No 'comments' key found in response: %s", utils.lazy_payload(comments_res))
+                break
+            comments = comments_res["comments"]
+            self._mark_root_comment(comments, root_comment_id)
+            if callback:
+                await callback(note_id, comments)
+            await tracing.sleep(crawl_interval)
+            result.extend(comments)
         return result
 
     async def get_creator_info(self, user_id: str) -> Dict:
@@ -498,7 +550,7 @@ class XiaoHongShuClient(AbstractApiClient):
             notes_has_more = notes_res.get("has_more", False)
             notes_cursor = notes_res.get("cursor", "")
             if "notes" not in notes_res:
-                utils.logger.info(f"[XiaoHongShuClient.get_all_notes_by_creator] No 'notes' key found in response: {notes_res}")
+                utils.logger.info("[XiaoHongShuClient.get_all_notes_by_creator] No 'notes' key found in response: %s", utils.lazy_payload(notes_res))
                 break
 
             notes = notes_res["notes"]
@@ -513,7 +565,7 @@ class XiaoHongShuClient(AbstractApiClient):
                 await callback(notes_to_add)
 
             result.extend(notes_to_add)
-            await asyncio.sleep(crawl_interval)
+            await tracing.sleep(crawl_interval)
 
         utils.logger.info(f"[XiaoHongShuClient.get_all_notes_by_creator] Finished getting notes for user {user_id}, total: {len(result)}")
         return result
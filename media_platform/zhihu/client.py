@@ -23,7 +23,7 @@ import config
 from base.base_crawler import AbstractApiClient
 from constant import zhihu as zhihu_constant
 from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
-from tools import utils
+from tools import metrics, scheduler, tracing, utils
 
 from .exception import DataFetchError, ForbiddenError
 from .field import SearchSort, SearchTime, SearchType
@@ -45,8 +45,11 @@ class ZhiHuClient(AbstractApiClient):
         self.timeout = timeout
         self.default_headers = headers
         self.cookie_dict = cookie_dict
+        self._host = zhihu_constant.ZHIHU_URL
+        self._zhuanlan_host = zhihu_constant.ZHIHU_ZHUANLAN_URL
         self._extractor = ZhihuExtractor()
 
+    @tracing.traced("sign")
     async def _pre_headers(self, url: str) -> Dict:
         """
         请求头参数签名
@@ -65,6 +68,8 @@ class ZhiHuClient(AbstractApiClient):
         return headers
 
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
+    @scheduler.limit_requests("zhihu")
+    @metrics.instrument_request("zhihu")
     async def request(self, method, url, **kwargs) -> Union[str, Any]:
         """
         封装httpx的公共请求方法，对请求响应做一些处理
@@ -79,8 +84,10 @@ class ZhiHuClient(AbstractApiClient):
         # return response.text
         return_response = kwargs.pop('return_response', False)
 
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        with tracing.span("network", url):
+            async with httpx.AsyncClient(proxy=self.proxy) as client:
+                response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        metrics.observe_response("zhihu", response.status_code)
 
         if response.status_code != 200:
             utils.logger.error(f"[ZhiHuClient.request] Requset Url: {url}, Request error: {response.text}")
@@ -94,7 +101,8 @@ class ZhiHuClient(AbstractApiClient):
         if return_response:
             return response.text
         try:
-            data: Dict = response.json()
+            with tracing.span("parse"):
+                data: Dict = response.json()
             if data.get("error"):
                 utils.logger.error(f"[ZhiHuClient.request] Request error: {data}")
                 raise DataFetchError(data.get("error", {}).get("message"))
@@ -117,7 +125,7 @@ class ZhiHuClient(AbstractApiClient):
         if isinstance(params, dict):
             final_uri += '?' + urlencode(params)
         headers = await self._pre_headers(final_uri)
-        base_url = (zhihu_constant.ZHIHU_URL if "/p/" not in uri else zhihu_constant.ZHIHU_ZHUANLAN_URL)
+        base_url = (self._host if "/p/" not in uri else self._zhuanlan_host)
         return await self.request(method="GET", url=base_url + final_uri, headers=headers, **kwargs)
 
     async def pong(self) -> bool:
@@ -201,7 +209,7 @@ class ZhiHuClient(AbstractApiClient):
             "vertical": note_type.value,
         }
         search_res = await self.get(uri, params)
-        utils.logger.info(f"[ZhiHuClient.get_note_by_keyword] Search result: {search_res}")
+        utils.logger.debug("[ZhiHuClient.get_note_by_keyword] Search result: %s", utils.lazy_payload(search_res))
         return self._extractor.extract_contents_from_search(search_res)
 
     async def get_root_comments(
@@ -281,24 +289,29 @@ class ZhiHuClient(AbstractApiClient):
         is_end: bool = False
         offset: str = ""
         limit: int = 10
-        while not is_end:
-            root_comment_res = await self.get_root_comments(content.content_id, content.content_type, offset, limit)
-            if not root_comment_res:
-                break
-            paging_info = root_comment_res.get("paging", {})
-            is_end = paging_info.get("is_end")
-            offset = self._extractor.extract_offset(paging_info)
-            comments = self._extractor.extract_comments(content, root_comment_res.get("data"))
+        # 子评论在后台抓取，一级评论继续翻页，不用等每一页的回复都抓完；同一个内容下所有页共用一个并发上限
+        sub_comment_semaphore = scheduler.sub_comment_semaphore()
+        async with scheduler.BackgroundTasks() as pending:
+            while not is_end:
+                root_comment_res = await self.get_root_comments(content.content_id, content.content_type, offset, limit)
+                if not root_comment_res:
+                    break
+                paging_info = root_comment_res.get("paging", {})
+                is_end = paging_info.get("is_end")
+                offset = self._extractor.extract_offset(paging_info)
+                comments = self._extractor.extract_comments(content, root_comment_res.get("data"))
 
-            if not comments:
-                break
+                if not comments:
+                    break
 
-            if callback:
-                await callback(comments)
+                if callback:
+                    await callback(comments)
 
-            result.extend(comments)
-            await self.get_comments_all_sub_comments(content, comments, crawl_interval=crawl_interval, callback=callback)
-            await asyncio.sleep(crawl_interval)
+                result.extend(comments)
+                pending.start(self.get_comments_all_sub_comments(content, comments, crawl_interval=crawl_interval, callback=callback,
+                                                                  semaphore=sub_comment_semaphore))
+                await tracing.sleep(crawl_interval)
+            await pending.join()
         return result
 
     async def get_comments_all_sub_comments(
@@ -307,14 +320,16 @@ class ZhiHuClient(AbstractApiClient):
         comments: List[ZhihuComment],
         crawl_interval: float = 1.0,
         callback: Optional[Callable] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
     ) -> List[ZhihuComment]:
         """
-        获取指定评论下的所有子评论
+        获取指定评论下的所有子评论，多个一级评论的子评论并发翻页，同时最多 SUB_COMMENT_CONCURRENCY_NUM 个
         Args:
             content: 内容详情对象(问题｜文章｜视频)
             comments: 评论列表
             crawl_interval: 爬取一次笔记的延迟单位（秒）
             callback: 一次笔记爬取结束后
+            semaphore: 同一个内容下多页一级评论共用的并发上限，为空时只限制本页
 
         Returns:
 
@@ -322,32 +337,57 @@ class ZhiHuClient(AbstractApiClient):
         if not config.ENABLE_GET_SUB_COMMENTS:
             return []
 
+        task_list = [
+            self.get_root_comment_all_sub_comments(content, parment_comment, crawl_interval, callback)
+            for parment_comment in comments if parment_comment.sub_comment_count != 0
+        ]
         all_sub_comments: List[ZhihuComment] = []
-        for parment_comment in comments:
-            if parment_comment.sub_comment_count == 0:
-                continue
+        for sub_comments in await scheduler.gather_limited(task_list, config.SUB_COMMENT_CONCURRENCY_NUM, semaphore):
+            all_sub_comments.extend(sub_comments)
+        return all_sub_comments
 
-            is_end: bool = False
-            offset: str = ""
-            limit: int = 10
-            while not is_end:
-                child_comment_res = await self.get_child_comments(parment_comment.comment_id, offset, limit)
-                if not child_comment_res:
-                    break
-                paging_info = child_comment_res.get("paging", {})
-                is_end = paging_info.get("is_end")
-                offset = self._extractor.extract_offset(paging_info)
-                sub_comments = self._extractor.extract_comments(content, child_comment_res.get("data"))
+    async def get_root_comment_all_sub_comments(
+        self,
+        content: ZhihuContent,
+        parment_comment: ZhihuComment,
+        crawl_interval: float = 1.0,
+        callback: Optional[Callable] = None,
+    ) -> List[ZhihuComment]:
+        """
+        翻页获取单个一级评论下的所有子评论
+        Args:
+            content: 内容详情对象(问题｜文章｜视频)
+            parment_comment: 一级评论
+            crawl_interval: 爬取一次笔记的延迟单位（秒）
+            callback: 一次笔记爬取结束后
 
-                if not sub_comments:
-                    break
+        Returns:
 
-                if callback:
-                    await callback(sub_comments)
+        """
+        result: List[ZhihuComment] = []
+        is_end: bool = False
+        offset: str = ""
+        limit: int = 10
+        while not is_end:
+            child_comment_res = await self.get_child_comments(parment_comment.comment_id, offset, limit)
+            if not child_comment_res:
+                break
+            paging_info = child_comment_res.get("paging", {})
+            is_end = paging_info.get("is_end")
+            offset = self._extractor.extract_offset(paging_info)
+            sub_comments = self._extractor.extract_comments(content, child_comment_res.get("data"))
 
-                all_sub_comments.extend(sub_comments)
-                await asyncio.sleep(crawl_interval)
-        return all_sub_comments
+            if not sub_comments:
+                break
+            for sub_comment in sub_comments:
+                sub_comment.root_comment_id = parment_comment.comment_id
+
+            if callback:
+                await callback(sub_comments)
+
+            result.extend(sub_comments)
+            await tracing.sleep(crawl_interval)
+        return result
 
     async def get_creator_info(self, url_token: str) -> Optional[ZhihuCreator]:
         """
@@ -444,7 +484,7 @@ class ZhiHuClient(AbstractApiClient):
             res = await self.get_creator_answers(creator.url_token, offset, limit)
             if not res:
                 break
-            utils.logger.info(f"[ZhiHuClient.get_all_anwser_by_creator] Get creator {creator.url_token} answers: {res}")
+            utils.logger.debug("[ZhiHuClient.get_all_anwser_by_creator] Get creator %s answers: %s", creator.url_token, utils.lazy_payload(res))
             paging_info = res.get("paging", {})
             is_end = paging_info.get("is_end")
             contents = self._extractor.extract_content_list_from_creator(res.get("data"))
@@ -452,7 +492,7 @@ class ZhiHuClient(AbstractApiClient):
                 await callback(contents)
             all_contents.extend(contents)
             offset += limit
-            await asyncio.sleep(crawl_interval)
+            await tracing.sleep(crawl_interval)
         return all_contents
 
     async def get_all_articles_by_creator(
@@ -486,7 +526,7 @@ class ZhiHuClient(AbstractApiClient):
                 await callback(contents)
             all_contents.extend(contents)
             offset += limit
-            await asyncio.sleep(crawl_interval)
+            await tracing.sleep(crawl_interval)
         return all_contents
 
     async def get_all_videos_by_creator(
@@ -520,7 +560,7 @@ class ZhiHuClient(AbstractApiClient):
                 await callback(contents)
             all_contents.extend(contents)
             offset += limit
-            await asyncio.sleep(crawl_interval)
+            await tracing.sleep(crawl_interval)
         return all_contents
 
     async def get_answer_info(
@@ -0,0 +1,48 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 以 Prometheus 文本格式暴露爬虫运行时指标
+import threading
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+import config
+from tools import metrics, utils
+
+app = FastAPI()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Prometheus 抓取入口
+    """
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def start_metrics_server(host: str = config.METRICS_SERVER_HOST, port: int = config.METRICS_SERVER_PORT) -> uvicorn.Server:
+    """
+    在后台守护线程里启动 metrics server，不占用爬虫的事件循环，进程退出时随之结束
+    Args:
+        host: 监听地址
+        port: 监听端口
+
+    Returns:
+
+    """
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="metrics-server", daemon=True)
+    thread.start()
+    utils.logger.info(f"[metrics_server.start_metrics_server] metrics server listening on http://{host}:{port}/metrics")
+    return server
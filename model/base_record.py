@@ -0,0 +1,110 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 基于 __slots__ 的轻量存储记录，替代每条数据都新建一个大 dict
+from dataclasses import dataclass, field, fields
+from operator import attrgetter
+from typing import Any, Iterator, Optional, Tuple, Type, TypeVar
+
+R = TypeVar("R", bound="SlottedRecord")
+
+
+class SlottedRecord:
+    """
+    存储记录基类
+
+    子类通过 @slotted_record 声明字段，实例只占用固定的 slot 空间（没有 __dict__），
+    同时实现了存储层需要的 Mapping 接口（get / keys / values / items / item[key] = value），
+    因此各个 store 实现可以直接消费记录对象，不需要先转换成 dict。
+    add_ts 只在 DB 存储新增记录时才会被赋值，未赋值时不出现在 keys() 里。
+    """
+    __slots__ = ()
+
+    # 由 @slotted_record 在类创建时填充，按声明顺序排列，CSV 表头、DB 字段顺序都依赖它
+    _fields: Tuple[str, ...] = ()
+    _fields_with_add_ts: Tuple[str, ...] = ("add_ts",)
+    _field_set: frozenset = frozenset()
+    _field_getter = staticmethod(lambda record: ())
+    add_ts: Optional[int]
+
+    def keys(self) -> Tuple[str, ...]:
+        if self.add_ts is None:
+            return self._fields
+        return self._fields_with_add_ts
+
+    def values(self) -> Tuple[Any, ...]:
+        if self.add_ts is None:
+            return self._field_getter(self)
+        return self._field_getter(self) + (self.add_ts,)
+
+    def items(self) -> Tuple[Tuple[str, Any], ...]:
+        return tuple(zip(self.keys(), self.values()))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._field_set:
+            return getattr(self, key)
+        if key == "add_ts" and self.add_ts is not None:
+            return self.add_ts
+        return default
+
+    def to_dict(self) -> dict:
+        return dict(zip(self.keys(), self.values()))
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            return getattr(self, key)
+        if key == "add_ts" and self.add_ts is not None:
+            return self.add_ts
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self._field_set and key != "add_ts":
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._field_set or (key == "add_ts" and self.add_ts is not None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+
+def slotted_record(cls: Type[R]) -> Type[R]:
+    """
+    把只声明了类型注解的类转换成带 __slots__ 的 dataclass 记录
+    Python3.9 的 dataclass 还不支持 slots=True，这里先生成 dataclass，再按字段重新创建一次带 slots 的类
+    Args:
+        cls: 继承自 SlottedRecord 的类，字段只写注解不写默认值
+
+    Returns:
+
+    """
+    cls.__dict__["__annotations__"]["add_ts"] = Optional[int]
+    cls.add_ts = field(default=None, repr=False, compare=False)
+    cls = dataclass(cls)
+
+    all_fields = tuple(f.name for f in fields(cls))
+    record_fields = all_fields[:-1]
+    namespace = {
+        key: value for key, value in cls.__dict__.items()
+        if key not in all_fields and key not in ("__dict__", "__weakref__")
+    }
+    namespace["__slots__"] = all_fields
+    namespace["_fields"] = record_fields
+    namespace["_fields_with_add_ts"] = all_fields
+    namespace["_field_set"] = frozenset(record_fields)
+    # attrgetter 一次取出所有字段，CSV/DB 写入时取 values() 不再逐个 getattr
+    namespace["_field_getter"] = attrgetter(*record_fields)
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
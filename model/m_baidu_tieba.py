@@ -42,6 +42,7 @@ class TiebaComment(BaseModel):
 
     comment_id: str = Field(..., description="评论ID")
     parent_comment_id: str = Field(default="", description="父评论ID")
+    root_comment_id: str = Field(default="", description="根评论ID，一级评论为自身ID")
     content: str = Field(..., description="评论内容")
     user_link: str = Field(default="", description="用户主页链接")
     user_nickname: str = Field(default="", description="用户昵称")
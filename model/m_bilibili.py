@@ -0,0 +1,111 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+from model.base_record import SlottedRecord, slotted_record
+
+
+@slotted_record
+class BilibiliVideoRecord(SlottedRecord):
+    """
+    B站视频存储记录
+    """
+    video_id: str  # 视频ID
+    video_type: str  # 视频类型
+    title: str  # 视频标题
+    desc: str  # 视频描述
+    create_time: int  # 视频发布时间戳
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    avatar: str  # 用户头像地址
+    liked_count: str  # 用户点赞数
+    disliked_count: str  # 用户点踩数
+    video_play_count: str  # 视频播放数量
+    video_favorite_count: str  # 视频收藏数量
+    video_share_count: str  # 视频分享数量
+    video_coin_count: str  # 视频投币数量
+    video_danmaku: str  # 视频弹幕数量
+    video_comment: str  # 视频评论数量
+    last_modify_ts: int  # 记录最后修改时间戳
+    video_url: str  # 视频详情URL
+    video_cover_url: str  # 视频封面图 URL
+    source_keyword: str  # 搜索来源关键字
+
+
+@slotted_record
+class BilibiliVideoCommentRecord(SlottedRecord):
+    """
+    B站视频评论存储记录
+    """
+    comment_id: str  # 评论ID
+    parent_comment_id: str  # 父评论ID
+    root_comment_id: str  # 根评论ID，一级评论为自身ID
+    create_time: int  # 评论时间戳
+    video_id: str  # 视频ID
+    content: str  # 评论内容
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    sex: str  # 用户性别
+    sign: str  # 用户签名
+    avatar: str  # 用户头像地址
+    sub_comment_count: str  # 评论回复数
+    like_count: int  # 点赞数
+    last_modify_ts: int  # 记录最后修改时间戳
+
+
+@slotted_record
+class BilibiliUpInfoRecord(SlottedRecord):
+    """
+    B站UP主存储记录
+    """
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    sex: str  # 用户性别
+    sign: str  # 用户签名
+    avatar: str  # 用户头像地址
+    last_modify_ts: int  # 记录最后修改时间戳
+    total_fans: int  # 粉丝数
+    total_liked: int  # 总获赞数
+    user_rank: int  # 用户等级
+    is_official: int  # 是否官方认证
+
+
+@slotted_record
+class BilibiliContactRecord(SlottedRecord):
+    """
+    B站UP主粉丝/关注关系存储记录
+    """
+    up_id: str  # UP主ID
+    fan_id: str  # 粉丝ID
+    up_name: str  # UP主昵称
+    fan_name: str  # 粉丝昵称
+    up_sign: str  # UP主签名
+    fan_sign: str  # 粉丝签名
+    up_avatar: str  # UP主头像地址
+    fan_avatar: str  # 粉丝头像地址
+    last_modify_ts: int  # 记录最后修改时间戳
+
+
+@slotted_record
+class BilibiliDynamicRecord(SlottedRecord):
+    """
+    B站UP主动态存储记录
+    """
+    dynamic_id: str  # 动态ID
+    user_id: str  # 用户ID
+    user_name: str  # 用户昵称
+    text: str  # 动态文本
+    type: str  # 动态类型
+    pub_ts: int  # 动态发布时间戳
+    total_comments: int  # 评论数
+    total_forwards: int  # 转发数
+    total_liked: int  # 点赞数
+    last_modify_ts: int  # 记录最后修改时间戳
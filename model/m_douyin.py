@@ -10,3 +10,79 @@
 
 
 # -*- coding: utf-8 -*-
+
+from model.base_record import SlottedRecord, slotted_record
+
+
+@slotted_record
+class DouyinAwemeRecord(SlottedRecord):
+    """
+    抖音视频存储记录
+    """
+    aweme_id: str  # 视频ID
+    aweme_type: str  # 视频类型
+    title: str  # 视频标题
+    desc: str  # 视频描述
+    create_time: int  # 视频发布时间戳
+    user_id: str  # 用户ID
+    sec_uid: str  # 用户sec_uid
+    short_user_id: str  # 用户短ID
+    user_unique_id: str  # 用户唯一ID
+    user_signature: str  # 用户签名
+    nickname: str  # 用户昵称
+    avatar: str  # 用户头像地址
+    liked_count: str  # 视频点赞数
+    collected_count: str  # 视频收藏数
+    comment_count: str  # 视频评论数
+    share_count: str  # 视频分享数
+    ip_location: str  # 评论时的IP地址
+    last_modify_ts: int  # 记录最后修改时间戳
+    aweme_url: str  # 视频详情页URL
+    cover_url: str  # 视频封面图URL
+    video_download_url: str  # 视频下载地址
+    music_download_url: str  # 音乐下载地址
+    note_download_url: str  # 图文笔记的图片下载地址
+    source_keyword: str  # 搜索来源关键字
+
+
+@slotted_record
+class DouyinAwemeCommentRecord(SlottedRecord):
+    """
+    抖音视频评论存储记录
+    """
+    comment_id: str  # 评论ID
+    create_time: int  # 评论时间戳
+    ip_location: str  # 评论时的IP地址
+    aweme_id: str  # 视频ID
+    content: str  # 评论内容
+    user_id: str  # 用户ID
+    sec_uid: str  # 用户sec_uid
+    short_user_id: str  # 用户短ID
+    user_unique_id: str  # 用户唯一ID
+    user_signature: str  # 用户签名
+    nickname: str  # 用户昵称
+    avatar: str  # 用户头像地址
+    sub_comment_count: str  # 评论回复数
+    like_count: int  # 点赞数
+    last_modify_ts: int  # 记录最后修改时间戳
+    parent_comment_id: str  # 父评论ID
+    root_comment_id: str  # 根评论ID，一级评论为自身ID
+    pictures: str  # 评论图片列表
+
+
+@slotted_record
+class DouyinCreatorRecord(SlottedRecord):
+    """
+    抖音创作者存储记录
+    """
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    gender: str  # 性别
+    avatar: str  # 用户头像地址
+    desc: str  # 用户描述
+    ip_location: str  # IP地址
+    follows: int  # 关注数
+    fans: int  # 粉丝数
+    interaction: int  # 获赞数
+    videos_count: int  # 作品数
+    last_modify_ts: int  # 记录最后修改时间戳
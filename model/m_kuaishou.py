@@ -10,3 +10,64 @@
 
 
 # -*- coding: utf-8 -*-
+
+from typing import Optional
+
+from model.base_record import SlottedRecord, slotted_record
+
+
+@slotted_record
+class KuaishouVideoRecord(SlottedRecord):
+    """
+    快手视频存储记录
+    """
+    video_id: str  # 视频ID
+    video_type: str  # 视频类型
+    title: str  # 视频标题
+    desc: str  # 视频描述
+    create_time: int  # 视频发布时间戳
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    avatar: str  # 用户头像地址
+    liked_count: str  # 视频点赞数
+    viewd_count: str  # 视频浏览数量
+    last_modify_ts: int  # 记录最后修改时间戳
+    video_url: str  # 视频详情URL
+    video_cover_url: str  # 视频封面图 URL
+    video_play_url: str  # 视频播放 URL
+    source_keyword: str  # 搜索来源关键字
+
+
+@slotted_record
+class KuaishouVideoCommentRecord(SlottedRecord):
+    """
+    快手视频评论存储记录
+    """
+    comment_id: str  # 评论ID
+    create_time: int  # 评论时间戳
+    video_id: str  # 视频ID
+    content: str  # 评论内容
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    avatar: str  # 用户头像地址
+    sub_comment_count: str  # 评论回复数
+    parent_comment_id: str  # 父评论ID
+    root_comment_id: str  # 根评论ID，一级评论为自身ID
+    last_modify_ts: int  # 记录最后修改时间戳
+
+
+@slotted_record
+class KuaishouCreatorRecord(SlottedRecord):
+    """
+    快手创作者存储记录
+    """
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    gender: str  # 性别
+    avatar: str  # 用户头像地址
+    desc: str  # 用户描述
+    ip_location: str  # IP地址
+    follows: Optional[int]  # 关注数
+    fans: Optional[int]  # 粉丝数
+    interaction: Optional[int]  # 作品数
+    last_modify_ts: int  # 记录最后修改时间戳
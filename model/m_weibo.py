@@ -10,3 +10,73 @@
 
 
 # -*- coding: utf-8 -*-
+
+from model.base_record import SlottedRecord, slotted_record
+
+
+@slotted_record
+class WeiboNoteRecord(SlottedRecord):
+    """
+    微博帖子存储记录
+    """
+    # 微博信息
+    note_id: str  # 帖子ID
+    content: str  # 帖子正文内容
+    create_time: int  # 帖子发布时间戳
+    create_date_time: str  # 帖子发布日期时间
+    liked_count: str  # 帖子点赞数
+    comments_count: str  # 帖子评论数量
+    shared_count: str  # 帖子转发数量
+    last_modify_ts: int  # 记录最后修改时间戳
+    note_url: str  # 帖子详情URL
+    ip_location: str  # 发布微博的地理信息
+
+    # 用户信息
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    gender: str  # 用户性别
+    profile_url: str  # 用户主页地址
+    avatar: str  # 用户头像地址
+    source_keyword: str  # 搜索来源关键字
+
+
+@slotted_record
+class WeiboNoteCommentRecord(SlottedRecord):
+    """
+    微博帖子评论存储记录
+    """
+    comment_id: str  # 评论ID
+    create_time: int  # 评论时间戳
+    create_date_time: str  # 评论日期时间
+    note_id: str  # 帖子ID
+    content: str  # 评论内容
+    sub_comment_count: str  # 评论回复数
+    comment_like_count: str  # 评论点赞数量
+    last_modify_ts: int  # 记录最后修改时间戳
+    ip_location: str  # 发布评论的地理信息
+    parent_comment_id: str  # 父评论ID
+    root_comment_id: str  # 根评论ID，一级评论为自身ID
+
+    # 用户信息
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    gender: str  # 用户性别
+    profile_url: str  # 用户主页地址
+    avatar: str  # 用户头像地址
+
+
+@slotted_record
+class WeiboCreatorRecord(SlottedRecord):
+    """
+    微博博主存储记录
+    """
+    user_id: str  # 用户ID
+    nickname: str  # 用户昵称
+    gender: str  # 性别
+    avatar: str  # 用户头像地址
+    desc: str  # 用户描述
+    ip_location: str  # IP地址
+    follows: str  # 关注数
+    fans: str  # 粉丝数
+    tag_list: str  # 标签列表
+    last_modify_ts: int  # 记录最后修改时间戳
@@ -11,11 +11,81 @@
 
 # -*- coding: utf-8 -*-
 
+from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from model.base_record import SlottedRecord, slotted_record
+
 
 class NoteUrlInfo(BaseModel):
     note_id: str = Field(title="note id")
     xsec_token: str = Field(title="xsec token")
-    xsec_source: str = Field(title="xsec source")
\ No newline at end of file
+    xsec_source: str = Field(title="xsec source")
+
+
+@slotted_record
+class XhsNoteRecord(SlottedRecord):
+    """
+    小红书笔记存储记录
+    """
+    note_id: str  # 帖子id
+    type: str  # 帖子类型
+    title: str  # 帖子标题
+    desc: str  # 帖子描述
+    video_url: str  # 帖子视频url
+    time: int  # 帖子发布时间
+    last_update_time: int  # 帖子最后更新时间
+    user_id: str  # 用户id
+    nickname: str  # 用户昵称
+    avatar: str  # 用户头像
+    liked_count: str  # 点赞数
+    collected_count: str  # 收藏数
+    comment_count: str  # 评论数
+    share_count: str  # 分享数
+    ip_location: str  # ip地址
+    image_list: str  # 图片url
+    tag_list: str  # 标签
+    last_modify_ts: int  # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
+    note_url: str  # 帖子url
+    source_keyword: str  # 搜索关键词
+    xsec_token: str  # xsec_token
+
+
+@slotted_record
+class XhsNoteCommentRecord(SlottedRecord):
+    """
+    小红书笔记评论存储记录
+    """
+    comment_id: str  # 评论id
+    create_time: int  # 评论时间
+    ip_location: str  # ip地址
+    note_id: str  # 帖子id
+    content: str  # 评论内容
+    user_id: str  # 用户id
+    nickname: str  # 用户昵称
+    avatar: str  # 用户头像
+    sub_comment_count: int  # 子评论数
+    pictures: str  # 评论图片
+    parent_comment_id: str  # 父评论id
+    root_comment_id: str  # 根评论id，一级评论为自身id
+    last_modify_ts: int  # 最后更新时间戳
+    like_count: int  # 点赞数
+
+
+@slotted_record
+class XhsCreatorRecord(SlottedRecord):
+    """
+    小红书创作者存储记录
+    """
+    user_id: str  # 用户id
+    nickname: str  # 昵称
+    gender: Optional[str]  # 性别
+    avatar: str  # 头像
+    desc: str  # 个人描述
+    ip_location: str  # ip地址
+    follows: int  # 关注数
+    fans: int  # 粉丝数
+    interaction: int  # 互动数
+    tag_list: str  # 标签
+    last_modify_ts: int  # 最后更新时间戳
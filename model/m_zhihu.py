@@ -46,6 +46,7 @@ class ZhihuComment(BaseModel):
 
     comment_id: str = Field(default="", description="评论ID")
     parent_comment_id: str = Field(default="", description="父评论ID")
+    root_comment_id: str = Field(default="", description="根评论ID，一级评论为自身ID")
     content: str = Field(default="", description="评论内容")
     publish_time: int = Field(default=0, description="发布时间")
     ip_location: Optional[str] = Field(default="", description="IP地理位置")
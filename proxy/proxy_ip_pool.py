@@ -12,6 +12,7 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2023/12/2 13:45
 # @Desc    : ip代理池实现
+import asyncio
 import random
 from typing import Dict, List
 
@@ -23,7 +24,7 @@ from proxy.providers import (
     new_kuai_daili_proxy,
     new_wandou_http_proxy,
 )
-from tools import utils
+from tools import metrics, utils
 
 from .base_proxy import ProxyProvider
 from .types import IpInfoModel, ProviderNameEnum
@@ -46,6 +47,7 @@ class ProxyIpPool:
         self.enable_validate_ip = enable_validate_ip
         self.proxy_list: List[IpInfoModel] = []
         self.ip_provider: ProxyProvider = ip_provider
+        self.provider_name: str = type(ip_provider).__name__
 
     async def load_proxies(self) -> None:
         """
@@ -54,6 +56,8 @@ class ProxyIpPool:
 
         """
         self.proxy_list = await self.ip_provider.get_proxy(self.ip_pool_count)
+        metrics.PROXY_LOADED_TOTAL.inc(len(self.proxy_list), provider=self.provider_name)
+        metrics.PROXY_POOL_SIZE.set(len(self.proxy_list), provider=self.provider_name)
 
     async def _is_valid_proxy(self, proxy: IpInfoModel) -> bool:
         """
@@ -94,11 +98,19 @@ class ProxyIpPool:
 
         proxy = random.choice(self.proxy_list)
         self.proxy_list.remove(proxy)  # 取出来一个IP就应该移出掉
+        metrics.PROXY_POOL_SIZE.set(len(self.proxy_list), provider=self.provider_name)
         if self.enable_validate_ip:
-            if not await self._is_valid_proxy(proxy):
+            try:
+                is_valid = await self._is_valid_proxy(proxy)
+            except Exception:
+                metrics.PROXY_CHECKOUT_TOTAL.inc(provider=self.provider_name, outcome="error")
+                raise
+            if not is_valid:
+                metrics.PROXY_CHECKOUT_TOTAL.inc(provider=self.provider_name, outcome="invalid")
                 raise Exception(
                     "[ProxyIpPool.get_proxy] current ip invalid and again get it"
                 )
+        metrics.PROXY_CHECKOUT_TOTAL.inc(provider=self.provider_name, outcome="ok")
         return proxy
 
     async def _reload_proxies(self):
@@ -132,5 +144,25 @@ async def create_ip_pool(ip_pool_count: int, enable_validate_ip: bool) -> ProxyI
     return pool
 
 
+_shared_pools: Dict[str, "asyncio.Future[ProxyIpPool]"] = {}
+
+
+async def get_shared_ip_pool(ip_pool_count: int, enable_validate_ip: bool) -> ProxyIpPool:
+    """
+    获取进程内共用的 IP 代理池，同一个代理商只加载一次；多平台同时运行、服务模式下各平台共用，每次取出的代理 IP 不会重复
+    :param ip_pool_count: ip池子的数量
+    :param enable_validate_ip: 是否开启验证IP代理
+    :return:
+    """
+    key = config.IP_PROXY_PROVIDER_NAME
+    future = _shared_pools.get(key)
+    # 加载失败或者换了事件循环（例如测试里多次 asyncio.run）时重新创建
+    if future is None or future.get_loop() is not asyncio.get_running_loop() or \
+            (future.done() and (future.cancelled() or future.exception() is not None)):
+        future = _shared_pools[key] = asyncio.ensure_future(create_ip_pool(ip_pool_count, enable_validate_ip))
+    # 多个平台同时等待加载时，其中一个被取消不影响其他平台
+    return await asyncio.shield(future)
+
+
 if __name__ == "__main__":
     pass
@@ -52,11 +52,13 @@ CREATE TABLE bilibili_video_comment (
     create_time INTEGER NOT NULL,
     sub_comment_count TEXT NOT NULL,
     parent_comment_id TEXT DEFAULT NULL,
+    root_comment_id TEXT DEFAULT NULL,
     like_count TEXT NOT NULL DEFAULT '0'
 );
 
 CREATE INDEX idx_bilibili_vi_comment_41c34e ON bilibili_video_comment(comment_id);
 CREATE INDEX idx_bilibili_vi_video_i_f22873 ON bilibili_video_comment(video_id);
+CREATE INDEX idx_bilibili_video_comment_thread ON bilibili_video_comment(video_id, root_comment_id);
 
 -- ----------------------------
 -- Table structure for bilibili_up_info
@@ -179,12 +181,14 @@ CREATE TABLE douyin_aweme_comment (
     create_time INTEGER NOT NULL,
     sub_comment_count TEXT NOT NULL,
     parent_comment_id TEXT DEFAULT NULL,
+    root_comment_id TEXT DEFAULT NULL,
     like_count TEXT NOT NULL DEFAULT '0',
     pictures TEXT NOT NULL DEFAULT ''
 );
 
 CREATE INDEX idx_douyin_awem_comment_fcd7e4 ON douyin_aweme_comment(comment_id);
 CREATE INDEX idx_douyin_awem_aweme_i_c50049 ON douyin_aweme_comment(aweme_id);
+CREATE INDEX idx_douyin_aweme_comment_thread ON douyin_aweme_comment(aweme_id, root_comment_id);
 
 -- ----------------------------
 -- Table structure for dy_creator
@@ -248,11 +252,14 @@ CREATE TABLE kuaishou_video_comment (
     video_id TEXT NOT NULL,
     content TEXT,
     create_time INTEGER NOT NULL,
-    sub_comment_count TEXT NOT NULL
+    sub_comment_count TEXT NOT NULL,
+    parent_comment_id TEXT DEFAULT NULL,
+    root_comment_id TEXT DEFAULT NULL
 );
 
 CREATE INDEX idx_kuaishou_vi_comment_ed48fa ON kuaishou_video_comment(comment_id);
 CREATE INDEX idx_kuaishou_vi_video_i_e50914 ON kuaishou_video_comment(video_id);
+CREATE INDEX idx_kuaishou_video_comment_thread ON kuaishou_video_comment(video_id, root_comment_id);
 
 -- ----------------------------
 -- Table structure for weibo_note
@@ -304,12 +311,14 @@ CREATE TABLE weibo_note_comment (
     create_date_time TEXT NOT NULL,
     comment_like_count TEXT NOT NULL,
     sub_comment_count TEXT NOT NULL,
-    parent_comment_id TEXT DEFAULT NULL
+    parent_comment_id TEXT DEFAULT NULL,
+    root_comment_id TEXT DEFAULT NULL
 );
 
 CREATE INDEX idx_weibo_note__comment_c7611c ON weibo_note_comment(comment_id);
 CREATE INDEX idx_weibo_note__note_id_24f108 ON weibo_note_comment(note_id);
 CREATE INDEX idx_weibo_note__create__667fe3 ON weibo_note_comment(create_date_time);
+CREATE INDEX idx_weibo_note_comment_thread ON weibo_note_comment(note_id, root_comment_id);
 
 -- ----------------------------
 -- Table structure for weibo_creator
@@ -402,11 +411,13 @@ CREATE TABLE xhs_note_comment (
     sub_comment_count INTEGER NOT NULL,
     pictures TEXT DEFAULT NULL,
     parent_comment_id TEXT DEFAULT NULL,
+    root_comment_id TEXT DEFAULT NULL,
     like_count TEXT DEFAULT NULL
 );
 
 CREATE INDEX idx_xhs_note_co_comment_8e8349 ON xhs_note_comment(comment_id);
 CREATE INDEX idx_xhs_note_co_create__204f8d ON xhs_note_comment(create_time);
+CREATE INDEX idx_xhs_note_comment_thread ON xhs_note_comment(note_id, root_comment_id);
 
 -- ----------------------------
 -- Table structure for tieba_note
@@ -444,6 +455,7 @@ CREATE TABLE tieba_comment (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     comment_id TEXT NOT NULL,
     parent_comment_id TEXT DEFAULT '',
+    root_comment_id TEXT DEFAULT NULL,
     content TEXT NOT NULL,
     user_link TEXT DEFAULT '',
     user_nickname TEXT DEFAULT '',
@@ -463,6 +475,7 @@ CREATE TABLE tieba_comment (
 CREATE INDEX idx_tieba_comment_comment_id ON tieba_comment(comment_id);
 CREATE INDEX idx_tieba_comment_note_id ON tieba_comment(note_id);
 CREATE INDEX idx_tieba_comment_publish_time ON tieba_comment(publish_time);
+CREATE INDEX idx_tieba_comment_thread ON tieba_comment(note_id, root_comment_id);
 
 -- ----------------------------
 -- Table structure for tieba_creator
@@ -521,6 +534,7 @@ CREATE TABLE zhihu_comment (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     comment_id TEXT NOT NULL,
     parent_comment_id TEXT DEFAULT NULL,
+    root_comment_id TEXT DEFAULT NULL,
     content TEXT NOT NULL,
     publish_time TEXT NOT NULL,
     ip_location TEXT DEFAULT NULL,
@@ -540,6 +554,7 @@ CREATE TABLE zhihu_comment (
 CREATE INDEX idx_zhihu_comment_comment_id ON zhihu_comment(comment_id);
 CREATE INDEX idx_zhihu_comment_content_id ON zhihu_comment(content_id);
 CREATE INDEX idx_zhihu_comment_publish_time ON zhihu_comment(publish_time);
+CREATE INDEX idx_zhihu_comment_thread ON zhihu_comment(content_id, root_comment_id);
 
 -- ----------------------------
 -- Table structure for zhihu_creator
@@ -595,3 +595,20 @@ alter table douyin_aweme_comment add column `like_count` varchar(255) NOT NULL D
 alter table xhs_note add column xsec_token varchar(50) default null comment '签名算法';
 alter table douyin_aweme_comment add column `pictures` varchar(500) NOT NULL DEFAULT '' COMMENT '评论图片列表';
 alter table bilibili_video_comment add column `like_count` varchar(255) NOT NULL DEFAULT '0' COMMENT '点赞数';
+
+-- 评论树：所有评论表统一 root_comment_id / parent_comment_id，按内容ID + 根评论ID 建联合索引，一次范围查询取出整个楼层
+alter table kuaishou_video_comment add column `parent_comment_id` varchar(64) DEFAULT NULL COMMENT '父评论ID';
+alter table bilibili_video_comment add column `root_comment_id` varchar(64) DEFAULT NULL COMMENT '根评论ID';
+alter table douyin_aweme_comment add column `root_comment_id` varchar(64) DEFAULT NULL COMMENT '根评论ID';
+alter table kuaishou_video_comment add column `root_comment_id` varchar(64) DEFAULT NULL COMMENT '根评论ID';
+alter table weibo_note_comment add column `root_comment_id` varchar(64) DEFAULT NULL COMMENT '根评论ID';
+alter table xhs_note_comment add column `root_comment_id` varchar(64) DEFAULT NULL COMMENT '根评论ID';
+alter table tieba_comment add column `root_comment_id` varchar(255) DEFAULT NULL COMMENT '根评论ID';
+alter table zhihu_comment add column `root_comment_id` varchar(64) DEFAULT NULL COMMENT '根评论ID';
+alter table bilibili_video_comment add index `idx_bilibili_video_comment_thread` (`video_id`, `root_comment_id`);
+alter table douyin_aweme_comment add index `idx_douyin_aweme_comment_thread` (`aweme_id`, `root_comment_id`);
+alter table kuaishou_video_comment add index `idx_kuaishou_video_comment_thread` (`video_id`, `root_comment_id`);
+alter table weibo_note_comment add index `idx_weibo_note_comment_thread` (`note_id`, `root_comment_id`);
+alter table xhs_note_comment add index `idx_xhs_note_comment_thread` (`note_id`, `root_comment_id`);
+alter table tieba_comment add index `idx_tieba_comment_thread` (`note_id`, `root_comment_id`);
+alter table zhihu_comment add index `idx_zhihu_comment_thread` (`content_id`, `root_comment_id`);
@@ -0,0 +1,82 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 参数化 SQL 语句的生成与缓存，MySQL 和 SQLite 共用
+#
+# 表名、字段名来自存储代码里的字典 key，按 (表名, 字段集合) 缓存生成的 SQL 文本；取值一律通过参数绑定，
+# 不会拼接进 SQL，取值里带引号也不会出错，相同的 SQL 文本可以复用数据库的执行计划
+import functools
+from typing import Tuple
+
+
+class SqlBuilder:
+    """
+    按数据库方言生成 SQL：标识符的引号和参数占位符
+    """
+
+    def __init__(self, quote: str, placeholder: str) -> None:
+        self.quote = quote
+        self.placeholder = placeholder
+
+    def ident(self, name: str) -> str:
+        """
+        给表名、字段名加上引号，名字里的引号转义
+        """
+        return f"{self.quote}{name.replace(self.quote, self.quote * 2)}{self.quote}"
+
+    def placeholders(self, count: int) -> str:
+        return ",".join([self.placeholder] * count)
+
+    @functools.lru_cache(maxsize=1024)
+    def insert(self, table_name: str, fields: Tuple[str, ...]) -> str:
+        """
+        INSERT INTO table (f1,f2) VALUES (?,?)
+        VALUES 后面的空格不能省：aiomysql 的 executemany 按 RE_INSERT_VALUES 匹配后才会合并成一条多值 INSERT
+        """
+        return "INSERT INTO %s (%s) VALUES (%s)" % (
+            self.ident(table_name), ",".join(self.ident(f) for f in fields), self.placeholders(len(fields)))
+
+    @functools.lru_cache(maxsize=1024)
+    def update(self, table_name: str, fields: Tuple[str, ...], field_where: str) -> str:
+        """
+        UPDATE table SET f1=?,f2=? WHERE field_where=?，where 条件的取值放在参数的最后
+        """
+        upsets = ",".join(f"{self.ident(f)}={self.placeholder}" for f in fields)
+        return "UPDATE %s SET %s WHERE %s=%s" % (self.ident(table_name), upsets, self.ident(field_where), self.placeholder)
+
+    @functools.lru_cache(maxsize=1024)
+    def select_where(self, table_name: str, fields: Tuple[str, ...]) -> str:
+        """
+        SELECT * FROM table WHERE f1=? AND f2=?
+        """
+        conditions = " AND ".join(f"{self.ident(f)}={self.placeholder}" for f in fields)
+        return "SELECT * FROM %s WHERE %s" % (self.ident(table_name), conditions)
+
+    @functools.lru_cache(maxsize=1024)
+    def select_in(self, table_name: str, field: str, count: int) -> str:
+        """
+        SELECT field FROM table WHERE field IN (?,?,...)
+        """
+        return "SELECT %s FROM %s WHERE %s IN (%s)" % (
+            self.ident(field), self.ident(table_name), self.ident(field), self.placeholders(count))
+
+    @functools.lru_cache(maxsize=1024)
+    def select_fields_in(self, table_name: str, fields: Tuple[str, ...], field: str, count: int) -> str:
+        """
+        SELECT f1,f2 FROM table WHERE field IN (?,?,...)
+        """
+        return "SELECT %s FROM %s WHERE %s IN (%s)" % (
+            ",".join(self.ident(f) for f in fields), self.ident(table_name), self.ident(field), self.placeholders(count))
+
+
+MYSQL = SqlBuilder("`", "%s")
+SQLITE = SqlBuilder('"', "?")
@@ -0,0 +1,174 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : SQLite 全文索引：给帖子、评论的文本字段建 FTS5 索引（trigram 分词，中文也能按子串检索），
+#            触发器在新增、更新、删除记录时同步索引，替代全表扫描的 LIKE '%关键词%'
+#
+# 开启 ENABLE_SQLITE_FTS 后每次初始化 SQLite 时自动创建索引，已有的数据会补建索引。命令行检索（在项目根目录执行）：
+#   python sqlite_fts.py --table xhs_note_comment --keyword 编程副业
+#   python sqlite_fts.py --table xhs_note --keyword "编程副业 兼职" --limit 50
+#   python sqlite_fts.py --rebuild
+import argparse
+import asyncio
+import json
+from typing import Dict, List, Sequence
+
+import config
+from async_sqlite_db import AsyncSqliteDB
+from sql_builder import SQLITE
+
+# 表名 -> 建全文索引的文本字段
+FTS_TABLES = {
+    "xhs_note": ("title", "desc"),
+    "xhs_note_comment": ("content",),
+    "douyin_aweme": ("title", "desc"),
+    "douyin_aweme_comment": ("content",),
+    "kuaishou_video": ("title", "desc"),
+    "kuaishou_video_comment": ("content",),
+    "bilibili_video": ("title", "desc"),
+    "bilibili_video_comment": ("content",),
+    "weibo_note": ("content",),
+    "weibo_note_comment": ("content",),
+    "tieba_note": ("title", "desc"),
+    "tieba_comment": ("content",),
+    "zhihu_content": ("title", "desc", "content_text"),
+    "zhihu_comment": ("content",),
+}
+
+# trigram 分词只能检索不少于 3 个字符的关键词，更短的关键词退回到 LIKE 扫描
+MIN_MATCH_LENGTH = 3
+
+
+def fts_table_name(table_name: str) -> str:
+    return f"{table_name}_fts"
+
+
+def build_fts_schema(table_name: str, columns: Sequence[str]) -> str:
+    """
+    生成外部内容（content=表名）的 FTS5 虚拟表和同步索引的触发器，索引里只存分词结果，不重复保存原文
+    Args:
+        table_name: 表名
+        columns: 建索引的文本字段
+
+    Returns:
+
+    """
+    fts = SQLITE.ident(fts_table_name(table_name))
+    table = SQLITE.ident(table_name)
+    cols = ", ".join(SQLITE.ident(c) for c in columns)
+    new_values = ", ".join(f"new.{SQLITE.ident(c)}" for c in columns)
+    old_values = ", ".join(f"old.{SQLITE.ident(c)}" for c in columns)
+    changed = " OR ".join(f"old.{SQLITE.ident(c)} IS NOT new.{SQLITE.ident(c)}" for c in columns)
+    trigger = fts_table_name(table_name)
+    return f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content={table}, content_rowid=id, tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS {SQLITE.ident(trigger + "_ai")} AFTER INSERT ON {table} BEGIN
+    INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});
+END;
+CREATE TRIGGER IF NOT EXISTS {SQLITE.ident(trigger + "_ad")} AFTER DELETE ON {table} BEGIN
+    INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+END;
+CREATE TRIGGER IF NOT EXISTS {SQLITE.ident(trigger + "_au")} AFTER UPDATE ON {table} WHEN {changed} BEGIN
+    INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+    INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});
+END;
+"""
+
+
+async def _table_exists(async_db: AsyncSqliteDB, name: str) -> bool:
+    return bool(await async_db.query("SELECT name FROM sqlite_master WHERE type='table' AND name=?", name))
+
+
+async def init_fts(async_db: AsyncSqliteDB) -> None:
+    """
+    创建全文索引和触发器，可以重复执行；新建索引时对表里已有的数据补建索引
+    Args:
+        async_db: SQLite 数据库对象
+
+    Returns:
+
+    """
+    for table_name, columns in FTS_TABLES.items():
+        if not await _table_exists(async_db, table_name):
+            continue
+        created = not await _table_exists(async_db, fts_table_name(table_name))
+        await async_db.executescript(build_fts_schema(table_name, columns))
+        if created:
+            await rebuild_fts(async_db, table_name)
+
+
+async def rebuild_fts(async_db: AsyncSqliteDB, table_name: str) -> None:
+    """
+    按表里的数据重建全文索引
+    """
+    fts = SQLITE.ident(fts_table_name(table_name))
+    await async_db.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+async def search(async_db: AsyncSqliteDB, table_name: str, keyword: str, limit: int = 20) -> List[Dict]:
+    """
+    全文检索，多个关键词用空格分隔，需要同时命中；关键词都不少于 3 个字符时走 FTS5 索引，按相关度排序
+    Args:
+        async_db: SQLite 数据库对象
+        table_name: 表名，需要在 FTS_TABLES 里
+        keyword: 关键词
+        limit: 返回的最大条数
+
+    Returns: 命中的原表记录
+
+    """
+    if table_name not in FTS_TABLES:
+        raise ValueError(f"table {table_name} has no full-text index, supported: {', '.join(FTS_TABLES)}")
+    terms = keyword.split()
+    if not terms:
+        return []
+    table = SQLITE.ident(table_name)
+    if all(len(term) >= MIN_MATCH_LENGTH for term in terms):
+        fts = SQLITE.ident(fts_table_name(table_name))
+        # 每个关键词作为一个短语，关键词里的双引号转义，不会被当成 FTS5 查询语法
+        match = " AND ".join('"%s"' % term.replace('"', '""') for term in terms)
+        sql = f"SELECT {table}.* FROM {fts} JOIN {table} ON {table}.id = {fts}.rowid " \
+              f"WHERE {fts} MATCH ? ORDER BY {fts}.rank LIMIT ?"
+        return await async_db.query(sql, match, limit)
+    columns = FTS_TABLES[table_name]
+    conditions, args = [], []
+    for term in terms:
+        conditions.append("(" + " OR ".join(f"{SQLITE.ident(c)} LIKE ?" for c in columns) + ")")
+        args.extend([f"%{term}%"] * len(columns))
+    sql = f"SELECT * FROM {table} WHERE {' AND '.join(conditions)} ORDER BY id DESC LIMIT ?"
+    return await async_db.query(sql, *args, limit)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Full-text search over crawled notes and comments in SQLite")
+    parser.add_argument("--table", choices=list(FTS_TABLES), help="table to search, e.g. xhs_note_comment")
+    parser.add_argument("--keyword", default="", help="keywords separated by spaces, all of them must match")
+    parser.add_argument("--limit", type=int, default=20, help="max rows to return")
+    parser.add_argument("--rebuild", action="store_true", help="create missing indexes and rebuild all of them")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    async_db = AsyncSqliteDB(config.SQLITE_DB_PATH)
+    await init_fts(async_db)
+    if args.rebuild:
+        for table_name in FTS_TABLES:
+            if await _table_exists(async_db, table_name):
+                await rebuild_fts(async_db, table_name)
+    if args.table and args.keyword:
+        for row in await search(async_db, args.table, args.keyword, args.limit):
+            print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
@@ -12,4 +12,127 @@
 # -*- coding: utf-8 -*-
 # @Author  : relakkes@gmail.com
 # @Time    : 2024/1/14 17:29
-# @Desc    :
+# @Desc    : 各平台存储共用的部分：存储实例缓存、DB/SQLite 按主键批量新增或更新、跳过没有变化的更新
+from typing import Any, Dict, List, Mapping, Tuple, Type
+
+import config
+from store.spool import spooled_store
+from tools import metrics, utils
+from var import media_crawler_db_var
+
+# (平台, 存储实现类) -> 包装了监控指标的存储实例，同一次运行里各平台的 StoreFactory 复用同一个实例
+_store_instances: Dict[Tuple[str, Type], Any] = {}
+
+# 判断记录有没有变化时不比较的字段，每次爬取都会重新生成
+UNCOMPARED_FIELDS = ("add_ts", "last_modify_ts")
+
+_MISSING = object()
+
+
+def get_store(platform: str, store_class: Type) -> Any:
+    """
+    获取当前运行中该平台、该存储实现的实例，第一次使用时创建；开启 ENABLE_DB_SPOOL 时 DB/SQLite 存储先写入本地 spool
+    Args:
+        platform: 平台名称
+        store_class: 存储实现类
+
+    Returns:
+
+    """
+    key = (platform, store_class)
+    store = _store_instances.get(key)
+    if store is None:
+        store = _store_instances[key] = metrics.instrument_store(platform, spooled_store(store_class()))
+    return store
+
+
+def clear_store_cache() -> None:
+    """
+    运行结束时清空存储实例缓存，下一次运行重新创建
+    """
+    _store_instances.clear()
+
+
+def _same_value(value: Any, stored: Any) -> bool:
+    if value is None or stored is None:
+        return value is stored
+    if isinstance(value, bool):
+        value = int(value)
+    # 点赞数等计数在部分表里是 TEXT 字段，记录里可能是 int，按字符串比较
+    return str(value) == str(stored)
+
+
+def changed_fields(item: Mapping, existing: Mapping) -> Dict[str, Any]:
+    """
+    和数据库里已有的记录比较，返回需要更新的字段；有字段变化时带上 last_modify_ts，没有变化时返回空 dict。
+    关闭 SKIP_UNCHANGED_UPDATES 时返回整条记录
+    Args:
+        item: 本次爬取的记录
+        existing: 数据库里已有的记录，至少包含 item 里需要比较的字段
+
+    Returns:
+
+    """
+    if not config.SKIP_UNCHANGED_UPDATES:
+        return dict(item)
+    changes = {
+        key: value for key, value in item.items()
+        if key not in UNCOMPARED_FIELDS and not _same_value(value, existing.get(key, _MISSING))
+    }
+    if changes and "last_modify_ts" in item:
+        changes["last_modify_ts"] = item["last_modify_ts"]
+    return changes
+
+
+async def _query_existing(async_db_conn, table_name: str, key_field: str, keys: List, items: List[Dict]) -> Dict[str, Mapping]:
+    """
+    查询已存在的记录，主键 -> 记录；开启 SKIP_UNCHANGED_UPDATES 时只取出需要比较的字段
+    """
+    if not config.SKIP_UNCHANGED_UPDATES:
+        return {str(key): {} for key in await async_db_conn.query_field_values(table_name, key_field, keys)}
+    fields = tuple(dict.fromkeys(key for item in items for key in item.keys() if key not in UNCOMPARED_FIELDS))
+    rows = await async_db_conn.query_rows_in(table_name, key_field, keys, fields)
+    return {str(row[key_field]): row for row in rows}
+
+
+async def batch_add_or_update(table_name: str, key_field: str, items: List[Dict]) -> None:
+    """
+    按主键批量写入 DB/SQLite：一次查询出已存在的记录，新记录补上 add_ts 后批量插入；已存在的记录只更新变化了的字段，
+    变化的字段相同的记录合并成一次批量更新，没有变化的记录不写库
+    Args:
+        table_name: 表名
+        key_field: 主键字段名（note_id、comment_id、user_id ...）
+        items: 同一类型的记录列表
+
+    Returns:
+
+    """
+    if not items:
+        return
+    async_db_conn = media_crawler_db_var.get()
+    keys = [item.get(key_field) for item in items]
+    existing = await _query_existing(async_db_conn, table_name, key_field, keys, items)
+    new_items: List[Dict] = []
+    update_groups: Dict[Tuple[str, ...], List[Dict]] = {}
+    unchanged = 0
+    add_ts = utils.get_current_timestamp()
+    for key, item in zip(keys, items):
+        stored = existing.get(str(key))
+        if stored is None:
+            item["add_ts"] = add_ts
+            new_items.append(item)
+        else:
+            changes = changed_fields(item, stored)
+            if changes:
+                changes[key_field] = key
+                update_groups.setdefault(tuple(changes), []).append(changes)
+            else:
+                unchanged += 1
+        # 同一批里重复的记录，第一条插入，后面的和前一条比较
+        existing[str(key)] = item
+    await async_db_conn.items_to_table(table_name, new_items)
+    for updated_items in update_groups.values():
+        await async_db_conn.update_items(table_name, updated_items, key_field)
+    metrics.DB_ROWS_TOTAL.inc(len(new_items), table=table_name, action="insert")
+    metrics.DB_ROWS_TOTAL.inc(sum(len(group) for group in update_groups.values()), table=table_name, action="update")
+    metrics.DB_ROWS_TOTAL.inc(unchanged, table=table_name, action="unchanged")
@@ -16,6 +16,10 @@
 from typing import List
 
 import config
+from model.m_bilibili import (BilibiliContactRecord, BilibiliDynamicRecord,
+                              BilibiliUpInfoRecord, BilibiliVideoCommentRecord,
+                              BilibiliVideoRecord)
+from store import get_store
 from var import source_keyword_var
 
 from .bilibili_store_impl import *
@@ -28,14 +32,15 @@ class BiliStoreFactory:
         "db": BiliDbStoreImplement,
         "json": BiliJsonStoreImplement,
         "sqlite": BiliSqliteStoreImplement,
+        "parquet": BiliParquetStoreImplement,
     }
 
     @staticmethod
     def create_store() -> AbstractStore:
         store_class = BiliStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[BiliStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite ...")
-        return store_class()
+            raise ValueError("[BiliStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or parquet ...")
+        return get_store("bili", store_class)
 
 
 async def update_bilibili_video(video_item: Dict):
@@ -43,47 +48,47 @@ async def update_bilibili_video(video_item: Dict):
     video_user_info: Dict = video_item_view.get("owner")
     video_item_stat: Dict = video_item_view.get("stat")
     video_id = str(video_item_view.get("aid"))
-    save_content_item = {
-        "video_id": video_id,
-        "video_type": "video",
-        "title": video_item_view.get("title", "")[:500],
-        "desc": video_item_view.get("desc", "")[:500],
-        "create_time": video_item_view.get("pubdate"),
-        "user_id": str(video_user_info.get("mid")),
-        "nickname": video_user_info.get("name"),
-        "avatar": video_user_info.get("face", ""),
-        "liked_count": str(video_item_stat.get("like", "")),
-        "disliked_count": str(video_item_stat.get("dislike", "")),
-        "video_play_count": str(video_item_stat.get("view", "")),
-        "video_favorite_count": str(video_item_stat.get("favorite", "")),
-        "video_share_count": str(video_item_stat.get("share", "")),
-        "video_coin_count": str(video_item_stat.get("coin", "")),
-        "video_danmaku": str(video_item_stat.get("danmaku", "")),
-        "video_comment": str(video_item_stat.get("reply", "")),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "video_url": f"https://www.bilibili.com/video/av{video_id}",
-        "video_cover_url": video_item_view.get("pic", ""),
-        "source_keyword": source_keyword_var.get(),
-    }
-    utils.logger.info(f"[store.bilibili.update_bilibili_video] bilibili video id:{video_id}, title:{save_content_item.get('title')}")
+    save_content_item = BilibiliVideoRecord(
+        video_id=video_id,
+        video_type="video",
+        title=video_item_view.get("title", "")[:500],
+        desc=video_item_view.get("desc", "")[:500],
+        create_time=video_item_view.get("pubdate"),
+        user_id=str(video_user_info.get("mid")),
+        nickname=video_user_info.get("name"),
+        avatar=video_user_info.get("face", ""),
+        liked_count=str(video_item_stat.get("like", "")),
+        disliked_count=str(video_item_stat.get("dislike", "")),
+        video_play_count=str(video_item_stat.get("view", "")),
+        video_favorite_count=str(video_item_stat.get("favorite", "")),
+        video_share_count=str(video_item_stat.get("share", "")),
+        video_coin_count=str(video_item_stat.get("coin", "")),
+        video_danmaku=str(video_item_stat.get("danmaku", "")),
+        video_comment=str(video_item_stat.get("reply", "")),
+        last_modify_ts=utils.get_current_timestamp(),
+        video_url=f"https://www.bilibili.com/video/av{video_id}",
+        video_cover_url=video_item_view.get("pic", ""),
+        source_keyword=source_keyword_var.get(),
+    )
+    utils.logger.info("[store.bilibili.update_bilibili_video] bilibili video id:%s, title:%s", video_id, save_content_item.title)
     await BiliStoreFactory.create_store().store_content(content_item=save_content_item)
 
 
 async def update_up_info(video_item: Dict):
     video_item_card_list: Dict = video_item.get("Card")
     video_item_card: Dict = video_item_card_list.get("card")
-    saver_up_info = {
-        "user_id": str(video_item_card.get("mid")),
-        "nickname": video_item_card.get("name"),
-        "sex": video_item_card.get("sex"),
-        "sign": video_item_card.get("sign"),
-        "avatar": video_item_card.get("face"),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "total_fans": video_item_card.get("fans"),
-        "total_liked": video_item_card_list.get("like_num"),
-        "user_rank": video_item_card.get("level_info").get("current_level"),
-        "is_official": video_item_card.get("official_verify").get("type"),
-    }
+    saver_up_info = BilibiliUpInfoRecord(
+        user_id=str(video_item_card.get("mid")),
+        nickname=video_item_card.get("name"),
+        sex=video_item_card.get("sex"),
+        sign=video_item_card.get("sign"),
+        avatar=video_item_card.get("face"),
+        last_modify_ts=utils.get_current_timestamp(),
+        total_fans=video_item_card.get("fans"),
+        total_liked=video_item_card_list.get("like_num"),
+        user_rank=video_item_card.get("level_info").get("current_level"),
+        is_official=video_item_card.get("official_verify").get("type"),
+    )
     utils.logger.info(f"[store.bilibili.update_up_info] bilibili user_id:{video_item_card.get('mid')}")
     await BiliStoreFactory.create_store().store_creator(creator=saver_up_info)
 
@@ -91,33 +96,43 @@ async def update_up_info(video_item: Dict):
 async def batch_update_bilibili_video_comments(video_id: str, comments: List[Dict]):
     if not comments:
         return
-    for comment_item in comments:
-        await update_bilibili_video_comment(video_id, comment_item)
+    comment_items = [_build_bilibili_video_comment(video_id, comment_item) for comment_item in comments]
+    await BiliStoreFactory.create_store().store_comments(comment_items)
 
 
 async def update_bilibili_video_comment(video_id: str, comment_item: Dict):
+    save_comment_item = _build_bilibili_video_comment(video_id, comment_item)
+    await BiliStoreFactory.create_store().store_comment(save_comment_item)
+
+
+def _build_bilibili_video_comment(video_id: str, comment_item: Dict) -> BilibiliVideoCommentRecord:
+    """
+    把视频评论转换成存储记录
+    """
     comment_id = str(comment_item.get("rpid"))
     parent_comment_id = str(comment_item.get("parent", 0))
+    root_comment_id = str(comment_item.get("root") or comment_id)
     content: Dict = comment_item.get("content")
     user_info: Dict = comment_item.get("member")
     like_count: int = comment_item.get("like", 0)
-    save_comment_item = {
-        "comment_id": comment_id,
-        "parent_comment_id": parent_comment_id,
-        "create_time": comment_item.get("ctime"),
-        "video_id": str(video_id),
-        "content": content.get("message"),
-        "user_id": user_info.get("mid"),
-        "nickname": user_info.get("uname"),
-        "sex": user_info.get("sex"),
-        "sign": user_info.get("sign"),
-        "avatar": user_info.get("avatar"),
-        "sub_comment_count": str(comment_item.get("rcount", 0)),
-        "like_count": like_count,
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
-    utils.logger.info(f"[store.bilibili.update_bilibili_video_comment] Bilibili video comment: {comment_id}, content: {save_comment_item.get('content')}")
-    await BiliStoreFactory.create_store().store_comment(comment_item=save_comment_item)
+    save_comment_item = BilibiliVideoCommentRecord(
+        comment_id=comment_id,
+        parent_comment_id=parent_comment_id,
+        root_comment_id=root_comment_id,
+        create_time=comment_item.get("ctime"),
+        video_id=str(video_id),
+        content=content.get("message"),
+        user_id=user_info.get("mid"),
+        nickname=user_info.get("uname"),
+        sex=user_info.get("sex"),
+        sign=user_info.get("sign"),
+        avatar=user_info.get("avatar"),
+        sub_comment_count=str(comment_item.get("rcount", 0)),
+        like_count=like_count,
+        last_modify_ts=utils.get_current_timestamp(),
+    )
+    utils.logger.info("[store.bilibili.update_bilibili_video_comment] Bilibili video comment: %s, content: %s", comment_id, save_comment_item.content)
+    return save_comment_item
 
 
 async def store_video(aid, video_content, extension_file_name):
@@ -188,33 +203,33 @@ async def batch_update_bilibili_creator_dynamics(creator_info: Dict, dynamics_li
 
 
 async def update_bilibili_creator_contact(creator_info: Dict, fan_info: Dict):
-    save_contact_item = {
-        "up_id": creator_info["id"],
-        "fan_id": fan_info["id"],
-        "up_name": creator_info["name"],
-        "fan_name": fan_info["name"],
-        "up_sign": creator_info["sign"],
-        "fan_sign": fan_info["sign"],
-        "up_avatar": creator_info["avatar"],
-        "fan_avatar": fan_info["avatar"],
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
+    save_contact_item = BilibiliContactRecord(
+        up_id=creator_info["id"],
+        fan_id=fan_info["id"],
+        up_name=creator_info["name"],
+        fan_name=fan_info["name"],
+        up_sign=creator_info["sign"],
+        fan_sign=fan_info["sign"],
+        up_avatar=creator_info["avatar"],
+        fan_avatar=fan_info["avatar"],
+        last_modify_ts=utils.get_current_timestamp(),
+    )
 
     await BiliStoreFactory.create_store().store_contact(contact_item=save_contact_item)
 
 
 async def update_bilibili_creator_dynamic(creator_info: Dict, dynamic_info: Dict):
-    save_dynamic_item = {
-        "dynamic_id": dynamic_info["dynamic_id"],
-        "user_id": creator_info["id"],
-        "user_name": creator_info["name"],
-        "text": dynamic_info["text"],
-        "type": dynamic_info["type"],
-        "pub_ts": dynamic_info["pub_ts"],
-        "total_comments": dynamic_info["total_comments"],
-        "total_forwards": dynamic_info["total_forwards"],
-        "total_liked": dynamic_info["total_liked"],
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
+    save_dynamic_item = BilibiliDynamicRecord(
+        dynamic_id=dynamic_info["dynamic_id"],
+        user_id=creator_info["id"],
+        user_name=creator_info["name"],
+        text=dynamic_info["text"],
+        type=dynamic_info["type"],
+        pub_ts=dynamic_info["pub_ts"],
+        total_comments=dynamic_info["total_comments"],
+        total_forwards=dynamic_info["total_forwards"],
+        total_liked=dynamic_info["total_liked"],
+        last_modify_ts=utils.get_current_timestamp(),
+    )
 
     await BiliStoreFactory.create_store().store_dynamic(dynamic_item=save_dynamic_item)
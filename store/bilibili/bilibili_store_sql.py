@@ -31,8 +31,7 @@ async def query_content_by_content_id(content_id: str) -> Dict:
 
     """
     async_db_conn: Union[AsyncMysqlDB, AsyncSqliteDB] = media_crawler_db_var.get()
-    sql: str = f"select * from bilibili_video where video_id = '{content_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    rows: List[Dict] = await async_db_conn.query_by_fields("bilibili_video", {"video_id": content_id})
     if len(rows) > 0:
         return rows[0]
     return dict()
@@ -78,8 +77,7 @@ async def query_comment_by_comment_id(comment_id: str) -> Dict:
 
     """
     async_db_conn: Union[AsyncMysqlDB, AsyncSqliteDB] = media_crawler_db_var.get()
-    sql: str = f"select * from bilibili_video_comment where comment_id = '{comment_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    rows: List[Dict] = await async_db_conn.query_by_fields("bilibili_video_comment", {"comment_id": comment_id})
     if len(rows) > 0:
         return rows[0]
     return dict()
@@ -124,8 +122,7 @@ async def query_creator_by_creator_id(creator_id: str) -> Dict:
 
     """
     async_db_conn: Union[AsyncMysqlDB, AsyncSqliteDB] = media_crawler_db_var.get()
-    sql: str = f"select * from bilibili_up_info where user_id = '{creator_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    rows: List[Dict] = await async_db_conn.query_by_fields("bilibili_up_info", {"user_id": creator_id})
     if len(rows) > 0:
         return rows[0]
     return dict()
@@ -171,8 +168,7 @@ async def query_contact_by_up_and_fan(up_id: str, fan_id: str) -> Dict:
 
     """
     async_db_conn: Union[AsyncMysqlDB, AsyncSqliteDB] = media_crawler_db_var.get()
-    sql: str = f"select * from bilibili_contact_info where up_id = '{up_id}' and fan_id = '{fan_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    rows: List[Dict] = await async_db_conn.query_by_fields("bilibili_contact_info", {"up_id": up_id, "fan_id": fan_id})
     if len(rows) > 0:
         return rows[0]
     return dict()
@@ -217,8 +213,7 @@ async def query_dynamic_by_dynamic_id(dynamic_id: str) -> Dict:
 
     """
     async_db_conn: Union[AsyncMysqlDB, AsyncSqliteDB] = media_crawler_db_var.get()
-    sql: str = f"select * from bilibili_up_dynamic where dynamic_id = '{dynamic_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    rows: List[Dict] = await async_db_conn.query_by_fields("bilibili_up_dynamic", {"dynamic_id": dynamic_id})
     if len(rows) > 0:
         return rows[0]
     return dict()
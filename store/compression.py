@@ -0,0 +1,201 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 文件类存储（csv、json）的压缩输出：gzip / zstd，按文件扩展名（.gz / .zst）读取时边读边解压
+#
+# CSV 每次写入磁盘都是一个独立的压缩帧（gzip member / zstd frame），多个帧直接拼接在同一个文件里，
+# 进程异常退出时已经写入的帧仍然可以正常解压：
+#   gzip -dc data/xhs/1_search_comments_2024-01-14.csv.gz
+#   zstd -dc data/xhs/1_search_comments_2024-01-14.csv.zst
+#
+# JSON 存储是一个完整的数组，不能按帧追加：每批数据都要把当天的文件整体读出、解压、追加后重新压缩，
+# 这些都在线程里完成，写入临时文件后再替换原文件，进程中途退出时原文件仍然完整
+import asyncio
+import gzip
+import io
+import json
+import os
+from typing import IO, Any, Dict, List, Optional
+
+import aiofiles
+
+import config
+
+SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+# STORE_COMPRESSION_LEVEL 为 0 时使用的默认压缩级别
+DEFAULT_LEVELS = {
+    "gzip": 6,
+    "zstd": 3,
+}
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstd compression requires the zstandard package, please run: pip install zstandard") from e
+    return zstandard
+
+
+class FrameCompressor:
+    """
+    把每次写入的数据压缩成一个独立的帧
+    """
+
+    def __init__(self, algorithm: str, level: int = 0):
+        if algorithm not in SUFFIXES:
+            raise ValueError(f"unsupported compression: {algorithm}, only supported {' or '.join(SUFFIXES)}")
+        self.algorithm = algorithm
+        self.suffix = SUFFIXES[algorithm]
+        self.level = level or DEFAULT_LEVELS[algorithm]
+        self._zstd_compressor = _import_zstandard().ZstdCompressor(level=self.level) if algorithm == "zstd" else None
+
+    def compress(self, data: bytes) -> bytes:
+        if self._zstd_compressor is not None:
+            return self._zstd_compressor.compress(data)
+        return gzip.compress(data, compresslevel=self.level)
+
+
+def get_compressor() -> Optional[FrameCompressor]:
+    """
+    按配置创建压缩器，未开启压缩时返回 None
+    """
+    if not config.STORE_COMPRESSION:
+        return None
+    return FrameCompressor(config.STORE_COMPRESSION, config.STORE_COMPRESSION_LEVEL)
+
+
+def compressed_file_name(file_name: str) -> str:
+    """
+    开启压缩时给输出文件名追加 .gz / .zst
+    Args:
+        file_name: 未压缩的文件名
+
+    Returns:
+
+    """
+    if not config.STORE_COMPRESSION:
+        return file_name
+    return file_name + SUFFIXES[config.STORE_COMPRESSION]
+
+
+def algorithm_of(file_name: str) -> str:
+    """
+    按文件扩展名（.gz / .zst）判断压缩算法，未压缩的文件返回空字符串
+    """
+    for algorithm, suffix in SUFFIXES.items():
+        if file_name.endswith(suffix):
+            return algorithm
+    return ""
+
+
+def decompress(data: bytes, file_name: str) -> bytes:
+    """
+    按文件扩展名解压整个文件的内容，支持多个帧拼接
+    Args:
+        data: 文件内容
+        file_name: 文件名
+
+    Returns:
+
+    """
+    algorithm = algorithm_of(file_name)
+    if algorithm == "gzip":
+        return gzip.decompress(data)
+    if algorithm == "zstd":
+        reader = _import_zstandard().ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True)
+        return reader.read()
+    return data
+
+
+def open_text(file_name: str, encoding: str = "utf-8-sig") -> IO[str]:
+    """
+    以文本方式打开数据文件，.gz / .zst 文件边读边解压，例如逐行读取压缩过的 CSV：
+        with open_text("data/xhs/1_search_comments_2024-01-14.csv.gz") as f:
+            for row in csv.reader(f):
+                ...
+    Args:
+        file_name: 文件名
+        encoding: 文本编码，utf-8-sig 兼容带 BOM 的 CSV
+
+    Returns:
+
+    """
+    algorithm = algorithm_of(file_name)
+    if algorithm == "gzip":
+        return gzip.open(file_name, "rt", encoding=encoding, newline="")
+    if algorithm == "zstd":
+        reader = _import_zstandard().ZstdDecompressor().stream_reader(open(file_name, "rb"), read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding=encoding, newline="")
+    return open(file_name, encoding=encoding, newline="")
+
+
+async def read_text(file_name: str) -> str:
+    """
+    读取整个数据文件的文本内容，压缩文件先解压
+    """
+    if not algorithm_of(file_name):
+        async with aiofiles.open(file_name, "r", encoding="utf-8") as f:
+            return await f.read()
+    async with aiofiles.open(file_name, "rb") as f:
+        data = await f.read()
+    return (await asyncio.to_thread(decompress, data, file_name)).decode("utf-8")
+
+
+def _replace_file(file_name: str, data: bytes) -> None:
+    # 先写临时文件再原子替换，写到一半退出不会留下截断的文件
+    tmp_file_name = f"{file_name}.tmp"
+    try:
+        with open(tmp_file_name, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file_name, file_name)
+    except BaseException:
+        if os.path.exists(tmp_file_name):
+            os.remove(tmp_file_name)
+        raise
+
+
+def _append_json_items(file_name: str, items: List[Dict], indent: Optional[int]) -> List[Dict]:
+    save_data: List[Dict] = []
+    if os.path.exists(file_name):
+        with open(file_name, "rb") as f:
+            save_data = json.loads(decompress(f.read(), file_name).decode("utf-8"))
+    save_data.extend(items)
+
+    data = json.dumps(save_data, ensure_ascii=False, indent=indent).encode("utf-8")
+    algorithm = algorithm_of(file_name)
+    if algorithm:
+        level = config.STORE_COMPRESSION_LEVEL if algorithm == config.STORE_COMPRESSION else 0
+        data = FrameCompressor(algorithm, level).compress(data)
+    _replace_file(file_name, data)
+    return save_data
+
+
+async def append_json_items(file_name: str, items: List[Dict[str, Any]], indent: Optional[int] = None) -> List[Dict]:
+    """
+    把一批记录追加到 JSON 数组文件，文件名以 .gz / .zst 结尾时整体压缩成一个帧
+    解析、序列化和压缩都在线程里执行，不阻塞事件循环；写入临时文件后替换原文件
+    Args:
+        file_name: 数据文件名
+        items: 待追加的记录
+        indent: json 缩进
+
+    Returns:
+        追加后文件里的全部记录
+    """
+    return await asyncio.to_thread(_append_json_items, file_name, items, indent)
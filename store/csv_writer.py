@@ -0,0 +1,191 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : CSV 存储的常驻写入器：每个输出文件保持打开，行先写入内存缓冲，缓冲满或定时写入磁盘，文件过大时切换到新文件
+#            开启 STORE_COMPRESSION 时每次写入磁盘的数据压缩成一个独立的帧
+import asyncio
+import csv
+import io
+import os
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import aiofiles
+
+import config
+from store.compression import FrameCompressor, get_compressor
+from tools import utils
+
+
+class RotatingCsvWriter:
+    """
+    单个 CSV 输出的写入器，文件名形如 data/xhs/1_search_comments_2024-01-14.csv，
+    切换文件后依次写入 data/xhs/1_search_comments_2024-01-14_2.csv、..._3.csv，每个文件都带表头
+    切换文件的判断在每次写入磁盘前进行，单个文件最多超出限制一次写入的数据量（压缩时按压缩后的大小计算）
+    """
+
+    def __init__(self, file_name: str, buffer_rows: int = 1000, max_bytes: int = 0, max_rows: int = 0,
+                 compressor: Optional[FrameCompressor] = None):
+        self.file_name = file_name
+        self.buffer_rows = max(buffer_rows, 1)
+        self.max_bytes = max_bytes
+        self.max_rows = max_rows
+        self.compressor = compressor
+        self._stem, self._ext = os.path.splitext(file_name)
+        self._suffix = compressor.suffix if compressor else ""
+        self._header: Optional[Sequence[str]] = None
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._buffered_rows = 0
+        self._part = 1
+        self._file = None
+        self._file_bytes = 0
+        self._file_rows = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def current_file_name(self) -> str:
+        if self._part == 1:
+            return self.file_name + self._suffix
+        return f"{self._stem}_{self._part}{self._ext}{self._suffix}"
+
+    async def write_rows(self, header: Sequence[str], rows: Iterable[Iterable[Any]]) -> None:
+        """
+        写入多行数据，先进入内存缓冲，缓冲的行数达到 buffer_rows 时写入磁盘
+        Args:
+            header: 表头，只在新文件的第一行写入
+            rows: 每行的值
+
+        Returns:
+
+        """
+        if self._header is None:
+            self._header = list(header)
+        count = 0
+        for row in rows:
+            self._writer.writerow(row)
+            count += 1
+        self._buffered_rows += count
+        if self._buffered_rows >= self.buffer_rows:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        把缓冲区写入磁盘
+        """
+        async with self._lock:
+            if not self._buffered_rows:
+                return
+            data, rows = self._buffer.getvalue(), self._buffered_rows
+            self._buffer.seek(0)
+            self._buffer.truncate()
+            self._buffered_rows = 0
+            if self._file is None:
+                await self._open()
+            while self._should_rotate():
+                await self._file.close()
+                self._part += 1
+                await self._open()
+            # 新文件以带 BOM 的表头开头，Excel 可以直接识别 utf-8
+            payload = self._header_bytes() + data.encode("utf-8") if self._file_bytes == 0 else data.encode("utf-8")
+            if self.compressor is not None:
+                payload = self.compressor.compress(payload)
+            await self._file.write(payload)
+            await self._file.flush()
+            self._file_bytes = await self._file.tell()
+            self._file_rows += rows
+
+    async def close(self) -> None:
+        """
+        写入剩余的缓冲并关闭文件
+        """
+        await self.flush()
+        if self._file is not None:
+            await self._file.close()
+            self._file = None
+
+    def _should_rotate(self) -> bool:
+        return (self.max_bytes > 0 and self._file_bytes >= self.max_bytes) or \
+            (self.max_rows > 0 and self._file_rows >= self.max_rows)
+
+    def _header_bytes(self) -> bytes:
+        header = io.StringIO()
+        csv.writer(header).writerow(self._header)
+        return header.getvalue().encode("utf-8-sig")
+
+    async def _open(self) -> None:
+        file_name = self.current_file_name
+        os.makedirs(os.path.dirname(file_name) or ".", exist_ok=True)
+        self._file = await aiofiles.open(file_name, mode="ab")
+        self._file_bytes = await self._file.tell()
+        self._file_rows = 0
+        utils.logger.info(f"[RotatingCsvWriter._open] write csv file: {file_name}")
+
+
+# 输出文件名 -> 写入器，同一次运行里同一个 (crawler_type, store_type) 的数据写入同一个写入器
+_writers: Dict[str, RotatingCsvWriter] = {}
+_flush_task: Optional[asyncio.Task] = None
+
+
+def get_csv_writer(file_name: str) -> RotatingCsvWriter:
+    """
+    获取输出文件的写入器，第一次使用时创建，并启动定时写入磁盘的后台任务
+    Args:
+        file_name: 输出文件名（不含切换文件后追加的序号和压缩文件的扩展名）
+
+    Returns:
+
+    """
+    global _flush_task
+    writer = _writers.get(file_name)
+    if writer is None:
+        writer = _writers[file_name] = RotatingCsvWriter(
+            file_name,
+            buffer_rows=config.CSV_BUFFER_ROWS,
+            max_bytes=config.CSV_ROTATE_MAX_BYTES,
+            max_rows=config.CSV_ROTATE_MAX_ROWS,
+            compressor=get_compressor(),
+        )
+    if _flush_task is None or _flush_task.done():
+        _flush_task = asyncio.get_running_loop().create_task(_flush_periodically())
+    return writer
+
+
+async def _flush_periodically() -> None:
+    while True:
+        await asyncio.sleep(config.CSV_FLUSH_INTERVAL_SEC)
+        await flush_csv_writers()
+
+
+async def flush_csv_writers() -> None:
+    """
+    把所有写入器的缓冲写入磁盘
+    """
+    for writer in list(_writers.values()):
+        try:
+            await writer.flush()
+        except Exception as e:
+            utils.logger.error(f"[flush_csv_writers] flush {writer.file_name} failed, err: {e}")
+
+
+async def close_csv_writers() -> None:
+    """
+    运行结束时调用：停止定时任务，写入剩余的缓冲并关闭所有文件
+    """
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        await asyncio.gather(_flush_task, return_exceptions=True)
+        _flush_task = None
+    writers = list(_writers.values())
+    _writers.clear()
+    for writer in writers:
+        await writer.close()
@@ -14,16 +14,13 @@
 # @Time    : 2024/1/14 18:46
 # @Desc    : 抖音存储实现类
 import asyncio
-import csv
-import json
 import os
 import pathlib
-from typing import Dict
-
-import aiofiles
+from typing import Dict, List
 
 import config
 from base.base_crawler import AbstractStore
+from store import batch_add_or_update, changed_fields, compression, csv_writer, parquet_writer
 from tools import utils, words
 from var import crawler_type_var
 
@@ -68,13 +65,22 @@ class DouyinCsvStoreImplement(AbstractStore):
         Returns: no returns
 
         """
-        pathlib.Path(self.csv_store_path).mkdir(parents=True, exist_ok=True)
-        save_file_name = self.make_save_file_name(store_type=store_type)
-        async with aiofiles.open(save_file_name, mode='a+', encoding="utf-8-sig", newline="") as f:
-            writer = csv.writer(f)
-            if await f.tell() == 0:
-                await writer.writerow(save_item.keys())
-            await writer.writerow(save_item.values())
+        await self.save_items_to_csv([save_item], store_type)
+
+    async def save_items_to_csv(self, save_items: List[Dict], store_type: str):
+        """
+        Save a batch of items in CSV format through the long-lived buffered writer of the output file
+        Args:
+            save_items: save content dict list
+            store_type: Save type contains content and comments（contents | comments）
+
+        Returns: no returns
+
+        """
+        if not save_items:
+            return
+        writer = csv_writer.get_csv_writer(self.make_save_file_name(store_type=store_type))
+        await writer.write_rows(save_items[0].keys(), (save_item.values() for save_item in save_items))
 
     async def store_content(self, content_item: Dict):
         """
@@ -109,6 +115,39 @@ class DouyinCsvStoreImplement(AbstractStore):
         """
         await self.save_data_to_csv(save_item=creator, store_type="creator")
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        Douyin contents CSV batch storage implementation
+        Args:
+            content_items: content item dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_csv(content_items, "contents")
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        Douyin comments CSV batch storage implementation
+        Args:
+            comment_items: comment item dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_csv(comment_items, "comments")
+
+    async def store_creators(self, creators: List[Dict]):
+        """
+        Douyin creators CSV batch storage implementation
+        Args:
+            creators: creator dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_csv(creators, "creator")
+
 
 class DouyinDbStoreImplement(AbstractStore):
     async def store_content(self, content_item: Dict):
@@ -131,7 +170,9 @@ class DouyinDbStoreImplement(AbstractStore):
             if content_item.get("title"):
                 await add_new_content(content_item)
         else:
-            await update_content_by_content_id(aweme_id, content_item=content_item)
+            changes = changed_fields(content_item, aweme_detail)
+            if changes:
+                await update_content_by_content_id(aweme_id, content_item=changes)
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -151,7 +192,9 @@ class DouyinDbStoreImplement(AbstractStore):
             comment_item["add_ts"] = utils.get_current_timestamp()
             await add_new_comment(comment_item)
         else:
-            await update_comment_by_comment_id(comment_id, comment_item=comment_item)
+            changes = changed_fields(comment_item, comment_detail)
+            if changes:
+                await update_comment_by_comment_id(comment_id, comment_item=changes)
 
     async def store_creator(self, creator: Dict):
         """
@@ -171,7 +214,31 @@ class DouyinDbStoreImplement(AbstractStore):
             creator["add_ts"] = utils.get_current_timestamp()
             await add_new_creator(creator)
         else:
-            await update_creator_by_user_id(user_id, creator)
+            changes = changed_fields(creator, user_detail)
+            if changes:
+                await update_creator_by_user_id(user_id, changes)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        Douyin comments DB batch storage implementation
+        Args:
+            comment_items: comment item dict list
+
+        Returns:
+
+        """
+        await batch_add_or_update("douyin_aweme_comment", "comment_id", comment_items)
+
+    async def store_creators(self, creators: List[Dict]):
+        """
+        Douyin creators DB batch storage implementation
+        Args:
+            creators: creator dict list
+
+        Returns:
+
+        """
+        await batch_add_or_update("dy_creator", "user_id", creators)
 
 class DouyinJsonStoreImplement(AbstractStore):
     json_store_path: str = "data/douyin/json"
@@ -179,7 +246,6 @@ class DouyinJsonStoreImplement(AbstractStore):
 
     lock = asyncio.Lock()
     file_count: int = calculate_number_of_files(json_store_path)
-    WordCloud = words.AsyncWordCloudGenerator()
 
     def make_save_file_name(self, store_type: str) -> (str,str):
         """
@@ -205,23 +271,31 @@ class DouyinJsonStoreImplement(AbstractStore):
         Returns:
 
         """
+        await self.save_items_to_json([save_item], store_type)
+
+    async def save_items_to_json(self, save_items: List[Dict], store_type: str):
+        """
+        Save a batch of items in json format, the file is read and rewritten once per batch
+        Args:
+            save_items: save content dict list
+            store_type: Save type contains content and comments（contents | comments）
+
+        Returns:
+
+        """
+        if not save_items:
+            return
         pathlib.Path(self.json_store_path).mkdir(parents=True, exist_ok=True)
         pathlib.Path(self.words_store_path).mkdir(parents=True, exist_ok=True)
         save_file_name,words_file_name_prefix = self.make_save_file_name(store_type=store_type)
-        save_data = []
+        save_file_name = compression.compressed_file_name(save_file_name)
 
         async with self.lock:
-            if os.path.exists(save_file_name):
-                async with aiofiles.open(save_file_name, 'r', encoding='utf-8') as file:
-                    save_data = json.loads(await file.read())
-
-            save_data.append(save_item)
-            async with aiofiles.open(save_file_name, 'w', encoding='utf-8') as file:
-                await file.write(json.dumps(save_data, ensure_ascii=False))
+            save_data = await compression.append_json_items(save_file_name, [dict(save_item) for save_item in save_items])
 
             if config.ENABLE_GET_COMMENTS and config.ENABLE_GET_WORDCLOUD:
                 try:
-                    await self.WordCloud.generate_word_frequency_and_cloud(save_data, words_file_name_prefix)
+                    await words.get_word_cloud_generator().generate_word_frequency_and_cloud(save_data, words_file_name_prefix)
                 except:
                     pass
 
@@ -259,6 +333,39 @@ class DouyinJsonStoreImplement(AbstractStore):
         """
         await self.save_data_to_json(save_item=creator, store_type="creator")
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        Douyin contents JSON batch storage implementation
+        Args:
+            content_items: content item dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_json(content_items, "contents")
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        Douyin comments JSON batch storage implementation
+        Args:
+            comment_items: comment item dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_json(comment_items, "comments")
+
+    async def store_creators(self, creators: List[Dict]):
+        """
+        Douyin creators JSON batch storage implementation
+        Args:
+            creators: creator dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_json(creators, "creator")
+
 
 class DouyinSqliteStoreImplement(AbstractStore):
     async def store_content(self, content_item: Dict):
@@ -281,7 +388,9 @@ class DouyinSqliteStoreImplement(AbstractStore):
             if content_item.get("title"):
                 await add_new_content(content_item)
         else:
-            await update_content_by_content_id(aweme_id, content_item=content_item)
+            changes = changed_fields(content_item, aweme_detail)
+            if changes:
+                await update_content_by_content_id(aweme_id, content_item=changes)
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -301,7 +410,9 @@ class DouyinSqliteStoreImplement(AbstractStore):
             comment_item["add_ts"] = utils.get_current_timestamp()
             await add_new_comment(comment_item)
         else:
-            await update_comment_by_comment_id(comment_id, comment_item=comment_item)
+            changes = changed_fields(comment_item, comment_detail)
+            if changes:
+                await update_comment_by_comment_id(comment_id, comment_item=changes)
 
     async def store_creator(self, creator: Dict):
         """
@@ -321,4 +432,131 @@ class DouyinSqliteStoreImplement(AbstractStore):
             creator["add_ts"] = utils.get_current_timestamp()
             await add_new_creator(creator)
         else:
-            await update_creator_by_user_id(user_id, creator)
\ No newline at end of file
+            changes = changed_fields(creator, user_detail)
+            if changes:
+                await update_creator_by_user_id(user_id, changes)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        Douyin comments SQLite batch storage implementation
+        Args:
+            comment_items: comment item dict list
+
+        Returns:
+
+        """
+        await batch_add_or_update("douyin_aweme_comment", "comment_id", comment_items)
+
+    async def store_creators(self, creators: List[Dict]):
+        """
+        Douyin creators SQLite batch storage implementation
+        Args:
+            creators: creator dict list
+
+        Returns:
+
+        """
+        await batch_add_or_update("dy_creator", "user_id", creators)
+
+
+class DouyinParquetStoreImplement(AbstractStore):
+    parquet_store_path: str = "data/douyin/parquet"
+    file_count: int = calculate_number_of_files(parquet_store_path)
+    # 存储类型 -> 对应的数据表，parquet 文件的列和类型与数据表一致
+    store_tables = {
+        "contents": "douyin_aweme",
+        "comments": "douyin_aweme_comment",
+        "creator": "dy_creator",
+    }
+
+    def make_save_file_name(self, store_type: str) -> str:
+        """
+        make save file name by store type
+        Args:
+            store_type: contents or comments
+
+        Returns: eg: data/douyin/parquet/1_search_comments_20240114.parquet ...
+
+        """
+        return f"{self.parquet_store_path}/{self.file_count}_{crawler_type_var.get()}_{store_type}_{utils.get_current_date()}.parquet"
+
+    async def save_items_to_parquet(self, save_items: List[Dict], store_type: str):
+        """
+        Save a batch of items through the parquet writer of the output file, rows are written in row groups
+        Args:
+            save_items: save content dict list
+            store_type: Save type contains content and comments（contents | comments）
+
+        Returns: no returns
+
+        """
+        if not save_items:
+            return
+        writer = parquet_writer.get_parquet_writer(self.make_save_file_name(store_type=store_type), self.store_tables[store_type])
+        await writer.write_rows(save_items)
+
+    async def store_content(self, content_item: Dict):
+        """
+        Douyin content Parquet storage implementation
+        Args:
+            content_item: content item dict
+
+        Returns:
+
+        """
+        await self.save_items_to_parquet([content_item], "contents")
+
+    async def store_comment(self, comment_item: Dict):
+        """
+        Douyin comment Parquet storage implementation
+        Args:
+            comment_item: comment item dict
+
+        Returns:
+
+        """
+        await self.save_items_to_parquet([comment_item], "comments")
+
+    async def store_creator(self, creator: Dict):
+        """
+        Douyin creator Parquet storage implementation
+        Args:
+            creator: creator dict
+
+        Returns:
+
+        """
+        await self.save_items_to_parquet([creator], "creator")
+
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        Douyin contents Parquet batch storage implementation
+        Args:
+            content_items: content item dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_parquet(content_items, "contents")
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        Douyin comments Parquet batch storage implementation
+        Args:
+            comment_items: comment item dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_parquet(comment_items, "comments")
+
+    async def store_creators(self, creators: List[Dict]):
+        """
+        Douyin creators Parquet batch storage implementation
+        Args:
+            creators: creator dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_parquet(creators, "creator")
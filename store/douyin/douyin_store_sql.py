@@ -31,8 +31,7 @@ async def query_content_by_content_id(content_id: str) -> Dict:
 
     """
     async_db_conn: Union[AsyncMysqlDB, AsyncSqliteDB] = media_crawler_db_var.get()
-    sql: str = f"select * from douyin_aweme where aweme_id = '{content_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    rows: List[Dict] = await async_db_conn.query_by_fields("douyin_aweme", {"aweme_id": content_id})
     if len(rows) > 0:
         return rows[0]
     return dict()
@@ -78,8 +77,7 @@ async def query_comment_by_comment_id(comment_id: str) -> Dict:
 
     """
     async_db_conn: Union[AsyncMysqlDB, AsyncSqliteDB] = media_crawler_db_var.get()
-    sql: str = f"select * from douyin_aweme_comment where comment_id = '{comment_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    rows: List[Dict] = await async_db_conn.query_by_fields("douyin_aweme_comment", {"comment_id": comment_id})
     if len(rows) > 0:
         return rows[0]
     return dict()
@@ -124,8 +122,7 @@ async def query_creator_by_user_id(user_id: str) -> Dict:
 
     """
     async_db_conn: Union[AsyncMysqlDB, AsyncSqliteDB] = media_crawler_db_var.get()
-    sql: str = f"select * from dy_creator where user_id = '{user_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    rows: List[Dict] = await async_db_conn.query_by_fields("dy_creator", {"user_id": user_id})
     if len(rows) > 0:
         return rows[0]
     return dict()
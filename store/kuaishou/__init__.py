@@ -16,6 +16,9 @@
 from typing import List
 
 import config
+from model.m_kuaishou import (KuaishouCreatorRecord, KuaishouVideoCommentRecord,
+                              KuaishouVideoRecord)
+from store import get_store
 from var import source_keyword_var
 
 from .kuaishou_store_impl import *
@@ -26,7 +29,8 @@ class KuaishouStoreFactory:
         "csv": KuaishouCsvStoreImplement,
         "db": KuaishouDbStoreImplement,
         "json": KuaishouJsonStoreImplement,
-        "sqlite": KuaishouSqliteStoreImplement
+        "sqlite": KuaishouSqliteStoreImplement,
+        "parquet": KuaishouParquetStoreImplement,
     }
 
     @staticmethod
@@ -34,8 +38,8 @@ class KuaishouStoreFactory:
         store_class = KuaishouStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError(
-                "[KuaishouStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite ...")
-        return store_class()
+                "[KuaishouStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or parquet ...")
+        return get_store("ks", store_class)
 
 
 async def update_kuaishou_video(video_item: Dict):
@@ -44,68 +48,80 @@ async def update_kuaishou_video(video_item: Dict):
     if not video_id:
         return
     user_info = video_item.get("author", {})
-    save_content_item = {
-        "video_id": video_id,
-        "video_type": str(video_item.get("type")),
-        "title": photo_info.get("caption", "")[:500],
-        "desc": photo_info.get("caption", "")[:500],
-        "create_time": photo_info.get("timestamp"),
-        "user_id": user_info.get("id"),
-        "nickname": user_info.get("name"),
-        "avatar": user_info.get("headerUrl", ""),
-        "liked_count": str(photo_info.get("realLikeCount")),
-        "viewd_count": str(photo_info.get("viewCount")),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "video_url": f"https://www.kuaishou.com/short-video/{video_id}",
-        "video_cover_url": photo_info.get("coverUrl", ""),
-        "video_play_url": photo_info.get("photoUrl", ""),
-        "source_keyword": source_keyword_var.get(),
-    }
+    save_content_item = KuaishouVideoRecord(
+        video_id=video_id,
+        video_type=str(video_item.get("type")),
+        title=photo_info.get("caption", "")[:500],
+        desc=photo_info.get("caption", "")[:500],
+        create_time=photo_info.get("timestamp"),
+        user_id=user_info.get("id"),
+        nickname=user_info.get("name"),
+        avatar=user_info.get("headerUrl", ""),
+        liked_count=str(photo_info.get("realLikeCount")),
+        viewd_count=str(photo_info.get("viewCount")),
+        last_modify_ts=utils.get_current_timestamp(),
+        video_url=f"https://www.kuaishou.com/short-video/{video_id}",
+        video_cover_url=photo_info.get("coverUrl", ""),
+        video_play_url=photo_info.get("photoUrl", ""),
+        source_keyword=source_keyword_var.get(),
+    )
     utils.logger.info(
-        f"[store.kuaishou.update_kuaishou_video] Kuaishou video id:{video_id}, title:{save_content_item.get('title')}")
+        "[store.kuaishou.update_kuaishou_video] Kuaishou video id:%s, title:%s", video_id, save_content_item.title)
     await KuaishouStoreFactory.create_store().store_content(content_item=save_content_item)
 
 
 async def batch_update_ks_video_comments(video_id: str, comments: List[Dict]):
-    utils.logger.info(f"[store.kuaishou.batch_update_ks_video_comments] video_id:{video_id}, comments:{comments}")
+    utils.logger.debug("[store.kuaishou.batch_update_ks_video_comments] video_id:%s, comments:%s", video_id, utils.lazy_payload(comments))
     if not comments:
         return
-    for comment_item in comments:
-        await update_ks_video_comment(video_id, comment_item)
+    comment_items = [_build_ks_video_comment(video_id, comment_item) for comment_item in comments]
+    await KuaishouStoreFactory.create_store().store_comments(comment_items)
 
 
 async def update_ks_video_comment(video_id: str, comment_item: Dict):
+    save_comment_item = _build_ks_video_comment(video_id, comment_item)
+    await KuaishouStoreFactory.create_store().store_comment(save_comment_item)
+
+
+def _build_ks_video_comment(video_id: str, comment_item: Dict) -> KuaishouVideoCommentRecord:
+    """
+    把视频评论转换成存储记录
+    """
     comment_id = comment_item.get("commentId")
-    save_comment_item = {
-        "comment_id": comment_id,
-        "create_time": comment_item.get("timestamp"),
-        "video_id": video_id,
-        "content": comment_item.get("content"),
-        "user_id": comment_item.get("authorId"),
-        "nickname": comment_item.get("authorName"),
-        "avatar": comment_item.get("headurl"),
-        "sub_comment_count": str(comment_item.get("subCommentCount", 0)),
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
+    # 二级评论由 client 按所属的一级评论补上 root_comment_id，接口里没有回复的是哪条二级评论，父评论记为一级评论
+    root_comment_id = comment_item.get("root_comment_id") or comment_id
+    save_comment_item = KuaishouVideoCommentRecord(
+        comment_id=comment_id,
+        create_time=comment_item.get("timestamp"),
+        video_id=video_id,
+        content=comment_item.get("content"),
+        user_id=comment_item.get("authorId"),
+        nickname=comment_item.get("authorName"),
+        avatar=comment_item.get("headurl"),
+        sub_comment_count=str(comment_item.get("subCommentCount", 0)),
+        parent_comment_id=root_comment_id if root_comment_id != comment_id else "0",
+        root_comment_id=root_comment_id,
+        last_modify_ts=utils.get_current_timestamp(),
+    )
     utils.logger.info(
-        f"[store.kuaishou.update_ks_video_comment] Kuaishou video comment: {comment_id}, content: {save_comment_item.get('content')}")
-    await KuaishouStoreFactory.create_store().store_comment(comment_item=save_comment_item)
+        "[store.kuaishou.update_ks_video_comment] Kuaishou video comment: %s, content: %s", comment_id, save_comment_item.content)
+    return save_comment_item
 
 async def save_creator(user_id: str, creator: Dict):
     ownerCount = creator.get('ownerCount', {})
     profile = creator.get('profile', {})
 
-    local_db_item = {
-        'user_id': user_id,
-        'nickname': profile.get('user_name'),
-        'gender': '女' if profile.get('gender') == "F" else '男',
-        'avatar': profile.get('headurl'),
-        'desc': profile.get('user_text'),
-        'ip_location': "",
-        'follows': ownerCount.get("follow"),
-        'fans': ownerCount.get("fan"),
-        'interaction': ownerCount.get("photo_public"),
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
-    utils.logger.info(f"[store.kuaishou.save_creator] creator:{local_db_item}")
+    local_db_item = KuaishouCreatorRecord(
+        user_id=user_id,
+        nickname=profile.get('user_name'),
+        gender='女' if profile.get('gender') == "F" else '男',
+        avatar=profile.get('headurl'),
+        desc=profile.get('user_text'),
+        ip_location="",
+        follows=ownerCount.get("follow"),
+        fans=ownerCount.get("fan"),
+        interaction=ownerCount.get("photo_public"),
+        last_modify_ts=utils.get_current_timestamp(),
+    )
+    utils.logger.debug("[store.kuaishou.save_creator] creator:%s", utils.lazy_payload(local_db_item))
     await KuaishouStoreFactory.create_store().store_creator(local_db_item)
\ No newline at end of file
@@ -31,8 +31,7 @@ async def query_content_by_content_id(content_id: str) -> Dict:
 
     """
     async_db_conn: Union[AsyncMysqlDB, AsyncSqliteDB] = media_crawler_db_var.get()
-    sql: str = f"select * from kuaishou_video where video_id = '{content_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    rows: List[Dict] = await async_db_conn.query_by_fields("kuaishou_video", {"video_id": content_id})
     if len(rows) > 0:
         return rows[0]
     return dict()
@@ -78,8 +77,7 @@ async def query_comment_by_comment_id(comment_id: str) -> Dict:
 
     """
     async_db_conn: Union[AsyncMysqlDB, AsyncSqliteDB] = media_crawler_db_var.get()
-    sql: str = f"select * from kuaishou_video_comment where comment_id = '{comment_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    rows: List[Dict] = await async_db_conn.query_by_fields("kuaishou_video_comment", {"comment_id": comment_id})
     if len(rows) > 0:
         return rows[0]
     return dict()
@@ -0,0 +1,196 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : Parquet 存储的写入器：按数据库表结构（schema/sqlite_tables.sql）确定列类型，行先缓冲在内存里，
+#            攒够一个 row group 后在后台线程写入文件，运行结束时写入文件尾（footer）
+#
+# 需要 pip install pyarrow，文件写完后可以直接用 duckdb / pandas / spark 读取：
+#   duckdb -c "select note_id, liked_count from 'data/xhs/parquet/*_contents_*.parquet' where time > 1700000000000"
+import asyncio
+import functools
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import config
+from tools import utils
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "schema", "sqlite_tables.sql")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("parquet storage requires the pyarrow package, please run: pip install pyarrow") from e
+    return pyarrow
+
+
+@functools.lru_cache(maxsize=None)
+def table_columns(table_name: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    从 sqlite 建表语句里读取表的列名和类型（INTEGER / TEXT），不含自增主键 id
+    Args:
+        table_name: 表名，如 xhs_note、douyin_aweme、bilibili_video_comment
+
+    Returns:
+
+    """
+    with open(SCHEMA_FILE, encoding="utf-8") as f:
+        sql = f.read()
+    match = re.search(rf"CREATE TABLE {table_name} \((.*?)\);", sql, re.S)
+    if match is None:
+        raise ValueError(f"table {table_name} not found in {SCHEMA_FILE}")
+    columns = []
+    for line in match.group(1).splitlines():
+        column = re.match(r"\s*(\w+)\s+(INTEGER|TEXT)\b", line)
+        if column and column.group(1) != "id":
+            columns.append((column.group(1), column.group(2)))
+    return tuple(columns)
+
+
+def _to_int(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        # 如 "1.2万" 这类展示用的数字，写入空值，不中断整个 row group
+        return None
+
+
+def _to_str(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+class ParquetTableWriter:
+    """
+    单个 Parquet 输出文件的写入器，列和类型固定为对应数据表的列，数据里多出的字段会被忽略、缺少的字段写入空值
+    文件已存在时（如服务模式下同一天的多个任务）依次写入 xxx_2.parquet、xxx_3.parquet
+    """
+
+    def __init__(self, file_name: str, table_name: str, row_group_rows: int = 10000, compression: str = "snappy"):
+        self.file_name = file_name
+        self.table_name = table_name
+        self.row_group_rows = max(row_group_rows, 1)
+        self.compression = compression
+        self.columns = table_columns(table_name)
+        # 没有安装 pyarrow 时在第一次存储数据时就报错，而不是运行结束写文件时才发现
+        self._pyarrow = _import_pyarrow()
+        self._stem, self._ext = os.path.splitext(file_name)
+        self._part = 1
+        self._rows: List[Dict] = []
+        self._lock = asyncio.Lock()
+        self._writer = None
+        self._schema = None
+
+    @property
+    def current_file_name(self) -> str:
+        if self._part == 1:
+            return self.file_name
+        return f"{self._stem}_{self._part}{self._ext}"
+
+    async def write_rows(self, items: Iterable[Dict]) -> None:
+        """
+        写入一批数据，缓冲的行数达到 row_group_rows 时写入一个 row group
+        Args:
+            items: 与数据表对应的存储字典
+
+        Returns:
+
+        """
+        self._rows.extend(items)
+        if len(self._rows) >= self.row_group_rows:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        把缓冲的行作为一个 row group 写入文件，编码和压缩在后台线程进行，不阻塞事件循环
+        """
+        async with self._lock:
+            if not self._rows:
+                return
+            rows, self._rows = self._rows, []
+            await asyncio.to_thread(self._write_row_group, rows)
+
+    async def close(self) -> None:
+        """
+        写入剩余的缓冲并写入文件尾，之后文件才能被读取
+        """
+        await self.flush()
+        async with self._lock:
+            if self._writer is not None:
+                await asyncio.to_thread(self._writer.close)
+                self._writer = None
+
+    def _write_row_group(self, rows: List[Dict]) -> None:
+        pyarrow = self._pyarrow
+        if self._writer is None:
+            self._open()
+        data = {}
+        for name, kind in self.columns:
+            convert = _to_int if kind == "INTEGER" else _to_str
+            data[name] = [convert(row.get(name)) for row in rows]
+        self._writer.write_table(pyarrow.Table.from_pydict(data, schema=self._schema), row_group_size=len(rows))
+
+    def _open(self) -> None:
+        pyarrow = self._pyarrow
+        self._schema = pyarrow.schema([
+            (name, pyarrow.int64() if kind == "INTEGER" else pyarrow.string()) for name, kind in self.columns
+        ])
+        while os.path.exists(self.current_file_name):
+            self._part += 1
+        file_name = self.current_file_name
+        os.makedirs(os.path.dirname(file_name) or ".", exist_ok=True)
+        self._writer = pyarrow.parquet.ParquetWriter(file_name, self._schema, compression=self.compression)
+        utils.logger.info(f"[ParquetTableWriter._open] write parquet file: {file_name}")
+
+
+# 输出文件名 -> 写入器
+_writers: Dict[str, ParquetTableWriter] = {}
+
+
+def get_parquet_writer(file_name: str, table_name: str) -> ParquetTableWriter:
+    """
+    获取输出文件的写入器，第一次使用时创建
+    Args:
+        file_name: 输出文件名
+        table_name: 数据对应的表名，决定文件的列和类型
+
+    Returns:
+
+    """
+    writer = _writers.get(file_name)
+    if writer is None:
+        writer = _writers[file_name] = ParquetTableWriter(
+            file_name,
+            table_name,
+            row_group_rows=config.PARQUET_ROW_GROUP_ROWS,
+            compression=config.PARQUET_COMPRESSION,
+        )
+    return writer
+
+
+async def close_parquet_writers() -> None:
+    """
+    运行结束时调用：写入剩余的缓冲和文件尾，关闭所有文件
+    """
+    writers = list(_writers.values())
+    _writers.clear()
+    for writer in writers:
+        try:
+            await writer.close()
+        except Exception as e:
+            utils.logger.error(f"[close_parquet_writers] close {writer.file_name} failed, err: {e}")
@@ -0,0 +1,317 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : DB/SQLite 存储的本地磁盘 spool：爬虫的存储调用先追加写入 data/spool/ 下的日志段文件，
+#            后台任务再按批写入数据库，数据库变慢或暂时不可用时爬取不受影响，恢复后继续写入
+#
+# 每个日志段是 JSON Lines，一行对应一次存储调用；checkpoint 文件记录已经写入数据库的位置（段号、偏移），
+# 进程异常退出后下次启动从 checkpoint 继续写入。写入数据库是按主键新增或更新，重复写入同一批数据没有副作用
+# 同一批数据多次写入失败后逐条写入，逐条仍然失败的记录（字段超长、存储类已删除等）移到 dead_letter.jsonl，
+# 格式和日志段相同并多一个 error 字段，不会一直阻塞后面的数据
+import asyncio
+import importlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import config
+from tools import metrics, utils
+
+# 单条写入方法 -> 对应的批量写入方法，写入数据库时连续的单条调用合并成一次批量调用
+SINGLE_TO_BATCH_METHODS = {
+    "store_content": "store_contents",
+    "store_comment": "store_comments",
+    "store_creator": "store_creators",
+}
+
+# 写入数据库失败后的重试间隔（秒），每次失败翻倍，直到上限
+RETRY_MIN_INTERVAL_SEC = 1
+RETRY_MAX_INTERVAL_SEC = 60
+
+
+def _json_default(value: Any) -> Any:
+    # 存储的记录可能是 SlottedRecord 之类实现了 keys / __getitem__ 的记录对象
+    if hasattr(value, "keys"):
+        return dict(value)
+    return str(value)
+
+
+class DiskSpool:
+    """
+    追加写的日志段 + 后台写入数据库的任务
+    """
+
+    def __init__(self, spool_dir: str, segment_max_bytes: int = 64 * 1024 * 1024, batch_size: int = 500,
+                 fsync: bool = False, max_attempts: int = 10):
+        self.spool_dir = spool_dir
+        self.segment_max_bytes = segment_max_bytes
+        self.batch_size = max(batch_size, 1)
+        self.fsync = fsync
+        self.max_attempts = max(max_attempts, 1)
+        self.dead_letter_path = os.path.join(spool_dir, "dead_letter.jsonl")
+        os.makedirs(spool_dir, exist_ok=True)
+        self._read_no, self._read_offset = self._load_checkpoint()
+        # 每次启动写入新的日志段，上次运行中断时没写完整的最后一行不会和新数据拼在一起
+        self._write_no = max([self._read_no] + self._segment_numbers()) + 1
+        self._write_file = None
+        self._write_bytes = 0
+        self._stores: Dict[str, Any] = {}
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._drainer = asyncio.get_running_loop().create_task(self._drain())
+
+    def _segment_path(self, no: int) -> str:
+        return os.path.join(self.spool_dir, f"{no:08d}.log")
+
+    def _segment_numbers(self) -> List[int]:
+        return sorted(int(name[:-len(".log")]) for name in os.listdir(self.spool_dir)
+                      if name.endswith(".log") and name[:-len(".log")].isdigit())
+
+    def _load_checkpoint(self) -> Tuple[int, int]:
+        try:
+            with open(os.path.join(self.spool_dir, "checkpoint"), encoding="utf-8") as f:
+                checkpoint = json.load(f)
+            return checkpoint["segment"], checkpoint["offset"]
+        except FileNotFoundError:
+            return 0, 0
+
+    def _save_checkpoint(self, no: int, offset: int) -> None:
+        path = os.path.join(self.spool_dir, "checkpoint")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"segment": no, "offset": offset}, f)
+        os.replace(path + ".tmp", path)
+        # 已经全部写入数据库的日志段可以删除
+        for segment_no in self._segment_numbers():
+            if segment_no < no:
+                os.remove(self._segment_path(segment_no))
+
+    def append(self, store_path: str, method: str, args: tuple, kwargs: Dict) -> None:
+        """
+        追加一次存储调用，写入操作系统后返回，进程异常退出也不会丢失；SPOOL_FSYNC 开启时机器断电也不会丢失
+        Args:
+            store_path: 存储实现类，module:ClassName
+            method: 存储方法名
+            args: 位置参数
+            kwargs: 关键字参数
+
+        Returns:
+
+        """
+        line = json.dumps({"store": store_path, "method": method, "args": args, "kwargs": kwargs},
+                          ensure_ascii=False, default=_json_default).encode("utf-8") + b"\n"
+        if self._write_file is None or self._write_bytes >= self.segment_max_bytes:
+            if self._write_file is not None:
+                self._write_file.close()
+                self._write_no += 1
+            self._write_file = open(self._segment_path(self._write_no), "ab")
+            self._write_bytes = 0
+        self._write_file.write(line)
+        self._write_file.flush()
+        if self.fsync:
+            os.fsync(self._write_file.fileno())
+        self._write_bytes += len(line)
+        metrics.SPOOL_RECORDS_TOTAL.inc(stage="appended")
+        self._wakeup.set()
+
+    def _read_batch(self) -> Tuple[List[Dict], int, int]:
+        records = []
+        no, offset = self._read_no, self._read_offset
+        while len(records) < self.batch_size:
+            path = self._segment_path(no)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    for line in f:
+                        # 正在写入的最后一行还不完整，等下一轮再读
+                        if not line.endswith(b"\n"):
+                            break
+                        offset += len(line)
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            utils.logger.error(f"[DiskSpool._read_batch] skip corrupted record in {path} at {offset}")
+                        if len(records) >= self.batch_size:
+                            break
+            if len(records) >= self.batch_size or no >= self._write_no:
+                break
+            # 之前的日志段已经不再写入，读完后转到下一个段
+            no, offset = no + 1, 0
+        return records, no, offset
+
+    def _get_store(self, store_path: str) -> Any:
+        store = self._stores.get(store_path)
+        if store is None:
+            module_name, class_name = store_path.split(":")
+            store = self._stores[store_path] = getattr(importlib.import_module(module_name), class_name)()
+        return store
+
+    async def _replay(self, records: List[Dict]) -> None:
+        index = 0
+        while index < len(records):
+            record = records[index]
+            store = self._get_store(record["store"])
+            batch_method = SINGLE_TO_BATCH_METHODS.get(record["method"], record["method"])
+            if batch_method not in SINGLE_TO_BATCH_METHODS.values():
+                await getattr(store, record["method"])(*record["args"], **record["kwargs"])
+                index += 1
+                continue
+            # 同一个存储实现连续的单条、批量写入合并成一次批量写入
+            items = []
+            while index < len(records) and records[index]["store"] == record["store"] and \
+                    SINGLE_TO_BATCH_METHODS.get(records[index]["method"], records[index]["method"]) == batch_method:
+                call = records[index]
+                arg = call["args"][0] if call["args"] else next(iter(call["kwargs"].values()))
+                if call["method"] == batch_method:
+                    items.extend(arg)
+                else:
+                    items.append(arg)
+                index += 1
+            await getattr(store, batch_method)(items)
+
+    def _dead_letter(self, record: Dict, error: Exception) -> None:
+        line = json.dumps({**record, "error": repr(error)}, ensure_ascii=False,
+                          default=_json_default).encode("utf-8") + b"\n"
+        with open(self.dead_letter_path, "ab") as f:
+            f.write(line)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        metrics.SPOOL_RECORDS_TOTAL.inc(stage="dead_lettered")
+        utils.logger.error(f"[DiskSpool._dead_letter] replay {record['store']}.{record['method']} failed "
+                           f"{self.max_attempts} times, moved to {self.dead_letter_path}, err: {error}")
+
+    async def _replay_one_by_one(self, records: List[Dict]) -> int:
+        # 整批多次写入失败后逐条写入，找出写不进去的记录移到死信文件，其余记录正常写入，返回移到死信文件的条数
+        dead = 0
+        for record in records:
+            try:
+                await self._replay([record])
+            except Exception as e:
+                self._dead_letter(record, e)
+                dead += 1
+        return dead
+
+    async def _drain(self) -> None:
+        interval = RETRY_MIN_INTERVAL_SEC
+        attempts = 0
+        while True:
+            records, no, offset = await asyncio.to_thread(self._read_batch)
+            if not records:
+                if (no, offset) != (self._read_no, self._read_offset):
+                    self._read_no, self._read_offset = no, offset
+                    self._save_checkpoint(no, offset)
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=1)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            dead = 0
+            try:
+                if attempts >= self.max_attempts:
+                    dead = await self._replay_one_by_one(records)
+                else:
+                    await self._replay(records)
+            except Exception as e:
+                attempts += 1
+                metrics.SPOOL_REPLAY_ERRORS_TOTAL.inc()
+                utils.logger.warning(f"[DiskSpool._drain] replay {len(records)} records failed ({attempts}/{self.max_attempts}), "
+                                     f"retry in {interval}s, err: {e}")
+                await asyncio.sleep(interval)
+                interval = min(interval * 2, RETRY_MAX_INTERVAL_SEC)
+                continue
+            interval = RETRY_MIN_INTERVAL_SEC
+            attempts = 0
+            metrics.SPOOL_RECORDS_TOTAL.inc(len(records) - dead, stage="replayed")
+            self._read_no, self._read_offset = no, offset
+            self._save_checkpoint(no, offset)
+
+    async def close(self, timeout: float) -> None:
+        """
+        等待后台任务把 spool 写入数据库，超时后停止，剩余的数据保留在磁盘上，下次启动继续写入
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+
+        """
+        self._closing = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._drainer, timeout=timeout)
+        except asyncio.TimeoutError:
+            utils.logger.warning(f"[DiskSpool.close] spool not fully written to the database in {timeout}s, "
+                                 f"the rest will be written on next start")
+        if self._write_file is not None:
+            self._write_file.close()
+            self._write_file = None
+
+
+class SpooledStore:
+    """
+    DB/SQLite 存储实现的代理：store_xxx 协程方法只追加写入 spool，其他属性原样透传
+    """
+
+    def __init__(self, store: Any, spool: DiskSpool):
+        self._store = store
+        self._spool = spool
+        self._store_path = f"{type(store).__module__}:{type(store).__name__}"
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._store, name)
+        if not name.startswith("store_") or not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        async def wrapper(*args, **kwargs):
+            self._spool.append(self._store_path, name, args, kwargs)
+
+        return wrapper
+
+
+_spool: Optional[DiskSpool] = None
+
+
+def get_spool() -> DiskSpool:
+    """
+    获取进程内的 spool，第一次使用时创建并启动后台写入任务，上次运行没写完的数据也会继续写入
+    """
+    global _spool
+    if _spool is None:
+        _spool = DiskSpool(config.SPOOL_DIR, segment_max_bytes=config.SPOOL_SEGMENT_MAX_BYTES,
+                           batch_size=config.SPOOL_BATCH_SIZE, fsync=config.SPOOL_FSYNC,
+                           max_attempts=config.SPOOL_REPLAY_MAX_ATTEMPTS)
+    return _spool
+
+
+def spool_enabled() -> bool:
+    return config.ENABLE_DB_SPOOL and config.SAVE_DATA_OPTION in ["db", "sqlite"]
+
+
+def spooled_store(store: Any) -> Any:
+    """
+    开启 ENABLE_DB_SPOOL 且存储方式为 db / sqlite 时，把存储实现包装成先写 spool 的代理
+    """
+    if not spool_enabled():
+        return store
+    return SpooledStore(store, get_spool())
+
+
+async def close_spool() -> None:
+    """
+    运行结束时调用，需要在关闭数据库连接之前
+    """
+    global _spool
+    if _spool is not None:
+        spool, _spool = _spool, None
+        await spool.close(config.SPOOL_DRAIN_TIMEOUT_SEC)
@@ -13,6 +13,7 @@
 from typing import List
 
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
+from store import get_store
 from var import source_keyword_var
 
 from . import tieba_store_impl
@@ -24,7 +25,8 @@ class TieBaStoreFactory:
         "csv": TieBaCsvStoreImplement,
         "db": TieBaDbStoreImplement,
         "json": TieBaJsonStoreImplement,
-        "sqlite": TieBaSqliteStoreImplement
+        "sqlite": TieBaSqliteStoreImplement,
+        "parquet": TieBaParquetStoreImplement,
     }
 
     @staticmethod
@@ -32,8 +34,8 @@ class TieBaStoreFactory:
         store_class = TieBaStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError(
-                "[TieBaStoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+                "[TieBaStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or parquet ...")
+        return get_store("tieba", store_class)
 
 
 async def batch_update_tieba_notes(note_list: List[TiebaNote]):
@@ -47,8 +49,8 @@ async def batch_update_tieba_notes(note_list: List[TiebaNote]):
     """
     if not note_list:
         return
-    for note_item in note_list:
-        await update_tieba_note(note_item)
+    content_items = [_build_tieba_note(note_item) for note_item in note_list]
+    await TieBaStoreFactory.create_store().store_contents(content_items)
 
 
 async def update_tieba_note(note_item: TiebaNote):
@@ -59,13 +61,20 @@ async def update_tieba_note(note_item: TiebaNote):
 
     Returns:
 
+    """
+    save_note_item = _build_tieba_note(note_item)
+    await TieBaStoreFactory.create_store().store_content(save_note_item)
+
+
+def _build_tieba_note(note_item: TiebaNote) -> Dict:
+    """
+    把帖子转换成存储记录
     """
     note_item.source_keyword = source_keyword_var.get()
     save_note_item = note_item.model_dump()
     save_note_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.tieba.update_tieba_note] tieba note: {save_note_item}")
-
-    await TieBaStoreFactory.create_store().store_content(save_note_item)
+    utils.logger.debug("[store.tieba.update_tieba_note] tieba note: %s", utils.lazy_payload(save_note_item))
+    return save_note_item
 
 
 async def batch_update_tieba_note_comments(note_id: str, comments: List[TiebaComment]):
@@ -80,8 +89,8 @@ async def batch_update_tieba_note_comments(note_id: str, comments: List[TiebaCom
     """
     if not comments:
         return
-    for comment_item in comments:
-        await update_tieba_note_comment(note_id, comment_item)
+    comment_items = [_build_tieba_note_comment(note_id, comment_item) for comment_item in comments]
+    await TieBaStoreFactory.create_store().store_comments(comment_items)
 
 
 async def update_tieba_note_comment(note_id: str, comment_item: TiebaComment):
@@ -94,12 +103,22 @@ async def update_tieba_note_comment(note_id: str, comment_item: TiebaComment):
     Returns:
 
     """
-    save_comment_item = comment_item.model_dump()
-    save_comment_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.tieba.update_tieba_note_comment] tieba note id: {note_id} comment:{save_comment_item}")
+    save_comment_item = _build_tieba_note_comment(note_id, comment_item)
     await TieBaStoreFactory.create_store().store_comment(save_comment_item)
 
 
+def _build_tieba_note_comment(note_id: str, comment_item: TiebaComment) -> Dict:
+    """
+    把帖子评论转换成存储记录
+    """
+    save_comment_item = comment_item.model_dump()
+    # 楼中楼回复的父评论就是所在的楼层
+    root_comment_id = comment_item.root_comment_id or comment_item.parent_comment_id or comment_item.comment_id
+    save_comment_item.update({"root_comment_id": root_comment_id, "last_modify_ts": utils.get_current_timestamp()})
+    utils.logger.debug("[store.tieba.update_tieba_note_comment] tieba note id: %s comment:%s", note_id, utils.lazy_payload(save_comment_item))
+    return save_comment_item
+
+
 async def save_creator(user_info: TiebaCreator):
     """
     Save creator information to local
@@ -111,5 +130,5 @@ async def save_creator(user_info: TiebaCreator):
     """
     local_db_item = user_info.model_dump()
     local_db_item["last_modify_ts"] = utils.get_current_timestamp()
-    utils.logger.info(f"[store.tieba.save_creator] creator:{local_db_item}")
+    utils.logger.debug("[store.tieba.save_creator] creator:%s", utils.lazy_payload(local_db_item))
     await TieBaStoreFactory.create_store().store_creator(local_db_item)
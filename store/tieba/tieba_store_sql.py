@@ -27,8 +27,7 @@ async def query_content_by_content_id(content_id: str) -> Dict:
 
     """
     async_db_conn: Union[AsyncMysqlDB, AsyncSqliteDB] = media_crawler_db_var.get()
-    sql: str = f"select * from tieba_note where note_id = '{content_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    rows: List[Dict] = await async_db_conn.query_by_fields("tieba_note", {"note_id": content_id})
     if len(rows) > 0:
         return rows[0]
     return dict()
@@ -74,8 +73,7 @@ async def query_comment_by_comment_id(comment_id: str) -> Dict:
 
     """
     async_db_conn: Union[AsyncMysqlDB, AsyncSqliteDB] = media_crawler_db_var.get()
-    sql: str = f"select * from tieba_comment where comment_id = '{comment_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    rows: List[Dict] = await async_db_conn.query_by_fields("tieba_comment", {"comment_id": comment_id})
     if len(rows) > 0:
         return rows[0]
     return dict()
@@ -120,8 +118,7 @@ async def query_creator_by_user_id(user_id: str) -> Dict:
 
     """
     async_db_conn: Union[AsyncMysqlDB, AsyncSqliteDB] = media_crawler_db_var.get()
-    sql: str = f"select * from tieba_creator where user_id = '{user_id}'"
-    rows: List[Dict] = await async_db_conn.query(sql)
+    rows: List[Dict] = await async_db_conn.query_by_fields("tieba_creator", {"user_id": user_id})
     if len(rows) > 0:
         return rows[0]
     return dict()
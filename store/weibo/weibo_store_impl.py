@@ -14,16 +14,13 @@
 # @Time    : 2024/1/14 21:35
 # @Desc    : 微博存储实现类
 import asyncio
-import csv
-import json
 import os
 import pathlib
-from typing import Dict
-
-import aiofiles
+from typing import Dict, List
 
 import config
 from base.base_crawler import AbstractStore
+from store import batch_add_or_update, changed_fields, compression, csv_writer, parquet_writer
 from tools import utils, words
 from var import crawler_type_var
 
@@ -69,13 +66,22 @@ class WeiboCsvStoreImplement(AbstractStore):
         Returns: no returns
 
         """
-        pathlib.Path(self.csv_store_path).mkdir(parents=True, exist_ok=True)
-        save_file_name = self.make_save_file_name(store_type=store_type)
-        async with aiofiles.open(save_file_name, mode='a+', encoding="utf-8-sig", newline="") as f:
-            writer = csv.writer(f)
-            if await f.tell() == 0:
-                await writer.writerow(save_item.keys())
-            await writer.writerow(save_item.values())
+        await self.save_items_to_csv([save_item], store_type)
+
+    async def save_items_to_csv(self, save_items: List[Dict], store_type: str):
+        """
+        Save a batch of items in CSV format through the long-lived buffered writer of the output file
+        Args:
+            save_items: save content dict list
+            store_type: Save type contains content and comments（contents | comments）
+
+        Returns: no returns
+
+        """
+        if not save_items:
+            return
+        writer = csv_writer.get_csv_writer(self.make_save_file_name(store_type=store_type))
+        await writer.write_rows(save_items[0].keys(), (save_item.values() for save_item in save_items))
 
     async def store_content(self, content_item: Dict):
         """
@@ -110,6 +116,39 @@ class WeiboCsvStoreImplement(AbstractStore):
         """
         await self.save_data_to_csv(save_item=creator, store_type="creators")
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        Weibo contents CSV batch storage implementation
+        Args:
+            content_items: content item dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_csv(content_items, "contents")
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        Weibo comments CSV batch storage implementation
+        Args:
+            comment_items: comment item dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_csv(comment_items, "comments")
+
+    async def store_creators(self, creators: List[Dict]):
+        """
+        Weibo creators CSV batch storage implementation
+        Args:
+            creators: creator dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_csv(creators, "creators")
+
 
 class WeiboDbStoreImplement(AbstractStore):
 
@@ -132,7 +171,9 @@ class WeiboDbStoreImplement(AbstractStore):
             content_item["add_ts"] = utils.get_current_timestamp()
             await add_new_content(content_item)
         else:
-            await update_content_by_content_id(note_id, content_item=content_item)
+            changes = changed_fields(content_item, note_detail)
+            if changes:
+                await update_content_by_content_id(note_id, content_item=changes)
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -152,7 +193,9 @@ class WeiboDbStoreImplement(AbstractStore):
             comment_item["add_ts"] = utils.get_current_timestamp()
             await add_new_comment(comment_item)
         else:
-            await update_comment_by_comment_id(comment_id, comment_item=comment_item)
+            changes = changed_fields(comment_item, comment_detail)
+            if changes:
+                await update_comment_by_comment_id(comment_id, comment_item=changes)
 
     async def store_creator(self, creator: Dict):
         """
@@ -173,7 +216,42 @@ class WeiboDbStoreImplement(AbstractStore):
             creator["add_ts"] = utils.get_current_timestamp()
             await add_new_creator(creator)
         else:
-            await update_creator_by_user_id(user_id, creator)
+            changes = changed_fields(creator, user_detail)
+            if changes:
+                await update_creator_by_user_id(user_id, changes)
+
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        Weibo contents DB batch storage implementation
+        Args:
+            content_items: content item dict list
+
+        Returns:
+
+        """
+        await batch_add_or_update("weibo_note", "note_id", content_items)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        Weibo comments DB batch storage implementation
+        Args:
+            comment_items: comment item dict list
+
+        Returns:
+
+        """
+        await batch_add_or_update("weibo_note_comment", "comment_id", comment_items)
+
+    async def store_creators(self, creators: List[Dict]):
+        """
+        Weibo creators DB batch storage implementation
+        Args:
+            creators: creator dict list
+
+        Returns:
+
+        """
+        await batch_add_or_update("weibo_creator", "user_id", creators)
 
 
 class WeiboJsonStoreImplement(AbstractStore):
@@ -181,7 +259,6 @@ class WeiboJsonStoreImplement(AbstractStore):
     words_store_path: str = "data/weibo/words"
     lock = asyncio.Lock()
     file_count: int = calculate_number_of_files(json_store_path)
-    WordCloud = words.AsyncWordCloudGenerator()
 
     def make_save_file_name(self, store_type: str) -> (str, str):
         """
@@ -208,23 +285,31 @@ class WeiboJsonStoreImplement(AbstractStore):
         Returns:
 
         """
+        await self.save_items_to_json([save_item], store_type)
+
+    async def save_items_to_json(self, save_items: List[Dict], store_type: str):
+        """
+        Save a batch of items in json format, the file is read and rewritten once per batch
+        Args:
+            save_items: save content dict list
+            store_type: Save type contains content and comments（contents | comments）
+
+        Returns:
+
+        """
+        if not save_items:
+            return
         pathlib.Path(self.json_store_path).mkdir(parents=True, exist_ok=True)
         pathlib.Path(self.words_store_path).mkdir(parents=True, exist_ok=True)
         save_file_name, words_file_name_prefix = self.make_save_file_name(store_type=store_type)
-        save_data = []
+        save_file_name = compression.compressed_file_name(save_file_name)
 
         async with self.lock:
-            if os.path.exists(save_file_name):
-                async with aiofiles.open(save_file_name, 'r', encoding='utf-8') as file:
-                    save_data = json.loads(await file.read())
-
-            save_data.append(save_item)
-            async with aiofiles.open(save_file_name, 'w', encoding='utf-8') as file:
-                await file.write(json.dumps(save_data, ensure_ascii=False))
+            save_data = await compression.append_json_items(save_file_name, [dict(save_item) for save_item in save_items])
 
             if config.ENABLE_GET_COMMENTS and config.ENABLE_GET_WORDCLOUD:
                 try:
-                    await self.WordCloud.generate_word_frequency_and_cloud(save_data, words_file_name_prefix)
+                    await words.get_word_cloud_generator().generate_word_frequency_and_cloud(save_data, words_file_name_prefix)
                 except:
                     pass
 
@@ -261,6 +346,39 @@ class WeiboJsonStoreImplement(AbstractStore):
         """
         await self.save_data_to_json(creator, "creators")
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        Weibo contents JSON batch storage implementation
+        Args:
+            content_items: content item dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_json(content_items, "contents")
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        Weibo comments JSON batch storage implementation
+        Args:
+            comment_items: comment item dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_json(comment_items, "comments")
+
+    async def store_creators(self, creators: List[Dict]):
+        """
+        Weibo creators JSON batch storage implementation
+        Args:
+            creators: creator dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_json(creators, "creators")
+
 
 class WeiboSqliteStoreImplement(AbstractStore):
     async def store_content(self, content_item: Dict):
@@ -282,7 +400,9 @@ class WeiboSqliteStoreImplement(AbstractStore):
             content_item["add_ts"] = utils.get_current_timestamp()
             await add_new_content(content_item)
         else:
-            await update_content_by_content_id(note_id, content_item=content_item)
+            changes = changed_fields(content_item, note_detail)
+            if changes:
+                await update_content_by_content_id(note_id, content_item=changes)
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -302,7 +422,9 @@ class WeiboSqliteStoreImplement(AbstractStore):
             comment_item["add_ts"] = utils.get_current_timestamp()
             await add_new_comment(comment_item)
         else:
-            await update_comment_by_comment_id(comment_id, comment_item=comment_item)
+            changes = changed_fields(comment_item, comment_detail)
+            if changes:
+                await update_comment_by_comment_id(comment_id, comment_item=changes)
 
     async def store_creator(self, creator: Dict):
         """
@@ -323,4 +445,142 @@ class WeiboSqliteStoreImplement(AbstractStore):
             creator["add_ts"] = utils.get_current_timestamp()
             await add_new_creator(creator)
         else:
-            await update_creator_by_user_id(user_id, creator)
+            changes = changed_fields(creator, user_detail)
+            if changes:
+                await update_creator_by_user_id(user_id, changes)
+
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        Weibo contents SQLite batch storage implementation
+        Args:
+            content_items: content item dict list
+
+        Returns:
+
+        """
+        await batch_add_or_update("weibo_note", "note_id", content_items)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        Weibo comments SQLite batch storage implementation
+        Args:
+            comment_items: comment item dict list
+
+        Returns:
+
+        """
+        await batch_add_or_update("weibo_note_comment", "comment_id", comment_items)
+
+    async def store_creators(self, creators: List[Dict]):
+        """
+        Weibo creators SQLite batch storage implementation
+        Args:
+            creators: creator dict list
+
+        Returns:
+
+        """
+        await batch_add_or_update("weibo_creator", "user_id", creators)
+
+
+class WeiboParquetStoreImplement(AbstractStore):
+    parquet_store_path: str = "data/weibo/parquet"
+    file_count: int = calculate_number_of_files(parquet_store_path)
+    # 存储类型 -> 对应的数据表，parquet 文件的列和类型与数据表一致
+    store_tables = {
+        "contents": "weibo_note",
+        "comments": "weibo_note_comment",
+        "creators": "weibo_creator",
+    }
+
+    def make_save_file_name(self, store_type: str) -> str:
+        """
+        make save file name by store type
+        Args:
+            store_type: contents or comments
+
+        Returns: eg: data/weibo/parquet/1_search_comments_20240114.parquet ...
+
+        """
+        return f"{self.parquet_store_path}/{self.file_count}_{crawler_type_var.get()}_{store_type}_{utils.get_current_date()}.parquet"
+
+    async def save_items_to_parquet(self, save_items: List[Dict], store_type: str):
+        """
+        Save a batch of items through the parquet writer of the output file, rows are written in row groups
+        Args:
+            save_items: save content dict list
+            store_type: Save type contains content and comments（contents | comments）
+
+        Returns: no returns
+
+        """
+        if not save_items:
+            return
+        writer = parquet_writer.get_parquet_writer(self.make_save_file_name(store_type=store_type), self.store_tables[store_type])
+        await writer.write_rows(save_items)
+
+    async def store_content(self, content_item: Dict):
+        """
+        Weibo content Parquet storage implementation
+        Args:
+            content_item: content item dict
+
+        Returns:
+
+        """
+        await self.save_items_to_parquet([content_item], "contents")
+
+    async def store_comment(self, comment_item: Dict):
+        """
+        Weibo comment Parquet storage implementation
+        Args:
+            comment_item: comment item dict
+
+        Returns:
+
+        """
+        await self.save_items_to_parquet([comment_item], "comments")
+
+    async def store_creator(self, creator: Dict):
+        """
+        Weibo creator Parquet storage implementation
+        Args:
+            creator: creator dict
+
+        Returns:
+
+        """
+        await self.save_items_to_parquet([creator], "creators")
+
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        Weibo contents Parquet batch storage implementation
+        Args:
+            content_items: content item dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_parquet(content_items, "contents")
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        Weibo comments Parquet batch storage implementation
+        Args:
+            comment_items: comment item dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_parquet(comment_items, "comments")
+
+    async def store_creators(self, creators: List[Dict]):
+        """
+        Weibo creators Parquet batch storage implementation
+        Args:
+            creators: creator dict list
+
+        Returns:
+
+        """
+        await self.save_items_to_parquet(creators, "creators")
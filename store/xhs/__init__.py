@@ -15,6 +15,9 @@
 from typing import List
 
 import config
+from model.m_xiaohongshu import (XhsCreatorRecord, XhsNoteCommentRecord,
+                                  XhsNoteRecord)
+from store import get_store
 from var import source_keyword_var
 
 from . import xhs_store_impl
@@ -28,14 +31,15 @@ class XhsStoreFactory:
         "db": XhsDbStoreImplement,
         "json": XhsJsonStoreImplement,
         "sqlite": XhsSqliteStoreImplement,
+        "parquet": XhsParquetStoreImplement,
     }
 
     @staticmethod
     def create_store() -> AbstractStore:
         store_class = XhsStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[XhsStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite ...")
-        return store_class()
+            raise ValueError("[XhsStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or parquet ...")
+        return get_store("xhs", store_class)
 
 
 def get_video_url_arr(note_item: Dict) -> List:
@@ -86,30 +90,30 @@ async def update_xhs_note(note_item: Dict):
 
     video_url = ','.join(get_video_url_arr(note_item))
 
-    local_db_item = {
-        "note_id": note_item.get("note_id"),  # 帖子id
-        "type": note_item.get("type"),  # 帖子类型
-        "title": note_item.get("title") or note_item.get("desc", "")[:255],  # 帖子标题
-        "desc": note_item.get("desc", ""),  # 帖子描述
-        "video_url": video_url,  # 帖子视频url
-        "time": note_item.get("time"),  # 帖子发布时间
-        "last_update_time": note_item.get("last_update_time", 0),  # 帖子最后更新时间
-        "user_id": user_info.get("user_id"),  # 用户id
-        "nickname": user_info.get("nickname"),  # 用户昵称
-        "avatar": user_info.get("avatar"),  # 用户头像
-        "liked_count": interact_info.get("liked_count"),  # 点赞数
-        "collected_count": interact_info.get("collected_count"),  # 收藏数
-        "comment_count": interact_info.get("comment_count"),  # 评论数
-        "share_count": interact_info.get("share_count"),  # 分享数
-        "ip_location": note_item.get("ip_location", ""),  # ip地址
-        "image_list": ','.join([img.get('url', '') for img in image_list]),  # 图片url
-        "tag_list": ','.join([tag.get('name', '') for tag in tag_list if tag.get('type') == 'topic']),  # 标签
-        "last_modify_ts": utils.get_current_timestamp(),  # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
-        "note_url": f"https://www.xiaohongshu.com/explore/{note_id}?xsec_token={note_item.get('xsec_token')}&xsec_source=pc_search",  # 帖子url
-        "source_keyword": source_keyword_var.get(),  # 搜索关键词
-        "xsec_token": note_item.get("xsec_token"),  # xsec_token
-    }
-    utils.logger.info(f"[store.xhs.update_xhs_note] xhs note: {local_db_item}")
+    local_db_item = XhsNoteRecord(
+        note_id=note_item.get("note_id"),  # 帖子id
+        type=note_item.get("type"),  # 帖子类型
+        title=note_item.get("title") or note_item.get("desc", "")[:255],  # 帖子标题
+        desc=note_item.get("desc", ""),  # 帖子描述
+        video_url=video_url,  # 帖子视频url
+        time=note_item.get("time"),  # 帖子发布时间
+        last_update_time=note_item.get("last_update_time", 0),  # 帖子最后更新时间
+        user_id=user_info.get("user_id"),  # 用户id
+        nickname=user_info.get("nickname"),  # 用户昵称
+        avatar=user_info.get("avatar"),  # 用户头像
+        liked_count=interact_info.get("liked_count"),  # 点赞数
+        collected_count=interact_info.get("collected_count"),  # 收藏数
+        comment_count=interact_info.get("comment_count"),  # 评论数
+        share_count=interact_info.get("share_count"),  # 分享数
+        ip_location=note_item.get("ip_location", ""),  # ip地址
+        image_list=','.join([img.get('url', '') for img in image_list]),  # 图片url
+        tag_list=','.join([tag.get('name', '') for tag in tag_list if tag.get('type') == 'topic']),  # 标签
+        last_modify_ts=utils.get_current_timestamp(),  # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
+        note_url=f"https://www.xiaohongshu.com/explore/{note_id}?xsec_token={note_item.get('xsec_token')}&xsec_source=pc_search",  # 帖子url
+        source_keyword=source_keyword_var.get(),  # 搜索关键词
+        xsec_token=note_item.get("xsec_token"),  # xsec_token
+    )
+    utils.logger.debug("[store.xhs.update_xhs_note] xhs note: %s", utils.lazy_payload(local_db_item))
     await XhsStoreFactory.create_store().store_content(local_db_item)
 
 
@@ -125,8 +129,8 @@ async def batch_update_xhs_note_comments(note_id: str, comments: List[Dict]):
     """
     if not comments:
         return
-    for comment_item in comments:
-        await update_xhs_note_comment(note_id, comment_item)
+    comment_items = [_build_xhs_note_comment(note_id, comment_item) for comment_item in comments]
+    await XhsStoreFactory.create_store().store_comments(comment_items)
 
 
 async def update_xhs_note_comment(note_id: str, comment_item: Dict):
@@ -138,28 +142,39 @@ async def update_xhs_note_comment(note_id: str, comment_item: Dict):
 
     Returns:
 
+    """
+    local_db_item = _build_xhs_note_comment(note_id, comment_item)
+    await XhsStoreFactory.create_store().store_comment(local_db_item)
+
+
+def _build_xhs_note_comment(note_id: str, comment_item: Dict) -> XhsNoteCommentRecord:
+    """
+    把笔记评论转换成存储记录
     """
     user_info = comment_item.get("user_info", {})
     comment_id = comment_item.get("id")
     comment_pictures = [item.get("url_default", "") for item in comment_item.get("pictures", [])]
     target_comment = comment_item.get("target_comment", {})
-    local_db_item = {
-        "comment_id": comment_id,  # 评论id
-        "create_time": comment_item.get("create_time"),  # 评论时间
-        "ip_location": comment_item.get("ip_location"),  # ip地址
-        "note_id": note_id,  # 帖子id
-        "content": comment_item.get("content"),  # 评论内容
-        "user_id": user_info.get("user_id"),  # 用户id
-        "nickname": user_info.get("nickname"),  # 用户昵称
-        "avatar": user_info.get("image"),  # 用户头像
-        "sub_comment_count": comment_item.get("sub_comment_count", 0),  # 子评论数
-        "pictures": ",".join(comment_pictures),  # 评论图片
-        "parent_comment_id": target_comment.get("id", 0),  # 父评论id
-        "last_modify_ts": utils.get_current_timestamp(),  # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
-        "like_count": comment_item.get("like_count", 0),
-    }
-    utils.logger.info(f"[store.xhs.update_xhs_note_comment] xhs note comment:{local_db_item}")
-    await XhsStoreFactory.create_store().store_comment(local_db_item)
+    # 二级评论由 client 按所属的一级评论补上 root_comment_id
+    root_comment_id = comment_item.get("root_comment_id") or comment_id
+    local_db_item = XhsNoteCommentRecord(
+        comment_id=comment_id,  # 评论id
+        create_time=comment_item.get("create_time"),  # 评论时间
+        ip_location=comment_item.get("ip_location"),  # ip地址
+        note_id=note_id,  # 帖子id
+        content=comment_item.get("content"),  # 评论内容
+        user_id=user_info.get("user_id"),  # 用户id
+        nickname=user_info.get("nickname"),  # 用户昵称
+        avatar=user_info.get("image"),  # 用户头像
+        sub_comment_count=comment_item.get("sub_comment_count", 0),  # 子评论数
+        pictures=",".join(comment_pictures),  # 评论图片
+        parent_comment_id=target_comment.get("id") or (root_comment_id if root_comment_id != comment_id else 0),  # 父评论id
+        root_comment_id=root_comment_id,  # 根评论id
+        last_modify_ts=utils.get_current_timestamp(),  # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
+        like_count=comment_item.get("like_count", 0),
+    )
+    utils.logger.debug("[store.xhs.update_xhs_note_comment] xhs note comment:%s", utils.lazy_payload(local_db_item))
+    return local_db_item
 
 
 async def save_creator(user_id: str, creator: Dict):
@@ -193,21 +208,21 @@ async def save_creator(user_id: str, creator: Dict):
         else:
             return None
 
-    local_db_item = {
-        'user_id': user_id,  # 用户id
-        'nickname': user_info.get('nickname'),  # 昵称
-        'gender': get_gender(user_info.get('gender')),  # 性别
-        'avatar': user_info.get('images'),  # 头像
-        'desc': user_info.get('desc'),  # 个人描述
-        'ip_location': user_info.get('ipLocation'),  # ip地址
-        'follows': follows,  # 关注数
-        'fans': fans,  # 粉丝数
-        'interaction': interaction,  # 互动数
-        'tag_list': json.dumps({tag.get('tagType'): tag.get('name')
+    local_db_item = XhsCreatorRecord(
+        user_id=user_id,  # 用户id
+        nickname=user_info.get('nickname'),  # 昵称
+        gender=get_gender(user_info.get('gender')),  # 性别
+        avatar=user_info.get('images'),  # 头像
+        desc=user_info.get('desc'),  # 个人描述
+        ip_location=user_info.get('ipLocation'),  # ip地址
+        follows=follows,  # 关注数
+        fans=fans,  # 粉丝数
+        interaction=interaction,  # 互动数
+        tag_list=json.dumps({tag.get('tagType'): tag.get('name')
                                 for tag in creator.get('tags')}, ensure_ascii=False),  # 标签
-        "last_modify_ts": utils.get_current_timestamp(),  # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
-    }
-    utils.logger.info(f"[store.xhs.save_creator] creator:{local_db_item}")
+        last_modify_ts=utils.get_current_timestamp(),  # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
+    )
+    utils.logger.debug("[store.xhs.save_creator] creator:%s", utils.lazy_payload(local_db_item))
     await XhsStoreFactory.create_store().store_creator(local_db_item)
 
 
@@ -10,7 +10,7 @@
 
 
 # -*- coding: utf-8 -*-
-from typing import List
+from typing import Dict, List
 
 import config
 from base.base_crawler import AbstractStore
@@ -18,7 +18,9 @@ from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
 from store.zhihu.zhihu_store_impl import (ZhihuCsvStoreImplement,
                                           ZhihuDbStoreImplement,
                                           ZhihuJsonStoreImplement,
+                                          ZhihuParquetStoreImplement,
                                           ZhihuSqliteStoreImplement)
+from store import get_store
 from tools import utils
 from var import source_keyword_var
 
@@ -28,15 +30,16 @@ class ZhihuStoreFactory:
         "csv": ZhihuCsvStoreImplement,
         "db": ZhihuDbStoreImplement,
         "json": ZhihuJsonStoreImplement,
-        "sqlite": ZhihuSqliteStoreImplement
+        "sqlite": ZhihuSqliteStoreImplement,
+        "parquet": ZhihuParquetStoreImplement,
     }
 
     @staticmethod
     def create_store() -> AbstractStore:
         store_class = ZhihuStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[ZhihuStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite ...")
-        return store_class()
+            raise ValueError("[ZhihuStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or parquet ...")
+        return get_store("zhihu", store_class)
 
 async def batch_update_zhihu_contents(contents: List[ZhihuContent]):
     """
@@ -50,8 +53,8 @@ async def batch_update_zhihu_contents(contents: List[ZhihuContent]):
     if not contents:
         return
 
-    for content_item in contents:
-        await update_zhihu_content(content_item)
+    content_items = [_build_zhihu_content(content_item) for content_item in contents]
+    await ZhihuStoreFactory.create_store().store_contents(content_items)
 
 async def update_zhihu_content(content_item: ZhihuContent):
     """
@@ -61,12 +64,20 @@ async def update_zhihu_content(content_item: ZhihuContent):
 
     Returns:
 
+    """
+    local_db_item = _build_zhihu_content(content_item)
+    await ZhihuStoreFactory.create_store().store_content(local_db_item)
+
+
+def _build_zhihu_content(content_item: ZhihuContent) -> Dict:
+    """
+    把知乎内容转换成存储记录
     """
     content_item.source_keyword = source_keyword_var.get()
     local_db_item = content_item.model_dump()
     local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.zhihu.update_zhihu_content] zhihu content: {local_db_item}")
-    await ZhihuStoreFactory.create_store().store_content(local_db_item)
+    utils.logger.debug("[store.zhihu.update_zhihu_content] zhihu content: %s", utils.lazy_payload(local_db_item))
+    return local_db_item
 
 
 
@@ -82,8 +93,8 @@ async def batch_update_zhihu_note_comments(comments: List[ZhihuComment]):
     if not comments:
         return
     
-    for comment_item in comments:
-        await update_zhihu_content_comment(comment_item)
+    comment_items = [_build_zhihu_content_comment(comment_item) for comment_item in comments]
+    await ZhihuStoreFactory.create_store().store_comments(comment_items)
 
 
 async def update_zhihu_content_comment(comment_item: ZhihuComment):
@@ -95,12 +106,21 @@ async def update_zhihu_content_comment(comment_item: ZhihuComment):
     Returns:
 
     """
-    local_db_item = comment_item.model_dump()
-    local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.zhihu.update_zhihu_note_comment] zhihu content comment:{local_db_item}")
+    local_db_item = _build_zhihu_content_comment(comment_item)
     await ZhihuStoreFactory.create_store().store_comment(local_db_item)
 
 
+def _build_zhihu_content_comment(comment_item: ZhihuComment) -> Dict:
+    """
+    把知乎评论转换成存储记录
+    """
+    local_db_item = comment_item.model_dump()
+    local_db_item.update({"root_comment_id": comment_item.root_comment_id or comment_item.comment_id,
+                          "last_modify_ts": utils.get_current_timestamp()})
+    utils.logger.debug("[store.zhihu.update_zhihu_note_comment] zhihu content comment:%s", utils.lazy_payload(local_db_item))
+    return local_db_item
+
+
 async def save_creator(creator: ZhihuCreator):
     """
     保存知乎创作者信息
@@ -0,0 +1,311 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 离线端到端压测：各平台爬虫的 search 流程跑在本地 mock 服务上，输出 notes/s、comments/s、p95 延迟与峰值内存
+#
+# 用法（在项目根目录执行）：
+#   python -m test.benchmark --platforms xhs,dy,bili --notes 100 --comments 20 --latency-ms 30 --error-rate 0.01
+#
+# 浏览器登录这一步被跳过：爬虫的 API 客户端直接指向 mock 服务，签名需要的页面池由 FakePage 组成，
+# 除此之外签名、请求、解析、存储走的都是正式代码。默认把 mock 服务放在独立子进程里，避免和被测代码抢 GIL。
+import argparse
+import asyncio
+import resource
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import config
+import db
+from main import CrawlerFactory
+from media_platform.bilibili.client import BilibiliClient
+from media_platform.douyin.client import DouYinClient
+from media_platform.kuaishou.client import KuaiShouClient
+from media_platform.tieba.client import BaiduTieBaClient
+from media_platform.weibo.client import WeiboClient
+from media_platform.xhs.client import XiaoHongShuClient
+from media_platform.zhihu.client import ZhiHuClient
+from store import csv_writer, parquet_writer, spool
+from tools import metrics, tracing
+from tools.page_pool import BrowserPagePool
+from var import crawler_type_var
+
+from test.mock_server import PLATFORMS
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
+
+# 签名时从 localStorage 读取的字段：xhs 的 b1、抖音的 msToken、b 站的 wbi key
+MOCK_LOCAL_STORAGE = {
+    "b1": "mock_b1",
+    "xmst": "mock_ms_token",
+    "wbi_img_urls": "https://i0.hdslb.com/bfs/wbi/7cd084941338484aae1ad9425b84077c.png-"
+                    "https://i0.hdslb.com/bfs/wbi/4932caff0ff746eab6f01bf08b70ac45.png",
+}
+
+# window._webmsxyw 返回的 X-s 格式，长度和真实签名接近（help.mrc 要求参与计算的串至少 57 个字符）
+MOCK_XHS_X_S = ("XYW_eyJzaWduU3ZuIjogIjUxIiwgInNpZ25UeXBlIjogIngxIiwgImFwcElkIjogInhocy1wYy13ZWIiLCAic2lnblZlcnNpb24iOiAiMSIs"
+                "ICJwYXlsb2FkIjogIm1vY2sifQ==")
+
+
+class FakePage:
+    """
+    代替 playwright 的 Page，只实现 API 客户端签名和页面池会调用到的 evaluate / goto / is_closed
+    """
+
+    def __init__(self, user_agent: str = USER_AGENT):
+        self.user_agent = user_agent
+
+    async def evaluate(self, expression: str, arg=None):
+        if "_webmsxyw" in expression:
+            return {"X-s": MOCK_XHS_X_S, "X-t": int(time.time() * 1000)}
+        if "localStorage" in expression:
+            return dict(MOCK_LOCAL_STORAGE)
+        if "userAgent" in expression:
+            return self.user_agent
+        return None
+
+    async def goto(self, url: str, **kwargs):
+        return None
+
+    def is_closed(self) -> bool:
+        return False
+
+
+@dataclass
+class BenchmarkResult:
+    platform: str
+    notes: int = 0
+    comments: int = 0
+    requests: int = 0
+    failed_requests: int = 0
+    elapsed: float = 0.0
+    p95_latency: float = 0.0
+    peak_rss_mb: float = 0.0
+    error: str = ""
+
+    @property
+    def notes_per_sec(self) -> float:
+        return self.notes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def comments_per_sec(self) -> float:
+        return self.comments / self.elapsed if self.elapsed else 0.0
+
+
+def attach_mock_client(platform: str, crawler, platform_url: str):
+    """
+    创建指向 mock 服务的 API 客户端并挂到爬虫实例上，替代 crawler.start() 里的浏览器登录流程
+    Args:
+        platform: 平台
+        crawler: 爬虫实例
+        platform_url: mock 服务上该平台的地址前缀
+
+    Returns:
+
+    """
+    page_pool = BrowserPagePool([FakePage() for _ in range(max(config.BROWSER_PAGE_POOL_SIZE, 1))])
+    headers = {"User-Agent": USER_AGENT, "Cookie": "a1=mock_a1; d_c0=mock_d_c0", "Origin": "https://mock.local",
+               "Referer": "https://mock.local/", "Content-Type": "application/json;charset=UTF-8"}
+    cookie_dict = {"a1": "mock_a1", "d_c0": "mock_d_c0"}
+    if platform == "xhs":
+        client = crawler.xhs_client = XiaoHongShuClient(headers=headers, page_pool=page_pool, cookie_dict=cookie_dict)
+        client._host = platform_url
+    elif platform == "dy":
+        client = crawler.dy_client = DouYinClient(headers=headers, page_pool=page_pool, cookie_dict=cookie_dict)
+        client._host = platform_url
+    elif platform == "ks":
+        client = crawler.ks_client = KuaiShouClient(headers=headers, page_pool=page_pool, cookie_dict=cookie_dict)
+        client._host = f"{platform_url}/graphql"
+    elif platform == "bili":
+        client = crawler.bili_client = BilibiliClient(headers=headers, page_pool=page_pool, cookie_dict=cookie_dict)
+        client._host = platform_url
+    elif platform == "wb":
+        client = crawler.wb_client = WeiboClient(headers=headers, page_pool=page_pool, cookie_dict=cookie_dict)
+        client._host = platform_url
+    elif platform == "tieba":
+        client = crawler.tieba_client = BaiduTieBaClient()
+        client._host = platform_url
+    elif platform == "zhihu":
+        client = crawler.zhihu_client = ZhiHuClient(headers={**headers, "cookie": headers["Cookie"]}, playwright_page=page_pool.primary,
+                                                    cookie_dict=cookie_dict)
+        client._host = client._zhuanlan_host = platform_url
+    else:
+        raise ValueError(f"[benchmark.attach_mock_client] unknown platform: {platform}")
+    return client
+
+
+def apply_benchmark_config(notes: int, comments: int, concurrency: int, sub_comments: bool, save_option: str,
+                           keywords: int = 1, keyword_concurrency: int = 1) -> None:
+    """
+    压测只跑关键词搜索，关闭媒体下载和词云，爬取数量由参数控制（CRAWLER_MAX_NOTES_COUNT 按单个关键词计算）
+    """
+    config.CRAWLER_TYPE = "search"
+    config.KEYWORDS = ",".join(f"benchmark{i}" for i in range(keywords))
+    config.KEYWORD_CONCURRENCY_NUM = keyword_concurrency
+    config.START_PAGE = 1
+    config.CRAWLER_MAX_NOTES_COUNT = notes
+    config.CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES = comments
+    config.MAX_CONCURRENCY_NUM = concurrency
+    config.ENABLE_GET_COMMENTS = True
+    config.ENABLE_GET_SUB_COMMENTS = sub_comments
+    config.ENABLE_GET_MEIDAS = False
+    config.ENABLE_GET_WORDCLOUD = False
+    config.ENABLE_IP_PROXY = False
+    config.SAVE_DATA_OPTION = save_option
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux 下单位是 KB，macOS 下是字节
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+async def run_platform(platform: str, platform_url: str) -> BenchmarkResult:
+    """
+    在 mock 服务上跑一遍某个平台的关键词搜索流程，采集吞吐、延迟与内存数据
+    Args:
+        platform: 平台
+        platform_url: mock 服务上该平台的地址前缀
+
+    Returns:
+
+    """
+    result = BenchmarkResult(platform=platform)
+    crawler = CrawlerFactory.create_crawler(platform)
+    attach_mock_client(platform, crawler, platform_url)
+    crawler_type_var.set(config.CRAWLER_TYPE)
+
+    notes_before = metrics.STORE_ITEMS_TOTAL.total(platform=platform, item_type="content", outcome="ok")
+    comments_before = metrics.STORE_ITEMS_TOTAL.total(platform=platform, item_type="comment", outcome="ok")
+    requests_before = metrics.HTTP_REQUESTS_TOTAL.total(platform=platform)
+    failed_before = metrics.HTTP_REQUESTS_TOTAL.total(platform=platform) - metrics.HTTP_REQUESTS_TOTAL.total(platform=platform, outcome="ok")
+
+    # 每个平台单独统计一份分阶段耗时，p95 取 network 阶段
+    tracing.recorder = tracing.TraceRecorder(enabled=True)
+    start = time.perf_counter()
+    try:
+        await crawler.search()
+        await csv_writer.close_csv_writers()
+        await parquet_writer.close_parquet_writers()
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.elapsed = time.perf_counter() - start
+
+    result.notes = int(metrics.STORE_ITEMS_TOTAL.total(platform=platform, item_type="content", outcome="ok") - notes_before)
+    result.comments = int(metrics.STORE_ITEMS_TOTAL.total(platform=platform, item_type="comment", outcome="ok") - comments_before)
+    result.requests = int(metrics.HTTP_REQUESTS_TOTAL.total(platform=platform) - requests_before)
+    failed_after = metrics.HTTP_REQUESTS_TOTAL.total(platform=platform) - metrics.HTTP_REQUESTS_TOTAL.total(platform=platform, outcome="ok")
+    result.failed_requests = int(failed_after - failed_before)
+    network = sorted(tracing.recorder.stage_durations.get("network", []))
+    if network:
+        result.p95_latency = network[min(len(network) - 1, int(round(0.95 * (len(network) - 1))))]
+    result.peak_rss_mb = _peak_rss_mb()
+    return result
+
+
+def format_report(results: List[BenchmarkResult]) -> str:
+    lines = [f"{'platform':<8} {'notes':>6} {'comments':>9} {'requests':>9} {'failed':>7} {'elapsed(s)':>11} "
+             f"{'notes/s':>9} {'comments/s':>11} {'p95(ms)':>9} {'peak_rss(MB)':>13}  error"]
+    for r in results:
+        lines.append(f"{r.platform:<8} {r.notes:>6} {r.comments:>9} {r.requests:>9} {r.failed_requests:>7} {r.elapsed:>11.2f} "
+                     f"{r.notes_per_sec:>9.1f} {r.comments_per_sec:>11.1f} {r.p95_latency * 1000:>9.1f} {r.peak_rss_mb:>13.1f}  {r.error}")
+    return "\n".join(lines)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def spawn_mock_server(args: argparse.Namespace) -> (subprocess.Popen, str):
+    """
+    在子进程里启动 mock 服务，等端口可连接后返回
+    """
+    port = _free_port()
+    cmd = [sys.executable, "-m", "test.mock_server", "--port", str(port),
+           "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms), "--error-rate", str(args.error_rate),
+           "--comments-per-note", str(args.comments_per_note), "--sub-comments-per-comment", str(args.sub_comments_per_comment)]
+    if args.seed is not None:
+        cmd += ["--seed", str(args.seed)]
+    proc = subprocess.Popen(cmd)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"[benchmark.spawn_mock_server] mock server exited with code {proc.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("[benchmark.spawn_mock_server] mock server did not start in 30s")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="MediaCrawler offline end-to-end benchmark")
+    parser.add_argument("--platforms", default=",".join(PLATFORMS), help="comma separated platforms, default all")
+    parser.add_argument("--notes", type=int, default=40, help="CRAWLER_MAX_NOTES_COUNT for each platform")
+    parser.add_argument("--comments", type=int, default=20, help="CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES")
+    parser.add_argument("--comments-per-note", type=int, default=20, help="level one comments the mock server holds per note")
+    parser.add_argument("--sub-comments-per-comment", type=int, default=0, help="level two comments per comment, enables ENABLE_GET_SUB_COMMENTS")
+    parser.add_argument("--keywords", type=int, default=1, help="number of search keywords")
+    parser.add_argument("--keyword-concurrency", type=int, default=1, help="KEYWORD_CONCURRENCY_NUM")
+    parser.add_argument("--concurrency", type=int, default=config.MAX_CONCURRENCY_NUM, help="MAX_CONCURRENCY_NUM")
+    parser.add_argument("--latency-ms", type=float, default=20, help="fixed latency injected by the mock server")
+    parser.add_argument("--jitter-ms", type=float, default=10, help="random latency added on top of --latency-ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of an injected error response")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the error injection")
+    parser.add_argument("--save-option", default="csv", choices=["csv", "db", "json", "sqlite", "parquet"], help="SAVE_DATA_OPTION")
+    parser.add_argument("--keep-sleep", action="store_true", help="keep the crawl interval sleeps instead of skipping them")
+    parser.add_argument("--server-url", default="", help="use an already running mock server instead of spawning one")
+    return parser.parse_args(argv)
+
+
+async def run_benchmark(args: argparse.Namespace, base_url: str) -> List[BenchmarkResult]:
+    apply_benchmark_config(args.notes, args.comments, args.concurrency, args.sub_comments_per_comment > 0, args.save_option,
+                           args.keywords, args.keyword_concurrency)
+    if not args.keep_sleep:
+        tracing.sleep_scale = 0
+    if config.SAVE_DATA_OPTION in ["db", "sqlite"]:
+        await db.init_db()
+    results: Dict[str, BenchmarkResult] = {}
+    try:
+        for platform in args.platforms.split(","):
+            results[platform] = await run_platform(platform, f"{base_url}/{platform}")
+    finally:
+        await spool.close_spool()
+        if config.SAVE_DATA_OPTION in ["db", "sqlite"]:
+            await db.close()
+    return list(results.values())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    proc = None
+    base_url = args.server_url.rstrip("/")
+    if not base_url:
+        proc, base_url = spawn_mock_server(args)
+    try:
+        results = asyncio.get_event_loop().run_until_complete(run_benchmark(args, base_url))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=10)
+    print(format_report(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : mock 平台接口的响应数据，字段结构按各平台真实接口抓包结果裁剪，只保留爬虫和存储层会读取的字段
+import time
+from typing import Dict, List, Optional
+
+# 帖子 id 起始值，id = NOTE_ID_BASE + 页码 * 1000 + 页内序号，保证不同页之间不重复
+NOTE_ID_BASE = 7_400_000_000
+# 评论 id 在帖子 id 基础上扩展，便于从评论 id 反查所属帖子
+COMMENT_ID_FACTOR = 100_000
+
+MOCK_TEXT = "这是一条用于本地压测的模拟内容，包含一些常见的中文字符和标点符号，长度接近真实帖子的描述。"
+MOCK_AVATAR = "https://mock.media-crawler.local/avatar.jpg"
+MOCK_IMAGE = "https://mock.media-crawler.local/image.webp"
+MOCK_VIDEO = "https://mock.media-crawler.local/video.mp4"
+
+
+def note_id_of(page: int, index: int) -> int:
+    return NOTE_ID_BASE + page * 1000 + index
+
+
+def comment_id_of(note_id: int, seq: int) -> int:
+    return note_id * COMMENT_ID_FACTOR + seq
+
+
+def sub_comment_id_of(comment_id: int, seq: int) -> int:
+    return comment_id * 1000 + seq
+
+
+def page_window(total: int, page_size: int, page: int) -> range:
+    """
+    第 page 页（从 0 开始）的序号区间，超出总数时返回空区间
+    """
+    start = page * page_size
+    return range(start, min(start + page_size, total))
+
+
+def _now() -> int:
+    return int(time.time())
+
+
+def _rfc2822(ts: int) -> str:
+    return time.strftime("%a %b %d %H:%M:%S +0800 %Y", time.localtime(ts))
+
+
+class PayloadBuilder:
+    """
+    按数据规模生成各平台的接口响应
+    搜索结果是无限翻页的（真实平台的搜索结果也远超爬取上限），由爬虫的 CRAWLER_MAX_NOTES_COUNT 控制数量；
+    每个帖子的一级评论数、每条一级评论的二级评论数则由这里的参数决定
+    """
+
+    def __init__(self, page_size: int = 20, comments_per_note: int = 20, comment_page_size: int = 10,
+                 sub_comments_per_comment: int = 0, sub_comment_page_size: int = 10):
+        self.page_size = page_size
+        self.comments_per_note = comments_per_note
+        self.comment_page_size = comment_page_size
+        self.sub_comments_per_comment = sub_comments_per_comment
+        self.sub_comment_page_size = sub_comment_page_size
+
+    def note_ids(self, page: int, page_size: Optional[int] = None) -> List[int]:
+        return [note_id_of(page, i) for i in range(page_size or self.page_size)]
+
+    def comment_window(self, page: int) -> range:
+        return page_window(self.comments_per_note, self.comment_page_size, page)
+
+    def sub_comment_window(self, page: int) -> range:
+        return page_window(self.sub_comments_per_comment, self.sub_comment_page_size, page)
+
+    def has_more_comments(self, page: int) -> bool:
+        return (page + 1) * self.comment_page_size < self.comments_per_note
+
+    def has_more_sub_comments(self, page: int) -> bool:
+        return (page + 1) * self.sub_comment_page_size < self.sub_comments_per_comment
+
+    # ---------------------------------------------------------------- xhs
+    def xhs_search(self, page: int) -> Dict:
+        items = [{"id": str(note_id), "model_type": "note", "xsec_token": f"XYtoken{note_id}"} for note_id in self.note_ids(page)]
+        return {"success": True, "code": 0, "data": {"has_more": True, "items": items}}
+
+    def xhs_note_detail(self, note_id: str) -> Dict:
+        note_card = {
+            "note_id": note_id,
+            "type": "normal",
+            "title": f"mock xhs note {note_id}",
+            "desc": MOCK_TEXT,
+            "time": _now() * 1000,
+            "last_update_time": _now() * 1000,
+            "ip_location": "上海",
+            "user": {"user_id": f"user{note_id}", "nickname": "mock_user", "avatar": MOCK_AVATAR},
+            "interact_info": {"liked_count": "1024", "collected_count": "256", "comment_count": str(self.comments_per_note), "share_count": "64"},
+            "image_list": [{"url_default": MOCK_IMAGE}, {"url_default": MOCK_IMAGE}],
+            "tag_list": [{"name": "编程", "type": "topic"}],
+        }
+        return {"success": True, "code": 0, "data": {"items": [{"id": note_id, "note_card": note_card}]}}
+
+    def _xhs_comment(self, note_id: str, comment_id: int, target_id: Optional[int] = None) -> Dict:
+        comment = {
+            "id": str(comment_id),
+            "note_id": note_id,
+            "content": MOCK_TEXT,
+            "create_time": _now() * 1000,
+            "ip_location": "北京",
+            "like_count": "8",
+            "user_info": {"user_id": f"user{comment_id}", "nickname": "mock_commenter", "image": MOCK_AVATAR},
+            "sub_comment_count": str(self.sub_comments_per_comment),
+            "pictures": [],
+        }
+        if target_id is not None:
+            comment["target_comment"] = {"id": str(target_id)}
+        else:
+            comment.update({"sub_comments": [], "sub_comment_has_more": self.sub_comments_per_comment > 0, "sub_comment_cursor": ""})
+        return comment
+
+    def xhs_comments(self, note_id: str, page: int) -> Dict:
+        comments = [self._xhs_comment(note_id, comment_id_of(int(note_id), i)) for i in self.comment_window(page)]
+        return {"success": True, "code": 0, "data": {"comments": comments, "cursor": str(page + 1), "has_more": self.has_more_comments(page)}}
+
+    def xhs_sub_comments(self, note_id: str, root_comment_id: str, page: int) -> Dict:
+        comments = [self._xhs_comment(note_id, sub_comment_id_of(int(root_comment_id), i), int(root_comment_id))
+                    for i in self.sub_comment_window(page)]
+        return {"success": True, "code": 0, "data": {"comments": comments, "cursor": str(page + 1), "has_more": self.has_more_sub_comments(page)}}
+
+    # ---------------------------------------------------------------- douyin
+    def dy_search(self, offset: int) -> Dict:
+        # 请求参数里 count 固定为 15，但抖音实际每页返回 10 条左右，爬虫也是按 10 条一页翻的
+        data = [{"type": 1, "aweme_info": self._dy_aweme(NOTE_ID_BASE + offset + i)} for i in range(10)]
+        return {"status_code": 0, "data": data, "has_more": 1, "cursor": offset + len(data), "extra": {"logid": f"mocklog{offset}"}}
+
+    @staticmethod
+    def _dy_aweme(aweme_id: int) -> Dict:
+        return {
+            "aweme_id": str(aweme_id),
+            "aweme_type": 0,
+            "desc": MOCK_TEXT,
+            "create_time": _now(),
+            "ip_label": "广东",
+            "author": {"uid": f"{aweme_id}1", "sec_uid": f"MS4wLjAB{aweme_id}", "short_id": str(aweme_id), "unique_id": "mock_author",
+                       "signature": "mock", "nickname": "mock_author", "avatar_thumb": {"url_list": [MOCK_AVATAR]}},
+            "statistics": {"digg_count": 1024, "collect_count": 256, "comment_count": 128, "share_count": 64},
+            "video": {"play_addr": {"url_list": [MOCK_VIDEO, MOCK_VIDEO]}, "origin_cover": {"url_list": [MOCK_IMAGE, MOCK_IMAGE]}},
+            "music": {"play_url": {"uri": MOCK_VIDEO}},
+        }
+
+    def _dy_comment(self, aweme_id: str, comment_id: int, reply_id: int = 0) -> Dict:
+        return {
+            "cid": str(comment_id),
+            "aweme_id": aweme_id,
+            "text": MOCK_TEXT,
+            "create_time": _now(),
+            "ip_label": "浙江",
+            "digg_count": 8,
+            "reply_id": str(reply_id),
+            "reply_comment_total": 0 if reply_id else self.sub_comments_per_comment,
+            "user": {"uid": f"{comment_id}1", "sec_uid": f"MS4wLjAB{comment_id}", "short_id": "1", "unique_id": "mock",
+                     "signature": "", "nickname": "mock_commenter", "avatar_thumb": {"url_list": [MOCK_AVATAR]}},
+        }
+
+    def dy_comments(self, aweme_id: str, cursor: int) -> Dict:
+        page = cursor // self.comment_page_size
+        comments = [self._dy_comment(aweme_id, comment_id_of(int(aweme_id), i)) for i in self.comment_window(page)]
+        return {"status_code": 0, "comments": comments, "cursor": cursor + len(comments), "has_more": int(self.has_more_comments(page))}
+
+    def dy_sub_comments(self, aweme_id: str, comment_id: str, cursor: int) -> Dict:
+        page = cursor // self.sub_comment_page_size
+        comments = [self._dy_comment(aweme_id, sub_comment_id_of(int(comment_id), i), int(comment_id)) for i in self.sub_comment_window(page)]
+        return {"status_code": 0, "comments": comments, "cursor": cursor + len(comments), "has_more": int(self.has_more_sub_comments(page))}
+
+    # ---------------------------------------------------------------- kuaishou
+    def ks_search(self, pcursor: str) -> Dict:
+        page = int(pcursor or 1)
+        feeds = []
+        for note_id in self.note_ids(page):
+            feeds.append({
+                "type": 1,
+                "author": {"id": f"3x{note_id}", "name": "mock_author", "headerUrl": MOCK_AVATAR},
+                "photo": {"id": f"3x{note_id}", "caption": MOCK_TEXT, "timestamp": _now() * 1000, "realLikeCount": 1024,
+                          "viewCount": "10万", "coverUrl": MOCK_IMAGE, "photoUrl": MOCK_VIDEO},
+            })
+        return {"data": {"visionSearchPhoto": {"result": 1, "feeds": feeds, "searchSessionId": "mock-session", "pcursor": str(page + 1)}}}
+
+    def _ks_comment(self, comment_id: int, is_root: bool = True) -> Dict:
+        comment = {
+            "commentId": str(comment_id),
+            "authorId": f"3x{comment_id}",
+            "authorName": "mock_commenter",
+            "headurl": MOCK_AVATAR,
+            "content": MOCK_TEXT,
+            "timestamp": _now() * 1000,
+            "subCommentCount": self.sub_comments_per_comment if is_root else 0,
+        }
+        if is_root:
+            comment.update({"subComments": [], "subCommentsPcursor": "" if self.sub_comments_per_comment else "no_more"})
+        return comment
+
+    def ks_comments(self, photo_id: str, pcursor: str) -> Dict:
+        page = int(pcursor or 0)
+        note_id = int(photo_id[2:])
+        comments = [self._ks_comment(comment_id_of(note_id, i)) for i in self.comment_window(page)]
+        next_cursor = str(page + 1) if self.has_more_comments(page) else "no_more"
+        return {"data": {"visionCommentList": {"pcursor": next_cursor, "rootComments": comments}}}
+
+    def ks_sub_comments(self, root_comment_id: str, pcursor: str) -> Dict:
+        page = int(pcursor or 0)
+        comments = [self._ks_comment(sub_comment_id_of(int(root_comment_id), i), is_root=False) for i in self.sub_comment_window(page)]
+        next_cursor = str(page + 1) if self.has_more_sub_comments(page) else "no_more"
+        return {"data": {"visionSubCommentList": {"pcursor": next_cursor, "subComments": comments}}}
+
+    # ---------------------------------------------------------------- bilibili
+    def bili_search(self, page: int, page_size: int) -> Dict:
+        result = [{"aid": aid, "bvid": f"BV{aid}", "title": "mock"} for aid in self.note_ids(page, page_size)]
+        return {"code": 0, "message": "0", "data": {"page": page, "pagesize": page_size, "result": result}}
+
+    @staticmethod
+    def bili_video_detail(aid: int) -> Dict:
+        view = {
+            "aid": aid,
+            "bvid": f"BV{aid}",
+            "cid": aid + 1,
+            "title": f"mock bilibili video {aid}",
+            "desc": MOCK_TEXT,
+            "pubdate": _now(),
+            "pic": MOCK_IMAGE,
+            "owner": {"mid": aid % 100000, "name": "mock_up", "face": MOCK_AVATAR},
+            "stat": {"like": 1024, "dislike": 0, "view": 65536, "favorite": 256, "share": 64, "coin": 32, "danmaku": 16, "reply": 128},
+        }
+        card = {
+            "card": {"mid": str(aid % 100000), "name": "mock_up", "sex": "保密", "sign": "mock", "face": MOCK_AVATAR, "fans": 4096,
+                     "level_info": {"current_level": 6}, "official_verify": {"type": -1}},
+            "like_num": 8192,
+        }
+        return {"code": 0, "message": "0", "data": {"View": view, "Card": card}}
+
+    def _bili_reply(self, video_id: int, rpid: int, parent: int = 0) -> Dict:
+        return {
+            "rpid": rpid,
+            "oid": video_id,
+            "root": parent,
+            "parent": parent,
+            "ctime": _now(),
+            "like": 8,
+            "rcount": 0 if parent else self.sub_comments_per_comment,
+            "content": {"message": MOCK_TEXT},
+            "member": {"mid": str(rpid % 100000), "uname": "mock_commenter", "sex": "保密", "sign": "", "avatar": MOCK_AVATAR},
+        }
+
+    def bili_comments(self, video_id: int, next_page: int) -> Dict:
+        page = max(next_page - 1, 0)
+        replies = [self._bili_reply(video_id, comment_id_of(video_id, i)) for i in self.comment_window(page)]
+        is_end = not self.has_more_comments(page)
+        return {"code": 0, "message": "0", "data": {"cursor": {"is_end": is_end, "next": page + 2}, "replies": replies}}
+
+    def bili_sub_comments(self, video_id: int, root: int, pn: int, ps: int) -> Dict:
+        replies = [self._bili_reply(video_id, sub_comment_id_of(root, i), root)
+                   for i in page_window(self.sub_comments_per_comment, ps, max(pn - 1, 0))]
+        return {"code": 0, "message": "0", "data": {"page": {"count": self.sub_comments_per_comment, "num": pn, "size": ps}, "replies": replies}}
+
+    # ---------------------------------------------------------------- weibo
+    def wb_search(self, page: int) -> Dict:
+        cards = []
+        for note_id in self.note_ids(page, 10):
+            mblog = {
+                "id": str(note_id),
+                "mid": str(note_id),
+                "text": MOCK_TEXT,
+                "created_at": _rfc2822(_now()),
+                "attitudes_count": 1024,
+                "comments_count": 128,
+                "reposts_count": 64,
+                "region_name": "发布于 北京",
+                "user": {"id": note_id % 100000, "screen_name": "mock_user", "gender": "f",
+                         "profile_url": "https://m.weibo.cn/u/1", "profile_image_url": MOCK_AVATAR},
+            }
+            cards.append({"card_type": 9, "mblog": mblog})
+        return {"ok": 1, "data": {"cards": cards, "cardlistInfo": {"page": page + 1}}}
+
+    def wb_comments(self, note_id: str, max_id: int) -> Dict:
+        page = max_id if max_id > 0 else 0
+        comments = []
+        for i in self.comment_window(page):
+            comment_id = comment_id_of(int(note_id), i)
+            comments.append({
+                "id": comment_id,
+                "rootid": str(comment_id),
+                "text": MOCK_TEXT,
+                "created_at": _rfc2822(_now()),
+                "source": "来自北京",
+                "like_count": 8,
+                "total_number": 0,
+                "user": {"id": comment_id % 100000, "screen_name": "mock_commenter", "gender": "m",
+                         "profile_url": "https://m.weibo.cn/u/2", "profile_image_url": MOCK_AVATAR},
+            })
+        next_max_id = page + 1 if self.has_more_comments(page) else 0
+        return {"ok": 1, "data": {"data": comments, "max_id": next_max_id, "max_id_type": 0, "total_number": self.comments_per_note}}
+
+    # ---------------------------------------------------------------- zhihu
+    def zhihu_search(self, offset: int, limit: int) -> Dict:
+        page = offset // max(limit, 1)
+        data = []
+        for note_id in self.note_ids(page, limit):
+            answer = {
+                "id": str(note_id),
+                "type": "answer",
+                "content": f"<p>{MOCK_TEXT}</p>",
+                "title": "mock zhihu question",
+                "excerpt": MOCK_TEXT,
+                "created_time": _now(),
+                "updated_time": _now(),
+                "voteup_count": 1024,
+                "comment_count": self.comments_per_note,
+                "question": {"id": str(note_id + 1)},
+                "author": {"id": f"author{note_id}", "url_token": f"mock-{note_id}", "name": "mock_author", "avatar_url": MOCK_AVATAR},
+            }
+            data.append({"type": "search_result", "object": answer})
+        return {"data": data, "paging": {"is_end": False, "next": ""}}
+
+    def _zhihu_comment(self, comment_id: int, reply_comment_id: Optional[int] = None) -> Dict:
+        return {
+            "id": str(comment_id),
+            "type": "comment",
+            "content": f"<p>{MOCK_TEXT}</p>",
+            "created_time": _now(),
+            "reply_comment_id": str(reply_comment_id or 0),
+            "child_comment_count": 0 if reply_comment_id else self.sub_comments_per_comment,
+            "like_count": 8,
+            "dislike_count": 0,
+            "comment_tag": [{"type": "ip_info", "text": "IP 属地北京"}],
+            "author": {"id": f"author{comment_id}", "url_token": f"mock-{comment_id}", "name": "mock_commenter", "avatar_url": MOCK_AVATAR},
+        }
+
+    @staticmethod
+    def _zhihu_paging(path: str, page: int, has_more: bool) -> Dict:
+        return {"is_end": not has_more, "next": f"https://www.zhihu.com{path}?offset={page + 1}" if has_more else ""}
+
+    def zhihu_root_comments(self, path: str, content_id: str, offset: str) -> Dict:
+        page = int(offset or 0)
+        data = [self._zhihu_comment(comment_id_of(int(content_id), i)) for i in self.comment_window(page)]
+        return {"data": data, "paging": self._zhihu_paging(path, page, self.has_more_comments(page))}
+
+    def zhihu_child_comments(self, path: str, root_comment_id: str, offset: str) -> Dict:
+        page = int(offset or 0)
+        data = [self._zhihu_comment(sub_comment_id_of(int(root_comment_id), i), int(root_comment_id)) for i in self.sub_comment_window(page)]
+        return {"data": data, "paging": self._zhihu_paging(path, page, self.has_more_sub_comments(page))}
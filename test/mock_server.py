@@ -0,0 +1,263 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 本地 mock 平台服务，回放各平台接口响应，支持注入延迟与错误，用于离线端到端压测
+import asyncio
+import os
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
+
+from test.mock_payloads import PayloadBuilder
+
+PLATFORMS = ("xhs", "dy", "ks", "bili", "wb", "tieba", "zhihu")
+
+# 贴吧是解析网页的，直接回放 media_platform/tieba/test_data 下录制的页面
+TIEBA_PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "media_platform", "tieba", "test_data")
+
+
+def _error_response(platform: str) -> Response:
+    """
+    各平台被风控/限流时的典型响应，客户端会按自己的错误分支处理
+    """
+    if platform == "xhs":
+        return JSONResponse({"success": False, "code": -1, "msg": "mock injected error"}, status_code=503)
+    if platform == "dy":
+        return PlainTextResponse("blocked", status_code=503)
+    if platform == "ks":
+        return JSONResponse({"errors": [{"message": "mock injected error"}], "data": None}, status_code=503)
+    if platform == "bili":
+        return JSONResponse({"code": -412, "message": "mock injected error"}, status_code=503)
+    if platform == "wb":
+        return JSONResponse({"ok": 0, "msg": "mock injected error"}, status_code=503)
+    if platform == "zhihu":
+        return JSONResponse({"error": {"code": 10003, "message": "mock injected error"}}, status_code=503)
+    return PlainTextResponse("mock injected error", status_code=503)
+
+
+def create_app(builder: PayloadBuilder, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0,
+               seed: Optional[int] = None, request_counter: Optional[Counter] = None) -> FastAPI:
+    """
+    创建 mock 平台的 FastAPI 应用，所有平台挂在同一个服务下，用路径前缀区分：/xhs /dy /ks /bili /wb /tieba /zhihu
+    Args:
+        builder: 响应数据生成器
+        latency_ms: 每个请求的固定延迟
+        jitter_ms: 在固定延迟上叠加的随机抖动上限
+        error_rate: 注入错误响应的概率 0 ~ 1
+        seed: 随机数种子，固定后错误注入的位置可复现
+        request_counter: 按平台累计请求数，传入后由调用方读取
+
+    Returns:
+
+    """
+    app = FastAPI()
+    rand = random.Random(seed)
+    counter = request_counter if request_counter is not None else Counter()
+    tieba_pages: Dict[str, str] = {}
+    for name in ("search_keyword_notes", "note_detail", "note_comments", "note_sub_comments"):
+        with open(os.path.join(TIEBA_PAGES_DIR, f"{name}.html"), encoding="utf-8") as f:
+            tieba_pages[name] = f.read()
+
+    @app.middleware("http")
+    async def inject_latency_and_errors(request: Request, call_next):
+        platform = request.url.path.strip("/").split("/", 1)[0]
+        counter[platform] += 1
+        delay = latency_ms + (rand.uniform(0, jitter_ms) if jitter_ms else 0)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if error_rate and rand.random() < error_rate:
+            counter[f"{platform}_error"] += 1
+            return _error_response(platform)
+        return await call_next(request)
+
+    # ---------------------------------------------------------------- xhs
+    @app.post("/xhs/api/sns/web/v1/search/notes")
+    async def xhs_search(request: Request):
+        body = await request.json()
+        return builder.xhs_search(int(body.get("page", 1)))
+
+    @app.post("/xhs/api/sns/web/v1/feed")
+    async def xhs_feed(request: Request):
+        body = await request.json()
+        return builder.xhs_note_detail(body["source_note_id"])
+
+    @app.get("/xhs/api/sns/web/v2/comment/page")
+    async def xhs_comments(note_id: str, cursor: str = ""):
+        return builder.xhs_comments(note_id, int(cursor or 0))
+
+    @app.get("/xhs/api/sns/web/v2/comment/sub/page")
+    async def xhs_sub_comments(note_id: str, root_comment_id: str, cursor: str = ""):
+        return builder.xhs_sub_comments(note_id, root_comment_id, int(cursor or 0))
+
+    # ---------------------------------------------------------------- douyin
+    @app.get("/dy/aweme/v1/web/general/search/single/")
+    async def dy_search(offset: int = 0):
+        return builder.dy_search(offset)
+
+    @app.get("/dy/aweme/v1/web/comment/list/")
+    async def dy_comments(aweme_id: str, cursor: int = 0):
+        return builder.dy_comments(aweme_id, cursor)
+
+    @app.get("/dy/aweme/v1/web/comment/list/reply/")
+    async def dy_sub_comments(item_id: str, comment_id: str, cursor: int = 0):
+        return builder.dy_sub_comments(item_id, comment_id, cursor)
+
+    # ---------------------------------------------------------------- kuaishou
+    @app.post("/ks/graphql")
+    async def ks_graphql(request: Request):
+        body = await request.json()
+        operation, variables = body.get("operationName"), body.get("variables", {})
+        if operation == "visionSearchPhoto":
+            return builder.ks_search(variables.get("pcursor", ""))
+        if operation == "commentListQuery":
+            return builder.ks_comments(variables["photoId"], variables.get("pcursor", ""))
+        if operation == "visionSubCommentList":
+            return builder.ks_sub_comments(variables["rootCommentId"], variables.get("pcursor", ""))
+        return {"errors": [{"message": f"mock server does not support operation {operation}"}], "data": None}
+
+    # ---------------------------------------------------------------- bilibili
+    @app.get("/bili/x/web-interface/wbi/search/type")
+    async def bili_search(page: int = 1, page_size: int = 20):
+        return builder.bili_search(page, page_size)
+
+    @app.get("/bili/x/web-interface/view/detail")
+    async def bili_detail(aid: int):
+        return builder.bili_video_detail(aid)
+
+    @app.get("/bili/x/v2/reply/wbi/main")
+    async def bili_comments(oid: int, next: int = 0):
+        return builder.bili_comments(oid, next)
+
+    @app.get("/bili/x/v2/reply/reply")
+    async def bili_sub_comments(oid: int, root: int, pn: int = 1, ps: int = 10):
+        return builder.bili_sub_comments(oid, root, pn, ps)
+
+    # ---------------------------------------------------------------- weibo
+    @app.get("/wb/api/container/getIndex")
+    async def wb_search(page: int = 1):
+        return builder.wb_search(page)
+
+    @app.get("/wb/comments/hotflow")
+    async def wb_comments(id: str, max_id: int = 0):
+        return builder.wb_comments(id, max_id)
+
+    # ---------------------------------------------------------------- tieba
+    @app.get("/tieba/f/search/res", response_class=HTMLResponse)
+    async def tieba_search():
+        return tieba_pages["search_keyword_notes"]
+
+    @app.get("/tieba/p/comment", response_class=HTMLResponse)
+    async def tieba_sub_comments():
+        return tieba_pages["note_sub_comments"]
+
+    @app.get("/tieba/p/{note_id}", response_class=HTMLResponse)
+    async def tieba_note(note_id: str, pn: Optional[int] = None):
+        return tieba_pages["note_detail"] if pn is None else tieba_pages["note_comments"]
+
+    # ---------------------------------------------------------------- zhihu
+    @app.get("/zhihu/api/v4/search_v3")
+    async def zhihu_search(offset: int = 0, limit: int = 20):
+        return builder.zhihu_search(offset, limit)
+
+    @app.get("/zhihu/api/v4/comment_v5/{content_type}/{content_id}/root_comment")
+    async def zhihu_root_comments(request: Request, content_type: str, content_id: str, offset: str = ""):
+        return builder.zhihu_root_comments(request.url.path, content_id, offset)
+
+    @app.get("/zhihu/api/v4/comment_v5/comment/{root_comment_id}/child_comment")
+    async def zhihu_child_comments(request: Request, root_comment_id: str, offset: str = ""):
+        return builder.zhihu_child_comments(request.url.path, root_comment_id, offset)
+
+    return app
+
+
+class MockPlatformServer:
+    """
+    在后台线程里运行 mock 平台服务，监听随机端口，不占用被测爬虫的事件循环：
+        with MockPlatformServer(latency_ms=20, error_rate=0.01) as server:
+            client._host = server.url_for("xhs")
+    """
+
+    def __init__(self, builder: Optional[PayloadBuilder] = None, latency_ms: float = 0, jitter_ms: float = 0,
+                 error_rate: float = 0.0, seed: Optional[int] = None, host: str = "127.0.0.1"):
+        self.builder = builder or PayloadBuilder()
+        self.request_counter: Counter = Counter()
+        self.app = create_app(self.builder, latency_ms, jitter_ms, error_rate, seed, self.request_counter)
+        self.host = host
+        self.port = 0
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def url_for(self, platform: str) -> str:
+        if platform not in PLATFORMS:
+            raise ValueError(f"[MockPlatformServer.url_for] unknown platform: {platform}")
+        return f"{self.base_url}/{platform}"
+
+    def start(self, timeout: float = 10) -> "MockPlatformServer":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, 0))
+        self.port = sock.getsockname()[1]
+        self._server = uvicorn.Server(uvicorn.Config(self.app, log_level="warning", access_log=False))
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [sock]}, name="mock-platform-server", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("[MockPlatformServer.start] mock server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+        self._server = None
+
+    def __enter__(self) -> "MockPlatformServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="MediaCrawler mock platform server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--comments-per-note", type=int, default=20)
+    parser.add_argument("--sub-comments-per-comment", type=int, default=0)
+    args = parser.parse_args()
+    builder = PayloadBuilder(comments_per_note=args.comments_per_note, sub_comments_per_comment=args.sub_comments_per_comment)
+    app = create_app(builder, args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
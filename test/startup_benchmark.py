@@ -0,0 +1,109 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 启动耗时压测：在全新的子进程里导入 main 并创建各平台爬虫，统计耗时、内存和加载了哪些重依赖
+#
+# 用法（在项目根目录执行）：
+#   python -m test.startup_benchmark --platforms xhs,dy,bili --repeat 5
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# 只在特定功能开启时才需要的依赖，启动阶段不应该出现在 sys.modules 里
+HEAVY_MODULES = ["jieba", "matplotlib", "wordcloud", "cv2", "numpy", "PIL", "redis", "pandas"]
+
+PLATFORMS = ["xhs", "dy", "ks", "bili", "wb", "tieba", "zhihu"]
+
+# 子进程里执行的探测脚本，platform 为空时只导入 main
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import main
+platform = sys.argv[1]
+if platform:
+    main.CrawlerFactory.create_crawler(platform)
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    "elapsed": elapsed,
+    "peak_rss_mb": peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024,
+    "heavy_modules": sorted(name for name in json.loads(sys.argv[2]) if name in sys.modules),
+}))
+"""
+
+
+@dataclass
+class StartupResult:
+    scenario: str
+    import_seconds: List[float] = field(default_factory=list)
+    process_seconds: List[float] = field(default_factory=list)
+    peak_rss_mb: float = 0.0
+    heavy_modules: List[str] = field(default_factory=list)
+
+
+def probe(platform: str = "") -> dict:
+    """
+    在全新的 python 进程里导入 main（可选创建一个平台的爬虫），返回导入耗时、进程总耗时、内存峰值和已加载的重依赖
+    Args:
+        platform: 平台，为空时只导入 main
+
+    Returns:
+
+    """
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", PROBE, platform, json.dumps(HEAVY_MODULES)],
+                            check=True, capture_output=True, text=True).stdout
+    data = json.loads(output.strip().splitlines()[-1])
+    data["process_seconds"] = time.perf_counter() - start
+    return data
+
+
+def run_scenario(platform: str, repeat: int) -> StartupResult:
+    result = StartupResult(scenario=f"create {platform}" if platform else "import main")
+    for _ in range(repeat):
+        data = probe(platform)
+        result.import_seconds.append(data["elapsed"])
+        result.process_seconds.append(data["process_seconds"])
+        result.peak_rss_mb = max(result.peak_rss_mb, data["peak_rss_mb"])
+        result.heavy_modules = data["heavy_modules"]
+    return result
+
+
+def format_report(results: List[StartupResult]) -> str:
+    lines = [f"{'scenario':<14} {'import(ms)':>11} {'process(ms)':>12} {'peak_rss(MB)':>13}  heavy modules"]
+    for r in results:
+        lines.append(f"{r.scenario:<14} {statistics.median(r.import_seconds) * 1000:>11.0f} "
+                     f"{statistics.median(r.process_seconds) * 1000:>12.0f} {r.peak_rss_mb:>13.1f}  {','.join(r.heavy_modules) or '-'}")
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="MediaCrawler startup time benchmark")
+    parser.add_argument("--platforms", default=",".join(PLATFORMS), help="comma separated platforms, default all")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario, the report shows the median")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    results = [run_scenario("", args.repeat)]
+    results += [run_scenario(platform, args.repeat) for platform in args.platforms.split(",")]
+    print(format_report(results))
+
+
+if __name__ == "__main__":
+    main()
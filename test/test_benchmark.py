@@ -0,0 +1,62 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+
+import httpx
+import pytest
+
+import config
+from test import benchmark
+from test.mock_payloads import PayloadBuilder
+from test.mock_server import MockPlatformServer
+from tools import tracing
+
+
+@pytest.fixture
+def bench_env(monkeypatch, tmp_path):
+    # benchmark 会改全局配置和 tracing 状态，用 monkeypatch 兜底还原；csv 写到临时目录
+    for name in ("CRAWLER_TYPE", "KEYWORDS", "START_PAGE", "CRAWLER_MAX_NOTES_COUNT", "CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES",
+                 "MAX_CONCURRENCY_NUM", "KEYWORD_CONCURRENCY_NUM", "ENABLE_GET_COMMENTS", "ENABLE_GET_SUB_COMMENTS", "ENABLE_GET_MEIDAS",
+                 "ENABLE_GET_WORDCLOUD", "ENABLE_IP_PROXY", "SAVE_DATA_OPTION"):
+        monkeypatch.setattr(config, name, getattr(config, name))
+    monkeypatch.setattr(tracing, "recorder", tracing.recorder)
+    monkeypatch.setattr(tracing, "sleep_scale", 0)
+    monkeypatch.chdir(tmp_path)
+
+
+def test_xhs_search_end_to_end(bench_env):
+    builder = PayloadBuilder(comments_per_note=12, comment_page_size=10)
+    benchmark.apply_benchmark_config(notes=20, comments=15, concurrency=4, sub_comments=False, save_option="csv")
+    with MockPlatformServer(builder, latency_ms=1) as server:
+        result = asyncio.run(benchmark.run_platform("xhs", server.url_for("xhs")))
+        requests = server.request_counter["xhs"]
+
+    assert result.error == ""
+    assert result.notes == 20
+    # 每个帖子 12 条评论，分 2 页返回
+    assert result.comments == 20 * 12
+    # 1 次搜索 + 20 次详情 + 每个帖子 2 页评论
+    assert requests == result.requests == 1 + 20 + 20 * 2
+    assert result.p95_latency > 0
+    assert result.peak_rss_mb > 0
+
+
+def test_mock_server_error_injection():
+    with MockPlatformServer(error_rate=1.0, seed=1) as server:
+        wb = httpx.get(f"{server.url_for('wb')}/api/container/getIndex", params={"page": 1})
+        bili = httpx.get(f"{server.url_for('bili')}/x/web-interface/view/detail", params={"aid": 1})
+        counter = dict(server.request_counter)
+
+    assert wb.status_code == 503 and wb.json()["ok"] == 0
+    assert bili.json()["code"] == -412
+    assert counter["wb_error"] == 1 and counter["bili_error"] == 1
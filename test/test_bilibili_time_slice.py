@@ -0,0 +1,32 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+
+from media_platform.bilibili.core import BilibiliCrawler, TimeSlice
+
+
+def test_split_time_range_by_day():
+    begin_s, end_s = asyncio.run(BilibiliCrawler.get_pubtime_datetime(start="2024-01-30", end="2024-02-02"))
+    time_slices = BilibiliCrawler.split_time_range_by_day(int(begin_s), int(end_s))
+
+    assert [time_slice.day for time_slice in time_slices] == ["2024-01-30", "2024-01-31", "2024-02-01", "2024-02-02"]
+    assert time_slices[0].begin_s == int(begin_s) and time_slices[-1].end_s == int(end_s)
+    # 时间片首尾相接，每天 86400 秒
+    for previous, current in zip(time_slices, time_slices[1:]):
+        assert current.begin_s == previous.end_s + 1
+    assert all(time_slice.end_s - time_slice.begin_s + 1 == 86400 for time_slice in time_slices)
+
+
+def test_split_single_day():
+    begin_s, end_s = asyncio.run(BilibiliCrawler.get_pubtime_datetime(start="2024-01-01", end="2024-01-01"))
+    assert BilibiliCrawler.split_time_range_by_day(int(begin_s), int(end_s)) == [TimeSlice("2024-01-01", int(begin_s), int(end_s))]
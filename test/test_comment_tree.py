@@ -0,0 +1,99 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+
+import comment_tree
+from async_sqlite_db import AsyncSqliteDB
+from store import bilibili as bili_store
+from store import douyin as dy_store
+from store import xhs as xhs_store
+
+
+def _dy_comment(cid: str, reply_id: str = "0", reply_to_reply_id: str = "0") -> dict:
+    return {"cid": cid, "aweme_id": "a1", "text": cid, "create_time": 1, "reply_id": reply_id,
+            "reply_to_reply_id": reply_to_reply_id, "user": {}}
+
+
+def test_store_records_carry_root_and_parent():
+    root = dy_store._build_dy_aweme_comment("a1", _dy_comment("c1"))
+    reply = dy_store._build_dy_aweme_comment("a1", _dy_comment("c2", "c1"))
+    nested = dy_store._build_dy_aweme_comment("a1", _dy_comment("c3", "c1", "c2"))
+    assert [(r.root_comment_id, r.parent_comment_id) for r in (root, reply, nested)] == \
+           [("c1", "0"), ("c1", "c1"), ("c1", "c2")]
+
+    bili_reply = bili_store._build_bilibili_video_comment("v1", {
+        "rpid": 12, "root": 10, "parent": 11, "content": {"message": "hi"}, "member": {}})
+    assert (bili_reply.root_comment_id, bili_reply.parent_comment_id) == ("10", "11")
+
+    # 小红书二级评论的根评论ID由 client 补上
+    xhs_reply = xhs_store._build_xhs_note_comment("n1", {"id": "c2", "root_comment_id": "c1"})
+    assert (xhs_reply.root_comment_id, xhs_reply.parent_comment_id) == ("c1", "c1")
+
+
+def test_load_threads_builds_tree_with_one_indexed_query(tmp_path):
+    async_db = AsyncSqliteDB(str(tmp_path / "test.db"))
+    comments = [
+        _dy_comment("c1"), _dy_comment("c2"), _dy_comment("c3", "c1"), _dy_comment("c4", "c1", "c3"),
+        _dy_comment("c5", "c2"), _dy_comment("c6", "c9", "c8"),
+    ]
+
+    async def run():
+        with open("schema/sqlite_tables.sql", encoding="utf-8") as f:
+            await async_db.executescript(f.read())
+        items = []
+        for comment in comments:
+            item = dy_store._build_dy_aweme_comment("a1", comment).to_dict()
+            item["add_ts"] = 1
+            items.append(item)
+        await async_db.items_to_table("douyin_aweme_comment", items)
+        plan = await async_db.query("EXPLAIN QUERY PLAN SELECT * FROM douyin_aweme_comment "
+                                    "WHERE aweme_id = ? AND root_comment_id = ? ORDER BY id", "a1", "c1")
+        return (plan, await comment_tree.load_threads(async_db, "douyin_aweme_comment", "a1"),
+                await comment_tree.load_thread(async_db, "douyin_aweme_comment", "a1", "c1"))
+
+    plan, threads, thread = asyncio.run(run())
+
+    assert comment_tree.thread_index_name("douyin_aweme_comment") in plan[0]["detail"]
+
+    def shape(nodes):
+        return [(node["comment_id"], shape(node["replies"])) for node in nodes]
+
+    # 一级评论没有爬到的回复单独作为一个楼层
+    assert shape(threads) == [("c1", [("c3", [("c4", [])])]), ("c2", [("c5", [])]), ("c6", [])]
+    assert shape(thread) == [("c1", [("c3", [("c4", [])])])]
+
+
+def test_init_comment_tree_upgrades_old_tables(tmp_path):
+    async_db = AsyncSqliteDB(str(tmp_path / "test.db"))
+
+    async def run():
+        await async_db.executescript("""
+            CREATE TABLE kuaishou_video_comment (id INTEGER PRIMARY KEY AUTOINCREMENT, comment_id TEXT, video_id TEXT);
+            CREATE TABLE weibo_note_comment (id INTEGER PRIMARY KEY AUTOINCREMENT, comment_id TEXT, note_id TEXT,
+                                             parent_comment_id TEXT);
+            INSERT INTO kuaishou_video_comment (comment_id, video_id) VALUES ('k1', 'v1');
+            INSERT INTO weibo_note_comment (comment_id, note_id, parent_comment_id)
+            VALUES ('w1', 'n1', 'w1'), ('w2', 'n1', 'w1'), ('w3', 'n1', '');
+        """)
+        await comment_tree.init_comment_tree(async_db)
+        await comment_tree.init_comment_tree(async_db)
+        return (await async_db.query("SELECT comment_id, parent_comment_id, root_comment_id FROM kuaishou_video_comment"),
+                await async_db.query("SELECT comment_id, root_comment_id FROM weibo_note_comment ORDER BY id"),
+                await async_db.query("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE '%_thread'"))
+
+    ks_rows, wb_rows, indexes = asyncio.run(run())
+
+    assert ks_rows == [{"comment_id": "k1", "parent_comment_id": None, "root_comment_id": "k1"}]
+    assert [(row["comment_id"], row["root_comment_id"]) for row in wb_rows] == [("w1", "w1"), ("w2", "w1"), ("w3", "w3")]
+    assert sorted(row["name"] for row in indexes) == ["idx_kuaishou_video_comment_thread", "idx_weibo_note_comment_thread"]
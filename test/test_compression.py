@@ -0,0 +1,95 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+import csv
+import gzip
+import json
+
+import pytest
+
+import config
+from store import compression
+from store.compression import FrameCompressor
+from store.csv_writer import RotatingCsvWriter
+from store.xhs.xhs_store_impl import XhsJsonStoreImplement
+from var import crawler_type_var
+
+
+def test_csv_writer_writes_one_gzip_frame_per_flush(tmp_path):
+    file_name = str(tmp_path / "1_search_comments_2024-01-14.csv")
+
+    async def run():
+        writer = RotatingCsvWriter(file_name, buffer_rows=2, compressor=FrameCompressor("gzip"))
+        await writer.write_rows(["id", "content"], [("1", "a"), ("2", "b,c")])
+        # 第一帧写入后文件已经可以完整解压，模拟进程异常退出前读取
+        with gzip.open(writer.current_file_name, "rt", encoding="utf-8-sig", newline="") as f:
+            first = list(csv.reader(f))
+        await writer.write_rows(["id", "content"], [("3", "d")])
+        await writer.close()
+        return writer.current_file_name, first
+
+    compressed_name, first = asyncio.run(run())
+
+    assert compressed_name == file_name + ".gz"
+    assert first == [["id", "content"], ["1", "a"], ["2", "b,c"]]
+    with open(compressed_name, "rb") as f:
+        # 每次写入磁盘都是一个独立的 gzip member
+        assert f.read().count(b"\x1f\x8b\x08") == 2
+    with compression.open_text(compressed_name) as f:
+        assert list(csv.reader(f)) == [["id", "content"], ["1", "a"], ["2", "b,c"], ["3", "d"]]
+
+
+def test_json_store_round_trips_compressed_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "STORE_COMPRESSION", "gzip")
+    monkeypatch.setattr(config, "ENABLE_GET_WORDCLOUD", False)
+    store = XhsJsonStoreImplement()
+    store.json_store_path = str(tmp_path / "json")
+    store.words_store_path = str(tmp_path / "words")
+
+    async def run():
+        crawler_type_var.set("search")
+        await store.store_contents([{"note_id": "1", "title": "标题"}])
+        await store.store_contents([{"note_id": "2", "title": "b"}])
+        file_name, _ = store.make_save_file_name(store_type="contents")
+        return compression.compressed_file_name(file_name)
+
+    file_name = asyncio.run(run())
+
+    assert file_name.endswith(".json.gz")
+    with gzip.open(file_name, "rt", encoding="utf-8") as f:
+        assert json.load(f) == [{"note_id": "1", "title": "标题"}, {"note_id": "2", "title": "b"}]
+    assert json.loads(asyncio.run(compression.read_text(file_name)))[1]["note_id"] == "2"
+
+
+
+def test_append_json_items_keeps_file_when_write_fails(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "STORE_COMPRESSION", "gzip")
+    file_name = str(tmp_path / "1_search_contents_2024-01-14.json.gz")
+    asyncio.run(compression.append_json_items(file_name, [{"note_id": "1"}]))
+
+    def broken_fsync(fd: int) -> None:
+        raise OSError("disk full")
+
+    # 写入中途失败时，原文件保持完整，临时文件被清理，不会留下截断的压缩文件
+    monkeypatch.setattr(compression.os, "fsync", broken_fsync)
+    with pytest.raises(OSError):
+        asyncio.run(compression.append_json_items(file_name, [{"note_id": "2"}]))
+    with gzip.open(file_name, "rt", encoding="utf-8") as f:
+        assert json.load(f) == [{"note_id": "1"}]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["1_search_contents_2024-01-14.json.gz"]
+
+def test_open_text_reads_plain_files(tmp_path):
+    file_name = tmp_path / "plain.csv"
+    file_name.write_text("\ufeffid\n1\n", encoding="utf-8")
+    with compression.open_text(str(file_name)) as f:
+        assert list(csv.reader(f)) == [["id"], ["1"]]
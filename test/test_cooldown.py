@@ -0,0 +1,104 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+from tools import cooldown
+
+
+def test_cooldown_does_not_block_event_loop():
+    breaker = cooldown.CircuitBreaker("test_cooldown", cooldown_seconds=0.2, max_cooldown_seconds=1, failure_threshold=1)
+    ticks = []
+
+    async def other_work():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.02)
+
+    async def main():
+        breaker.record_failure("blocked")
+        start = time.monotonic()
+        await asyncio.gather(breaker.wait_until_available(), other_work())
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(main())
+    assert elapsed >= 0.2
+    # 冷却期间其他协程照常运行
+    assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.2
+    assert breaker.state == cooldown.STATE_CLOSED
+
+
+def test_half_open_probe_runs_once_and_backs_off_on_failure():
+    breaker = cooldown.CircuitBreaker("test_probe", cooldown_seconds=0.05, max_cooldown_seconds=0.15, failure_threshold=2)
+    calls = {"refresh": 0, "probe": 0}
+
+    async def refresh():
+        calls["refresh"] += 1
+
+    async def probe():
+        calls["probe"] += 1
+        # 探测里发出的请求不受熔断器限制
+        await breaker.wait_until_available()
+        return calls["probe"] >= 3
+
+    breaker.set_recovery(probe=probe, refresh=refresh)
+
+    async def main():
+        breaker.record_failure("first")
+        assert breaker.state == cooldown.STATE_CLOSED
+        breaker.record_failure("second")
+        assert breaker.state == cooldown.STATE_OPEN
+        await asyncio.gather(*[breaker.wait_until_available() for _ in range(10)])
+
+    asyncio.run(main())
+    # 10 个等待方共享同一次探测，前两次探测失败后冷却时间翻倍直到上限
+    assert calls == {"refresh": 3, "probe": 3}
+    assert breaker.state == cooldown.STATE_CLOSED
+    assert breaker.cooldown_seconds == 0.05
+
+
+def test_cancelled_probe_reopens_breaker():
+    breaker = cooldown.CircuitBreaker("test_cancel", cooldown_seconds=0.05, max_cooldown_seconds=0.05, failure_threshold=1)
+    calls = {"probe": 0}
+
+    async def probe():
+        calls["probe"] += 1
+        if calls["probe"] == 1:
+            # 第一次探测挂起，随后被取消
+            await asyncio.sleep(10)
+        return True
+
+    breaker.set_recovery(probe=probe)
+
+    async def main():
+        # 探测执行中被取消：finally 里重新熔断
+        breaker.record_failure("blocked")
+        waiter = asyncio.ensure_future(breaker.wait_until_available())
+        while calls["probe"] == 0:
+            await asyncio.sleep(0.005)
+        breaker._probe_task.cancel()
+        await asyncio.wait({breaker._probe_task})
+        assert breaker.state == cooldown.STATE_OPEN
+        # 等待方不会卡在已经结束的探测任务上，重新冷却后由下一次探测恢复
+        await asyncio.wait_for(waiter, timeout=1)
+        assert calls["probe"] == 2 and breaker.state == cooldown.STATE_CLOSED
+
+        # 探测还没开始执行就被取消：等待方发现仍是 half_open，重新熔断后再探测
+        breaker._set_state(cooldown.STATE_HALF_OPEN)
+        breaker._probe_task = asyncio.ensure_future(probe())
+        breaker._probe_task.cancel()
+        await asyncio.wait_for(breaker.wait_until_available(), timeout=1)
+        assert calls["probe"] == 3
+
+    asyncio.run(main())
+    assert breaker.state == cooldown.STATE_CLOSED
@@ -0,0 +1,63 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+import csv
+
+import config
+from store import csv_writer
+from store.csv_writer import RotatingCsvWriter
+
+
+def _read(path) -> list:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_writer_buffers_rows_and_rotates_by_row_count(tmp_path):
+    file_name = str(tmp_path / "csv" / "1_search_comments_2024-01-14.csv")
+
+    async def run():
+        writer = RotatingCsvWriter(file_name, buffer_rows=2, max_rows=3)
+        await writer.write_rows(["id", "content"], [("1", "a")])
+        # 还没到缓冲行数，不写磁盘
+        assert not (tmp_path / "csv").exists()
+        await writer.write_rows(["id", "content"], [("2", "b,c"), ("3", "d")])
+        await writer.write_rows(["id", "content"], [("4", "e"), ("5", "f")])
+        await writer.write_rows(["id", "content"], [("6", "g")])
+        await writer.close()
+
+    asyncio.run(run())
+
+    assert _read(file_name) == [["id", "content"], ["1", "a"], ["2", "b,c"], ["3", "d"]]
+    assert _read(tmp_path / "csv" / "1_search_comments_2024-01-14_2.csv") == [["id", "content"], ["4", "e"], ["5", "f"], ["6", "g"]]
+
+
+def test_writers_flush_periodically_and_close(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "CSV_BUFFER_ROWS", 1000)
+    monkeypatch.setattr(config, "CSV_FLUSH_INTERVAL_SEC", 0.01)
+    file_name = str(tmp_path / "1_search_contents_2024-01-14.csv")
+
+    async def run():
+        writer = csv_writer.get_csv_writer(file_name)
+        assert csv_writer.get_csv_writer(file_name) is writer
+        await writer.write_rows(["id"], [("1",)])
+        await asyncio.sleep(0.1)
+        flushed = _read(file_name)
+        await writer.write_rows(["id"], [("2",)])
+        await csv_writer.close_csv_writers()
+        return flushed
+
+    flushed = asyncio.run(run())
+
+    assert flushed == [["id"], ["1"]]
+    assert _read(file_name) == [["id"], ["1"], ["2"]]
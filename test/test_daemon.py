@@ -0,0 +1,87 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+import config
+import daemon
+
+
+class FakeCrawler:
+    def __init__(self, platform: str, calls: list):
+        self.platform = platform
+        self.calls = calls
+
+    async def prepare(self, playwright):
+        self.calls.append(("prepare", self.platform))
+
+    async def run(self):
+        self.calls.append(("run", self.platform, config.KEYWORDS, config.CRAWLER_MAX_NOTES_COUNT))
+        # 模拟爬取过程中修改配置
+        config.CRAWLER_MAX_NOTES_COUNT = 999
+        if config.KEYWORDS == "slow":
+            await asyncio.sleep(10)
+        if config.KEYWORDS == "boom":
+            raise RuntimeError("login expired")
+
+    async def close(self):
+        self.calls.append(("close", self.platform))
+
+
+def test_job_manager_keeps_crawler_warm(monkeypatch):
+    calls = []
+    monkeypatch.setattr(daemon.CrawlerFactory, "create_crawler", staticmethod(lambda platform: FakeCrawler(platform, calls)))
+    monkeypatch.setattr(config, "SAVE_DATA_OPTION", "csv")
+    keywords, max_notes = config.KEYWORDS, config.CRAWLER_MAX_NOTES_COUNT
+
+    async def wait_done(manager: daemon.JobManager, *jobs):
+        while not all(job.done for job in jobs):
+            await asyncio.sleep(0.01)
+
+    async def main():
+        manager = daemon.JobManager()
+        await manager.start(playwright=object())
+        first = manager.submit(daemon.CrawlSpec(platform="xhs", keywords="a", max_notes=5))
+        slow = manager.submit(daemon.CrawlSpec(platform="xhs", keywords="slow"))
+        queued = manager.submit(daemon.CrawlSpec(platform="xhs", keywords="never"))
+        manager.cancel(queued.job_id)
+        while slow.status != "running":
+            await asyncio.sleep(0.01)
+        manager.cancel(slow.job_id)
+        failed = manager.submit(daemon.CrawlSpec(platform="xhs", keywords="boom"))
+        after_failure = manager.submit(daemon.CrawlSpec(platform="xhs", keywords="b"))
+        await wait_done(manager, first, slow, queued, failed, after_failure)
+        with pytest.raises(ValueError):
+            manager.submit(daemon.CrawlSpec(platform="unknown"))
+        await manager.stop()
+        return first, slow, queued, failed, after_failure
+
+    first, slow, queued, failed, after_failure = asyncio.run(main())
+
+    assert [job.status for job in (first, slow, queued, failed, after_failure)] == \
+           ["finished", "cancelled", "cancelled", "failed", "finished"]
+    assert failed.error == "RuntimeError: login expired"
+    # 同一个平台只在第一次和失败之后重新 prepare，任务参数只在任务期间生效
+    assert calls == [
+        ("prepare", "xhs"),
+        ("run", "xhs", "a", 5),
+        ("run", "xhs", "slow", max_notes),
+        ("run", "xhs", "boom", max_notes),
+        ("close", "xhs"),
+        ("prepare", "xhs"),
+        ("run", "xhs", "b", max_notes),
+        ("close", "xhs"),
+    ]
+    assert config.KEYWORDS == keywords
+    assert config.CRAWLER_MAX_NOTES_COUNT == max_notes
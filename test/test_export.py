@@ -0,0 +1,101 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+import csv
+import gzip
+import json
+
+import pytest
+
+import config
+import export
+from async_sqlite_db import AsyncSqliteDB
+from var import media_crawler_db_var
+
+
+def _comment(i: int) -> dict:
+    return {
+        "comment_id": f"c{i}", "create_time": 1700000000000, "note_id": "n1", "content": f"第{i}条,评论",
+        "user_id": "u1", "sub_comment_count": 0, "add_ts": i, "last_modify_ts": i,
+    }
+
+
+def _prepare_db(tmp_path) -> AsyncSqliteDB:
+    async_db = AsyncSqliteDB(str(tmp_path / "test.db"))
+
+    async def run():
+        with open("schema/sqlite_tables.sql", encoding="utf-8") as f:
+            await async_db.executescript(f.read())
+        await async_db.items_to_table("xhs_note_comment", [_comment(i) for i in range(1, 6)])
+
+    asyncio.run(run())
+    return async_db
+
+
+def test_iter_query_streams_in_chunks(tmp_path):
+    async_db = _prepare_db(tmp_path)
+
+    async def run():
+        return [row["comment_id"] async for row in async_db.iter_query(
+            "SELECT * FROM xhs_note_comment WHERE add_ts >= ? ORDER BY id", 2, chunk_size=2)]
+
+    assert asyncio.run(run()) == ["c2", "c3", "c4", "c5"]
+
+
+def test_export_time_range_to_compressed_jsonl(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "SAVE_DATA_OPTION", "sqlite")
+    async_db = _prepare_db(tmp_path)
+    output = str(tmp_path / "export" / "comments.jsonl.gz")
+
+    async def run():
+        media_crawler_db_var.set(async_db)
+        return await export.export_table("xhs_note_comment", output, start=2, end=5, chunk_size=2)
+
+    assert asyncio.run(run()) == 3
+    with open(output, "rb") as f:
+        # 每批压缩成一个独立的 gzip member
+        assert f.read().count(b"\x1f\x8b\x08") == 2
+    with gzip.open(output, "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["comment_id"] for row in rows] == ["c2", "c3", "c4"]
+    assert rows[0]["content"] == "第2条,评论"
+
+
+def test_export_csv_and_rejects_unknown_names(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "SAVE_DATA_OPTION", "sqlite")
+    async_db = _prepare_db(tmp_path)
+    output = str(tmp_path / "comments.csv")
+
+    async def run():
+        media_crawler_db_var.set(async_db)
+        total = await export.export_table("xhs_note_comment", output, chunk_size=2)
+        with pytest.raises(ValueError):
+            await export.export_table("xhs_note_comment", output, time_field="add_ts; DROP TABLE xhs_note")
+        with pytest.raises(ValueError):
+            await export.export_table("no_such_table", output)
+        return total
+
+    assert asyncio.run(run()) == 5
+    with open(output, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["comment_id"] for row in rows] == ["c1", "c2", "c3", "c4", "c5"]
+    assert rows[4]["content"] == "第5条,评论"
+
+
+def test_guess_format_and_parse_time():
+    assert export.guess_format("a/b.csv.gz") == "csv"
+    assert export.guess_format("b.parquet") == "parquet"
+    with pytest.raises(ValueError):
+        export.guess_format("b.txt")
+    assert export.parse_time("1704038400000") == 1704038400000
+    assert export.parse_time("2024-01-01") == export.parse_time("2024-01-01 00:00:00")
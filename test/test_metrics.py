@@ -0,0 +1,56 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+import pytest
+
+from tools import metrics
+
+
+def test_histogram_render_is_cumulative():
+    registry = metrics.MetricsRegistry()
+    histogram = registry.histogram("test_latency_seconds", "latency", ("platform",), buckets=(0.1, 1))
+    histogram.observe(0.05, platform="xhs")
+    histogram.observe(0.5, platform="xhs")
+    histogram.observe(5, platform="xhs")
+    text = registry.render()
+    assert 'test_latency_seconds_bucket{platform="xhs",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{platform="xhs",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{platform="xhs",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{platform="xhs"} 3' in text
+
+
+def test_counter_requires_declared_labels():
+    counter = metrics.MetricsRegistry().counter("test_total", "total", ("platform",))
+    with pytest.raises(ValueError):
+        counter.inc(store="csv")
+
+
+def test_instrument_request_counts_outcomes():
+    class FakeClient:
+        @metrics.instrument_request("test_platform")
+        async def request(self, method, url, **kwargs):
+            if url == "bad":
+                raise ValueError(url)
+            return {}
+
+    client = FakeClient()
+    asyncio.run(client.request(method="GET", url="good"))
+    with pytest.raises(ValueError):
+        asyncio.run(client.request("POST", "bad"))
+
+    assert metrics.HTTP_REQUESTS_TOTAL.get(platform="test_platform", method="GET", outcome="ok") == 1
+    assert metrics.HTTP_REQUESTS_TOTAL.get(platform="test_platform", method="POST", outcome="ValueError") == 1
+    assert metrics.HTTP_REQUESTS_IN_FLIGHT.get(platform="test_platform") == 0
+    assert metrics.HTTP_REQUEST_DURATION.get_count(platform="test_platform") == 2
@@ -0,0 +1,112 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from tools.page_pool import BrowserPagePool
+
+
+class SlowPage:
+    def __init__(self, name: str):
+        self.name = name
+        self.closed = False
+        self.visited = []
+
+    async def evaluate(self, expression: str, arg=None):
+        await asyncio.sleep(0.01)
+        return self.name
+
+    async def goto(self, url: str, **kwargs):
+        self.visited.append(url)
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, open_delay: float = 0):
+        self.opened = 0
+        self.open_delay = open_delay
+
+    async def new_page(self) -> SlowPage:
+        self.opened += 1
+        name = f"new-{self.opened}"
+        await asyncio.sleep(self.open_delay)
+        return SlowPage(name)
+
+
+def test_page_pool_dispatches_to_least_busy_page():
+    async def main():
+        context = FakeContext()
+        pool = await BrowserPagePool.create(context, SlowPage("primary"), 3, "https://example.com")
+        assert len(pool) == 3
+        assert pool.primary.name == "primary"
+        assert all(page.visited == ["https://example.com"] for page in pool.pages[1:])
+
+        # 同时发起的 evaluate 平均分到每个页面上
+        names = await asyncio.gather(*[pool.evaluate("() => 1") for _ in range(6)])
+        assert sorted(names) == ["new-1", "new-1", "new-2", "new-2", "primary", "primary"]
+
+        # 连续借出时，已被占用的页面排在后面
+        async with pool.acquire() as first:
+            async with pool.acquire() as second:
+                assert first is not second
+
+        await pool.close()
+        assert len(pool) == 1
+        assert context.opened == 2
+
+    asyncio.run(main())
+
+
+def test_page_pool_replaces_closed_page():
+    async def main():
+        context = FakeContext()
+        pool = BrowserPagePool([SlowPage("primary"), SlowPage("second")], context, "https://example.com")
+        pool.pages[1].closed = True
+        names = await asyncio.gather(pool.evaluate("() => 1"), pool.evaluate("() => 1"))
+        assert sorted(names) == ["new-1", "primary"]
+        assert pool.pages[1].visited == ["https://example.com"]
+
+        # 没有浏览器上下文时无法替换，全部关闭后抛出异常
+        pool = BrowserPagePool([SlowPage("primary")])
+        pool.primary.closed = True
+        with pytest.raises(RuntimeError):
+            await pool.evaluate("() => 1")
+
+    asyncio.run(main())
+
+
+def test_page_pool_replaces_closed_page_once_and_keeps_primary():
+    async def main():
+        context = FakeContext(open_delay=0.01)
+        pool = BrowserPagePool([SlowPage("primary"), SlowPage("second")], context, "https://example.com")
+        primary = pool.primary
+        pool.pages[1].closed = True
+        # 并发借出时同一个关闭的页面只替换一次
+        await asyncio.gather(*[pool.evaluate("() => 1") for _ in range(6)])
+        assert context.opened == 1
+        assert pool.pages[1].name == "new-1"
+
+        # 主页面关闭后不替换，请求都落到其他页面上
+        primary.closed = True
+        names = await asyncio.gather(*[pool.evaluate("() => 1") for _ in range(3)])
+        assert names == ["new-1"] * 3
+        assert pool.primary is primary
+        assert context.opened == 1
+
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+import config
+from store import parquet_writer
+from store.bilibili import BiliStoreFactory
+from store.parquet_writer import table_columns
+from store.xhs import XhsParquetStoreImplement, XhsStoreFactory
+
+
+def test_table_columns_follow_sqlite_schema():
+    columns = dict(table_columns("xhs_note"))
+    assert "id" not in columns
+    assert columns["note_id"] == "TEXT"
+    assert columns["time"] == "INTEGER"
+    assert columns["liked_count"] == "TEXT"
+    with pytest.raises(ValueError):
+        table_columns("unknown_table")
+
+
+def test_every_parquet_store_type_has_a_table():
+    for store_class in (XhsStoreFactory.STORES["parquet"], BiliStoreFactory.STORES["parquet"]):
+        for table_name in store_class.store_tables.values():
+            assert table_columns(table_name)
+
+
+def test_parquet_store_writes_typed_row_groups(monkeypatch, tmp_path):
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(config, "PARQUET_ROW_GROUP_ROWS", 2)
+    store = XhsParquetStoreImplement()
+    store.parquet_store_path = str(tmp_path)
+
+    async def run():
+        await store.store_contents([
+            {"note_id": "1", "title": "a", "time": 1700000000000, "liked_count": "10", "unknown": "x"},
+            {"note_id": "2", "title": "b", "time": "1700000000001", "liked_count": 3},
+        ])
+        await store.store_content({"note_id": "3", "title": "c", "time": "1.2万"})
+        await parquet_writer.close_parquet_writers()
+        return store.make_save_file_name("contents")
+
+    file_name = asyncio.run(run())
+
+    parquet_file = pyarrow_parquet.ParquetFile(file_name)
+    assert parquet_file.metadata.num_row_groups == 2
+    table = parquet_file.read(columns=["note_id", "time", "liked_count"])
+    assert str(table.schema.field("time").type) == "int64"
+    assert table.to_pylist() == [
+        {"note_id": "1", "time": 1700000000000, "liked_count": "10"},
+        {"note_id": "2", "time": 1700000000001, "liked_count": "3"},
+        {"note_id": "3", "time": None, "liked_count": None},
+    ]
+
@@ -0,0 +1,54 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+from types import SimpleNamespace
+
+from tools.route_filter import ResourceFilter
+
+
+class FakeRoute:
+    def __init__(self, url: str, resource_type: str):
+        self.request = SimpleNamespace(url=url, resource_type=resource_type)
+        self.result = ""
+
+    async def abort(self):
+        self.result = "abort"
+
+    async def fallback(self):
+        self.result = "continue"
+
+
+def test_resource_filter_blocks_heavy_resources_and_analytics():
+    resource_filter = ResourceFilter(
+        "xhs", allow_list=["captcha"], blocked_types=["image", "media", "font"], blocked_hosts=["hm.baidu.com"]
+    )
+    cases = [
+        ("https://sns-webpic.xhscdn.com/a.jpg", "image", "abort"),
+        ("https://sns-video.xhscdn.com/a.mp4", "media", "abort"),
+        ("https://fe-static.xhscdn.com/a.woff2", "font", "abort"),
+        ("https://hm.baidu.com/hm.js", "script", "abort"),
+        ("https://sub.hm.baidu.com/hm.gif", "script", "abort"),
+        # 签名需要的脚本、接口请求、放行列表里的验证码图片不拦截
+        ("https://fe-static.xhscdn.com/vendor.js", "script", "continue"),
+        ("https://edith.xiaohongshu.com/api/sns/web/v1/search", "fetch", "continue"),
+        ("https://www.xiaohongshu.com/captcha/slide.png", "image", "continue"),
+        ("https://xhm.baidu.com/a.js", "script", "continue"),
+    ]
+
+    async def main():
+        for url, resource_type, expected in cases:
+            route = FakeRoute(url, resource_type)
+            await resource_filter.handle(route)
+            assert route.result == expected, url
+
+    asyncio.run(main())
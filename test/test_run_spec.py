@@ -0,0 +1,65 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+
+import pytest
+
+import config
+import main
+from tools.run_spec import load_run_spec
+
+
+class FakeCrawler:
+    def __init__(self, seen: list):
+        self.seen = seen
+
+    async def prepare(self, playwright):
+        pass
+
+    async def run(self):
+        # 爬取过程中修改配置只影响当前平台
+        config.CRAWLER_MAX_NOTES_COUNT = config.CRAWLER_MAX_NOTES_COUNT + 1
+        for _ in range(3):
+            await asyncio.sleep(0.01)
+            self.seen.append((config.PLATFORM, config.KEYWORDS, config.CRAWLER_MAX_NOTES_COUNT, tuple(config.BILI_CREATOR_ID_LIST)))
+
+
+def test_run_specs_isolate_platform_settings(monkeypatch, tmp_path):
+    seen = []
+    monkeypatch.setattr(main.CrawlerFactory, "create_crawler", staticmethod(lambda platform: FakeCrawler(seen)))
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps({"runs": [
+        {"platform": "xhs", "keywords": "a", "max_notes": 10},
+        {"platform": "bili", "crawler_type": "creator", "creator_ids": ["1"], "settings": {"KEYWORDS": "b"}},
+    ]}), encoding="utf-8")
+    defaults = (config.PLATFORM, config.KEYWORDS, config.CRAWLER_MAX_NOTES_COUNT, config.BILI_CREATOR_ID_LIST)
+
+    async def run():
+        specs = load_run_spec(str(spec_file))
+        await asyncio.gather(*[main.run_spec(spec, playwright=None) for spec in specs])
+
+    asyncio.run(run())
+
+    assert set(seen) == {
+        ("xhs", "a", 11, tuple(defaults[3])),
+        ("bili", "b", defaults[2] + 1, ("1",)),
+    }
+    assert (config.PLATFORM, config.KEYWORDS, config.CRAWLER_MAX_NOTES_COUNT, config.BILI_CREATOR_ID_LIST) == defaults
+
+
+def test_run_spec_rejects_shared_settings(tmp_path):
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps({"runs": [{"platform": "xhs", "settings": {"SAVE_DATA_OPTION": "db"}}]}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_run_spec(str(spec_file))
@@ -0,0 +1,129 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from tools import scheduler
+from var import source_keyword_var
+
+
+def test_run_keywords_keeps_source_keyword_per_task():
+    limiter = scheduler.RequestLimiter(max_inflight=2)
+    stored = []
+    running = {"keywords": 0, "requests": 0, "max_keywords": 0, "max_requests": 0}
+
+    async def fake_request():
+        async with limiter:
+            running["requests"] += 1
+            running["max_requests"] = max(running["max_requests"], running["requests"])
+            await asyncio.sleep(0.01)
+            running["requests"] -= 1
+
+    async def search_keyword(keyword: str) -> None:
+        running["keywords"] += 1
+        running["max_keywords"] = max(running["max_keywords"], running["keywords"])
+        for _ in range(3):
+            await asyncio.gather(fake_request(), fake_request())
+            # 其他关键词任务交替运行后，当前任务看到的仍是自己的关键词
+            stored.append((keyword, source_keyword_var.get()))
+        running["keywords"] -= 1
+        if keyword == "bad":
+            raise ValueError(keyword)
+
+    asyncio.run(scheduler.run_keywords(search_keyword, keywords=["a", "b", "bad", "c"], concurrency=3))
+
+    assert len(stored) == 12
+    assert all(keyword == source_keyword for keyword, source_keyword in stored)
+    assert running["max_keywords"] == 3
+    assert running["max_requests"] == 2
+    assert source_keyword_var.get() == ""
+
+
+def test_gather_limited_caps_concurrency_and_cancels_on_error():
+    running = {"now": 0, "max": 0, "started": 0, "cancelled": 0}
+
+    async def fetch(i: int) -> int:
+        running["started"] += 1
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        try:
+            await asyncio.sleep(0.01 if i != 3 else 0)
+            if i == 3:
+                raise ValueError(i)
+            await asyncio.sleep(1)
+            return i
+        except asyncio.CancelledError:
+            running["cancelled"] += 1
+            raise
+        finally:
+            running["now"] -= 1
+
+    async def main():
+        assert await scheduler.gather_limited([asyncio.sleep(0, result=i) for i in range(5)], 2) == [0, 1, 2, 3, 4]
+        with pytest.raises(ValueError):
+            await scheduler.gather_limited([fetch(i) for i in range(10)], 4)
+
+    asyncio.run(main())
+    assert running["max"] == 4
+    # 第 4 个协程失败后，已经启动的其余协程都被取消，排队中的协程不再执行
+    assert running["started"] < 10
+    assert running["cancelled"] == running["started"] - 1
+    assert running["now"] == 0
+
+
+
+def test_gather_limited_shares_semaphore_across_pages():
+    running = {"now": 0, "max": 0}
+
+    async def fetch(i: int) -> int:
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        return i
+
+    async def main():
+        # 同一个帖子下多页一级评论各自在后台抓二级评论，共用一个并发上限
+        semaphore = asyncio.Semaphore(2)
+        async with scheduler.BackgroundTasks() as pending:
+            for page in range(3):
+                pending.start(scheduler.gather_limited([fetch(i) for i in range(4)], 4, semaphore))
+            results = await pending.join()
+        assert results == [[0, 1, 2, 3]] * 3
+
+    asyncio.run(main())
+    assert running["max"] == 2
+
+def test_run_creators_worker_pool():
+    finished = []
+    running = {"now": 0, "max": 0}
+
+    async def crawl_creator(user_id: str) -> None:
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        # 每个创作者的翻页游标只在自己的任务里
+        cursor = 0
+        while cursor < int(user_id) % 3 + 1:
+            await asyncio.sleep(0.01)
+            cursor += 1
+        running["now"] -= 1
+        if user_id == "5":
+            raise ValueError(user_id)
+        finished.append(user_id)
+
+    creator_ids = [str(i) for i in range(20)]
+    asyncio.run(scheduler.run_creators(crawl_creator, creator_ids, concurrency=4))
+
+    assert sorted(finished, key=int) == [user_id for user_id in creator_ids if user_id != "5"]
+    assert running["max"] == 4
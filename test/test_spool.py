@@ -0,0 +1,138 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import os
+
+import config
+import store
+from async_sqlite_db import AsyncSqliteDB
+from store import spool
+from store import xhs as xhs_store
+from store.spool import DiskSpool
+from var import media_crawler_db_var
+
+from .test_store_batch import _comment
+
+
+class FlakyStore:
+    """
+    前两次批量写入失败，模拟数据库暂时不可用
+    """
+    failures = 2
+    written = []
+
+    async def store_comment(self, comment_item):
+        raise AssertionError("single calls are merged into store_comments")
+
+    async def store_comments(self, comment_items):
+        if FlakyStore.failures > 0:
+            FlakyStore.failures -= 1
+            raise ConnectionError("database is down")
+        FlakyStore.written.append([item["comment_id"] for item in comment_items])
+
+
+class PoisonStore:
+    """
+    带有 bad 的评论永远写入失败，模拟字段超长之类的坏数据
+    """
+    written = []
+
+    async def store_comments(self, comment_items):
+        if any(item["comment_id"].startswith("bad") for item in comment_items):
+            raise ValueError("data too long for column")
+        PoisonStore.written.extend(item["comment_id"] for item in comment_items)
+
+
+def test_spooled_store_replays_into_sqlite(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "SAVE_DATA_OPTION", "sqlite")
+    monkeypatch.setattr(config, "ENABLE_DB_SPOOL", True)
+    monkeypatch.setattr(config, "SPOOL_DIR", str(tmp_path / "spool"))
+    async_db = AsyncSqliteDB(str(tmp_path / "test.db"))
+    store.clear_store_cache()
+
+    async def run():
+        with open("schema/sqlite_tables.sql", encoding="utf-8") as f:
+            await async_db.executescript(f.read())
+        media_crawler_db_var.set(async_db)
+        db_store = xhs_store.XhsStoreFactory.create_store()
+        await db_store.store_comment(_comment("c1"))
+        await db_store.store_comments([_comment("c2"), _comment("c1", "edited")])
+        # 存储调用只写入 spool，数据库还没有数据
+        before = await async_db.query("select comment_id from xhs_note_comment")
+        await spool.close_spool()
+        return before, await async_db.query("select comment_id, content from xhs_note_comment order by id")
+
+    before, rows = asyncio.run(run())
+    store.clear_store_cache()
+
+    assert before == []
+    assert [(row["comment_id"], row["content"]) for row in rows] == [("c1", "edited"), ("c2", "hello")]
+
+
+def test_spool_retries_and_resumes_after_crash(monkeypatch, tmp_path):
+    monkeypatch.setattr(spool, "RETRY_MIN_INTERVAL_SEC", 0.01)
+    monkeypatch.setattr(FlakyStore, "written", [])
+    spool_dir = str(tmp_path / "spool")
+    store_path = f"{__name__}:FlakyStore"
+
+    async def crash():
+        disk_spool = DiskSpool(spool_dir, segment_max_bytes=200)
+        # 模拟进程异常退出：后台任务还没写入数据库
+        disk_spool._drainer.cancel()
+        for i in range(5):
+            disk_spool.append(store_path, "store_comment", ({"comment_id": f"c{i}"},), {})
+        disk_spool._write_file.write(b'{"store": "torn')
+        disk_spool._write_file.close()
+
+    async def restart():
+        FlakyStore.failures = 2
+        disk_spool = DiskSpool(spool_dir, batch_size=3)
+        disk_spool.append(store_path, "store_comments", ([{"comment_id": "c5"}],), {})
+        await disk_spool.close(timeout=5)
+
+    asyncio.run(crash())
+    assert len(os.listdir(spool_dir)) > 1
+    asyncio.run(restart())
+
+    assert FlakyStore.written == [["c0", "c1", "c2"], ["c3", "c4", "c5"]]
+    # 写入数据库的日志段已经删除，只剩重启后正在写入的段和 checkpoint
+    assert len(os.listdir(spool_dir)) == 2 and "checkpoint" in os.listdir(spool_dir)
+
+
+def test_spool_moves_poison_records_to_dead_letter(monkeypatch, tmp_path):
+    monkeypatch.setattr(spool, "RETRY_MIN_INTERVAL_SEC", 0.01)
+    monkeypatch.setattr(PoisonStore, "written", [])
+    spool_dir = str(tmp_path / "spool")
+    store_path = f"{__name__}:PoisonStore"
+
+    async def run():
+        disk_spool = DiskSpool(spool_dir, batch_size=3, max_attempts=2)
+        for comment_id in ["c0", "bad1", "c2", "c3"]:
+            disk_spool.append(store_path, "store_comment", ({"comment_id": comment_id},), {})
+        disk_spool.append("store.removed:MissingStore", "store_comment", ({"comment_id": "c4"},), {})
+        disk_spool.append(store_path, "store_comment", ({"comment_id": "c5"},), {})
+        await disk_spool.close(timeout=5)
+        return disk_spool
+
+    disk_spool = asyncio.run(run())
+
+    # 坏数据所在的批次逐条写入，其余数据不受影响（失败重试的批次里已写入的数据会重复写入，按主键更新没有副作用）
+    assert list(dict.fromkeys(PoisonStore.written)) == ["c0", "c2", "c3", "c5"]
+    with open(disk_spool.dead_letter_path, encoding="utf-8") as f:
+        dead = [json.loads(line) for line in f]
+    assert [(record["store"], record["args"][0]["comment_id"]) for record in dead] == \
+           [(store_path, "bad1"), ("store.removed:MissingStore", "c4")]
+    assert "data too long" in dead[0]["error"]
+    # checkpoint 越过了坏数据，重启后不会再重放
+    assert disk_spool._load_checkpoint() == (disk_spool._write_no, os.path.getsize(disk_spool._segment_path(disk_spool._write_no)))
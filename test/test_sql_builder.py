@@ -0,0 +1,57 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+
+from async_sqlite_db import AsyncSqliteDB
+from sql_builder import MYSQL, SQLITE
+from store.bilibili import bilibili_store_sql
+from store.xhs import xhs_store_sql
+from var import media_crawler_db_var
+
+
+def test_builder_binds_values_and_caches_sql_text():
+    assert MYSQL.update("xhs_note", ("title", "desc"), "note_id") == \
+           "UPDATE `xhs_note` SET `title`=%s,`desc`=%s WHERE `note_id`=%s"
+    assert SQLITE.insert("xhs_note", ("note_id", "desc")) == 'INSERT INTO "xhs_note" ("note_id","desc") VALUES (?,?)'
+    assert MYSQL.insert("xhs_note", ("note_id", "desc")) == "INSERT INTO `xhs_note` (`note_id`,`desc`) VALUES (%s,%s)"
+    assert SQLITE.select_where("bilibili_contact_info", ("up_id", "fan_id")) == \
+           'SELECT * FROM "bilibili_contact_info" WHERE "up_id"=? AND "fan_id"=?'
+    assert MYSQL.select_fields_in("xhs_note", ("note_id", "liked_count"), "note_id", 2) == \
+           "SELECT `note_id`,`liked_count` FROM `xhs_note` WHERE `note_id` IN (%s,%s)"
+    assert MYSQL.ident("a`b") == "`a``b`"
+    # 相同的表和字段集合复用同一个 SQL 文本
+    assert MYSQL.insert("xhs_note", ("note_id",)) is MYSQL.insert("xhs_note", ("note_id",))
+
+
+def test_store_sql_handles_ids_with_quotes(tmp_path):
+    async_db = AsyncSqliteDB(str(tmp_path / "test.db"))
+    note_id = "a'b\"c"
+
+    async def run():
+        with open("schema/sqlite_tables.sql", encoding="utf-8") as f:
+            await async_db.executescript(f.read())
+        media_crawler_db_var.set(async_db)
+        note = {"note_id": note_id, "user_id": "u1", "desc": "x", "add_ts": 1, "last_modify_ts": 1,
+                "time": 1, "last_update_time": 1}
+        await xhs_store_sql.add_new_content(note)
+        await xhs_store_sql.update_content_by_content_id(note_id, {"desc": "it's updated"})
+        await bilibili_store_sql.add_new_contact({"up_id": "1'", "fan_id": "2", "add_ts": 1, "last_modify_ts": 1})
+        return (await xhs_store_sql.query_content_by_content_id(note_id),
+                await bilibili_store_sql.query_contact_by_up_and_fan("1'", "2"),
+                await xhs_store_sql.query_content_by_content_id("' or '1'='1"))
+
+    note, contact, missing = asyncio.run(run())
+
+    assert note["desc"] == "it's updated"
+    assert contact["fan_id"] == "2"
+    assert missing == {}
@@ -0,0 +1,52 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+
+import sqlite_fts
+from async_sqlite_db import AsyncSqliteDB
+
+
+def _comment(comment_id: str, content: str) -> dict:
+    return {
+        "comment_id": comment_id, "create_time": 1, "note_id": "n1", "content": content, "user_id": "u1",
+        "sub_comment_count": 0, "add_ts": 1, "last_modify_ts": 1,
+    }
+
+
+def test_fts_index_follows_inserts_updates_and_deletes(tmp_path):
+    async_db = AsyncSqliteDB(str(tmp_path / "test.db"))
+
+    async def run():
+        with open("schema/sqlite_tables.sql", encoding="utf-8") as f:
+            await async_db.executescript(f.read())
+        # 建索引之前已有的数据也能检索到
+        await async_db.items_to_table("xhs_note_comment", [_comment("c1", "这个编程副业真的靠谱吗")])
+        await sqlite_fts.init_fts(async_db)
+        await sqlite_fts.init_fts(async_db)
+        await async_db.items_to_table("xhs_note_comment", [
+            _comment("c2", "编程副业月入过万"), _comment("c3", "今天天气不错"), _comment("c4", 'say "hello" world'),
+        ])
+        await async_db.update_items("xhs_note_comment", [{"comment_id": "c3", "content": "周末学编程副业"}], "comment_id")
+        await async_db.execute("DELETE FROM xhs_note_comment WHERE comment_id = ?", "c1")
+
+        def ids(rows):
+            return sorted(row["comment_id"] for row in rows)
+
+        return (ids(await sqlite_fts.search(async_db, "xhs_note_comment", "编程副业")),
+                ids(await sqlite_fts.search(async_db, "xhs_note_comment", "编程副业 周末学")),
+                ids(await sqlite_fts.search(async_db, "xhs_note_comment", "天气不错")),
+                ids(await sqlite_fts.search(async_db, "xhs_note_comment", '"hello"')),
+                # 少于 3 个字符的关键词退回到 LIKE
+                ids(await sqlite_fts.search(async_db, "xhs_note_comment", "周末")))
+
+    assert asyncio.run(run()) == (["c2", "c3"], ["c3"], [], ["c4"], ["c3"])
@@ -0,0 +1,21 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+from test import startup_benchmark
+
+
+def test_startup_does_not_load_heavy_modules():
+    # 词云、滑块验证码、redis 等依赖只在对应功能开启时才导入
+    for platform in ("", "dy"):
+        data = startup_benchmark.probe(platform)
+        assert data["heavy_modules"] == [], platform
+        assert data["elapsed"] > 0
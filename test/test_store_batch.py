@@ -0,0 +1,167 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+import csv
+
+from aiomysql.cursors import RE_INSERT_VALUES
+
+import config
+import store
+from async_db import AsyncMysqlDB
+from async_sqlite_db import AsyncSqliteDB
+from model.m_xiaohongshu import XhsNoteCommentRecord
+from store import csv_writer
+from store import xhs as xhs_store
+from tools import metrics
+from var import crawler_type_var, media_crawler_db_var
+
+
+def _comment(comment_id: str, content: str = "hello") -> XhsNoteCommentRecord:
+    return XhsNoteCommentRecord(
+        comment_id=comment_id, create_time=1700000000000, ip_location="上海", note_id="n1",
+        content=content, user_id="u1", nickname="nick", avatar="", sub_comment_count=0,
+        pictures="", parent_comment_id="0", root_comment_id=comment_id, last_modify_ts=1700000000001, like_count=3,
+    )
+
+
+class _RecordingMysqlCursor:
+    def __init__(self, executed: list):
+        self.executed = executed
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+    async def executemany(self, sql: str, args: list) -> int:
+        self.executed.append((sql, args))
+        return len(args)
+
+
+class _RecordingMysqlPool:
+    def __init__(self):
+        self.executed = []
+
+    def acquire(self):
+        return self
+
+    def cursor(self, *args):
+        return _RecordingMysqlCursor(self.executed)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+
+def test_mysql_items_to_table_uses_multi_row_insert():
+    pool = _RecordingMysqlPool()
+    items = [{"comment_id": "c1", "content": "a"}, {"comment_id": "c2", "content": "b"}]
+    assert asyncio.run(AsyncMysqlDB(pool).items_to_table("xhs_note_comment", items)) == 2
+
+    (sql, args), = pool.executed
+    # aiomysql 只有 SQL 匹配 RE_INSERT_VALUES 时才会把 executemany 合并成一条多值 INSERT，否则逐条执行
+    assert RE_INSERT_VALUES.match(sql)
+    assert len(args) == 2
+
+
+def test_store_factory_reuses_instance_until_cleared(monkeypatch):
+    monkeypatch.setattr(config, "SAVE_DATA_OPTION", "csv")
+    store.clear_store_cache()
+    first = xhs_store.XhsStoreFactory.create_store()
+    assert xhs_store.XhsStoreFactory.create_store() is first
+    store.clear_store_cache()
+    assert xhs_store.XhsStoreFactory.create_store() is not first
+    store.clear_store_cache()
+
+
+def test_csv_store_comments_writes_one_batch(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "SAVE_DATA_OPTION", "csv")
+    monkeypatch.setattr(xhs_store.XhsCsvStoreImplement, "csv_store_path", str(tmp_path))
+    store.clear_store_cache()
+    before = metrics.STORE_ITEMS_TOTAL.total(platform="xhs", item_type="comment", outcome="ok")
+
+    async def run():
+        crawler_type_var.set("search")
+        await xhs_store.XhsStoreFactory.create_store().store_comments([_comment("c1"), _comment("c2")])
+        await xhs_store.XhsStoreFactory.create_store().store_comments([_comment("c3")])
+        await csv_writer.close_csv_writers()
+
+    asyncio.run(run())
+    store.clear_store_cache()
+
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1
+    with open(files[0], encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(_comment("c0").keys())
+    assert [row[0] for row in rows[1:]] == ["c1", "c2", "c3"]
+    assert metrics.STORE_ITEMS_TOTAL.total(platform="xhs", item_type="comment", outcome="ok") - before == 3
+
+
+def test_sqlite_store_comments_inserts_new_and_updates_existing(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    async_db = AsyncSqliteDB(db_path)
+
+    async def run():
+        with open("schema/sqlite_tables.sql", encoding="utf-8") as f:
+            await async_db.executescript(f.read())
+        media_crawler_db_var.set(async_db)
+        sqlite_store = xhs_store.XhsSqliteStoreImplement()
+        await sqlite_store.store_comments([_comment("c1"), _comment("c2")])
+        # c2 已存在按更新处理，同一批里重复的 c3 只插入一次
+        await sqlite_store.store_comments([_comment("c2", "edited"), _comment("c3"), _comment("c3", "again")])
+        return await async_db.query("select comment_id, content, add_ts from xhs_note_comment order by id")
+
+    rows = asyncio.run(run())
+
+    assert [(row["comment_id"], row["content"]) for row in rows] == [("c1", "hello"), ("c2", "edited"), ("c3", "again")]
+    assert all(row["add_ts"] for row in rows)
+
+
+def test_sqlite_store_skips_unchanged_updates(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "SKIP_UNCHANGED_UPDATES", True)
+    async_db = AsyncSqliteDB(str(tmp_path / "test.db"))
+    updates = []
+    update_items = async_db.update_items
+
+    async def record_update_items(table_name, items, field_where):
+        updates.append([dict(item) for item in items])
+        return await update_items(table_name, items, field_where)
+
+    monkeypatch.setattr(async_db, "update_items", record_update_items)
+
+    def recrawled(comment_id: str, like_count: int) -> XhsNoteCommentRecord:
+        comment = _comment(comment_id)
+        comment.like_count = like_count
+        comment.last_modify_ts = 1700000000002
+        return comment
+
+    async def run():
+        with open("schema/sqlite_tables.sql", encoding="utf-8") as f:
+            await async_db.executescript(f.read())
+        media_crawler_db_var.set(async_db)
+        sqlite_store = xhs_store.XhsSqliteStoreImplement()
+        await sqlite_store.store_comments([_comment("c1"), _comment("c2")])
+        # like_count 在表里是 TEXT，取值相同的 int 不算变化
+        await sqlite_store.store_comments([recrawled("c1", 3), recrawled("c2", 5)])
+        await sqlite_store.store_comment(recrawled("c1", 3))
+        return await async_db.query("select comment_id, like_count, last_modify_ts from xhs_note_comment order by id")
+
+    rows = asyncio.run(run())
+
+    assert updates == [[{"like_count": 5, "last_modify_ts": 1700000000002, "comment_id": "c2"}]]
+    assert [(row["comment_id"], row["like_count"], row["last_modify_ts"]) for row in rows] == [
+        ("c1", "3", 1700000000001), ("c2", "5", 1700000000002)]
@@ -0,0 +1,73 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+
+from model.m_bilibili import BilibiliDynamicRecord
+from model.m_xiaohongshu import XhsNoteCommentRecord
+
+
+def _new_comment() -> XhsNoteCommentRecord:
+    return XhsNoteCommentRecord(
+        comment_id="c1",
+        create_time=1700000000000,
+        ip_location="上海",
+        note_id="n1",
+        content="hello",
+        user_id="u1",
+        nickname="nick",
+        avatar="",
+        sub_comment_count=0,
+        pictures="",
+        parent_comment_id="0",
+        root_comment_id="c1",
+        last_modify_ts=1700000000001,
+        like_count=3,
+    )
+
+
+def test_record_has_no_instance_dict():
+    record = _new_comment()
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(AttributeError):
+        record.unknown_field = 1
+
+
+def test_record_behaves_like_mapping():
+    record = _new_comment()
+    assert record.get("comment_id") == "c1"
+    assert record["like_count"] == 3
+    assert record.get("missing", "x") == "x"
+    assert "add_ts" not in record
+    assert list(record.keys())[:2] == ["comment_id", "create_time"]
+    assert len(record) == len(record.values())
+    with pytest.raises(KeyError):
+        record["missing"] = 1
+
+
+def test_record_add_ts_is_appended_once_set():
+    record = _new_comment()
+    record["add_ts"] = 123
+    assert record.keys()[-1] == "add_ts"
+    assert record["add_ts"] == 123
+    assert json.loads(json.dumps(dict(record)))["add_ts"] == 123
+
+
+def test_record_field_named_like_builtin():
+    record = BilibiliDynamicRecord(
+        dynamic_id="d1", user_id="u1", user_name="up", text="t", type="WORD",
+        pub_ts=1, total_comments=0, total_forwards=0, total_liked=0, last_modify_ts=2,
+    )
+    assert record.to_dict()["type"] == "WORD"
@@ -11,7 +11,16 @@
 
 # -*- coding: utf-8 -*-
 
-from tools import utils
+import asyncio
+import io
+import json
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueListener
+
+from tools import tracing, utils
 
 
 def test_convert_cookies():
@@ -19,3 +28,85 @@ def test_convert_cookies():
     cookie_dict = utils.convert_str_cookie_to_dict(xhs_cookies)
     assert cookie_dict.get("webId") == "1190c4d3cxxxx125xxx"
     assert cookie_dict.get("a1") == "x000101360"
+
+
+def test_lazy_payload_is_bounded():
+    payload = utils.lazy_payload({"items": [{"desc": "x" * 10000}] * 1000}, max_chars=100)
+    text = str(payload)
+    assert text.endswith("...(truncated)")
+    assert len(text) <= 100 + len("...(truncated)")
+
+
+def test_module_level_filter_matches_longest_prefix():
+    log_filter = utils.ModuleLevelFilter(
+        logging.INFO, {"store": logging.WARNING, "store.xhs": logging.DEBUG}
+    )
+
+    def make_record(rel_path: str, level: int) -> logging.LogRecord:
+        pathname = os.path.join(utils._PROJECT_ROOT, rel_path)
+        return logging.LogRecord("MediaCrawler", level, pathname, 1, "msg", None, None)
+
+    assert log_filter.filter(make_record("store/xhs/__init__.py", logging.DEBUG))
+    assert not log_filter.filter(make_record("store/douyin/__init__.py", logging.INFO))
+    assert log_filter.filter(make_record("media_platform/xhs/core.py", logging.INFO))
+    assert not log_filter.filter(make_record("media_platform/xhs/core.py", logging.DEBUG))
+
+
+def test_payload_sampling_filter():
+    log_filter = utils.PayloadSamplingFilter(every=3)
+    record = logging.LogRecord("MediaCrawler", logging.INFO, __file__, 1, "res: %s", (utils.lazy_payload({}),), None)
+    assert [log_filter.filter(record) for _ in range(6)] == [True, False, False, True, False, False]
+    plain = logging.LogRecord("MediaCrawler", logging.INFO, __file__, 2, "page: %s", (1,), None)
+    assert all(log_filter.filter(plain) for _ in range(3))
+
+
+
+def test_deferred_format_queue_handler_formats_on_listener_thread():
+    format_threads = []
+
+    class Payload:
+        def __str__(self) -> str:
+            format_threads.append(threading.current_thread())
+            return "payload"
+
+    stream = io.StringIO()
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    handler = utils.DeferredFormatQueueHandler(queue.SimpleQueue())
+    listener = QueueListener(handler.queue, stream_handler)
+    listener.start()
+    record = logging.LogRecord("MediaCrawler", logging.INFO, __file__, 1, "res: %s", (Payload(),), None)
+    handler.handle(record)
+    listener.stop()
+
+    assert stream.getvalue() == "INFO res: payload\n"
+    assert format_threads and threading.current_thread() not in format_threads
+
+def test_tracing_spans_nest_across_tasks(tmp_path):
+    recorder = tracing.TraceRecorder(enabled=True, export_path=str(tmp_path / "trace.json"))
+    origin_recorder, tracing.recorder = tracing.recorder, recorder
+    try:
+        async def fetch():
+            with tracing.span("network", "fetch"):
+                await tracing.sleep(0)
+
+        async def run():
+            with tracing.span("parse", "outer"):
+                await asyncio.gather(fetch(), fetch())
+
+        asyncio.run(run())
+    finally:
+        tracing.recorder = origin_recorder
+
+    assert {stage: len(durations) for stage, durations in recorder.stage_durations.items()} == {
+        "network": 2, "sleep": 2, "parse": 1,
+    }
+    events = {event["args"]["span_id"]: event for event in recorder.events}
+    outer = next(event for event in events.values() if event["name"] == "outer")
+    network_events = [event for event in events.values() if event["cat"] == "network"]
+    assert all(event["args"]["parent_id"] == outer["args"]["span_id"] for event in network_events)
+    assert "network" in recorder.summary()
+
+    recorder.export_chrome_trace(recorder.export_path)
+    with open(recorder.export_path, encoding="utf-8") as f:
+        assert len(json.load(f)["traceEvents"]) == 5
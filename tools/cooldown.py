@@ -0,0 +1,172 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 按平台的风控冷却/熔断器：疑似被封时暂停该平台的请求，冷却期间不阻塞事件循环，冷却结束后半开探测恢复
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Optional
+
+import config
+
+from . import metrics, tracing, utils
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# 指标里用数字表示状态
+_STATE_VALUES = {STATE_CLOSED: 0, STATE_OPEN: 1, STATE_HALF_OPEN: 2}
+
+# 探测任务里发出的请求不受熔断器限制，否则探测请求会等待自己
+_probing_var: ContextVar[bool] = ContextVar("cooldown_probing", default=False)
+
+
+class CircuitBreaker:
+    """
+    单个平台的熔断器
+        closed:    正常请求，连续失败达到阈值后进入 open
+        open:      冷却中，所有请求在 wait_until_available 处非阻塞地等待
+        half_open: 冷却结束，由一个任务刷新登录态并发一次轻量探测请求，成功则恢复 closed，失败则以翻倍的冷却时间重新 open
+    """
+
+    def __init__(self, platform: str, cooldown_seconds: Optional[float] = None,
+                 max_cooldown_seconds: Optional[float] = None, failure_threshold: Optional[int] = None):
+        """
+        Args:
+            platform: 平台名称
+            cooldown_seconds: 首次冷却时长，为空时读取 config.CIRCUIT_BREAKER_COOLDOWN_SEC
+            max_cooldown_seconds: 冷却时长翻倍的上限，为空时读取 config.CIRCUIT_BREAKER_MAX_COOLDOWN_SEC
+            failure_threshold: 连续失败多少次后熔断，为空时读取 config.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        """
+        self.platform = platform
+        self._cooldown_seconds = cooldown_seconds
+        self._max_cooldown_seconds = max_cooldown_seconds
+        self._failure_threshold = failure_threshold
+        self.state = STATE_CLOSED
+        self._consecutive_failures = 0
+        self._consecutive_trips = 0
+        self._open_until = 0.0
+        self._probe: Optional[Callable[[], Awaitable[bool]]] = None
+        self._refresh: Optional[Callable[[], Awaitable[None]]] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        metrics.CIRCUIT_BREAKER_STATE.set(0, platform=platform)
+
+    @property
+    def cooldown_seconds(self) -> float:
+        """
+        本次熔断的冷却时长，连续熔断时按 2 的幂翻倍，不超过上限
+        """
+        base = self._cooldown_seconds if self._cooldown_seconds is not None else config.CIRCUIT_BREAKER_COOLDOWN_SEC
+        upper = self._max_cooldown_seconds if self._max_cooldown_seconds is not None else config.CIRCUIT_BREAKER_MAX_COOLDOWN_SEC
+        return min(base * 2 ** max(self._consecutive_trips - 1, 0), upper)
+
+    @property
+    def failure_threshold(self) -> int:
+        if self._failure_threshold is not None:
+            return self._failure_threshold
+        return config.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+
+    def set_recovery(self, probe: Callable[[], Awaitable[bool]],
+                     refresh: Optional[Callable[[], Awaitable[None]]] = None) -> None:
+        """
+        设置半开状态下的恢复流程
+        Args:
+            probe: 轻量探测请求，返回 True 表示恢复正常，例如客户端的 pong
+            refresh: 探测前执行的登录态刷新，例如重新打开首页并更新 cookie
+
+        Returns:
+
+        """
+        self._probe = probe
+        self._refresh = refresh
+
+    def record_success(self) -> None:
+        if self.state == STATE_CLOSED:
+            self._consecutive_failures = 0
+
+    def record_failure(self, reason: object = None) -> None:
+        """
+        记录一次疑似被封的失败，连续失败达到阈值后熔断；已经熔断时忽略（冷却中在途请求的失败不重复计算）
+        """
+        if self.state != STATE_CLOSED:
+            return
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.failure_threshold:
+            self._trip(reason)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        metrics.CIRCUIT_BREAKER_STATE.set(_STATE_VALUES[state], platform=self.platform)
+
+    def _trip(self, reason: object) -> None:
+        self._consecutive_trips += 1
+        cooldown = self.cooldown_seconds
+        self._open_until = time.monotonic() + cooldown
+        self._set_state(STATE_OPEN)
+        metrics.CIRCUIT_BREAKER_TRIPS_TOTAL.inc(platform=self.platform)
+        utils.logger.warning(
+            f"[CircuitBreaker._trip] {self.platform} may be blocked, cool down {cooldown:.1f}s, reason: {reason}")
+
+    async def wait_until_available(self) -> None:
+        """
+        请求前调用：closed 状态直接返回；open 状态用 asyncio.sleep 等待冷却结束，期间其他协程（存储、其他平台）照常运行；
+        冷却结束后第一个到达的协程启动探测任务，其余协程等待探测结果
+        """
+        if _probing_var.get():
+            return
+        while self.state != STATE_CLOSED:
+            if self.state == STATE_OPEN:
+                remaining = self._open_until - time.monotonic()
+                if remaining > 0:
+                    with tracing.span("sleep", f"cooldown:{self.platform}"):
+                        await asyncio.sleep(remaining)
+                    continue
+                self._set_state(STATE_HALF_OPEN)
+                self._probe_task = asyncio.create_task(self._run_probe())
+            # 用 asyncio.wait 等待，等待方被取消时不会连带取消探测任务
+            await asyncio.wait({self._probe_task})
+            if self.state == STATE_HALF_OPEN:
+                # 探测任务还没开始执行就被取消，_run_probe 里的 finally 没有机会运行，这里重新熔断
+                self._trip("half-open probe cancelled")
+
+    async def _run_probe(self) -> None:
+        _probing_var.set(True)
+        ok = False
+        try:
+            if self._refresh is not None:
+                await self._refresh()
+            ok = await self._probe() if self._probe is not None else True
+        except Exception as e:
+            utils.logger.error(f"[CircuitBreaker._run_probe] {self.platform} probe error: {e}")
+        finally:
+            # 探测被取消时也要离开 half_open，否则等待方会一直等这个已经结束的探测任务
+            if ok:
+                utils.logger.info(f"[CircuitBreaker._run_probe] {self.platform} recovered, resume requests")
+                self._consecutive_failures = 0
+                self._consecutive_trips = 0
+                self._set_state(STATE_CLOSED)
+            else:
+                self._trip("half-open probe failed")
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(platform: str) -> CircuitBreaker:
+    """
+    获取平台的熔断器，同一平台的客户端和爬虫共享同一个实例
+    """
+    breaker = _breakers.get(platform)
+    if breaker is None:
+        breaker = _breakers[platform] = CircuitBreaker(platform)
+    return breaker
@@ -0,0 +1,368 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 轻量的 Prometheus 风格指标（Counter / Gauge / Histogram），供客户端、存储、代理池埋点
+import asyncio
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from . import tracing
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # 指标在事件循环里更新，在 metrics server 线程里读取，用锁保护
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, Any]) -> LabelValues:
+        if len(labels) != len(self.labelnames) or not all(name in labels for name in self.labelnames):
+            raise ValueError(f"[{self.name}] expected labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def collect(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        lines.extend(self.collect())
+        return lines
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._label_values(labels), 0)
+
+    def total(self, **labels) -> float:
+        """
+        只按部分 label 过滤求和，例如 STORE_ITEMS_TOTAL.total(platform="xhs", item_type="content")
+        """
+        unknown = set(labels) - set(self.labelnames)
+        if unknown:
+            raise ValueError(f"[{self.name}] unknown labels {tuple(unknown)}")
+        indexes = [(self.labelnames.index(name), str(value)) for name, value in labels.items()]
+        with self._lock:
+            items = list(self._values.items())
+        return sum(value for key, value in items if all(key[i] == expected for i, expected in indexes))
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    metric_type = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # 每组 label 对应: [各个桶的计数(非累计), sum, count]
+        self._values: Dict[LabelValues, List] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def get_count(self, **labels) -> int:
+        state = self._values.get(self._label_values(labels))
+        return state[2] if state else 0
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        lines = []
+        bucket_labelnames = self.labelnames + ("le",)
+        for key, (bucket_counts, total, count) in items:
+            cumulative = 0
+            for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(bucket_labelnames, key + (_format_value(upper_bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    指标注册表，按注册顺序输出 Prometheus 文本格式
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"[MetricsRegistry] duplicated metric name: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS_TOTAL = registry.counter(
+    "mediacrawler_http_requests_total",
+    "Platform API requests by outcome (ok or exception class name)",
+    ("platform", "method", "outcome"),
+)
+HTTP_RESPONSES_TOTAL = registry.counter(
+    "mediacrawler_http_responses_total",
+    "Platform API responses by HTTP status code",
+    ("platform", "status_code"),
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "mediacrawler_http_request_duration_seconds",
+    "Platform API request latency in seconds",
+    ("platform",),
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "mediacrawler_http_requests_in_flight",
+    "Platform API requests currently waiting for a response",
+    ("platform",),
+)
+STORE_ITEMS_TOTAL = registry.counter(
+    "mediacrawler_store_items_total",
+    "Items written by the store implementations",
+    ("platform", "store", "item_type", "outcome"),
+)
+STORE_DURATION = registry.histogram(
+    "mediacrawler_store_duration_seconds",
+    "Time spent in one store call (one item, or one batch for store_contents/store_comments/store_creators)",
+    ("platform", "store", "item_type"),
+)
+PROXY_POOL_SIZE = registry.gauge(
+    "mediacrawler_proxy_pool_size",
+    "Proxies currently available in the pool",
+    ("provider",),
+)
+PROXY_LOADED_TOTAL = registry.counter(
+    "mediacrawler_proxy_loaded_total",
+    "Proxies fetched from the provider",
+    ("provider",),
+)
+PROXY_CHECKOUT_TOTAL = registry.counter(
+    "mediacrawler_proxy_checkout_total",
+    "Proxies taken from the pool by outcome (ok | invalid | error)",
+    ("provider", "outcome"),
+)
+CIRCUIT_BREAKER_STATE = registry.gauge(
+    "mediacrawler_circuit_breaker_state",
+    "Per-platform circuit breaker state (0 closed, 1 open, 2 half-open)",
+    ("platform",),
+)
+CIRCUIT_BREAKER_TRIPS_TOTAL = registry.counter(
+    "mediacrawler_circuit_breaker_trips_total",
+    "Times a platform was put into cooldown after a suspected block",
+    ("platform",),
+)
+SPOOL_RECORDS_TOTAL = registry.counter(
+    "mediacrawler_spool_records_total",
+    "Store calls appended to the local disk spool and replayed into the database (stage: appended | replayed | dead_lettered)",
+    ("stage",),
+)
+SPOOL_REPLAY_ERRORS_TOTAL = registry.counter(
+    "mediacrawler_spool_replay_errors_total",
+    "Failed attempts to replay a spool batch into the database, the batch is retried",
+)
+DB_ROWS_TOTAL = registry.counter(
+    "mediacrawler_db_rows_total",
+    "Rows handled by the DB/SQLite store by action (insert | update | unchanged, unchanged rows are not written)",
+    ("table", "action"),
+)
+BROWSER_BLOCKED_REQUESTS_TOTAL = registry.counter(
+    "mediacrawler_browser_blocked_requests_total",
+    "Browser requests aborted by the resource filter",
+    ("platform", "resource_type"),
+)
+
+
+def instrument_request(platform: str) -> Callable:
+    """
+    给客户端的 request 方法埋点：请求数、耗时、进行中的请求数、异常类型
+    放在 @retry 的内层，这样每一次重试都会被单独统计
+    Args:
+        platform: 平台名称
+
+    Returns:
+
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            method = kwargs.get("method") or (args[0] if args else "")
+            outcome = "ok"
+            HTTP_REQUESTS_IN_FLIGHT.inc(platform=platform)
+            start = time.perf_counter()
+            try:
+                return await func(self, *args, **kwargs)
+            except Exception as e:
+                outcome = type(e).__name__
+                raise
+            finally:
+                HTTP_REQUESTS_IN_FLIGHT.dec(platform=platform)
+                HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, platform=platform)
+                HTTP_REQUESTS_TOTAL.inc(platform=platform, method=method, outcome=outcome)
+
+        return wrapper
+
+    return decorator
+
+
+def observe_response(platform: str, status_code: int) -> None:
+    """
+    记录一次 HTTP 响应的状态码，用来观察 461/471/429 之类的限流、验证码响应
+    """
+    HTTP_RESPONSES_TOTAL.inc(platform=platform, status_code=status_code)
+
+
+# 批量写入方法 -> 单条记录的类型
+BATCH_STORE_METHODS = {
+    "store_contents": "content",
+    "store_comments": "comment",
+    "store_creators": "creator",
+}
+
+
+class InstrumentedStore:
+    """
+    存储实现的代理，对 store_xxx 协程方法统计写入条数与耗时（同时记录 store 阶段的 span），其他属性原样透传
+    """
+
+    def __init__(self, platform: str, store: Any):
+        self._platform = platform
+        self._store = store
+        self._store_name = type(store).__name__
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._store, name)
+        if not name.startswith("store_") or not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        batch = name in BATCH_STORE_METHODS
+        item_type = BATCH_STORE_METHODS.get(name) or name[len("store_"):]
+
+        @functools.wraps(attr)
+        async def wrapper(*args, **kwargs):
+            # 批量接口按条数计数，和逐条写入的计数口径一致
+            count = len(args[0] if args else next(iter(kwargs.values()))) if batch else 1
+            outcome = "ok"
+            start = time.perf_counter()
+            try:
+                with tracing.span("store", f"{self._store_name}.{name}"):
+                    return await attr(*args, **kwargs)
+            except Exception as e:
+                outcome = type(e).__name__
+                raise
+            finally:
+                STORE_DURATION.observe(time.perf_counter() - start, platform=self._platform,
+                                       store=self._store_name, item_type=item_type)
+                STORE_ITEMS_TOTAL.inc(count, platform=self._platform, store=self._store_name,
+                                      item_type=item_type, outcome=outcome)
+
+        return wrapper
+
+
+def instrument_store(platform: str, store: Any) -> Any:
+    """
+    在各平台的 StoreFactory 里包装存储实现
+    Args:
+        platform: 平台名称
+        store: 存储实现实例
+
+    Returns:
+
+    """
+    return InstrumentedStore(platform, store)
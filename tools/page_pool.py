@@ -0,0 +1,157 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 同一个 BrowserContext 下的预热页面池，签名、读取 localStorage 等 evaluate 调用分散到多个页面上执行
+import asyncio
+import itertools
+from typing import Any, Dict, List, Optional
+
+from playwright.async_api import BrowserContext, Page
+
+from . import utils
+
+
+class _PageLease:
+    """
+    从页面池借出的一个页面，async with 结束时归还
+    """
+
+    def __init__(self, pool: "BrowserPagePool"):
+        self._pool = pool
+        self._index = -1
+
+    async def __aenter__(self) -> Page:
+        self._index = await self._pool._checkout()
+        return self._pool.pages[self._index]
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._pool._checkin(self._index)
+
+
+class BrowserPagePool:
+    """
+    Playwright 对同一个页面的 evaluate 是串行执行的，并发请求的签名都排在一个页面后面
+    页面池在同一个 BrowserContext 里打开多个已经加载好首页的页面（共享 cookie 和 localStorage），
+    每次借出正在执行的 evaluate 最少的页面，数量相同时轮询；借出前检查页面是否已关闭，关闭的页面会被替换
+    主页面由爬虫持有（登录、跳转都在它上面），池不会替换它，主页面关闭后只跳过
+    """
+
+    def __init__(self, pages: List[Page], browser_context: Optional[BrowserContext] = None, warm_url: str = ""):
+        """
+        Args:
+            pages: 池里的页面，第一个为主页面（爬虫的 context_page，登录、跳转都在它上面进行）
+            browser_context: 用于替换已关闭的页面，为空时不替换
+            warm_url: 新页面预热时打开的地址
+        """
+        if not pages:
+            raise ValueError("[BrowserPagePool] at least one page is required")
+        self.pages = list(pages)
+        self.browser_context = browser_context
+        self.warm_url = warm_url
+        self._busy = [0] * len(self.pages)
+        self._round_robin = itertools.count()
+        # 每个位置一把锁，同一个关闭的页面只替换一次，等锁的协程直接用替换好的页面
+        self._replace_locks: Dict[int, asyncio.Lock] = {}
+
+    @classmethod
+    async def create(cls, browser_context: BrowserContext, primary_page: Page, size: int, warm_url: str) -> "BrowserPagePool":
+        """
+        以爬虫的 context_page 为主页面，额外打开 size - 1 个页面并预热
+        Args:
+            browser_context: 浏览器上下文
+            primary_page: 主页面
+            size: 页面池大小
+            warm_url: 预热时打开的地址，一般为平台首页
+
+        Returns:
+
+        """
+        pool = cls([primary_page], browser_context, warm_url)
+        for _ in range(max(size, 1) - 1):
+            pool.pages.append(await pool._open_page())
+            pool._busy.append(0)
+        utils.logger.info(f"[BrowserPagePool.create] page pool ready, size: {len(pool.pages)}, warm url: {warm_url}")
+        return pool
+
+    @property
+    def primary(self) -> Page:
+        return self.pages[0]
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    async def _open_page(self) -> Page:
+        page = await self.browser_context.new_page()
+        if self.warm_url:
+            await page.goto(self.warm_url)
+        return page
+
+    async def _replace(self, index: int) -> bool:
+        if index == 0 or self.browser_context is None:
+            return False
+        lock = self._replace_locks.setdefault(index, asyncio.Lock())
+        async with lock:
+            # 等锁期间其他协程可能已经替换好了
+            if not self.pages[index].is_closed():
+                return True
+            try:
+                self.pages[index] = await self._open_page()
+            except Exception as e:
+                utils.logger.error(f"[BrowserPagePool._replace] open page to replace the closed one failed: {e}")
+                return False
+        utils.logger.warning(f"[BrowserPagePool._replace] page {index} was closed, replaced with a new page")
+        return True
+
+    async def _checkout(self) -> int:
+        # 先找最空闲的页面，页面已关闭时尝试替换（主页面不替换），替换失败就跳过它
+        offset = next(self._round_robin)
+        order = sorted(range(len(self.pages)), key=lambda i: (self._busy[i], (i - offset) % len(self.pages)))
+        for index in order:
+            if self.pages[index].is_closed() and not await self._replace(index):
+                continue
+            self._busy[index] += 1
+            return index
+        raise RuntimeError("[BrowserPagePool._checkout] all pages in the pool are closed")
+
+    def _checkin(self, index: int) -> None:
+        self._busy[index] -= 1
+
+    def acquire(self) -> _PageLease:
+        """
+        借出一个页面，用于需要在同一个页面上连续执行多次 evaluate 的场景：
+            async with page_pool.acquire() as page:
+                ...
+        """
+        return _PageLease(self)
+
+    async def evaluate(self, expression: str, arg: Any = None) -> Any:
+        """
+        在最空闲的页面上执行 page.evaluate
+        Args:
+            expression: js 表达式
+            arg: 传给表达式的参数
+
+        Returns:
+
+        """
+        async with self.acquire() as page:
+            return await page.evaluate(expression, arg)
+
+    async def close(self) -> None:
+        """
+        关闭主页面之外的页面
+        """
+        for page in self.pages[1:]:
+            if not page.is_closed():
+                await page.close()
+        self.pages = self.pages[:1]
+        self._busy = self._busy[:1]
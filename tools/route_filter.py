@@ -0,0 +1,89 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 浏览器资源过滤，打开首页、登录、刷新 cookie 时不下载图片、音视频、字体和统计脚本
+from typing import Iterable, List, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import BrowserContext, Route
+
+import config
+
+from . import metrics, utils
+
+
+class ResourceFilter:
+    """
+    按资源类型和域名拦截浏览器请求，allow_list 里的地址片段优先放行（登录二维码、滑块验证码图片等）
+    签名依赖的 js 脚本不属于拦截的资源类型，不会被拦截
+    """
+
+    def __init__(self, platform: str, allow_list: Iterable[str] = (),
+                 blocked_types: Optional[Iterable[str]] = None, blocked_hosts: Optional[Iterable[str]] = None):
+        """
+        Args:
+            platform: 平台名称，用于日志和指标
+            allow_list: 始终放行的地址片段，请求地址包含其中任意一个即放行
+            blocked_types: 拦截的资源类型，为空时读取 config.RESOURCE_FILTER_BLOCKED_TYPES
+            blocked_hosts: 拦截的域名（包含子域名），为空时读取 config.RESOURCE_FILTER_BLOCKED_HOSTS
+        """
+        self.platform = platform
+        self.allow_list: List[str] = list(allow_list)
+        self.blocked_types = set(blocked_types if blocked_types is not None else config.RESOURCE_FILTER_BLOCKED_TYPES)
+        self.blocked_hosts = tuple(blocked_hosts if blocked_hosts is not None else config.RESOURCE_FILTER_BLOCKED_HOSTS)
+
+    def _is_blocked_host(self, url: str) -> bool:
+        host = urlparse(url).hostname or ""
+        return any(host == blocked or host.endswith(f".{blocked}") for blocked in self.blocked_hosts)
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        """
+        判断请求是否需要拦截
+        Args:
+            url: 请求地址
+            resource_type: playwright 的资源类型，如 image、media、font、script
+
+        Returns:
+
+        """
+        if any(pattern in url for pattern in self.allow_list):
+            return False
+        return resource_type in self.blocked_types or self._is_blocked_host(url)
+
+    async def handle(self, route: Route) -> None:
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            metrics.BROWSER_BLOCKED_REQUESTS_TOTAL.inc(platform=self.platform, resource_type=request.resource_type)
+            await route.abort()
+        else:
+            await route.fallback()
+
+
+async def install_resource_filter(browser_context: BrowserContext, platform: str, allow_list: Iterable[str] = ()) -> None:
+    """
+    给浏览器上下文安装资源过滤，对之后打开的所有页面生效；未开启 ENABLE_RESOURCE_FILTER 时不做任何事
+    Args:
+        browser_context: 浏览器上下文
+        platform: 平台名称
+        allow_list: 平台的放行地址片段
+
+    Returns:
+
+    """
+    if not config.ENABLE_RESOURCE_FILTER:
+        return
+    resource_filter = ResourceFilter(platform, allow_list)
+    await browser_context.route("**/*", resource_filter.handle)
+    utils.logger.info(
+        f"[route_filter.install_resource_filter] {platform} blocking types: {sorted(resource_filter.blocked_types)}, "
+        f"hosts: {len(resource_filter.blocked_hosts)}, allow list: {resource_filter.allow_list}"
+    )
@@ -0,0 +1,119 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 单个平台的爬取参数（多平台运行的 run spec、服务模式的任务共用），转换成该平台运行期间生效的配置覆盖项
+#
+# run spec 文件示例（JSON），SAVE_DATA_OPTION 等存储配置所有平台共用，不能在单个平台里覆盖：
+#   {
+#       "runs": [
+#           {"platform": "xhs", "crawler_type": "search", "keywords": "编程副业", "max_notes": 20},
+#           {"platform": "bili", "crawler_type": "creator", "creator_ids": ["20813884"], "settings": {"CREATOR_MODE": false}}
+#       ]
+#   }
+import json
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+PLATFORMS = ["xhs", "dy", "ks", "bili", "wb", "tieba", "zhihu"]
+
+CRAWLER_TYPES = ["search", "detail", "creator"]
+
+# 各平台指定帖子、指定创作者对应的配置项
+SPECIFIED_ID_CONFIGS = {
+    "xhs": "XHS_SPECIFIED_NOTE_URL_LIST",
+    "dy": "DY_SPECIFIED_ID_LIST",
+    "ks": "KS_SPECIFIED_ID_LIST",
+    "bili": "BILI_SPECIFIED_ID_LIST",
+    "wb": "WEIBO_SPECIFIED_ID_LIST",
+    "tieba": "TIEBA_SPECIFIED_ID_LIST",
+    "zhihu": "ZHIHU_SPECIFIED_ID_LIST",
+}
+CREATOR_ID_CONFIGS = {
+    "xhs": "XHS_CREATOR_ID_LIST",
+    "dy": "DY_CREATOR_ID_LIST",
+    "ks": "KS_CREATOR_ID_LIST",
+    "bili": "BILI_CREATOR_ID_LIST",
+    "wb": "WEIBO_CREATOR_ID_LIST",
+    "tieba": "TIEBA_CREATOR_URL_LIST",
+    "zhihu": "ZHIHU_CREATOR_URL_LIST",
+}
+
+# 数据库连接池在进程启动时按全局配置初始化，所有平台共用
+SHARED_SETTINGS = ["SAVE_DATA_OPTION"]
+
+
+class CrawlSpec(BaseModel):
+    """
+    单个平台的爬取参数，未填写的字段沿用全局配置；settings 可以覆盖任意其他配置项
+    """
+    platform: str
+    crawler_type: str = "search"
+    keywords: Optional[str] = None
+    specified_ids: Optional[List[str]] = None
+    creator_ids: Optional[List[str]] = None
+    start_page: Optional[int] = None
+    max_notes: Optional[int] = None
+    max_comments: Optional[int] = None
+    get_comment: Optional[bool] = None
+    get_sub_comment: Optional[bool] = None
+    settings: Dict[str, Any] = {}
+
+    def validate_spec(self) -> None:
+        """
+        检查平台、爬取类型和覆盖的配置项，不合法时抛出 ValueError
+        """
+        if self.platform not in PLATFORMS:
+            raise ValueError(f"unsupported platform: {self.platform}")
+        if self.crawler_type not in CRAWLER_TYPES:
+            raise ValueError(f"unsupported crawler type: {self.crawler_type}")
+        shared = [name for name in self.settings if name in SHARED_SETTINGS]
+        if shared:
+            raise ValueError(f"{shared} are shared by all platforms and can not be overridden per platform")
+
+    def config_overrides(self) -> Dict[str, Any]:
+        """
+        该平台运行期间生效的配置覆盖项
+        """
+        overrides = {
+            "PLATFORM": self.platform,
+            "CRAWLER_TYPE": self.crawler_type,
+            "KEYWORDS": self.keywords,
+            SPECIFIED_ID_CONFIGS[self.platform]: self.specified_ids,
+            CREATOR_ID_CONFIGS[self.platform]: self.creator_ids,
+            "START_PAGE": self.start_page,
+            "CRAWLER_MAX_NOTES_COUNT": self.max_notes,
+            "CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES": self.max_comments,
+            "ENABLE_GET_COMMENTS": self.get_comment,
+            "ENABLE_GET_SUB_COMMENTS": self.get_sub_comment,
+        }
+        # 具名字段优先于 settings 里的同名配置
+        return {**self.settings, **{name: value for name, value in overrides.items() if value is not None}}
+
+
+def load_run_spec(path: str) -> List[CrawlSpec]:
+    """
+    读取 run spec 文件
+    Args:
+        path: JSON 文件路径
+
+    Returns:
+
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    specs = [CrawlSpec(**run) for run in data.get("runs", [])]
+    if not specs:
+        raise ValueError(f"no runs in run spec: {path}")
+    for spec in specs:
+        spec.validate_spec()
+    return specs
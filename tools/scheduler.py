@@ -0,0 +1,237 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 关键词、创作者的并发调度，所有任务共享的按平台请求预算（在途请求数、每秒请求数），以及评论抓取用的并发工具
+import asyncio
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import config
+from var import source_keyword_var
+
+from . import tracing, utils
+
+
+class RequestLimiter:
+    """
+    单个平台的全局请求预算：限制同时在途的请求数，可选限制每秒发起的请求数
+    """
+
+    def __init__(self, max_inflight: int, max_per_second: float = 0):
+        self.max_inflight = max(max_inflight, 1)
+        self.max_per_second = max_per_second
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._next_start = 0.0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphore 会绑定创建时的事件循环，换了事件循环（例如测试里多次 asyncio.run）就重新创建
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_inflight)
+            self._loop = loop
+        return self._semaphore
+
+    async def __aenter__(self) -> "RequestLimiter":
+        await self._get_semaphore().acquire()
+        if self.max_per_second > 0:
+            # 按固定间隔给每个请求分配发起时间，等待期间不占用事件循环
+            now = time.monotonic()
+            start_at = max(now, self._next_start)
+            self._next_start = start_at + 1 / self.max_per_second
+            if start_at > now:
+                with tracing.span("sleep", "request_limiter"):
+                    await asyncio.sleep(start_at - now)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._semaphore.release()
+
+
+_limiters: Dict[str, RequestLimiter] = {}
+
+
+def get_request_limiter(platform: str) -> RequestLimiter:
+    """
+    获取平台的请求预算，第一次使用时按 GLOBAL_MAX_INFLIGHT_REQUESTS、GLOBAL_MAX_REQUESTS_PER_SEC 创建
+    """
+    limiter = _limiters.get(platform)
+    if limiter is None:
+        limiter = _limiters[platform] = RequestLimiter(config.GLOBAL_MAX_INFLIGHT_REQUESTS, config.GLOBAL_MAX_REQUESTS_PER_SEC)
+    return limiter
+
+
+def limit_requests(platform: str) -> Callable:
+    """
+    给客户端的 request 方法套上平台的全局请求预算，放在 metrics.instrument_request 外层，排队时间不计入请求耗时
+    Args:
+        platform: 平台名称
+
+    Returns:
+
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            async with get_request_limiter(platform):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+async def _gather_or_cancel(tasks: List[asyncio.Task]) -> List[Any]:
+    # asyncio.gather 在某个任务失败时不会取消其他任务，这里手动取消，避免失败后还有请求在后台继续发出
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+async def gather_limited(aws: Iterable[Awaitable], concurrency: int,
+                         semaphore: Optional[asyncio.Semaphore] = None) -> List[Any]:
+    """
+    并发执行一组协程，同时最多运行 concurrency 个，结果按传入顺序返回；任一协程异常时取消其余协程并抛出
+    Args:
+        aws: 协程列表
+        concurrency: 并发上限
+        semaphore: 多次调用共享的并发上限（如同一个帖子下每页一级评论的二级评论抓取），传入时忽略 concurrency
+
+    Returns:
+
+    """
+    semaphore = semaphore or asyncio.Semaphore(max(concurrency, 1))
+
+    async def run(aw: Awaitable) -> Any:
+        try:
+            async with semaphore:
+                return await aw
+        except asyncio.CancelledError:
+            # 还在排队时被取消的协程没有开始执行，主动关闭，避免 never awaited 警告
+            if asyncio.iscoroutine(aw):
+                aw.close()
+            raise
+
+    return await _gather_or_cancel([asyncio.ensure_future(run(aw)) for aw in aws])
+
+
+def sub_comment_semaphore() -> asyncio.Semaphore:
+    """
+    一个帖子的二级评论抓取共用的并发上限：每页一级评论各自在后台抓取二级评论，
+    同一个帖子下同时翻页的一级评论总数不超过 SUB_COMMENT_CONCURRENCY_NUM
+    """
+    return asyncio.Semaphore(max(config.SUB_COMMENT_CONCURRENCY_NUM, 1))
+
+
+class BackgroundTasks:
+    """
+    在后台启动任务、最后统一等待结果，用于一级评论翻页时不等待二级评论抓取完成：
+        async with scheduler.BackgroundTasks() as pending:
+            pending.start(self.get_comments_all_sub_comments(...))
+            ...
+            sub_comments = await pending.join()
+    退出 async with 时如果有异常（包括被取消），未完成的后台任务会被取消
+    """
+
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self, aw: Awaitable) -> None:
+        self._tasks.append(asyncio.ensure_future(aw))
+
+    async def join(self) -> List[Any]:
+        """
+        等待所有后台任务完成，按启动顺序返回结果，任一任务异常时取消其余任务并抛出
+        """
+        tasks, self._tasks = self._tasks, []
+        return await _gather_or_cancel(tasks)
+
+    async def __aenter__(self) -> "BackgroundTasks":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+
+def get_keywords() -> List[str]:
+    return [keyword for keyword in config.KEYWORDS.split(",") if keyword.strip()]
+
+
+async def run_concurrently(items: Iterable[Any], handler: Callable[[Any], Awaitable[None]], concurrency: int, name: str) -> None:
+    """
+    用固定数量的 worker 处理一批任务（关键词、创作者等），worker 按顺序从同一个迭代器里取下一项，先到先得
+    单项失败只记录日志，不影响其他项
+    Args:
+        items: 待处理的任务列表
+        handler: 处理单项的协程函数
+        concurrency: worker 数量
+        name: 日志里显示的调用方名称
+
+    Returns:
+
+    """
+    iterator = iter(items)
+
+    async def worker() -> None:
+        # 迭代器在协程之间共享，next() 之间没有 await，不会重复取到同一项
+        for item in iterator:
+            try:
+                await handler(item)
+            except Exception as e:
+                utils.logger.error(f"[scheduler.{name}] {item} failed, err: {e}")
+
+    # create_task 会复制当前上下文，每个 worker 里对 ContextVar 的修改只在自己的任务内可见
+    await asyncio.gather(*[asyncio.create_task(worker()) for _ in range(max(concurrency, 1))])
+
+
+async def run_keywords(search_keyword: Callable[[str], Awaitable[None]], keywords: Optional[List[str]] = None,
+                       concurrency: Optional[int] = None) -> None:
+    """
+    并发搜索多个关键词，每个关键词在独立的任务里运行，source_keyword 在各自任务的上下文里设置，互不干扰
+    Args:
+        search_keyword: 搜索单个关键词的协程函数
+        keywords: 关键词列表，为空时读取 config.KEYWORDS
+        concurrency: 同时搜索的关键词数量，为空时读取 config.KEYWORD_CONCURRENCY_NUM
+
+    Returns:
+
+    """
+
+    async def search_one(keyword: str) -> None:
+        source_keyword_var.set(keyword)
+        await search_keyword(keyword)
+
+    keywords = keywords if keywords is not None else get_keywords()
+    await run_concurrently(keywords, search_one, concurrency or config.KEYWORD_CONCURRENCY_NUM, "run_keywords")
+
+
+async def run_creators(crawl_creator: Callable[[str], Awaitable[None]], creator_ids: List[str],
+                       concurrency: Optional[int] = None) -> None:
+    """
+    创作者模式的 worker 池：同时抓取多个创作者，每个创作者的翻页游标保存在自己的任务里
+    worker 按列表顺序领取下一个创作者，请求由平台的全局请求预算按先到先得排队，发帖多的创作者不会独占请求预算
+    Args:
+        crawl_creator: 抓取单个创作者的协程函数
+        creator_ids: 创作者ID列表
+        concurrency: 同时抓取的创作者数量，为空时读取 config.CREATOR_CONCURRENCY_NUM
+
+    Returns:
+
+    """
+    await run_concurrently(creator_ids, crawl_creator, concurrency or config.CREATOR_CONCURRENCY_NUM, "run_creators")
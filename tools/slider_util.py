@@ -17,9 +17,7 @@ import os
 from typing import List
 from urllib.parse import urlparse
 
-import cv2
 import httpx
-import numpy as np
 
 
 class Slide:
@@ -59,6 +57,10 @@ class Slide:
             }
             img_res = httpx.get(img, headers=headers)
             if img_res.status_code == 200:
+                # opencv 导入较慢，只在处理滑块验证码时导入
+                import cv2
+                import numpy as np
+
                 img_path = f'./temp_image/{img_type}.jpg'
                 image = np.asarray(bytearray(img_res.content), dtype="uint8")
                 image = cv2.imdecode(image, cv2.IMREAD_COLOR)
@@ -74,6 +76,8 @@ class Slide:
     @staticmethod
     def clear_white(img):
         """清除图片的空白区域，这里主要清除滑块的空白"""
+        import cv2
+
         img = cv2.imread(img)
         rows, cols, channel = img.shape
         min_x = 255
@@ -97,6 +101,8 @@ class Slide:
         return img1
 
     def template_match(self, tpl, target):
+        import cv2
+
         th, tw = tpl.shape[:2]
         result = cv2.matchTemplate(target, tpl, cv2.TM_CCOEFF_NORMED)
         # 寻找矩阵(一维数组当作向量,用Mat定义) 中最小值和最大值的位置
@@ -115,10 +121,14 @@ class Slide:
 
     @staticmethod
     def image_edge_detection(img):
+        import cv2
+
         edges = cv2.Canny(img, 100, 200)
         return edges
 
     def discern(self):
+        import cv2
+
         img1 = self.clear_white(self.gap)
         img1 = cv2.cvtColor(img1, cv2.COLOR_RGB2GRAY)
         slide = self.image_edge_detection(img1)
@@ -0,0 +1,187 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 轻量的分阶段耗时统计（签名、网络、解析、存储、休眠），支持导出 Chrome/Perfetto trace
+import asyncio
+import functools
+import itertools
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+import config
+from var import trace_span_var
+
+from . import utils
+
+# 导出 trace 文件时最多保留的事件数，避免长时间运行内存无限增长，统计数据不受影响
+MAX_TRACE_EVENTS = 200000
+
+# 休眠时长倍率，基准测试里设为 0 跳过爬取间隔，只统计处理本身的吞吐（sleep 阶段的 span 仍然会记录）
+sleep_scale = 1.0
+
+
+class TraceRecorder:
+    """
+    收集 span 的耗时，按阶段做汇总统计，可选保留明细用于导出 trace 文件
+    """
+
+    def __init__(self, enabled: bool, export_path: str = ""):
+        self.enabled = enabled
+        self.export_path = export_path
+        self.stage_durations: Dict[str, List[float]] = {}
+        self.events: List[Dict] = []
+        self.dropped_events = 0
+        self._span_ids = itertools.count(1)
+        self._task_ids: Dict[int, int] = {}
+        self._origin = time.perf_counter()
+
+    def next_span_id(self) -> int:
+        return next(self._span_ids)
+
+    def _current_tid(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is None:
+            return 0
+        return self._task_ids.setdefault(id(task), len(self._task_ids) + 1)
+
+    def add(self, stage: str, name: str, start: float, duration: float, span_id: int, parent_id: Optional[int]):
+        self.stage_durations.setdefault(stage, []).append(duration)
+        if not self.export_path:
+            return
+        if len(self.events) >= MAX_TRACE_EVENTS:
+            self.dropped_events += 1
+            return
+        self.events.append({
+            "name": name or stage,
+            "cat": stage,
+            "ph": "X",
+            "ts": round((start - self._origin) * 1e6, 3),
+            "dur": round(duration * 1e6, 3),
+            "pid": os.getpid(),
+            "tid": self._current_tid(),
+            "args": {"span_id": span_id, "parent_id": parent_id},
+        })
+
+    def summary(self) -> str:
+        """
+        按阶段总耗时倒序输出汇总表，包含次数、总耗时、p50、p95 与占比条
+        """
+        if not self.stage_durations:
+            return "no spans recorded"
+        rows = []
+        for stage, durations in self.stage_durations.items():
+            ordered = sorted(durations)
+            rows.append((stage, len(ordered), sum(ordered), _percentile(ordered, 0.5), _percentile(ordered, 0.95)))
+        rows.sort(key=lambda row: row[2], reverse=True)
+        grand_total = sum(row[2] for row in rows) or 1.0
+        lines = [f"{'stage':<10} {'count':>8} {'total(s)':>10} {'p50(ms)':>10} {'p95(ms)':>10}  share"]
+        for stage, count, total, p50, p95 in rows:
+            bar = "█" * max(1, round(total / grand_total * 40))
+            lines.append(f"{stage:<10} {count:>8} {total:>10.3f} {p50 * 1000:>10.1f} {p95 * 1000:>10.1f}  {bar}")
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path: str) -> None:
+        """
+        导出 Chrome trace event 格式，可以在 chrome://tracing 或 ui.perfetto.dev 打开
+        """
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+recorder = TraceRecorder(enabled=config.ENABLE_TRACING, export_path=config.TRACE_EXPORT_PATH)
+
+
+class span:
+    """
+    统计一段代码的耗时，同步、异步代码里都用 with 语句：
+        with tracing.span("network", url):
+            response = await client.request(...)
+    当前 span 通过 var.trace_span_var 传递，子任务会继承父 span，导出时可以还原调用层级
+    """
+    __slots__ = ("stage", "name", "span_id", "parent_id", "start", "token")
+
+    def __init__(self, stage: str, name: str = ""):
+        self.stage = stage
+        self.name = name
+        self.token = None
+
+    def __enter__(self) -> "span":
+        if not recorder.enabled:
+            return self
+        self.span_id = recorder.next_span_id()
+        self.parent_id = trace_span_var.get()
+        self.token = trace_span_var.set(self.span_id)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self.token is None:
+            return
+        duration = time.perf_counter() - self.start
+        trace_span_var.reset(self.token)
+        recorder.add(self.stage, self.name, self.start, duration, self.span_id, self.parent_id)
+
+
+def traced(stage: str) -> Callable:
+    """
+    异步函数装饰器版本的 span，span 名称取函数的 __qualname__
+    Args:
+        stage: 阶段名称 sign | network | parse | store | sleep
+
+    Returns:
+
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(stage, func.__qualname__):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+async def sleep(delay: float) -> None:
+    """
+    带 sleep 阶段统计的 asyncio.sleep，爬取间隔、随机等待都走这里
+    """
+    with span("sleep"):
+        await asyncio.sleep(delay * sleep_scale)
+
+
+def report() -> None:
+    """
+    程序退出时输出分阶段耗时汇总，配置了 TRACE_EXPORT_PATH 时同时导出 trace 文件
+    """
+    if not recorder.enabled:
+        return
+    utils.logger.info("[tracing.report] crawl stage summary:\n%s", recorder.summary())
+    if recorder.export_path:
+        recorder.export_chrome_trace(recorder.export_path)
+        utils.logger.info(
+            f"[tracing.report] trace exported to {recorder.export_path}, events: {len(recorder.events)}, dropped: {recorder.dropped_events}")
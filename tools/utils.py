@@ -10,22 +10,163 @@
 
 
 import argparse
+import atexit
+import copy
 import logging
+import os
+import queue
+import reprlib
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple, Union
+
+import config
 
 from .crawler_util import *
 from .slider_util import *
 from .time_util import *
 
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_LOG_FORMAT = "%(asctime)s %(name)s %(levelname)s (%(filename)s:%(lineno)d) - %(message)s"
+_LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _to_log_level(level: Union[str, int]) -> int:
+    if isinstance(level, int):
+        return level
+    level_no = logging.getLevelName(str(level).upper())
+    return level_no if isinstance(level_no, int) else logging.INFO
+
+
+class LazyPayload:
+    """
+    大报文日志包装：只有日志真正被输出时才会格式化，并且格式化的开销有上限
+    嵌套层级、dict/list 元素个数、字符串长度都会被 reprlib 截断，最后再按 LOG_PAYLOAD_MAX_CHARS 截断
+    用法: utils.logger.debug("[xxx] res: %s", utils.lazy_payload(res))
+    """
+    __slots__ = ("payload", "max_chars")
+
+    _repr = reprlib.Repr()
+    _repr.maxlevel = 3
+    _repr.maxdict = 8
+    _repr.maxlist = 5
+    _repr.maxtuple = 5
+    _repr.maxset = 5
+    _repr.maxstring = 80
+    _repr.maxother = 120
+
+    def __init__(self, payload: Any, max_chars: int):
+        self.payload = payload
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        text = self._repr.repr(self.payload)
+        if len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}...(truncated)"
+        return text
+
+    __repr__ = __str__
+
+
+def lazy_payload(payload: Any, max_chars: Optional[int] = None) -> LazyPayload:
+    """
+    包装接口响应、存储记录等大对象，配合 %s 占位符延迟格式化
+    Args:
+        payload: 需要输出到日志里的对象
+        max_chars: 最大输出字符数，默认取 config.LOG_PAYLOAD_MAX_CHARS
+
+    Returns:
+
+    """
+    return LazyPayload(payload, max_chars or config.LOG_PAYLOAD_MAX_CHARS)
+
+
+class ModuleLevelFilter(logging.Filter):
+    """
+    按照日志调用方所在模块（例如 media_platform.xhs.core）过滤日志级别
+    所有模块共用 MediaCrawler 这一个 logger，所以按 record.pathname 推导模块名，匹配最长的前缀
+    """
+
+    def __init__(self, default_level: int, module_levels: Dict[str, int]):
+        super().__init__()
+        self.default_level = default_level
+        self.module_levels = module_levels
+        self._pathname_levels: Dict[str, int] = {}
+
+    def _level_for_pathname(self, pathname: str) -> int:
+        level = self._pathname_levels.get(pathname)
+        if level is not None:
+            return level
+
+        level = self.default_level
+        rel_path = os.path.relpath(pathname, _PROJECT_ROOT)
+        if not rel_path.startswith(".."):
+            parts = os.path.splitext(rel_path)[0].split(os.sep)
+            for i in range(len(parts), 0, -1):
+                module_level = self.module_levels.get(".".join(parts[:i]))
+                if module_level is not None:
+                    level = module_level
+                    break
+        self._pathname_levels[pathname] = level
+        return level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.module_levels:
+            return record.levelno >= self.default_level
+        return record.levelno >= self._level_for_pathname(record.pathname)
+
+
+class PayloadSamplingFilter(logging.Filter):
+    """
+    带有 LazyPayload 参数的日志，同一调用位置每 every 次只输出 1 次
+    """
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = every
+        self._counters: Dict[Tuple[str, int], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every <= 1 or not isinstance(record.args, tuple):
+            return True
+        if not any(isinstance(arg, LazyPayload) for arg in record.args):
+            return True
+        key = (record.pathname, record.lineno)
+        count = self._counters.get(key, 0)
+        self._counters[key] = count + 1
+        return count % self.every == 0
+
+
+class DeferredFormatQueueHandler(QueueHandler):
+    """
+    标准 QueueHandler.prepare() 会在调用线程里合并 args、生成异常堆栈，格式化开销仍然落在事件循环上
+    这里入队前只复制 record，格式化交给 QueueListener 后台线程上的 handler 完成，
+    因此 args 里的对象（包括 LazyPayload）在后台线程里才转成字符串，记录日志后不要再修改它们
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return copy.copy(record)
+
 
 def init_loging_config():
-    level = logging.INFO
-    logging.basicConfig(
-        level=level,
-        format="%(asctime)s %(name)s %(levelname)s (%(filename)s:%(lineno)d) - %(message)s",
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    level = _to_log_level(config.LOG_LEVEL)
+    module_levels = {name: _to_log_level(lvl) for name, lvl in config.LOG_MODULE_LEVELS.items()}
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(_LOG_FORMAT, datefmt=_LOG_DATE_FORMAT))
+    handler: logging.Handler = stream_handler
+    if config.ENABLE_ASYNC_LOG:
+        # 调用线程里只复制 record 入队，格式化和输出都由 QueueListener 的后台线程完成，不阻塞事件循环
+        handler = DeferredFormatQueueHandler(queue.SimpleQueue())
+        listener = QueueListener(handler.queue, stream_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+    logging.basicConfig(level=level, handlers=[handler])
+
     _logger = logging.getLogger("MediaCrawler")
-    _logger.setLevel(level)
+    # logger 本身取最低的级别，具体每个模块的级别交给 ModuleLevelFilter 判断
+    _logger.setLevel(min([level, *module_levels.values()]))
+    _logger.addFilter(ModuleLevelFilter(level, module_levels))
+    _logger.addFilter(PayloadSamplingFilter(config.LOG_PAYLOAD_SAMPLE_EVERY))
     return _logger
 
 
@@ -13,11 +13,9 @@ import asyncio
 import json
 import logging
 from collections import Counter
+from typing import Optional
 
 import aiofiles
-import jieba
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
 
 import config
 from tools import utils
@@ -26,6 +24,9 @@ plot_lock = asyncio.Lock()
 
 class AsyncWordCloudGenerator:
     def __init__(self):
+        # jieba、matplotlib、wordcloud 导入和加载词典都比较慢，只在开启词云时才导入
+        import jieba
+
         logging.getLogger('jieba').setLevel(logging.WARNING)
         self.stop_words_file = config.STOP_WORDS_FILE
         self.lock = asyncio.Lock()
@@ -39,6 +40,8 @@ class AsyncWordCloudGenerator:
             return set(f.read().strip().split('\n'))
 
     async def generate_word_frequency_and_cloud(self, data, save_words_prefix):
+        import jieba
+
         all_text = ' '.join(item['content'] for item in data)
         words = [word for word in jieba.lcut(all_text) if word not in self.stop_words and len(word.strip()) > 0]
         word_freq = Counter(words)
@@ -56,6 +59,9 @@ class AsyncWordCloudGenerator:
         await self.generate_word_cloud(word_freq, save_words_prefix)
 
     async def generate_word_cloud(self, word_freq, save_words_prefix):
+        import matplotlib.pyplot as plt
+        from wordcloud import WordCloud
+
         await plot_lock.acquire()
         top_20_word_freq = {word: freq for word, freq in
                             sorted(word_freq.items(), key=lambda item: item[1], reverse=True)[:20]}
@@ -80,4 +86,17 @@ class AsyncWordCloudGenerator:
         plt.savefig(f"{save_words_prefix}_word_cloud.png", format='png', dpi=300)
         plt.close()
 
-        plot_lock.release()
\ No newline at end of file
+        plot_lock.release()
+
+
+_word_cloud_generator: Optional[AsyncWordCloudGenerator] = None
+
+
+def get_word_cloud_generator() -> AsyncWordCloudGenerator:
+    """
+    获取词云生成器，第一次生成词云时才创建
+    """
+    global _word_cloud_generator
+    if _word_cloud_generator is None:
+        _word_cloud_generator = AsyncWordCloudGenerator()
+    return _word_cloud_generator
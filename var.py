@@ -11,7 +11,7 @@
 
 from asyncio.tasks import Task
 from contextvars import ContextVar
-from typing import List
+from typing import List, Optional
 
 import aiomysql
 
@@ -22,4 +22,5 @@ crawler_type_var: ContextVar[str] = ContextVar("crawler_type", default="")
 comment_tasks_var: ContextVar[List[Task]] = ContextVar("comment_tasks", default=[])
 media_crawler_db_var: ContextVar[AsyncMysqlDB] = ContextVar("media_crawler_db_var")
 db_conn_pool_var: ContextVar[aiomysql.Pool] = ContextVar("db_conn_pool_var")
-source_keyword_var: ContextVar[str] = ContextVar("source_keyword", default="")
\ No newline at end of file
+source_keyword_var: ContextVar[str] = ContextVar("source_keyword", default="")
+trace_span_var: ContextVar[Optional[int]] = ContextVar("trace_span", default=None)